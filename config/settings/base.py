@@ -410,6 +410,29 @@ WEBPACK_LOADER = {
 # ------------------------------------------------------------------------------
 IRACING_USERNAME = env("IRACING_USERNAME", default="")
 IRACING_PASSWORD = env("IRACING_PASSWORD", default="")
+# Concurrent requests and minimum spacing (seconds) for AsyncIRacingClient
+IRACING_ASYNC_CONCURRENCY = env.int("IRACING_ASYNC_CONCURRENCY", default=4)
+IRACING_ASYNC_MIN_INTERVAL = env.float("IRACING_ASYNC_MIN_INTERVAL", default=0.25)
+# Shared token bucket (per iRacing account) used by every worker process
+IRACING_RATE_LIMIT_CAPACITY = env.int("IRACING_RATE_LIMIT_CAPACITY", default=10)
+IRACING_RATE_LIMIT_REFILL_PER_SECOND = env.float(
+    "IRACING_RATE_LIMIT_REFILL_PER_SECOND", default=1.0
+)
+# HTTP transport for IRacingClient: "live", "record" (save responses to the
+# corpus) or "replay" (serve responses from the corpus, no network access)
+IRACING_TRANSPORT = {
+    "MODE": env("IRACING_TRANSPORT_MODE", default="live"),
+    "CORPUS_DIR": env("IRACING_CORPUS_DIR", default=str(BASE_DIR / "iracing_corpus")),
+    "LATENCY": env.float("IRACING_REPLAY_LATENCY", default=0.0),
+}
+# Number of parallel subtasks sync_current_seasons_task splits the seasons
+# into; 1 syncs every season in the task itself
+IRACING_SEASON_SYNC_FANOUT = env.int("IRACING_SEASON_SYNC_FANOUT", default=8)
+# Concurrent weather forecast downloads per weather sync batch
+IRACING_WEATHER_FETCH_CONCURRENCY = env.int("IRACING_WEATHER_FETCH_CONCURRENCY", default=8)
+# Share of the rate limit capacity the past season backfill may keep in
+# flight; the rest is left for interactive and scheduled syncs
+IRACING_BACKFILL_RATE_SHARE = env.float("IRACING_BACKFILL_RATE_SHARE", default=0.5)
 
 # Discord Bot Configuration
 # ------------------------------------------------------------------------------
@@ -482,6 +505,14 @@ CHANNEL_LAYERS = {
     },
 }
 
+# Team Formation
+# ------------------------------------------------------------------------------
+# Wall-clock seconds the team formation solver spends improving its greedy
+# seed with member swaps
+TEAM_FORMATION_TIME_BUDGET = env.float("TEAM_FORMATION_TIME_BUDGET", default=2.0)
+# Seconds an event's availability bitmaps stay in Redis after their last change
+TEAM_AVAILABILITY_CACHE_TIMEOUT = env.int("TEAM_AVAILABILITY_CACHE_TIMEOUT", default=60 * 60 * 24)
+
 # Stripe Configuration
 # ------------------------------------------------------------------------------
 STRIPE_PUBLISHABLE_KEY = env("STRIPE_PUBLISHABLE_KEY", default="")
@@ -559,11 +590,61 @@ API_RESPONSE_STORAGE = {
     },
 }
 
+# Backend for the API response archive: "s3", "local" (e.g. a mirror made with
+# manage.py mirror_api_responses) or "memory"
+API_RESPONSE_ARCHIVE = {
+    "BACKEND": env("API_RESPONSE_ARCHIVE_BACKEND", default="s3"),
+    "LOCAL_ROOT": env(
+        "API_RESPONSE_ARCHIVE_LOCAL_ROOT", default=str(BASE_DIR / "api_responses")
+    ),
+    "MMAP_THRESHOLD": 1024 * 1024,  # Memory-map local objects from 1 MB
+}
+
 # API Response Cache Settings
 API_RESPONSE_CACHE_TTL = {
     "series": 24 * 60 * 60,  # 24 hours (series data changes infrequently)
     "seasons": 60 * 60,  # 1 hour (season data changes during active season)
     "schedules": 30 * 60,  # 30 minutes (schedule data can change frequently)
+    "schedule": 30 * 60,  # 30 minutes (per-season schedule responses)
+    "past_seasons": 7 * 24 * 60 * 60,  # 7 days (finished seasons do not change)
     "cars": 24 * 60 * 60,  # 24 hours (car data rarely changes)
     "tracks": 24 * 60 * 60,  # 24 hours (track data rarely changes)
 }
+
+# Seconds past the TTL a stale response is still served while a Celery task
+# refreshes it in the background
+API_RESPONSE_CACHE_GRACE = {
+    "default": 60 * 60,
+    "series": 24 * 60 * 60,
+    "past_seasons": 7 * 24 * 60 * 60,
+}
+
+# Upper bound (seconds) an entry may stay in each cache tier in front of S3;
+# None keeps it until its TTL plus grace window has passed
+API_RESPONSE_CACHE_TIER_TTL = {
+    "memory": 5 * 60,
+    "redis": None,
+}
+
+# Per-process memory tier budget, in bytes of serialized payload
+API_RESPONSE_CACHE_MEMORY_BYTES = env.int("API_RESPONSE_CACHE_MEMORY_BYTES", default=64 * 1024 * 1024)
+
+# Compression codec per API response data_type ("gzip" or "zstd")
+API_RESPONSE_CODECS = {
+    "default": "gzip",
+    "series": "zstd",
+    "seasons": "zstd",
+    "past_seasons": "zstd",
+    "schedule": "zstd",
+}
+API_RESPONSE_ZSTD_LEVEL = env.int("API_RESPONSE_ZSTD_LEVEL", default=10)
+
+# Retention per API response data_type, enforced by
+# simlane.iracing.tasks.enforce_api_response_retention_task
+API_RESPONSE_RETENTION = {
+    # Keep the latest 3 snapshots of each response plus one per day for 30 days,
+    # and pack older daily snapshots into one tar per month
+    "default": {"keep_latest": 3, "daily_days": 30, "compact": True},
+    # Past seasons never change once a season ends
+    "past_seasons": {"keep_latest": 1, "daily_days": 7, "compact": False},
+}
@@ -37,5 +37,8 @@ MEDIA_URL = "http://media.testserver/"
 # django-webpack-loader
 # ------------------------------------------------------------------------------
 WEBPACK_LOADER["DEFAULT"]["LOADER_CLASS"] = "webpack_loader.loaders.FakeWebpackLoader"  # noqa: F405
+# API RESPONSE ARCHIVE
+# ------------------------------------------------------------------------------
+API_RESPONSE_ARCHIVE = {**API_RESPONSE_ARCHIVE, "BACKEND": "memory"}  # noqa: F405
 # Your stuff...
 # ------------------------------------------------------------------------------
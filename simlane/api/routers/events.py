@@ -13,6 +13,7 @@ from typing import List, Optional
 from uuid import UUID
 from datetime import datetime, timedelta
 
+from django.core.exceptions import ValidationError
 from django.shortcuts import get_object_or_404
 from django.http import Http404
 from django.utils import timezone
@@ -28,7 +29,8 @@ from simlane.teams.models import (
     Club,
     ClubMember,
 )
-from simlane.sim.models import Event, TimeSlot, WeatherForecast, EventSession
+from simlane.teams.services import AvailabilityService
+from simlane.sim.models import Event, TimeSlot, EventSession
 from simlane.users.models import User
 from simlane.api.schemas.events import EventWeatherDataSchema, WeatherForecastSchema, SessionSchema
 
@@ -84,6 +86,30 @@ class CreateAvailabilityWindowSchema(Schema):
     preferred_stint_length: Optional[int] = None
     notes: Optional[str] = None
 
+class AvailabilityBitmaskSchema(Schema):
+    # Bit i (hex string, lowest bit first) is the i-th bucket from start_time
+    start_time: datetime
+    resolution_minutes: int = 15
+    mask: str
+    can_drive: bool = True
+    can_spot: bool = False
+    can_strategize: bool = False
+    preference_level: int = 3
+
+class ReplaceAvailabilitySchema(Schema):
+    windows: List[CreateAvailabilityWindowSchema] = []
+    bitmasks: List[AvailabilityBitmaskSchema] = []
+
+class AvailabilitySummarySchema(Schema):
+    windows: List[AvailabilityWindowSchema]
+    window_count: int
+    total_hours: float
+    drive_hours: float
+    spot_hours: float
+    strategize_hours: float
+    first_start: Optional[datetime] = None
+    last_end: Optional[datetime] = None
+
 class RaceStrategySchema(Schema):
     id: UUID
     name: str
@@ -338,6 +364,43 @@ def delete_availability_window(request, event_id: UUID, participation_id: UUID,
     window.delete()
     return {"success": True, "message": "Availability window deleted"}
 
+@router.put("/events/{event_id}/participations/{participation_id}/availability", response=AvailabilitySummarySchema)
+def replace_availability_windows(request, event_id: UUID, participation_id: UUID, data: ReplaceAvailabilitySchema):
+    """Replace all availability windows of a participation with a batch of intervals and/or bitmasks"""
+    event = get_object_or_404(Event, id=event_id)
+    club = get_club_from_context(request, event_id)
+    check_race_planning_subscription(club)
+    
+    participation = get_object_or_404(
+        EventParticipation,
+        id=participation_id,
+        event=event,
+        signup_context_club=club
+    )
+    
+    # Users can only manage their own availability
+    if participation.user != request.user:
+        raise HttpError(403, "You can only manage your own availability")
+    
+    windows = [window.dict() for window in data.windows]
+    try:
+        for bitmask in data.bitmasks:
+            try:
+                mask = int(bitmask.mask, 16)
+            except ValueError:
+                raise HttpError(400, "Bitmask must be a hexadecimal string")
+            windows += AvailabilityService.windows_from_mask(
+                bitmask.start_time,
+                timedelta(minutes=bitmask.resolution_minutes),
+                mask,
+                **bitmask.dict(exclude={"start_time", "resolution_minutes", "mask"}),
+            )
+        created = AvailabilityService.replace_availability(participation, windows)
+    except ValidationError as e:
+        raise HttpError(400, " ".join(e.messages))
+    
+    return AvailabilityService.availability_summary(created)
+
 # ===== TEAM FORMATION ENDPOINTS =====
 
 @router.get("/events/{event_id}/team-formation/candidates", response=List[EventParticipationSchema])
@@ -625,23 +688,36 @@ def complete_stint(request, strategy_id: UUID, stint_id: UUID):
 # ===== WEATHER ENDPOINTS =====
 
 @router.get("/events/{event_id}/weather", response=EventWeatherDataSchema, auth=None)
-def get_event_weather_data(request, event_id: UUID, time_slot_id: Optional[UUID] = None):
-    """Get weather data and session information for an event"""
+def get_event_weather_data(
+    request, event_id: UUID, time_slot_id: Optional[UUID] = None, resolution: Optional[int] = None
+):
+    """
+    Get weather data and session information for an event.
+
+    Forecasts are stored per event, so every time slot of the event shares
+    the same forecast; ``time_slot_id`` must be one of the event's slots.
+    ``resolution`` downsamples the forecast to one point per that many minutes.
+    """
+    if resolution is not None and resolution < 1:
+        raise HttpError(400, "resolution must be at least 1 minute")
+
     event = get_object_or_404(Event, id=event_id)
-    
-    # Get weather forecasts
-    weather_qs = WeatherForecast.objects.filter(event=event)
     if time_slot_id:
-        weather_qs = weather_qs.filter(time_slot_id=time_slot_id)
-    
-    weather_forecasts = weather_qs.order_by('timestamp')
-    
+        get_object_or_404(TimeSlot, id=time_slot_id, event=event)
+
+    # Forecasts are stored per event; the latest version is the current one
+    timeline = event.weather_timelines.order_by('-updated_at').first()
+    weather_forecasts = timeline.points(resolution) if timeline else []
+
     # Get sessions
     sessions = EventSession.objects.filter(event=event).order_by('in_game_time')
-    
+
     return {
         "event_id": event_id,
         "time_slot_id": time_slot_id,
+        "forecast_version": timeline.forecast_version if timeline else None,
+        "resolution": resolution,
+        "units_info": timeline.units_info if timeline else {},
         "weather_forecasts": weather_forecasts,
         "sessions": sessions,
     }
@@ -64,6 +64,9 @@ class SessionSchema(Schema):
 class EventWeatherDataSchema(Schema):
     event_id: UUID
     time_slot_id: Optional[UUID] = None
+    forecast_version: Optional[int] = None
+    resolution: Optional[int] = None
+    units_info: dict = {}
     weather_forecasts: List[WeatherForecastSchema]
     sessions: List[SessionSchema]
 
@@ -268,6 +268,118 @@ def cache_with_lock(
     return decorator
 
 
+class _InFlightCall:
+    """A computation that other threads in this process can wait on"""
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.ok = False
+
+
+class SingleFlight:
+    """Coalesce concurrent computations of the same cache key.
+
+    Threads in one process share a single in-flight call. Other processes wait
+    on a cache lock and read the leader's result from the cache, so only one
+    upstream request is made per key.
+    """
+
+    def __init__(
+        self,
+        cache_alias: str = "default",
+        lock_timeout: int = 60,
+        wait_timeout: float = 30.0,
+        poll_interval: float = 0.05,
+    ):
+        self.cache_alias = cache_alias
+        self.lock_timeout = lock_timeout
+        self.wait_timeout = wait_timeout
+        self.poll_interval = poll_interval
+        self._calls: dict[str, _InFlightCall] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def cache(self):
+        return caches[self.cache_alias]
+
+    def do(self, key: str, func: Callable[[], Any], timeout: int) -> Any:
+        """Return func() for key, computing it at most once across callers"""
+        with self._lock:
+            call = self._calls.get(key)
+            is_leader = call is None
+            if is_leader:
+                call = self._calls[key] = _InFlightCall()
+
+        if not is_leader:
+            call.event.wait(self.wait_timeout)
+            if call.ok:
+                return call.result
+            # Leader failed or is stuck, compute independently
+            return func()
+
+        try:
+            call.result = self._do_shared(key, func, timeout)
+            call.ok = True
+            return call.result
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.event.set()
+
+    def _do_shared(self, key: str, func: Callable[[], Any], timeout: int) -> Any:
+        """Compute under a cross-process cache lock, or wait for its holder"""
+        lock_key = f"lock:{key}"
+        try:
+            acquired = self.cache.add(lock_key, "locked", self.lock_timeout)
+        except Exception as e:
+            logger.warning(f"Lock operation failed for {key}: {e}")
+            acquired = None
+
+        # django-redis returns None instead of raising when IGNORE_EXCEPTIONS
+        # is set, so only an explicit False means another process holds it
+        if acquired is False:
+            result = self._wait_for_result(key, lock_key)
+            if result is not None:
+                return result
+            return self._compute(key, func, timeout)
+
+        try:
+            return self._compute(key, func, timeout)
+        finally:
+            if acquired:
+                try:
+                    self.cache.delete(lock_key)
+                except Exception:
+                    pass  # Lock cleanup is best effort
+
+    def _compute(self, key: str, func: Callable[[], Any], timeout: int) -> Any:
+        result = func()
+        try:
+            self.cache.set(key, result, timeout)
+        except Exception as e:
+            logger.warning(f"Cache set failed for {key}: {e}")
+        return result
+
+    def _wait_for_result(self, key: str, lock_key: str) -> Any:
+        """Poll the cache until the lock holder publishes a result"""
+        deadline = time.monotonic() + self.wait_timeout
+        delay = self.poll_interval
+        while time.monotonic() < deadline:
+            time.sleep(delay)
+            try:
+                result = self.cache.get(key)
+                if result is not None:
+                    return result
+                if self.cache.get(lock_key) is None:
+                    # Holder finished without publishing (it failed)
+                    return None
+            except Exception:
+                return None
+            delay = min(delay * 2, 1.0)
+        return None
+
+
 def cache_query(
     timeout: int = 300, cache_alias: str = "query_cache", tags: list[str] | None = None
 ):
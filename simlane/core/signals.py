@@ -8,11 +8,15 @@ ensuring cache consistency across the application.
 import logging
 
 from django.core.cache import caches
+from django.db.models import QuerySet
 from django.db.models.signals import post_delete
 from django.db.models.signals import post_save
 from django.dispatch import receiver
 
 from simlane.core.cache_utils import TaggedCacheService
+from simlane.iracing.recurrence import refresh_upcoming_sessions_on_commit
+from simlane.teams.availability_cache import drop_event_on_commit
+from simlane.teams.availability_cache import refresh_users_on_commit
 
 logger = logging.getLogger(__name__)
 
@@ -135,27 +139,51 @@ def invalidate_sim_profile_cache(sender, instance, **kwargs):
 def invalidate_event_cache(sender, instance, **kwargs):
     """Invalidate event-related cache entries"""
     try:
-        cache_keys = [
-            f"event:{instance.id}:detail",
-            f"series:{instance.series.id}:events",
-            "events_list",
-            "upcoming_events",
-        ]
-        
-        caches["default"].delete_many(cache_keys)
-        
-        # Invalidate tagged caches
-        tagged_cache = TaggedCacheService()
-        tagged_cache.invalidate_tag(f"event:{instance.id}")
-        tagged_cache.invalidate_tag(f"series:{instance.series.id}")
-        tagged_cache.invalidate_tag("events")
-        
+        invalidate_event_caches([instance])
         logger.info(f"Invalidated cache for event: {instance.name}")
         
     except Exception as e:
         logger.error(f"Failed to invalidate event cache: {e}")
 
 
+def invalidate_event_caches(events) -> None:
+    """
+    Invalidate cache entries of many events at once.
+    
+    Bulk writes (bulk_create/bulk_update) skip post_save, so callers use this
+    afterwards. Shared keys and tags are invalidated once per call.
+    """
+    series_ids = {event.series_id for event in events if event.series_id}
+    cache_keys = [f"event:{event.id}:detail" for event in events]
+    cache_keys += [f"series:{series_id}:events" for series_id in series_ids]
+    cache_keys += ["events_list", "upcoming_events"]
+    
+    caches["default"].delete_many(cache_keys)
+    
+    # Invalidate tagged caches
+    tagged_cache = TaggedCacheService()
+    for event in events:
+        tagged_cache.invalidate_tag(f"event:{event.id}")
+    for series_id in series_ids:
+        tagged_cache.invalidate_tag(f"series:{series_id}")
+    tagged_cache.invalidate_tag("events")
+
+
+@receiver(post_save, sender="sim.Event")
+@receiver(post_save, sender="sim.TimeSlot")
+@receiver(post_delete, sender="sim.TimeSlot")
+def refresh_event_upcoming_sessions(sender, instance, raw=False, **kwargs):
+    """Queue the event's materialised next session starts for a refresh on commit"""
+    if raw:
+        return
+    try:
+        event_id = instance.id if sender._meta.model_name == "event" else instance.event_id
+        refresh_upcoming_sessions_on_commit([event_id])
+
+    except Exception as e:
+        logger.error(f"Failed to refresh upcoming sessions: {e}")
+
+
 @receiver(post_save, sender="teams.EventParticipation")
 @receiver(post_delete, sender="teams.EventParticipation")
 def invalidate_event_participation_cache(sender, instance, **kwargs):
@@ -185,6 +213,26 @@ def invalidate_event_participation_cache(sender, instance, **kwargs):
         logger.error(f"Failed to invalidate event participation cache: {e}")
 
 
+@receiver(post_save, sender="teams.AvailabilityWindow")
+@receiver(post_delete, sender="teams.AvailabilityWindow")
+def refresh_availability_cache(sender, instance, origin=None, **kwargs):
+    """Refresh the window owner's bitmaps in the event availability cache"""
+    try:
+        participation = instance.participation
+        if origin is None or isinstance(origin, sender):
+            refresh_users_on_commit(participation.event_id, [participation.user_id])
+        elif isinstance(origin, QuerySet):
+            # Bulk deletes of windows are refreshed once by the caller, like
+            # bulk_create
+            return
+        else:
+            # Cascade from a participation or event delete
+            drop_event_on_commit(participation.event_id)
+
+    except Exception as e:
+        logger.error(f"Failed to refresh availability cache: {e}")
+
+
 @receiver(post_save, sender="users.User")
 def invalidate_user_cache(sender, instance, **kwargs):
     """Invalidate user-related cache entries on profile updates"""
@@ -0,0 +1,39 @@
+"""
+Shared test case base classes
+"""
+
+from unittest import mock
+
+from django.conf import settings
+from django.core.cache import caches
+from django.test import SimpleTestCase
+from django.test import override_settings
+
+# In-process caches so tests neither need nor touch Redis
+LOCMEM_CACHES = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+    "api_cache": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "api-cache",
+    },
+}
+
+
+class PatchingTestCase(SimpleTestCase):
+    """Test case with patches that are undone after each test"""
+
+    def patch_object(self, target, attribute, *args, **kwargs):
+        patcher = mock.patch.object(target, attribute, *args, **kwargs)
+        patched = patcher.start()
+        self.addCleanup(patcher.stop)
+        return patched
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class LocMemCacheTestCase(PatchingTestCase):
+    """Test case running against empty local memory caches"""
+
+    def setUp(self):
+        super().setUp()
+        for alias in settings.CACHES:
+            caches[alias].clear()
@@ -1 +1,23 @@
-# Admin module for iRacing app. No custom admin functionality at this time. 
\ No newline at end of file
+from django.contrib import admin
+from unfold.admin import ModelAdmin
+
+from .models import PastSeasonSyncCheckpoint
+
+
+@admin.register(PastSeasonSyncCheckpoint)
+class PastSeasonSyncCheckpointAdmin(ModelAdmin):
+    list_display = [
+        "external_season_id",
+        "season_name",
+        "external_series_id",
+        "status",
+        "attempts",
+        "duration_seconds",
+        "finished_at",
+    ]
+    list_filter = ["status", "finished_at"]
+    search_fields = ["season_name", "external_season_id", "external_series_id", "error"]
+    readonly_fields = ["payload_hash", "started_at", "finished_at", "created_at", "updated_at"]
+
+    def has_add_permission(self, request):
+        return False  # Created by the past season backfill
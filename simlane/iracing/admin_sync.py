@@ -14,8 +14,9 @@ from django.shortcuts import redirect, render
 from django.urls import path, reverse
 from django.utils.html import format_html
 
+from simlane.iracing.backfill import backfill_progress
 from simlane.iracing.tasks import (
-    queue_all_past_seasons_sync_task,
+    backfill_past_seasons_task,
     sync_car_classes_task,
     sync_current_seasons_task,
     sync_season_task,
@@ -65,7 +66,7 @@ class IRacingSyncAdmin(admin.ModelAdmin):
                 },
                 {
                     'name': 'Sync Past Seasons',
-                    'description': 'Queue sync for all past seasons',
+                    'description': 'Backfill all past seasons, resuming where the last run stopped',
                     'url': reverse('admin:iracing_sync_past_seasons'),
                 },
                 {
@@ -145,12 +146,12 @@ class IRacingSyncAdmin(admin.ModelAdmin):
             
             try:
                 # Trigger the task
-                task = queue_all_past_seasons_sync_task.delay(refresh=refresh)
+                task = backfill_past_seasons_task.delay(refresh=refresh)
                 
                 messages.success(
                     request,
-                    f"Past seasons sync task queued successfully. Task ID: {task.id}. "
-                    "This will queue individual season sync tasks for all series."
+                    f"Past seasons backfill queued successfully. Task ID: {task.id}. "
+                    "Seasons already synced are skipped; progress is shown on this page."
                 )
                 
                 logger.info(f"Past seasons sync triggered by {request.user.username}. Task ID: {task.id}")
@@ -159,14 +160,18 @@ class IRacingSyncAdmin(admin.ModelAdmin):
                 logger.exception("Error triggering past seasons sync")
                 messages.error(request, f"Error triggering past seasons sync: {e}")
             
-            return redirect('admin:index')
+            return redirect('admin:iracing_sync_past_seasons')
         
         context = {
             'title': 'Sync Past Seasons',
             'action_name': 'Sync Past Seasons',
-            'description': 'Queue sync tasks for all past seasons. This may take a while as it processes many seasons.',
-            'warning': 'This action will queue many individual season sync tasks. Use with caution.',
+            'description': (
+                'Backfill all past seasons, a few at a time within the iRacing rate limit. '
+                'An interrupted backfill resumes with the seasons it had not finished.'
+            ),
+            'warning': 'Force refresh re-checks every finished season against the iRacing API.',
             'opts': self.model._meta,
+            'progress': backfill_progress(),
         }
         
         return render(request, 'admin/iracing/sync_form.html', context)
@@ -350,6 +355,6 @@ def get_sync_dashboard_links() -> list[dict[str, str]]:
         {
             'name': 'Sync Past Seasons',
             'url': reverse('admin:iracing_sync_past_seasons'),
-            'description': 'Queue sync for all historical seasons (slow)'
+            'description': 'Backfill historical seasons (resumable)'
         },
     ] 
\ No newline at end of file
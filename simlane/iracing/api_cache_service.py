@@ -7,14 +7,17 @@ on the iRacing API and providing better development flexibility.
 """
 
 import logging
-from typing import Any, Optional, List
+from typing import Any, Dict, Optional, List
 from datetime import datetime, timedelta
 
-from django.conf import settings
+from django.core.cache import caches
 from django.utils import timezone
 
-from simlane.iracing.services import IRacingAPIService
+from simlane.iracing.async_client import fetch_series_season_schedules
+from simlane.iracing.services import IRacingAPIService, IRacingServiceError
 from simlane.iracing.types import Series, SeriesSeasons, PastSeasonsResponse, CarClass, Car, Track
+from simlane.iracing.response_cache import TieredResponseCache
+from simlane.iracing.response_cache import tiered_response_cache
 from simlane.iracing.s3_cache_storage import api_response_storage
 
 logger = logging.getLogger(__name__)
@@ -25,49 +28,101 @@ class CachedIRacingAPIService:
     Enhanced iRacing API service with S3 caching.
     
     This service provides intelligent caching using S3 storage:
-    1. Check S3 for existing data first
-    2. Only hit the API if no data exists or refresh=True
-    3. Store new API responses in S3 for future use
-    4. Respect cache TTL settings for different data types
+    1. Check the in-process, Redis and S3 cache tiers first
+    2. Only hit the API if no data exists, it is past its grace window, or refresh=True
+    3. Serve stale data inside the grace window while a Celery task refreshes it
+    4. Store new API responses in S3 (and the faster tiers) for future use
+    5. Respect cache TTL settings for different data types
     """
     
-    def __init__(self, base_service: Optional[IRacingAPIService] = None):
+    # Seconds a queued background refresh blocks further refreshes of the same response
+    REFRESH_LOCK_TIMEOUT = 300
+    
+    def __init__(
+        self,
+        base_service: Optional[IRacingAPIService] = None,
+        response_cache: Optional[TieredResponseCache] = None,
+    ):
         self.base_service = base_service or IRacingAPIService()
-        self.cache_ttl = getattr(settings, 'API_RESPONSE_CACHE_TTL', {})
+        self.response_cache = response_cache or tiered_response_cache
     
-    def _is_cache_valid(self, data_type: str, age_seconds: Optional[float], refresh: bool = False) -> bool:
+    def _get_cached(self, data_type: str, **cache_params) -> Optional[Any]:
         """
-        Determine if cached data is still valid.
+        Look up a stored response in the memory, Redis and S3 tiers.
         
-        Args:
-            data_type: Type of data ('series', 'seasons', 'schedules', etc.)
-            age_seconds: Age of cached data in seconds (None if no cached data)
-            refresh: Whether to force refresh (bypass cache)
-            
-        Returns:
-            True if cache should be used, False if fresh fetch is needed
+        Returns fresh data, or stale data inside the grace window after
+        queuing a background refresh. Returns None when the API must be called.
         """
-        if refresh:
-            logger.info(f"Refresh flag set - bypassing cache for {data_type}")
-            return False
-            
-        if age_seconds is None:
+        cached = self.response_cache.get(data_type, **cache_params)
+        if cached is None or not cached.data:
             logger.info(f"No cached data found for {data_type}")
-            return False
-            
-        # Get TTL for this data type (default to 1 hour if not configured)
-        ttl_seconds = self.cache_ttl.get(data_type, 3600)
+            return None
+        
+        ttl_seconds = self.response_cache.ttl(data_type)
+        if cached.age <= ttl_seconds:
+            logger.info(
+                f"Returning cached {data_type} data from {cached.tier} "
+                f"(age: {cached.age:.0f}s, TTL: {ttl_seconds}s)"
+            )
+            return cached.data
+        
+        # Stale-while-revalidate: answer now, refresh in the background
+        if cached.age <= ttl_seconds + self.response_cache.grace(data_type):
+            self._schedule_refresh(data_type, cache_params)
+            logger.info(f"Returning stale {data_type} data from {cached.tier} while it refreshes")
+            return cached.data
         
-        if age_seconds > ttl_seconds:
-            logger.info(f"Cached {data_type} data expired (age: {age_seconds:.0f}s, TTL: {ttl_seconds}s)")
-            return False
+        return None
+    
+    def _store(self, data_type: str, api_data: Any, **cache_params) -> Optional[str]:
+        """Store a fresh API response in S3 and the faster cache tiers."""
+        stored_path = api_response_storage.store_response(data_type, api_data, **cache_params)
+        self.response_cache.set(data_type, api_data, **cache_params)
+        return stored_path
+    
+    def _refresh_lock_key(self, data_type: str, cache_params: Dict[str, Any]) -> str:
+        return f"api_response_refresh:{api_response_storage._manifest_id(data_type, **cache_params)}"
+    
+    def _schedule_refresh(self, data_type: str, cache_params: Dict[str, Any]) -> None:
+        """Queue one background refresh per stale response."""
+        try:
+            if not caches['api_cache'].add(
+                self._refresh_lock_key(data_type, cache_params), 1, self.REFRESH_LOCK_TIMEOUT
+            ):
+                return
+            # tasks imports this module, so import the task at call time
+            from simlane.iracing.tasks import refresh_api_response_task
             
-        logger.info(f"Using cached {data_type} data (age: {age_seconds:.0f}s, TTL: {ttl_seconds}s)")
-        return True
+            refresh_api_response_task.delay(data_type, cache_params)
+        except Exception as e:
+            logger.warning(f"Failed to queue background refresh of {data_type} data: {e}")
+    
+    def refresh(self, data_type: str, **cache_params) -> Any:
+        """
+        Re-fetch one stored response from the API.
+        
+        Used by the background refresh of stale responses.
+        """
+        try:
+            if data_type == 'series':
+                return self.get_series(refresh=True)
+            if data_type == 'seasons':
+                return self.get_series_seasons(
+                    cache_params.get('series_ids'),
+                    include_series=cache_params.get('include_series', False),
+                    refresh=True,
+                )
+            if data_type == 'past_seasons':
+                return self.get_series_past_seasons(cache_params['series_id'], refresh=True)
+            if data_type == 'schedule':
+                return self.get_series_season_schedule(cache_params['season_id'], refresh=True)
+            raise ValueError(f"Cannot refresh unknown data type: {data_type}")
+        finally:
+            caches['api_cache'].delete(self._refresh_lock_key(data_type, cache_params))
     
     def get_series(self, refresh: bool = False) -> List[Series]:
         """
-        Get series data with S3 caching.
+        Get series data with tiered caching.
         
         Args:
             refresh: If True, bypass cache and fetch fresh data
@@ -77,14 +132,11 @@ class CachedIRacingAPIService:
         """
         logger.info(f"Getting series data (refresh={refresh})")
         
-        # Check S3 cache first
+        # Check the cache tiers first
         if not refresh:
-            cached_data = api_response_storage.retrieve_response('series')
+            cached_data = self._get_cached('series')
             if cached_data:
-                age_seconds = api_response_storage.get_response_age('series')
-                if self._is_cache_valid('series', age_seconds, refresh):
-                    logger.info("Returning cached series data from S3")
-                    return cached_data
+                return cached_data
         
         # Fetch from API
         logger.info("Fetching fresh series data from iRacing API")
@@ -92,7 +144,7 @@ class CachedIRacingAPIService:
         
         # Store in S3 cache for future use
         if api_data:
-            stored_path = api_response_storage.store_response('series', api_data)
+            stored_path = self._store('series', api_data)
             if stored_path:
                 logger.info(f"Stored series data in S3: {stored_path} ({len(api_data)} series)")
         
@@ -105,7 +157,7 @@ class CachedIRacingAPIService:
         refresh: bool = False
     ) -> List[SeriesSeasons]:
         """
-        Get series seasons data with S3 caching.
+        Get series seasons data with tiered caching.
         
         Args:
             series_ids: List of series IDs to filter (optional)
@@ -124,21 +176,18 @@ class CachedIRacingAPIService:
         if include_series:
             cache_params['include_series'] = True
         
-        # Check S3 cache first
+        # Check the cache tiers first
         if not refresh:
-            cached_data = api_response_storage.retrieve_response('seasons', **cache_params)
+            cached_data = self._get_cached('seasons', **cache_params)
             if cached_data:
-                age_seconds = api_response_storage.get_response_age('seasons', **cache_params)
-                if self._is_cache_valid('seasons', age_seconds, refresh):
-                    logger.info("Returning cached seasons data from S3")
-                    # Apply client-side filtering if needed (for partial matches)
-                    if series_ids and isinstance(cached_data, list):
-                        filtered_data = [
-                            season for season in cached_data 
-                            if season.get("series_id") in series_ids
-                        ]
-                        return filtered_data
-                    return cached_data
+                # Apply client-side filtering if needed (for partial matches)
+                if series_ids and isinstance(cached_data, list):
+                    filtered_data = [
+                        season for season in cached_data 
+                        if season.get("series_id") in series_ids
+                    ]
+                    return filtered_data
+                return cached_data
         
         # Fetch from API
         logger.info("Fetching fresh series seasons data from iRacing API")
@@ -146,7 +195,7 @@ class CachedIRacingAPIService:
         
         # Store in S3 cache for future use
         if api_data:
-            stored_path = api_response_storage.store_response('seasons', api_data, **cache_params)
+            stored_path = self._store('seasons', api_data, **cache_params)
             if stored_path:
                 logger.info(f"Stored seasons data in S3: {stored_path} ({len(api_data)} seasons)")
         
@@ -154,7 +203,7 @@ class CachedIRacingAPIService:
     
     def get_series_past_seasons(self, series_id: int, refresh: bool = False) -> PastSeasonsResponse:
         """
-        Get past seasons for a specific series with S3 caching.
+        Get past seasons for a specific series with tiered caching.
         
         Args:
             series_id: iRacing series ID
@@ -167,14 +216,11 @@ class CachedIRacingAPIService:
         
         cache_params = {'series_id': series_id}
         
-        # Check S3 cache first
+        # Check the cache tiers first
         if not refresh:
-            cached_data = api_response_storage.retrieve_response('past_seasons', **cache_params)
+            cached_data = self._get_cached('past_seasons', **cache_params)
             if cached_data:
-                age_seconds = api_response_storage.get_response_age('past_seasons', **cache_params)
-                if self._is_cache_valid('past_seasons', age_seconds, refresh):
-                    logger.info(f"Returning cached past seasons data for series {series_id}")
-                    return cached_data
+                return cached_data
         
         # Fetch from API
         logger.info(f"Fetching fresh past seasons data for series {series_id}")
@@ -182,7 +228,7 @@ class CachedIRacingAPIService:
         
         # Store in S3 cache
         if api_data:
-            stored_path = api_response_storage.store_response('past_seasons', api_data, **cache_params)
+            stored_path = self._store('past_seasons', api_data, **cache_params)
             if stored_path:
                 logger.info(f"Stored past seasons data in S3: {stored_path}")
         
@@ -190,7 +236,7 @@ class CachedIRacingAPIService:
     
     def get_series_season_schedule(self, season_id: int, refresh: bool = False) -> Any:
         """
-        Get season schedule data with S3 caching.
+        Get season schedule data with tiered caching.
         
         Args:
             season_id: iRacing season ID
@@ -203,14 +249,11 @@ class CachedIRacingAPIService:
         
         cache_params = {'season_id': season_id}
         
-        # Check S3 cache first
+        # Check the cache tiers first
         if not refresh:
-            cached_data = api_response_storage.retrieve_response('schedule', **cache_params)
+            cached_data = self._get_cached('schedule', **cache_params)
             if cached_data:
-                age_seconds = api_response_storage.get_response_age('schedule', **cache_params)
-                if self._is_cache_valid('schedule', age_seconds, refresh):
-                    logger.info(f"Returning cached schedule data for season {season_id}")
-                    return cached_data
+                return cached_data
         
         # Fetch from API
         logger.info(f"Fetching fresh schedule data for season {season_id}")
@@ -218,12 +261,61 @@ class CachedIRacingAPIService:
         
         # Store in S3 cache
         if api_data:
-            stored_path = api_response_storage.store_response('schedule', api_data, **cache_params)
+            stored_path = self._store('schedule', api_data, **cache_params)
             if stored_path:
                 logger.info(f"Stored schedule data in S3: {stored_path}")
         
         return api_data
     
+    def get_series_season_schedules(
+        self, season_ids: List[int], refresh: bool = False
+    ) -> Dict[int, Any]:
+        """
+        Get schedules for many seasons, fetching cache misses concurrently.
+
+        The past season backfill uses it to pull each claimed batch in one
+        pass before its per-season tasks read the schedules from the cache.
+
+        Args:
+            season_ids: iRacing season IDs
+            refresh: If True, bypass cache and fetch fresh data
+
+        Returns:
+            Dict mapping season_id to season schedule data
+        """
+        logger.info(f"Getting season schedules for {len(season_ids)} seasons (refresh={refresh})")
+
+        schedules: Dict[int, Any] = {}
+        missing: List[int] = []
+
+        # Check the cache tiers first
+        for season_id in season_ids:
+            if not refresh:
+                cached_data = self._get_cached('schedule', season_id=season_id)
+                if cached_data:
+                    schedules[season_id] = cached_data
+                    continue
+            missing.append(season_id)
+
+        if not missing:
+            return schedules
+
+        if not self.base_service.client:
+            raise IRacingServiceError("iRacing API client not available")
+
+        # Fetch all misses in one concurrent pass
+        logger.info(f"Fetching fresh schedule data for {len(missing)} seasons")
+        fetched = fetch_series_season_schedules(missing, client=self.base_service.client)
+
+        for season_id, api_data in fetched.items():
+            if api_data:
+                stored_path = self._store('schedule', api_data, season_id=season_id)
+                if stored_path:
+                    logger.info(f"Stored schedule data in S3: {stored_path}")
+            schedules[season_id] = api_data
+
+        return schedules
+
     # Delegate other methods to base service (no caching needed for these)
     def get_cars(self) -> List[Car]:
         return self.base_service.get_cars()
@@ -244,6 +336,11 @@ class CachedIRacingAPIService:
             **params: Additional parameters to filter cache clearing
         """
         logger.info(f"Clearing S3 cache (data_type={data_type}, params={params})")
+        if data_type and params:
+            self.response_cache.invalidate(data_type, **params)
+        else:
+            # Uses the manifests, so it runs before they are deleted
+            self.response_cache.invalidate_data_type(data_type)
         api_response_storage.clear_cache(data_type=data_type, **params)
 
 
@@ -0,0 +1,166 @@
+"""
+Storage backends for the API response archive.
+
+APIResponseS3Storage writes through a Django storage chosen by
+settings.API_RESPONSE_ARCHIVE["BACKEND"]:
+
+- "s3": the shared bucket configured in settings.API_RESPONSE_STORAGE
+- "local": a directory on disk (e.g. a mirror made with
+  ``manage.py mirror_api_responses``), with memory-mapped reads of large objects
+- "memory": a per-process in-memory store for tests and CI
+
+Every backend uses the same key layout (``<data_type>/YYYY/MM/...``,
+``manifests/...``, ``dictionaries/...``), so a local mirror is a drop-in
+replacement for the bucket.
+"""
+
+import logging
+import mmap
+import os
+from collections.abc import Iterable, Iterator
+from typing import Optional, Union
+
+from django.conf import settings
+from django.core.files.storage import FileSystemStorage
+from django.core.files.storage import InMemoryStorage
+from django.core.files.storage import Storage
+from storages.backends.s3 import S3Storage
+from storages.utils import clean_name
+
+logger = logging.getLogger(__name__)
+
+# Objects at least this large are memory-mapped instead of read into memory
+DEFAULT_MMAP_THRESHOLD = 1024 * 1024
+# S3 DeleteObjects accepts at most 1000 keys per request
+DELETE_BATCH_SIZE = 1000
+
+
+class LocalResponseStorage(FileSystemStorage):
+    """Local disk archive with memory-mapped reads of large objects."""
+
+    def __init__(self, *args, mmap_threshold: int = DEFAULT_MMAP_THRESHOLD, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.mmap_threshold = mmap_threshold
+
+    def read_bytes(self, name: str) -> Union[bytes, mmap.mmap]:
+        """Read an object, mapping it into memory if it is large."""
+        with open(self.path(name), "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            if size < self.mmap_threshold:
+                return f.read()
+            # The mapping stays valid after the file is closed
+            return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+class InMemoryResponseStorage(InMemoryStorage):
+    """In-memory archive, optionally overwriting existing keys like the others."""
+
+    def __init__(self, *args, allow_overwrite: bool = False, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.allow_overwrite = allow_overwrite
+
+    def get_available_name(self, name: str, max_length: Optional[int] = None) -> str:
+        if self.allow_overwrite and self.exists(name):
+            self.delete(name)
+            return name
+        return super().get_available_name(name, max_length)
+
+
+def archive_backend_name() -> str:
+    """Return the configured archive backend ("s3", "local" or "memory")."""
+    return getattr(settings, "API_RESPONSE_ARCHIVE", {}).get("BACKEND", "s3")
+
+
+def build_archive_storage(
+    backend: Optional[str] = None,
+    overwrite: bool = False,
+    object_parameters: Optional[dict] = None,
+    location: Optional[str] = None,
+) -> Storage:
+    """
+    Build a storage for the API response archive.
+
+    Args:
+        backend: "s3", "local" or "memory" (defaults to the configured backend)
+        overwrite: Replace existing keys instead of picking an alternate name
+        object_parameters: S3 object parameters overriding the configured ones
+        location: Root directory for the local backend
+    """
+    backend = backend or archive_backend_name()
+    archive_config = getattr(settings, "API_RESPONSE_ARCHIVE", {})
+
+    if backend == "s3":
+        api_storage_config = settings.API_RESPONSE_STORAGE["OPTIONS"]
+        return S3Storage(**{
+            "access_key": api_storage_config["access_key"],
+            "secret_key": api_storage_config["secret_key"],
+            "bucket_name": api_storage_config["bucket_name"],
+            "region_name": api_storage_config["region_name"],
+            "location": api_storage_config.get("location", "api_responses"),
+            "file_overwrite": overwrite or api_storage_config.get("file_overwrite", False),
+            "default_acl": api_storage_config.get("default_acl", "private"),
+            "object_parameters": (
+                object_parameters
+                if object_parameters is not None
+                else api_storage_config.get("object_parameters", {})
+            ),
+        })
+    if backend == "local":
+        return LocalResponseStorage(
+            location=location or archive_config["LOCAL_ROOT"],
+            allow_overwrite=overwrite,
+            mmap_threshold=archive_config.get("MMAP_THRESHOLD", DEFAULT_MMAP_THRESHOLD),
+        )
+    if backend == "memory":
+        return InMemoryResponseStorage(allow_overwrite=overwrite)
+    raise ValueError(f"Unknown API response archive backend: {backend}")
+
+
+def read_bytes(storage: Storage, name: str) -> Union[bytes, mmap.mmap]:
+    """Read a whole object, using the backend's fast path when it has one."""
+    if hasattr(storage, "read_bytes"):
+        return storage.read_bytes(name)
+    with storage.open(name, "rb") as f:
+        return f.read()
+
+
+def walk(storage: Storage, prefix: str = "") -> Iterator[str]:
+    """Yield every file key below a prefix, recursing into sub-directories."""
+    prefix = prefix.strip("/")
+    try:
+        dirs, files = storage.listdir(prefix)
+    except FileNotFoundError:
+        return
+    for name in files:
+        yield f"{prefix}/{name}" if prefix else name
+    for directory in dirs:
+        yield from walk(storage, f"{prefix}/{directory}" if prefix else directory)
+
+
+def delete_many(storage: Storage, names: Iterable[str], batch_size: int = DELETE_BATCH_SIZE) -> int:
+    """
+    Delete many keys, in DeleteObjects batches on S3.
+
+    Returns:
+        Number of keys deleted
+    """
+    names = list(names)
+    deleted = 0
+    for start in range(0, len(names), batch_size):
+        batch = names[start : start + batch_size]
+        if isinstance(storage, S3Storage):
+            response = storage.bucket.delete_objects(
+                Delete={
+                    "Objects": [{"Key": storage._normalize_name(clean_name(name))} for name in batch],
+                    "Quiet": True,
+                }
+            )
+            errors = response.get("Errors", [])
+            for error in errors:
+                logger.warning(f"Failed to delete {error.get('Key')}: {error.get('Message')}")
+            deleted += len(batch) - len(errors)
+        else:
+            for name in batch:
+                storage.delete(name)
+            deleted += len(batch)
+    return deleted
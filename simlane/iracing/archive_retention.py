@@ -0,0 +1,228 @@
+"""
+Retention and compaction for the API response archive.
+
+Every stored response is an immutable, timestamped object, so without pruning
+the archive grows with every sync. The policy for each data_type (from
+settings.API_RESPONSE_RETENTION, falling back to its "default" entry) keeps:
+
+- the ``keep_latest`` newest objects of every response stream, plus
+- the newest object of each day for ``daily_days`` days.
+
+Older daily snapshots are packed, when ``compact`` is enabled, into tar
+segments grouped by month: each run writes the snapshots it compacts to a new
+``archives/<data_type>/YYYY-MM/<run timestamp>.tar``, so earlier segments are
+never read back or rewritten. Every other object is deleted in DeleteObjects
+batches. Objects referenced by a manifest are never removed.
+"""
+
+import io
+import json
+import logging
+import re
+import tarfile
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.files.base import ContentFile
+from django.utils import timezone
+
+from simlane.iracing.archive_backends import delete_many
+from simlane.iracing.archive_backends import read_bytes
+from simlane.iracing.archive_backends import walk
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_PREFIX = "archives"
+
+# Manifests missing from Redis are read from storage this many at a time
+MANIFEST_READ_WORKERS = 8
+
+# <stream>_YYYYMMDD_HHMMSS.json[_<alternate name suffix>].<gz|zst>
+OBJECT_NAME_RE = re.compile(
+    r"^(?P<stream>.+)_(?P<timestamp>\d{8}_\d{6})\.json(?:_[A-Za-z0-9]{7})?\.(?:gz|zst)$"
+)
+
+
+@dataclass(frozen=True)
+class RetentionPolicy:
+    """How many snapshots of each response stream to keep."""
+
+    keep_latest: int = 3
+    daily_days: int = 30
+    compact: bool = True
+
+    @classmethod
+    def for_data_type(cls, data_type: str) -> "RetentionPolicy":
+        policies = getattr(settings, "API_RESPONSE_RETENTION", {})
+        return cls(**{**policies.get("default", {}), **policies.get(data_type, {})})
+
+
+@dataclass(frozen=True)
+class ArchivedObject:
+    """A stored response object parsed from its key."""
+
+    key: str
+    stream: str
+    stored_at: datetime
+
+    @classmethod
+    def parse(cls, key: str) -> Optional["ArchivedObject"]:
+        match = OBJECT_NAME_RE.match(key.rsplit("/", 1)[-1])
+        if not match:
+            return None
+        stored_at = datetime.strptime(match["timestamp"], "%Y%m%d_%H%M%S").replace(tzinfo=dt_timezone.utc)
+        return cls(key=key, stream=match["stream"], stored_at=stored_at)
+
+
+@dataclass
+class RetentionPlan:
+    """Objects to keep, pack into monthly archives, and delete."""
+
+    keep: List[ArchivedObject]
+    compact: List[ArchivedObject]
+    delete: List[ArchivedObject]
+
+
+def plan_retention(
+    objects: Iterable[ArchivedObject],
+    policy: RetentionPolicy,
+    protected: Set[str],
+    now: Optional[datetime] = None,
+) -> RetentionPlan:
+    """
+    Decide what happens to each object of one data_type.
+
+    Objects are grouped into streams (the key name without its timestamp,
+    e.g. ``schedule_4321``) and each stream is walked newest first.
+    """
+    now = now or timezone.now()
+    daily_cutoff = (now - timedelta(days=policy.daily_days)).date()
+
+    streams: Dict[str, List[ArchivedObject]] = defaultdict(list)
+    for obj in objects:
+        streams[obj.stream].append(obj)
+
+    plan = RetentionPlan(keep=[], compact=[], delete=[])
+    for stream_objects in streams.values():
+        stream_objects.sort(key=lambda obj: (obj.stored_at, obj.key), reverse=True)
+        days_seen: Set[date] = set()
+        for index, obj in enumerate(stream_objects):
+            day = obj.stored_at.date()
+            first_of_day = day not in days_seen
+            days_seen.add(day)
+
+            if obj.key in protected or index < policy.keep_latest:
+                plan.keep.append(obj)
+            elif first_of_day and day > daily_cutoff:
+                plan.keep.append(obj)
+            elif first_of_day and policy.compact:
+                plan.compact.append(obj)
+            else:
+                plan.delete.append(obj)
+    return plan
+
+
+def _protected_keys(store, data_type: str) -> Set[str]:
+    """
+    Keys referenced by the data_type's manifests.
+
+    Manifests are fetched from Redis in one round trip; only those missing
+    there are read from storage, concurrently, and put back into Redis.
+    """
+    manifest_ids = [
+        store._manifest_id_of_key(key)
+        for key in walk(store.manifest_storage, f"{store.MANIFEST_PREFIX}/{data_type}")
+    ]
+    cache = caches[store.MANIFEST_CACHE_ALIAS]
+    cache_keys = {store._manifest_cache_key(manifest_id): manifest_id for manifest_id in manifest_ids}
+
+    try:
+        manifests = cache.get_many(list(cache_keys))
+    except Exception as e:
+        logger.warning(f"Failed to read {data_type} manifests from Redis: {e}")
+        manifests = {}
+
+    missing = [cache_key for cache_key in cache_keys if cache_key not in manifests]
+    if missing:
+
+        def read_manifest(cache_key: str) -> Dict[str, Any]:
+            return json.loads(bytes(read_bytes(store.manifest_storage, store._manifest_key(cache_keys[cache_key]))))
+
+        with ThreadPoolExecutor(max_workers=min(MANIFEST_READ_WORKERS, len(missing))) as executor:
+            read = dict(zip(missing, executor.map(read_manifest, missing)))
+        manifests.update(read)
+        try:
+            cache.set_many(read, None)
+        except Exception as e:
+            logger.debug(f"Failed to cache {data_type} manifests in Redis: {e}")
+
+    return {manifest["key"] for manifest in manifests.values()}
+
+
+def _compact(store, data_type: str, objects: List[ArchivedObject]) -> int:
+    """Pack objects into a new tar segment per month. Returns the number packed."""
+    by_month: Dict[str, List[ArchivedObject]] = defaultdict(list)
+    for obj in objects:
+        by_month[obj.stored_at.strftime("%Y-%m")].append(obj)
+
+    run = timezone.now().strftime("%Y%m%d_%H%M%S")
+    packed = 0
+    for month, month_objects in sorted(by_month.items()):
+        buffer = io.BytesIO()
+        # Objects are already compressed, so the tar itself is not
+        with tarfile.open(fileobj=buffer, mode="w") as archive:
+            for obj in month_objects:
+                content = bytes(read_bytes(store.storage, obj.key))
+                info = tarfile.TarInfo(obj.key)
+                info.size = len(content)
+                info.mtime = int(obj.stored_at.timestamp())
+                archive.addfile(info, io.BytesIO(content))
+        archive_key = store.archive_storage.save(
+            f"{ARCHIVE_PREFIX}/{data_type}/{month}/{run}.tar", ContentFile(buffer.getvalue())
+        )
+        packed += len(month_objects)
+        logger.info(f"Packed {len(month_objects)} {data_type} snapshots into {archive_key}")
+    return packed
+
+
+def enforce_retention(
+    store,
+    data_type: str,
+    policy: Optional[RetentionPolicy] = None,
+    dry_run: bool = False,
+) -> Dict[str, Any]:
+    """
+    Apply the retention policy to one data_type of an APIResponseS3Storage.
+
+    Returns:
+        Counts of scanned, kept, compacted and deleted objects
+    """
+    policy = policy or RetentionPolicy.for_data_type(data_type)
+    objects = [obj for obj in map(ArchivedObject.parse, walk(store.storage, data_type)) if obj]
+    plan = plan_retention(objects, policy, _protected_keys(store, data_type))
+
+    result = {
+        "data_type": data_type,
+        "scanned": len(objects),
+        "kept": len(plan.keep),
+        "compacted": len(plan.compact),
+        "deleted": len(plan.delete) + len(plan.compact),
+    }
+    if dry_run:
+        return result
+
+    if plan.compact:
+        _compact(store, data_type, plan.compact)
+    # Compacted objects are deleted only after their archive was written
+    result["deleted"] = delete_many(store.storage, [obj.key for obj in plan.delete + plan.compact])
+
+    logger.info(
+        f"Retention for {data_type}: scanned {result['scanned']}, kept {result['kept']}, "
+        f"compacted {result['compacted']}, deleted {result['deleted']}"
+    )
+    return result
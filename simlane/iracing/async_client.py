@@ -0,0 +1,351 @@
+"""
+Asynchronous iRacing Data API client.
+
+Runs many iRacing requests concurrently over one pooled aiohttp session while
+sharing authentication and session cookies with the synchronous IRacingClient.
+"""
+
+import asyncio
+import json
+import logging
+import time
+from collections.abc import Awaitable, Iterable
+from typing import Any, Dict, List, Optional, TypeVar, Union
+
+import aiohttp
+from django.conf import settings
+from django.core.cache import cache
+from yarl import URL
+
+from .client import IRacingAPIError, IRacingClient
+from .rate_limiter import IRacingRateLimitError, is_blocking
+from .types import PastSeasonsResponse, SeasonScheduleResponse
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class AsyncIRacingClient:
+    """
+    asyncio variant of IRacingClient for bulk fetches.
+
+    Features:
+    - Reuses the sync client's login and cached session cookies
+    - Bounded concurrency over a single connection pool
+    - Local request spacing plus the cluster-wide IRacingRateLimiter budget
+    - Linked (S3) payloads fetched inside each concurrent request
+
+    Usage::
+
+        async with AsyncIRacingClient() as client:
+            schedules = await client.get_series_season_schedules([5001, 5002])
+    """
+
+    DEFAULT_CONCURRENCY = 4
+    # Minimum spacing between two request starts from this client's coroutines
+    DEFAULT_MIN_INTERVAL = 0.25
+    REQUEST_TIMEOUT = 30.0
+
+    def __init__(
+        self,
+        client: Optional[IRacingClient] = None,
+        concurrency: Optional[int] = None,
+        min_interval: Optional[float] = None,
+    ):
+        """
+        Initialize the async client.
+
+        Args:
+            client: Sync client whose authentication and cookies are shared
+            concurrency: Maximum number of requests in flight
+                (defaults to settings.IRACING_ASYNC_CONCURRENCY)
+            min_interval: Minimum seconds between request starts
+                (defaults to settings.IRACING_ASYNC_MIN_INTERVAL)
+        """
+        self.client = client or IRacingClient.from_settings()
+        self.concurrency = concurrency or getattr(
+            settings, "IRACING_ASYNC_CONCURRENCY", self.DEFAULT_CONCURRENCY
+        )
+        self.min_interval = (
+            min_interval
+            if min_interval is not None
+            else getattr(settings, "IRACING_ASYNC_MIN_INTERVAL", self.DEFAULT_MIN_INTERVAL)
+        )
+        self.session: Optional[aiohttp.ClientSession] = None
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+        self._budget_lock = asyncio.Lock()
+        self._auth_lock = asyncio.Lock()
+        self._next_request_at = 0.0
+        self._paused_until = 0.0
+        self._auth_generation = 0
+
+    async def __aenter__(self) -> "AsyncIRacingClient":
+        await self.open()
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    async def open(self) -> None:
+        """Open the pooled HTTP session and authenticate."""
+        if self.session is None:
+            connector = aiohttp.TCPConnector(limit=self.concurrency * 2)
+            self.session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=self.REQUEST_TIMEOUT),
+            )
+        await self._ensure_authenticated()
+
+    async def close(self) -> None:
+        """Close the pooled HTTP session."""
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+
+    def _copy_cookies(self) -> None:
+        """Copy the sync client's session cookies into the aiohttp cookie jar."""
+        if self.session is None:
+            return
+        self.session.cookie_jar.update_cookies(
+            {cookie.name: cookie.value for cookie in self.client.session.cookies},
+            response_url=URL(self.client.BASE_URL),
+        )
+
+    async def _ensure_authenticated(self, generation: Optional[int] = None) -> None:
+        """
+        Authenticate through the sync client and share its cookies.
+
+        Concurrent callers that hit a 401 pass the generation they saw, so only
+        the first one re-authenticates and the rest reuse its cookies.
+        """
+        async with self._auth_lock:
+            if generation is not None and generation != self._auth_generation:
+                return
+            if generation is not None:
+                self.client.authenticated = False
+                await cache.adelete(self.client.session_cache_key)
+            # The sync login path blocks on requests, keep it off the event loop
+            await asyncio.to_thread(self.client._ensure_authenticated)
+            self._copy_cookies()
+            self._auth_generation += 1
+
+    async def _rate_limit(self) -> None:
+        """Wait for a slot in the local spacing and the shared request budget."""
+        async with self._budget_lock:
+            now = time.monotonic()
+            start_at = max(now, self._next_request_at, self._paused_until)
+            self._next_request_at = start_at + self.min_interval
+        delay = start_at - now
+        if delay > 0:
+            logger.debug(f"Rate limiting: sleeping for {delay:.2f} seconds")
+            await asyncio.sleep(delay)
+
+        rate_limiter = getattr(self.client, "rate_limiter", None)
+        if rate_limiter is None:
+            return
+        while True:
+            wait = await asyncio.to_thread(rate_limiter.try_acquire)
+            if wait <= 0:
+                return
+            if not is_blocking():
+                raise IRacingRateLimitError(wait)
+            await asyncio.sleep(wait)
+
+    def _pause_for_rate_limit(self, headers: Any) -> float:
+        """Pause every coroutine and worker until the iRacing rate limit window resets."""
+        wait_time = self.client.rate_limiter.pause(headers)
+        self._paused_until = max(self._paused_until, time.monotonic() + wait_time)
+        if not is_blocking():
+            raise IRacingRateLimitError(wait_time)
+        logger.warning(f"Rate limited by iRacing API, pausing requests for {wait_time:.1f} seconds")
+        return wait_time
+
+    @staticmethod
+    def _encode_params(params: Optional[Dict]) -> Dict[str, str]:
+        """Encode query parameters the same way requests does."""
+        return {key: str(value) for key, value in (params or {}).items() if value is not None}
+
+    async def _make_request(
+        self,
+        endpoint: str,
+        params: Optional[Dict] = None,
+        use_cache: bool = True,
+        cache_timeout: Optional[int] = None,
+    ) -> Union[Dict, List]:
+        """
+        Make an authenticated request to the iRacing API.
+
+        Mirrors IRacingClient._make_request, including the shared Django cache.
+        """
+        cache_key = None
+        if use_cache:
+            cache_key = self.client._get_cache_key(endpoint, params)
+            cached_data = await cache.aget(cache_key)
+            if cached_data is not None:
+                logger.debug(f"Cache hit for endpoint: {endpoint}")
+                return cached_data
+
+        if self.session is None:
+            await self.open()
+
+        url = f"{self.client.BASE_URL}{endpoint}"
+        query = self._encode_params(params)
+        max_retries = self.client.MAX_RETRIES
+
+        async with self._semaphore:
+            for attempt in range(max_retries + 1):
+                await self._rate_limit()
+                generation = self._auth_generation
+                try:
+                    async with self.session.get(url, params=query) as response:
+                        self.client.rate_limiter.update_from_headers(response.headers)
+                        if response.status == 401 and attempt < max_retries:
+                            logger.warning("Received 401, re-authenticating")
+                            await self._ensure_authenticated(generation)
+                            continue
+
+                        if response.status == 429 and attempt < max_retries:
+                            await asyncio.sleep(self._pause_for_rate_limit(response.headers))
+                            continue
+
+                        body = await response.text()
+                        if response.status != 200:
+                            self._raise_for_response(response, body, endpoint)
+
+                        try:
+                            data = json.loads(body)
+                        except json.JSONDecodeError as e:
+                            raise IRacingAPIError(
+                                f"Invalid JSON response: {e}",
+                                status_code=response.status,
+                                endpoint=endpoint,
+                            )
+
+                    # Fetch link-style payloads outside the iRacing response context
+                    if isinstance(data, dict) and "link" in data:
+                        data = await self._fetch_linked_data(data["link"])
+
+                    if use_cache and cache_key:
+                        await cache.aset(cache_key, data, cache_timeout or self.client.DATA_CACHE_TIMEOUT)
+                        logger.debug(f"Cached response for endpoint: {endpoint}")
+
+                    return data
+
+                except (asyncio.TimeoutError, aiohttp.ClientConnectionError) as e:
+                    if attempt < max_retries:
+                        logger.warning(f"Request error, retrying ({attempt + 1}/{max_retries}): {e}")
+                        await asyncio.sleep(self.client.RETRY_DELAY * (attempt + 1))
+                        continue
+                    raise IRacingAPIError(
+                        f"Request failed after {max_retries} retries: {e}", endpoint=endpoint
+                    )
+
+        raise IRacingAPIError(f"Request failed after {max_retries} retries", endpoint=endpoint)
+
+    def _raise_for_response(self, response: aiohttp.ClientResponse, body: str, endpoint: str):
+        """Log a failed response and raise the matching IRacingAPIError."""
+        try:
+            response_data = json.loads(body)
+        except ValueError:
+            response_data = {"raw_content": body[:1000]}
+
+        logger.error(
+            "iRacing API request failed",
+            extra={
+                "status_code": response.status,
+                "endpoint": endpoint,
+                "response_headers": dict(response.headers),
+                "response_data": response_data,
+                "request_url": str(response.url),
+                "request_method": response.method,
+            },
+        )
+        self.client._raise_api_error(
+            response.status, response_data, endpoint, dict(response.headers)
+        )
+
+    async def _fetch_linked_data(self, link_url: str) -> Union[Dict, List]:
+        """Fetch data from a chunked/linked response."""
+        try:
+            # Linked payloads are served from S3, so they skip the iRacing budget
+            async with self.session.get(link_url) as response:
+                if response.status == 200:
+                    return await response.json(content_type=None)
+                logger.warning(f"Failed to fetch linked data: {response.status}")
+                return {}
+        except Exception as e:
+            logger.warning(f"Error fetching linked data: {e}")
+            return {}
+
+    async def gather(self, calls: Dict[Any, Awaitable[T]]) -> Dict[Any, T]:
+        """
+        Run keyed coroutines concurrently and collect the successful results.
+
+        Failed calls are logged and left out of the result so one bad season
+        does not abort a whole batch. An exhausted rate budget is re-raised.
+        """
+        keys = list(calls)
+        results = await asyncio.gather(*calls.values(), return_exceptions=True)
+        collected: Dict[Any, T] = {}
+        for key, result in zip(keys, results):
+            if isinstance(result, BaseException):
+                # Surface an exhausted rate budget so the caller can reschedule
+                if not isinstance(result, Exception) or isinstance(result, IRacingRateLimitError):
+                    raise result
+                logger.warning(f"Batch request for {key} failed: {result}")
+                continue
+            collected[key] = result
+        return collected
+
+    # API Methods
+
+    async def get_series_past_seasons(self, series_id: int) -> PastSeasonsResponse:
+        """Get past seasons for a specific series."""
+        result = await self._make_request("/data/series/past_seasons", params={"series_id": series_id})
+        if not isinstance(result, dict):
+            raise IRacingAPIError("Invalid response format for past seasons", endpoint="/data/series/past_seasons")
+        return result  # type: ignore
+
+    async def get_series_season_schedule(self, season_id: int) -> SeasonScheduleResponse:
+        """Get the detailed schedule for a specific season."""
+        result = await self._make_request("/data/series/season_schedule", params={"season_id": season_id})
+        if not isinstance(result, dict):
+            raise IRacingAPIError("Invalid response format for season schedule", endpoint="/data/series/season_schedule")
+        return result  # type: ignore
+
+    # Batch helpers
+
+    async def get_series_season_schedules(
+        self, season_ids: Iterable[int]
+    ) -> Dict[int, SeasonScheduleResponse]:
+        """Get schedules for many seasons concurrently, keyed by season_id."""
+        return await self.gather(
+            {season_id: self.get_series_season_schedule(season_id) for season_id in dict.fromkeys(season_ids)}
+        )
+
+    async def get_series_past_seasons_many(
+        self, series_ids: Iterable[int]
+    ) -> Dict[int, PastSeasonsResponse]:
+        """Get past seasons for many series concurrently, keyed by series_id."""
+        return await self.gather(
+            {series_id: self.get_series_past_seasons(series_id) for series_id in dict.fromkeys(series_ids)}
+        )
+
+
+def fetch_series_season_schedules(
+    season_ids: Iterable[int],
+    client: Optional[IRacingClient] = None,
+    concurrency: Optional[int] = None,
+) -> Dict[int, SeasonScheduleResponse]:
+    """
+    Fetch many season schedules concurrently from synchronous code.
+
+    Intended for Celery tasks, which run outside an event loop.
+    """
+
+    async def _fetch() -> Dict[int, SeasonScheduleResponse]:
+        async with AsyncIRacingClient(client=client, concurrency=concurrency) as async_client:
+            return await async_client.get_series_season_schedules(season_ids)
+
+    return asyncio.run(_fetch())
@@ -22,7 +22,7 @@ from simlane.sim.models import SimLayout
 from simlane.sim.models import SimProfile
 from simlane.sim.models import Simulator
 from simlane.sim.models import TimeSlot
-from simlane.sim.models import WeatherForecast
+from simlane.sim.models import WeatherTimeline
 
 logger = logging.getLogger(__name__)
 
@@ -114,164 +114,197 @@ def find_or_create_sim_layout_from_track_data(
         return None
 
 
-def create_weather_forecasts_from_iracing_data(
-    event: Event,
-    weather_forecast_data: list,
-    # time_slot: TimeSlot,
-    forecast_version: int = 1,
-) -> int:
+# Unit conversion factors stored with every WeatherTimeline for reference
+WEATHER_UNITS_INFO = {
+    "air_temperature": {
+        "unit": "celsius",
+        "conversion": "divide by 100",
+        "api_field": "air_temp",
+    },
+    "pressure": {
+        "unit": "hectopascals",
+        "conversion": "divide by 10",
+        "api_field": "pressure",
+    },
+    "wind_speed": {
+        "unit": "m/s",
+        "conversion": "divide by 100",
+        "api_field": "wind_speed",
+    },
+    "wind_direction": {
+        "unit": "degrees",
+        "conversion": "as-is",
+        "api_field": "wind_dir",
+    },
+    "precipitation_chance": {
+        "unit": "percent",
+        "conversion": "divide by 100",
+        "api_field": "precip_chance",
+    },
+    "precipitation_amount": {
+        "unit": "mm/hour",
+        "conversion": "divide by 10",
+        "api_field": "precip_amount",
+    },
+    "cloud_cover": {
+        "unit": "percent",
+        "conversion": "divide by 10",
+        "api_field": "cloud_cover",
+    },
+    "relative_humidity": {
+        "unit": "percent",
+        "conversion": "divide by 100",
+        "api_field": "rel_humidity",
+    },
+}
+
+
+# WeatherTimeline fields rewritten when a forecast changes
+WEATHER_TIMELINE_FIELDS = ("start_time", "end_time", "point_count", "columns", "units_info")
+
+
+def weather_forecast_fields(
+    forecast_item: dict[str, Any], forecast_version: int = 1
+) -> tuple[datetime | None, dict[str, Any]]:
     """
-    Create WeatherForecast records from iRacing weather forecast data.
-
-    Args:
-        weather_forecast_data: List of weather forecast dictionaries from iRacing API
-        time_slot: TimeSlot to create forecasts for
-        forecast_version: Weather forecast version (1=Forecast/hourly, 3=Timeline/15min)
+    Convert one iRacing weather forecast item to forecast field values.
 
     Returns:
-        Number of weather forecast records created
+        Tuple of (timestamp, defaults); timestamp is None if the item has none
     """
-    if not weather_forecast_data:
-        return 0
+    timestamp = None
+    timestamp_str = forecast_item.get("timestamp")
+    if timestamp_str:
+        timestamp = datetime.fromisoformat(timestamp_str.replace("Z", "+00:00"))
+        timestamp = (
+            timezone.make_aware(timestamp)
+            if timezone.is_naive(timestamp)
+            else timestamp
+        )
 
-    created_count = 0
+    # Convert iRacing units to standard units using official conversion factors
+    # Air temperature: divide by 100 (Celsius)
+    air_temp_celsius = forecast_item.get("air_temp", 2000) / 100.0
 
-    # Define unit conversion factors for reference
-    units_info = {
-        "air_temperature": {
-            "unit": "celsius",
-            "conversion": "divide by 100",
-            "api_field": "air_temp",
-        },
-        "pressure": {
-            "unit": "hectopascals",
-            "conversion": "divide by 10",
-            "api_field": "pressure",
-        },
-        "wind_speed": {
-            "unit": "m/s",
-            "conversion": "divide by 100",
-            "api_field": "wind_speed",
-        },
-        "wind_direction": {
-            "unit": "degrees",
-            "conversion": "as-is",
-            "api_field": "wind_dir",
-        },
-        "precipitation_chance": {
-            "unit": "percent",
-            "conversion": "divide by 100",
-            "api_field": "precip_chance",
-        },
-        "precipitation_amount": {
-            "unit": "mm/hour",
-            "conversion": "divide by 10",
-            "api_field": "precip_amount",
-        },
-        "cloud_cover": {
-            "unit": "percent",
-            "conversion": "divide by 10",
-            "api_field": "cloud_cover",
-        },
-        "relative_humidity": {
-            "unit": "percent",
-            "conversion": "divide by 100",
-            "api_field": "rel_humidity",
-        },
-    }
+    # Pressure: divide by 10 (hectopascals/hPa)
+    pressure_hpa = forecast_item.get("pressure", 10132) / 10.0
 
-    for forecast_item in weather_forecast_data:
-        try:
-            # Parse timestamp
-            timestamp_str = forecast_item.get("timestamp")
-            if timestamp_str:
-                timestamp = datetime.fromisoformat(timestamp_str.replace("Z", "+00:00"))
-                timestamp = (
-                    timezone.make_aware(timestamp)
-                    if timezone.is_naive(timestamp)
-                    else timestamp
-                )
-            else:
-                # Fallback: calculate from time_offset
-                logger.warning("No timestamp in forecast item: %s", forecast_item)
-                continue
+    # Wind speed: divide by 100 (meters per second)
+    wind_speed_ms = forecast_item.get("wind_speed", 0) / 100.0
 
-            # Convert iRacing units to standard units using official conversion factors
-            # Air temperature: divide by 100 (Celsius)
-            air_temp_celsius = forecast_item.get("air_temp", 2000) / 100.0
+    # Relative humidity: divide by 100 (percent)
+    humidity_percent = min(100, forecast_item.get("rel_humidity", 5000) / 100.0)
 
-            # Pressure: divide by 10 (hectopascals/hPa)
-            pressure_hpa = forecast_item.get("pressure", 10132) / 10.0
+    # Cloud cover: divide by 10 (percent)
+    cloud_cover_percent = min(
+        100, max(0, forecast_item.get("cloud_cover", 0) / 10.0)
+    )
 
-            # Wind speed: divide by 100 (meters per second)
-            wind_speed_ms = forecast_item.get("wind_speed", 0) / 100.0
+    # Precipitation chance: divide by 100 (percent)
+    precip_chance_percent = min(
+        100, forecast_item.get("precip_chance", 0) / 100.0
+    )
 
-            # Relative humidity: divide by 100 (percent)
-            humidity_percent = min(100, forecast_item.get("rel_humidity", 5000) / 100.0)
+    # Precipitation amount: divide by 10 (mm/hour)
+    precip_amount = forecast_item.get("precip_amount", 0) / 10.0
+
+    defaults = {
+        "is_sun_up": forecast_item.get("is_sun_up", True),
+        "affects_session": forecast_item.get("affects_session", True),
+        # Temperature and Pressure (converted)
+        "air_temperature": air_temp_celsius,
+        "pressure": pressure_hpa,
+        # Wind (converted)
+        "wind_speed": wind_speed_ms,
+        "wind_direction": forecast_item.get("wind_dir", 0),
+        # Precipitation (converted)
+        "precipitation_chance": int(precip_chance_percent),
+        "precipitation_amount": precip_amount,
+        "allow_precipitation": forecast_item.get("allow_precip", False),
+        # Cloud and Humidity (converted)
+        "cloud_cover": int(cloud_cover_percent),
+        "relative_humidity": int(humidity_percent),
+        # Metadata
+        "forecast_version": forecast_version,
+        "valid_stats": forecast_item.get("valid_stats", True),
+        "units_info": WEATHER_UNITS_INFO,  # Store unit conversion reference
+        "raw_data": forecast_item,  # Store complete raw data for reference
+    }
+    return timestamp, defaults
 
-            # Cloud cover: divide by 10 (percent)
-            cloud_cover_percent = min(
-                100, max(0, forecast_item.get("cloud_cover", 0) / 10.0)
-            )
 
-            # Precipitation chance: divide by 100 (percent)
-            precip_chance_percent = min(
-                100, forecast_item.get("precip_chance", 0) / 100.0
-            )
-
-            # Precipitation amount: divide by 10 (mm/hour)
-            precip_amount = forecast_item.get("precip_amount", 0) / 10.0
-
-            defaults = {
-                "is_sun_up": forecast_item.get("is_sun_up", True),
-                "affects_session": forecast_item.get("affects_session", True),
-                # Temperature and Pressure (converted)
-                "air_temperature": air_temp_celsius,
-                "pressure": pressure_hpa,
-                # Wind (converted)
-                "wind_speed": wind_speed_ms,
-                "wind_direction": forecast_item.get("wind_dir", 0),
-                # Precipitation (converted)
-                "precipitation_chance": int(precip_chance_percent),
-                "precipitation_amount": precip_amount,
-                "allow_precipitation": forecast_item.get("allow_precip", False),
-                # Cloud and Humidity (converted)
-                "cloud_cover": int(cloud_cover_percent),
-                "relative_humidity": int(humidity_percent),
-                # Metadata
-                "forecast_version": forecast_version,
-                "valid_stats": forecast_item.get("valid_stats", True),
-                "units_info": units_info,  # Store unit conversion reference
-                "raw_data": forecast_item,  # Store complete raw data for reference
-            }
-
-            _weatherForecast, created = WeatherForecast.objects.update_or_create(
-                event=event,
-                time_offset=forecast_item.get("time_offset", 0),
-                timestamp=timestamp,
-                defaults=defaults,
-            )
-            if created:
-                logger.info(f"Created weather forecast for event {event.id}")
-            else:
-                logger.info(f"weather forecast updated for event {event.id}")
-            created_count += 1
+def weather_timeline_points(
+    weather_forecast_data: list[dict[str, Any]], forecast_version: int = 1
+) -> list[dict[str, Any]]:
+    """
+    Convert iRacing forecast items to WeatherTimeline points.
 
+    Items without a timestamp are skipped; a repeated timestamp keeps the last item.
+    """
+    points: dict[datetime, dict[str, Any]] = {}
+    for forecast_item in weather_forecast_data:
+        try:
+            timestamp, fields = weather_forecast_fields(forecast_item, forecast_version)
         except Exception as e:
-            logger.error(
-                "Failed to create WeatherForecast from data %s: %s",
-                forecast_item,
-                str(e),
-            )
+            logger.error("Failed to convert weather forecast item %s: %s", forecast_item, str(e))
             continue
+        if timestamp is None:
+            logger.warning("No timestamp in forecast item: %s", forecast_item)
+            continue
+        points[timestamp] = {
+            **fields,
+            "timestamp": timestamp,
+            "time_offset": forecast_item.get("time_offset", 0),
+        }
+    return list(points.values())
+
+
+def build_weather_timeline(
+    event: Event, weather_forecast_data: list[dict[str, Any]], forecast_version: int = 1
+) -> WeatherTimeline:
+    """Unsaved WeatherTimeline holding an event's forecast."""
+    timeline = WeatherTimeline(
+        event=event,
+        forecast_version=forecast_version,
+        units_info=WEATHER_UNITS_INFO,
+    )
+    timeline.set_points(weather_timeline_points(weather_forecast_data, forecast_version))
+    return timeline
+
+
+def create_weather_forecasts_from_iracing_data(
+    event: Event,
+    weather_forecast_data: list,
+    forecast_version: int = 1,
+) -> int:
+    """
+    Store iRacing weather forecast data as the event's WeatherTimeline.
+
+    Args:
+        weather_forecast_data: List of weather forecast dictionaries from iRacing API
+        forecast_version: Weather forecast version (1=Forecast/hourly, 3=Timeline/15min)
+
+    Returns:
+        Number of forecast points stored
+    """
+    if not weather_forecast_data:
+        return 0
+
+    forecast_version = forecast_version or 1
+    timeline = build_weather_timeline(event, weather_forecast_data, forecast_version)
+    WeatherTimeline.objects.update_or_create(
+        event=event,
+        forecast_version=forecast_version,
+        defaults={field: getattr(timeline, field) for field in WEATHER_TIMELINE_FIELDS},
+    )
 
     logger.info(
-        "Created %d weather forecast records for Event %s (version %d)",
-        created_count,
+        "Stored %d weather forecast points for Event %s (version %d)",
+        timeline.point_count,
         event.id,
         forecast_version,
     )
-    return created_count
+    return timeline.point_count
 
 
 def fetch_and_cache_weather_forecast(event: "Event") -> bool:
@@ -0,0 +1,224 @@
+"""
+Checkpointed backfill of past iRacing seasons.
+
+Every past season of every series gets a PastSeasonSyncCheckpoint row. The
+backfill claims pending rows one batch at a time, with no more seasons in
+flight than its share of the iRacing rate limit, and records each season's
+outcome, schedule payload hash and duration. An interrupted backfill
+therefore resumes with the seasons it had not finished, and a refresh run
+only re-processes seasons whose schedule payload changed.
+
+Progress (percent done and ETA) is computed from the checkpoint table and the
+run state kept in the default cache, for the admin sync dashboard.
+"""
+
+import logging
+from datetime import datetime
+from datetime import timedelta
+from typing import Any, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count
+from django.db.models import F
+from django.db.models import Q
+from django.utils import timezone
+
+from simlane.iracing.models import PastSeasonSyncCheckpoint
+from simlane.iracing.types import Season as SeasonType
+
+logger = logging.getLogger(__name__)
+
+Status = PastSeasonSyncCheckpoint.Status
+
+RUN_CACHE_KEY = "iracing:past_season_backfill:run"
+RUN_CACHE_TIMEOUT = 30 * 24 * 60 * 60
+
+# A claimed season whose task has not reported back by then is claimed again
+STALE_CLAIM_AFTER = timedelta(minutes=30)
+
+
+def backfill_concurrency() -> int:
+    """Number of seasons the backfill keeps in flight."""
+    return max(1, int(settings.IRACING_RATE_LIMIT_CAPACITY * settings.IRACING_BACKFILL_RATE_SHARE))
+
+
+def register_past_seasons(
+    series_id: int, past_seasons: list[SeasonType], recheck: bool = False
+) -> dict[str, int]:
+    """
+    Record the past seasons of a series in the checkpoint table.
+
+    New seasons are added as pending, failed seasons are queued again and,
+    with ``recheck``, so are finished ones; they are skipped by the sync if
+    their schedule payload hash is unchanged.
+
+    Returns:
+        Dict with the number of seasons ``registered`` and ``requeued``
+    """
+    seasons = {season["season_id"]: season for season in past_seasons if season.get("season_id")}
+    existing = set(
+        PastSeasonSyncCheckpoint.objects.filter(external_season_id__in=seasons).values_list(
+            "external_season_id", flat=True
+        )
+    )
+    PastSeasonSyncCheckpoint.objects.bulk_create(
+        [
+            PastSeasonSyncCheckpoint(
+                external_series_id=series_id,
+                external_season_id=season_id,
+                season_name=season.get("season_name") or "",
+            )
+            for season_id, season in seasons.items()
+            if season_id not in existing
+        ],
+        ignore_conflicts=True,
+        batch_size=500,
+    )
+
+    requeue = [Status.FAILED, Status.DONE] if recheck else [Status.FAILED]
+    requeued = PastSeasonSyncCheckpoint.objects.filter(
+        external_season_id__in=existing, status__in=requeue
+    ).update(status=Status.PENDING, error="", updated_at=timezone.now())
+
+    return {"registered": len(seasons) - len(existing), "requeued": requeued}
+
+
+def _claimable(now: datetime) -> Q:
+    return Q(status=Status.PENDING) | Q(status=Status.RUNNING, started_at__lt=now - STALE_CLAIM_AFTER)
+
+
+def claim_pending(
+    limit: int,
+    now: Optional[datetime] = None,
+    series_ids: Optional[list[int]] = None,
+) -> list[int]:
+    """
+    Mark up to ``limit`` pending seasons, of ``series_ids`` if given, as
+    running and return their ids.
+
+    Seasons left running by a crashed or lost task for longer than
+    STALE_CLAIM_AFTER are claimed again.
+    """
+    now = now or timezone.now()
+    checkpoints = PastSeasonSyncCheckpoint.objects.select_for_update(skip_locked=True).filter(_claimable(now))
+    if series_ids is not None:
+        checkpoints = checkpoints.filter(external_series_id__in=series_ids)
+    with transaction.atomic():
+        season_ids = list(
+            checkpoints.order_by("external_series_id", "external_season_id").values_list(
+                "external_season_id", flat=True
+            )[:limit]
+        )
+        PastSeasonSyncCheckpoint.objects.filter(external_season_id__in=season_ids).update(
+            status=Status.RUNNING, attempts=F("attempts") + 1, started_at=now, updated_at=now
+        )
+    return season_ids
+
+
+def backfill_stalled(now: Optional[datetime] = None) -> bool:
+    """
+    Whether seasons are left to claim while no claimed season is in flight,
+    e.g. because a batch's continuation was lost with its worker.
+    """
+    now = now or timezone.now()
+    checkpoints = PastSeasonSyncCheckpoint.objects
+    in_flight = checkpoints.filter(status=Status.RUNNING, started_at__gte=now - STALE_CLAIM_AFTER)
+    return not in_flight.exists() and checkpoints.filter(_claimable(now)).exists()
+
+
+def record_outcome(
+    season_id: int,
+    success: bool,
+    payload_hash: str = "",
+    duration: Optional[float] = None,
+    error: str = "",
+) -> None:
+    """
+    Store the outcome of syncing one season.
+
+    A failed season loses its payload hash so its next attempt is processed
+    even if the payload did not change.
+    """
+    now = timezone.now()
+    PastSeasonSyncCheckpoint.objects.filter(external_season_id=season_id).update(
+        status=Status.DONE if success else Status.FAILED,
+        payload_hash=payload_hash if success else "",
+        duration_seconds=duration,
+        error=error,
+        finished_at=now,
+        updated_at=now,
+    )
+
+
+def start_run(now: Optional[datetime] = None) -> None:
+    """Remember when the current backfill run started, for its ETA."""
+    now = now or timezone.now()
+    cache.set(
+        RUN_CACHE_KEY,
+        {"started_at": now.isoformat(), "finished_at": None, "concurrency": backfill_concurrency()},
+        RUN_CACHE_TIMEOUT,
+    )
+
+
+def finish_run(now: Optional[datetime] = None) -> None:
+    """Mark the current backfill run as finished."""
+    run = cache.get(RUN_CACHE_KEY)
+    if run and not run.get("finished_at"):
+        run["finished_at"] = (now or timezone.now()).isoformat()
+        cache.set(RUN_CACHE_KEY, run, RUN_CACHE_TIMEOUT)
+
+
+def estimate_progress(
+    counts: dict[str, int],
+    finished_in_run: int,
+    started_at: Optional[datetime],
+    now: datetime,
+) -> dict[str, Any]:
+    """
+    Turn checkpoint counts into progress figures.
+
+    The ETA extrapolates the rate at which the current run has finished
+    seasons so far; it is None until the run has finished one.
+    """
+    total = sum(counts.values())
+    remaining = counts.get(Status.PENDING, 0) + counts.get(Status.RUNNING, 0)
+    eta_seconds = None
+    if remaining and finished_in_run and started_at:
+        elapsed = (now - started_at).total_seconds()
+        if elapsed > 0:
+            eta_seconds = round(remaining * elapsed / finished_in_run)
+    return {
+        "total": total,
+        "done": counts.get(Status.DONE, 0),
+        "failed": counts.get(Status.FAILED, 0),
+        "pending": counts.get(Status.PENDING, 0),
+        "running": counts.get(Status.RUNNING, 0),
+        "percent_done": round(100 * (total - remaining) / total, 1) if total else 100.0,
+        "eta_seconds": eta_seconds,
+        "eta": now + timedelta(seconds=eta_seconds) if eta_seconds is not None else None,
+    }
+
+
+def backfill_progress(now: Optional[datetime] = None) -> dict[str, Any]:
+    """Progress of the past season backfill, for the admin dashboard."""
+    now = now or timezone.now()
+    run = cache.get(RUN_CACHE_KEY) or {}
+    started_at = datetime.fromisoformat(run["started_at"]) if run.get("started_at") else None
+
+    counts = {
+        row["status"]: row["count"]
+        for row in PastSeasonSyncCheckpoint.objects.values("status").annotate(count=Count("pk"))
+    }
+    finished_in_run = (
+        PastSeasonSyncCheckpoint.objects.filter(finished_at__gte=started_at).count()
+        if started_at
+        else 0
+    )
+    return {
+        **estimate_progress(counts, finished_in_run, started_at, now),
+        "started_at": started_at,
+        "finished_at": datetime.fromisoformat(run["finished_at"]) if run.get("finished_at") else None,
+        "concurrency": run.get("concurrency") or backfill_concurrency(),
+    }
@@ -10,11 +10,17 @@ import json
 import logging
 import pickle
 import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Any, Dict, List, Optional, Union
+from typing import Any, Dict, Iterator, List, Optional, Union
 
+from .rate_limiter import IRacingRateLimiter, IRacingRateLimitError, is_blocking
+from .streaming import JSONItemStream, chunk_urls, find_chunk_info, iter_json_items
+from .transport import ReplayAdapter
+from .transport import build_transport_from_settings
 from .types import (
-    Car, CarAsset, CarClass, MemberInfo, PastSeasonsResponse,
+    Car, CarAsset, CarClass, MemberInfo, PastSeasonsResponse, Schedule,
     SeasonScheduleResponse, Series, SeriesAsset, SeriesSeasons,
     Track, TrackAsset, Season
 )
@@ -24,6 +30,8 @@ from django.conf import settings
 from django.core.cache import cache
 from django.utils import timezone
 
+from simlane.core.cache_utils import SingleFlight
+
 logger = logging.getLogger(__name__)
 
 
@@ -66,7 +74,7 @@ class IRacingClient:
     Features:
     - Session caching with Django cache framework
     - Comprehensive error handling and logging
-    - Built-in rate limiting and retry logic
+    - Cluster-wide rate limiting (shared Redis token bucket) and retry logic
     - Only implements endpoints we actually use
     """
     
@@ -77,28 +85,57 @@ class IRacingClient:
     SESSION_CACHE_KEY = "iracing_session_system"
     SESSION_CACHE_TIMEOUT = 86400  # 24 hours
     DATA_CACHE_TIMEOUT = 300  # 5 minutes for data caching
+    # Per-endpoint cache key versions (default 1)
+    ENDPOINT_CACHE_VERSIONS: Dict[str, int] = {}
+    
+    # Coalesces identical in-flight requests across threads and processes
+    _single_flight = SingleFlight()
     
     # Rate limiting settings
     DEFAULT_RATE_LIMIT_DELAY = 1.0  # 1 second between requests
     MAX_RETRIES = 3
     RETRY_DELAY = 2.0  # 2 seconds between retries
     
-    def __init__(self, username: Optional[str] = None, password: Optional[str] = None):
+    # Streaming settings for linked and chunked payloads
+    STREAM_CHUNK_SIZE = 64 * 1024
+    CHUNK_DOWNLOAD_WORKERS = 4
+    
+    def __init__(
+        self,
+        username: Optional[str] = None,
+        password: Optional[str] = None,
+        transport: Optional[requests.adapters.BaseAdapter] = None,
+    ):
         """
         Initialize the iRacing client.
         
         Args:
             username: iRacing username (defaults to settings.IRACING_USERNAME)
             password: iRacing password (defaults to settings.IRACING_PASSWORD)
+            transport: requests adapter for all HTTPS traffic, e.g. a
+                RecordingAdapter or ReplayAdapter (defaults to
+                settings.IRACING_TRANSPORT, or the live network)
         """
         self.username = username or settings.IRACING_USERNAME
         self.password = password or settings.IRACING_PASSWORD
         self.session = requests.Session()
+        self.transport = transport or build_transport_from_settings()
+        if self.transport is not None:
+            self.session.mount("https://", self.transport)
+        # Replayed sessions are synthetic, keep them away from the live one
+        self.session_cache_key = (
+            f"{self.SESSION_CACHE_KEY}:replay"
+            if isinstance(self.transport, ReplayAdapter)
+            else self.SESSION_CACHE_KEY
+        )
         self.authenticated = False
         self.last_request_time = 0
         
         if not self.username or not self.password:
             raise IRacingAPIError("iRacing credentials not configured")
+        
+        # Request permits are shared by every worker using this account
+        self.rate_limiter = IRacingRateLimiter(self.username)
     
     @classmethod
     def from_settings(cls) -> 'IRacingClient':
@@ -113,18 +150,19 @@ class IRacingClient:
         return base64.b64encode(initial_hash).decode("utf-8")
     
     def _rate_limit(self):
-        """Implement rate limiting between requests."""
-        elapsed = time.time() - self.last_request_time
-        if elapsed < self.DEFAULT_RATE_LIMIT_DELAY:
-            sleep_time = self.DEFAULT_RATE_LIMIT_DELAY - elapsed
-            logger.debug(f"Rate limiting: sleeping for {sleep_time:.2f} seconds")
-            time.sleep(sleep_time)
+        """
+        Take a request permit from the shared rate limiter.
+        
+        Sleeps until a permit is available, or raises IRacingRateLimitError
+        inside ``rate_limit_mode(blocking=False)``.
+        """
+        self.rate_limiter.acquire()
         self.last_request_time = time.time()
     
     def _load_session_from_cache(self) -> bool:
         """Load session cookies from Django cache."""
         try:
-            session_data = cache.get(self.SESSION_CACHE_KEY)
+            session_data = cache.get(self.session_cache_key)
             if session_data:
                 self.session.cookies.update(pickle.loads(session_data))
                 self.authenticated = True
@@ -132,14 +170,14 @@ class IRacingClient:
                 return True
         except Exception as e:
             logger.warning(f"Failed to load session from cache: {e}")
-            cache.delete(self.SESSION_CACHE_KEY)
+            cache.delete(self.session_cache_key)
         return False
     
     def _save_session_to_cache(self):
         """Save session cookies to Django cache."""
         try:
             cache.set(
-                self.SESSION_CACHE_KEY,
+                self.session_cache_key,
                 pickle.dumps(self.session.cookies),
                 self.SESSION_CACHE_TIMEOUT
             )
@@ -195,21 +233,12 @@ class IRacingClient:
     
     def _handle_rate_limit(self, response):
         """Handle rate limiting response."""
-        reset_header = response.headers.get("x-ratelimit-reset")
-        if reset_header:
-            try:
-                reset_time = datetime.fromtimestamp(int(reset_header))
-                wait_time = (reset_time - datetime.now()).total_seconds() + 0.5
-                if wait_time > 0:
-                    logger.warning(f"Rate limited by iRacing API, waiting {wait_time:.1f} seconds")
-                    time.sleep(wait_time)
-                    return
-            except (ValueError, TypeError):
-                pass
-        
-        # Fallback: wait 60 seconds
-        logger.warning("Rate limited by iRacing API, waiting 60 seconds")
-        time.sleep(60)
+        # Pause every worker sharing this account until the window resets
+        wait_time = self.rate_limiter.pause(response.headers)
+        if not is_blocking():
+            raise IRacingRateLimitError(wait_time)
+        logger.warning(f"Rate limited by iRacing API, waiting {wait_time:.1f} seconds")
+        time.sleep(wait_time)
     
     def _handle_error_response(self, response, endpoint: str):
         """Handle non-200 HTTP responses."""
@@ -231,6 +260,18 @@ class IRacingClient:
             }
         )
         
+        self._raise_api_error(
+            response.status_code, response_data, endpoint, dict(response.headers)
+        )
+    
+    def _raise_api_error(
+        self,
+        status_code: int,
+        response_data: Any,
+        endpoint: str,
+        response_headers: Optional[Dict] = None,
+    ):
+        """Raise the appropriate IRacingAPIError for a failed response."""
         # Create meaningful error messages
         error_messages = {
             400: "Bad Request: Invalid parameters or request format",
@@ -244,8 +285,8 @@ class IRacingClient:
         }
         
         message = error_messages.get(
-            response.status_code,
-            f"HTTP Error ({response.status_code}): Request failed"
+            status_code,
+            f"HTTP Error ({status_code}): Request failed"
         )
         
         # Include response error details if available
@@ -255,7 +296,7 @@ class IRacingClient:
             elif "message" in response_data:
                 message += f" - {response_data['message']}"
         
-        if response.status_code == 503:
+        if status_code == 503:
             # Detect maintenance mode specifically
             is_maintenance = False
             if isinstance(response_data, dict):
@@ -267,18 +308,18 @@ class IRacingClient:
                 message = "Service Unavailable: iRacing API is undergoing maintenance. Please try again later."
                 raise IRacingMaintenanceError(
                     message=message,
-                    status_code=response.status_code,
+                    status_code=status_code,
                     response_data=response_data,
                     endpoint=endpoint,
-                    response_headers=dict(response.headers),
+                    response_headers=response_headers,
                 )
         
         raise IRacingAPIError(
             message=message,
-            status_code=response.status_code,
+            status_code=status_code,
             response_data=response_data,
             endpoint=endpoint,
-            response_headers=dict(response.headers)
+            response_headers=response_headers
         )
     
     def _ensure_authenticated(self):
@@ -296,12 +337,25 @@ class IRacingClient:
             except IRacingAPIError:
                 logger.warning("Cached session invalid, re-authenticating")
                 self.authenticated = False
-                cache.delete(self.SESSION_CACHE_KEY)
+                cache.delete(self.session_cache_key)
         
         # Authenticate if no valid cached session
         if not self._login():
             raise IRacingAPIError("Failed to authenticate with iRacing API")
     
+    def _get_cache_key(self, endpoint: str, params: Optional[Dict] = None) -> str:
+        """
+        Build the Django cache key for an endpoint and its parameters.
+        
+        The digest is stable across processes (unlike the built-in ``hash``),
+        so every worker shares the same cache entries. Bump an endpoint's entry
+        in ENDPOINT_CACHE_VERSIONS to invalidate only that endpoint's keys.
+        """
+        version = self.ENDPOINT_CACHE_VERSIONS.get(endpoint, 1)
+        canonical = json.dumps(params or {}, sort_keys=True, separators=(",", ":"), default=str)
+        digest = hashlib.sha256(canonical.encode("utf-8")).hexdigest()[:32]
+        return f"iracing_api:v{version}:{endpoint}:{digest}"
+    
     def _make_request(
         self,
         endpoint: str,
@@ -321,29 +375,50 @@ class IRacingClient:
         Returns:
             API response data
         """
-        # Check cache first if enabled
-        cache_key = None
-        if use_cache:
-            cache_key = f"iracing_api:{endpoint}:{hash(str(sorted((params or {}).items())))}"
-            cached_data = cache.get(cache_key)
-            if cached_data is not None:
-                logger.debug(f"Cache hit for endpoint: {endpoint}")
-                return cached_data
+        if not use_cache:
+            return self._request(endpoint, params)
+        
+        # Check cache first
+        cache_key = self._get_cache_key(endpoint, params)
+        cached_data = cache.get(cache_key)
+        if cached_data is not None:
+            logger.debug(f"Cache hit for endpoint: {endpoint}")
+            return cached_data
+        
+        # Concurrent callers for the same endpoint and params share one request
+        return self._single_flight.do(
+            cache_key,
+            lambda: self._request(endpoint, params),
+            cache_timeout or self.DATA_CACHE_TIMEOUT,
+        )
+    
+    def _request(
+        self,
+        endpoint: str,
+        params: Optional[Dict] = None,
+        follow_links: bool = True,
+    ) -> Union[Dict, List]:
+        """
+        Perform an authenticated request with retries, without caching.
         
+        With ``follow_links=False`` link-style responses are returned as-is so
+        the caller can stream the linked payload.
+        """
         self._ensure_authenticated()
-        self._rate_limit()
         
         url = f"{self.BASE_URL}{endpoint}"
         
         for attempt in range(self.MAX_RETRIES + 1):
+            self._rate_limit()
             try:
                 response = self.session.get(url, params=params, timeout=30.0)
+                self.rate_limiter.update_from_headers(response.headers)
                 
                 # Handle authentication issues
                 if response.status_code == 401:
                     logger.warning("Received 401, re-authenticating")
                     self.authenticated = False
-                    cache.delete(self.SESSION_CACHE_KEY)
+                    cache.delete(self.session_cache_key)
                     if attempt < self.MAX_RETRIES:
                         self._ensure_authenticated()
                         continue
@@ -360,15 +435,9 @@ class IRacingClient:
                         data = response.json()
                         
                         # Handle link-style responses (chunked data)
-                        if isinstance(data, dict) and "link" in data:
+                        if follow_links and isinstance(data, dict) and "link" in data:
                             data = self._fetch_linked_data(data["link"])
                         
-                        # Cache successful response
-                        if use_cache and cache_key:
-                            timeout = cache_timeout or self.DATA_CACHE_TIMEOUT
-                            cache.set(cache_key, data, timeout)
-                            logger.debug(f"Cached response for endpoint: {endpoint}")
-                        
                         return data
                         
                     except json.JSONDecodeError as e:
@@ -410,6 +479,98 @@ class IRacingClient:
             logger.warning(f"Error fetching linked data: {e}")
             return {}
     
+    def _iter_link_content(self, link_url: str) -> Iterator[bytes]:
+        """Stream a linked (S3) object in STREAM_CHUNK_SIZE byte chunks."""
+        with self.session.get(link_url, stream=True, timeout=30.0) as response:
+            if response.status_code != 200:
+                raise IRacingAPIError(
+                    f"Failed to fetch linked data: {response.status_code}",
+                    status_code=response.status_code,
+                )
+            yield from response.iter_content(self.STREAM_CHUNK_SIZE)
+    
+    def _download_chunk(self, url: str) -> bytes:
+        """Download one chunk_info chunk file."""
+        response = self.session.get(url, timeout=30.0)
+        if response.status_code != 200:
+            raise IRacingAPIError(
+                f"Failed to fetch chunk file: {response.status_code}",
+                status_code=response.status_code,
+            )
+        return response.content
+    
+    def iter_chunk_records(
+        self, chunk_info: Dict, max_workers: Optional[int] = None
+    ) -> Iterator[Any]:
+        """
+        Yield the records of every chunk file in a ``chunk_info`` block, in order.
+        
+        Chunk files are downloaded concurrently, at most ``max_workers`` ahead
+        of the consumer, and each file is parsed one record at a time, so
+        memory stays bounded by a few chunk files whatever the total row count.
+        """
+        urls = iter(chunk_urls(chunk_info))
+        workers = max_workers or self.CHUNK_DOWNLOAD_WORKERS
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="iracing-chunks") as executor:
+            pending = deque(executor.submit(self._download_chunk, url) for _, url in zip(range(workers), urls))
+            try:
+                while pending:
+                    content = pending.popleft().result()
+                    next_url = next(urls, None)
+                    if next_url is not None:
+                        pending.append(executor.submit(self._download_chunk, next_url))
+                    yield from iter_json_items([content])
+            finally:
+                # Stop queued downloads if the consumer stops early or a chunk fails
+                for future in pending:
+                    future.cancel()
+    
+    def iter_records(
+        self,
+        endpoint: str,
+        params: Optional[Dict] = None,
+        item_key: Optional[str] = None,
+    ) -> Iterator[Any]:
+        """
+        Stream the records of an endpoint without loading the payload at once.
+        
+        Linked payloads are parsed incrementally and ``chunk_info`` results are
+        expanded into the rows of their chunk files. Yields the elements of the
+        payload's ``item_key`` array (or of the payload itself if it is an
+        array), otherwise the payload as a single record. Responses are not
+        cached.
+        
+        Args:
+            endpoint: API endpoint path
+            params: Query parameters
+            item_key: Key of the record array inside an object payload
+        """
+        data = self._request(endpoint, params, follow_links=False)
+        
+        if isinstance(data, dict) and "link" in data:
+            stream = JSONItemStream(self._iter_link_content(data["link"]), item_key=item_key)
+            for item in stream:
+                chunk_info = find_chunk_info(item) if item_key is None else None
+                if chunk_info:
+                    yield from self.iter_chunk_records(chunk_info)
+                else:
+                    yield item
+            chunk_info = find_chunk_info(stream.fields)
+            if chunk_info:
+                yield from self.iter_chunk_records(chunk_info)
+            return
+        
+        chunk_info = find_chunk_info(data)
+        if chunk_info:
+            yield from self.iter_chunk_records(chunk_info)
+            return
+        if item_key and isinstance(data, dict):
+            data = data.get(item_key) or []
+        if isinstance(data, list):
+            yield from data
+        else:
+            yield data
+    
     # API Methods - Only implement what we need
     
     def get_member_info(self) -> MemberInfo:
@@ -457,6 +618,53 @@ class IRacingClient:
             raise IRacingAPIError("Invalid response format for season schedule", endpoint="/data/series/season_schedule")
         return result  # type: ignore
     
+    def iter_series_season_schedule(self, season_id: int) -> Iterator[Schedule]:
+        """Stream the weekly schedules of a season one week at a time."""
+        return self.iter_records(
+            "/data/series/season_schedule", params={"season_id": season_id}, item_key="schedules"
+        )
+    
+    def iter_result_lap_data(
+        self,
+        subsession_id: int,
+        simsession_number: int = 0,
+        cust_id: Optional[int] = None,
+        team_id: Optional[int] = None,
+    ) -> Iterator[Dict[str, Any]]:
+        """Stream lap rows of a subsession session (chunk_info result)."""
+        params = {"subsession_id": subsession_id, "simsession_number": simsession_number}
+        if cust_id is not None:
+            params["cust_id"] = cust_id
+        if team_id is not None:
+            params["team_id"] = team_id
+        return self.iter_records("/data/results/lap_data", params=params)
+    
+    def iter_result_event_log(
+        self, subsession_id: int, simsession_number: int = 0
+    ) -> Iterator[Dict[str, Any]]:
+        """Stream event log rows of a subsession session (chunk_info result)."""
+        return self.iter_records(
+            "/data/results/event_log",
+            params={"subsession_id": subsession_id, "simsession_number": simsession_number},
+        )
+    
+    def iter_subsession_results(
+        self, subsession_id: int, simsession_number: int = 0
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Stream the result rows of one session of a subsession.
+        
+        The subsession's sessions are decoded one at a time, so only the
+        requested session is held in memory rather than the whole subsession.
+        Session 0 is the race.
+        """
+        sessions = self.iter_records(
+            "/data/results/get", params={"subsession_id": subsession_id}, item_key="session_results"
+        )
+        for session in sessions:
+            if session.get("simsession_number") == simsession_number:
+                yield from session.get("results") or []
+
     def get_season_list(self, season_year: int, season_quarter: int) -> List[Season]:
         """Get all available seasons."""
         params = {"season_year": season_year, "season_quarter": season_quarter}
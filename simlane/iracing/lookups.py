@@ -0,0 +1,164 @@
+"""
+Sync-scoped lookups of a simulator's content by API id.
+
+Season, car class and owned content syncs resolve the same few thousand
+layouts, cars, car classes and tracks over and over. SimContentResolver loads
+each kind once, on first use, into a dict keyed by the simulator's API id and
+answers every later lookup from memory. Layouts also get a normalised
+(track name, layout name) index for schedules whose track_id is unknown.
+
+A resolver is meant to live for one sync run; rows created during the run are
+registered with add() so later lookups see them.
+"""
+
+import logging
+import re
+from collections import Counter
+from collections import defaultdict
+from typing import Any, Optional
+
+from django.db import models
+
+from simlane.sim.models import CarClass
+from simlane.sim.models import SimCar
+from simlane.sim.models import SimLayout
+from simlane.sim.models import SimTrack
+from simlane.sim.models import Simulator
+
+logger = logging.getLogger(__name__)
+
+_NON_ALNUM = re.compile(r"[^a-z0-9]+")
+
+
+def normalize_name(name: Optional[str]) -> str:
+    """Lowercase a name and drop everything but letters and digits."""
+    return _NON_ALNUM.sub("", (name or "").lower())
+
+
+class SimContentResolver:
+    """
+    In-memory lookups of SimLayout, SimCar, CarClass and SimTrack rows.
+
+    Usage::
+
+        resolver = SimContentResolver(iracing_simulator)
+        sim_car = resolver.car(car_id)
+        layout = resolver.layout(track_id, track_name, config_name)
+    """
+
+    KINDS = ("layout", "car", "car_class", "track")
+
+    def __init__(self, simulator: Simulator):
+        self.simulator = simulator
+        self._indexes: dict[str, dict[str, Any]] = {}
+        self._layout_names: Optional[dict[tuple[str, str], SimLayout]] = None
+        self._stats: Counter = Counter()
+
+    # Loading
+
+    def _queryset(self, kind: str) -> models.QuerySet:
+        if kind == "layout":
+            return SimLayout.objects.filter(sim_track__simulator=self.simulator).select_related(
+                "sim_track__track_model"
+            )
+        if kind == "car":
+            return SimCar.objects.filter(simulator=self.simulator)
+        if kind == "car_class":
+            return CarClass.objects.filter(simulator=self.simulator)
+        if kind == "track":
+            return SimTrack.objects.filter(simulator=self.simulator).select_related("track_model")
+        raise ValueError(f"Unknown content kind: {kind}")
+
+    @staticmethod
+    def _api_id(kind: str, obj: models.Model) -> str:
+        return str(obj.layout_code if kind == "layout" else obj.sim_api_id)
+
+    def _index(self, kind: str) -> dict[str, Any]:
+        """Load a kind on first use, leaving out ids that match several rows."""
+        if kind not in self._indexes:
+            rows: dict[str, list] = defaultdict(list)
+            for obj in self._queryset(kind):
+                rows[self._api_id(kind, obj)].append(obj)
+            index = {}
+            for api_id, matches in rows.items():
+                if len(matches) > 1:
+                    logger.warning(f"Multiple {kind} rows found for API id {api_id}, ignoring them")
+                    continue
+                index[api_id] = matches[0]
+            self._indexes[kind] = index
+            logger.debug(f"Loaded {len(index)} {kind} rows for {self.simulator.name}")
+        return self._indexes[kind]
+
+    def _layout_name_index(self) -> dict[tuple[str, str], SimLayout]:
+        if self._layout_names is None:
+            self._layout_names = {}
+            for layout in self._index("layout").values():
+                for track_name in self._track_names(layout.sim_track):
+                    self._layout_names.setdefault((track_name, normalize_name(layout.name)), layout)
+        return self._layout_names
+
+    @staticmethod
+    def _track_names(sim_track: SimTrack) -> set[str]:
+        return {
+            name
+            for name in (normalize_name(sim_track.display_name), normalize_name(sim_track.track_model.name))
+            if name
+        }
+
+    def add(self, obj: models.Model) -> None:
+        """Register a row created during the sync."""
+        kind = {SimLayout: "layout", SimCar: "car", CarClass: "car_class", SimTrack: "track"}[type(obj)]
+        if kind in self._indexes:
+            self._indexes[kind][self._api_id(kind, obj)] = obj
+        if kind == "layout":
+            self._layout_names = None
+
+    # Lookups
+
+    def _get(self, kind: str, api_id: Any) -> Optional[Any]:
+        obj = self._index(kind).get(str(api_id))
+        self._stats[(kind, "hit" if obj is not None else "miss")] += 1
+        return obj
+
+    def car(self, car_id: Any) -> Optional[SimCar]:
+        return self._get("car", car_id)
+
+    def car_class(self, car_class_id: Any) -> Optional[CarClass]:
+        return self._get("car_class", car_class_id)
+
+    def track(self, track_id: Any) -> Optional[SimTrack]:
+        return self._get("track", track_id)
+
+    def layout(self, track_id: Any, track_name: str = "", layout_name: str = "") -> Optional[SimLayout]:
+        """Find a layout by track_id, falling back to its track and layout names."""
+        layout = self._index("layout").get(str(track_id))
+        if layout is not None:
+            self._stats[("layout", "hit")] += 1
+            return layout
+
+        layout = self._match_layout_name(normalize_name(track_name), normalize_name(layout_name))
+        self._stats[("layout", "fallback" if layout is not None else "miss")] += 1
+        return layout
+
+    def _match_layout_name(self, track_name: str, layout_name: str) -> Optional[SimLayout]:
+        if not track_name:
+            return None
+        names = self._layout_name_index()
+        exact = names.get((track_name, layout_name))
+        if exact is not None:
+            return exact
+        # Same containment rule as a name__icontains query on both names
+        for (indexed_track, indexed_layout), layout in names.items():
+            if track_name in indexed_track and layout_name in indexed_layout:
+                return layout
+        return None
+
+    # Stats
+
+    def stats(self) -> dict[str, dict[str, int]]:
+        """Lookup counters as {kind: {"hit": n, "miss": n, "fallback": n}}."""
+        result = {kind: {"hit": 0, "miss": 0} for kind in self.KINDS}
+        result["layout"]["fallback"] = 0
+        for (kind, outcome), count in self._stats.items():
+            result[kind][outcome] = count
+        return result
@@ -0,0 +1,136 @@
+"""
+Management command to benchmark the season sync pipeline against a replay corpus.
+"""
+
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.core.management.base import CommandError
+from django.db import connection
+from django.db import transaction
+from django.test.utils import CaptureQueriesContext
+
+from simlane.iracing.client import IRacingAPIError
+from simlane.iracing.client import IRacingClient
+from simlane.iracing.tasks import sync_current_seasons_data
+from simlane.iracing.transport import ReplayAdapter
+from simlane.iracing.transport import ResponseCorpus
+from simlane.sim.models import Simulator
+
+
+class Command(BaseCommand):
+    help = (
+        "Time a full current-season sync against a recorded iRacing corpus and report "
+        "throughput (events/sec, DB queries per event) without network access"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--corpus",
+            default=settings.IRACING_TRANSPORT["CORPUS_DIR"],
+            help="Directory of the recorded corpus",
+        )
+        parser.add_argument(
+            "--repeat",
+            type=int,
+            default=1,
+            help="Number of timed sync runs",
+        )
+        parser.add_argument(
+            "--latency",
+            type=float,
+            default=0.0,
+            help="Seconds of latency injected into every replayed response",
+        )
+        parser.add_argument(
+            "--rate-limit-rate",
+            type=float,
+            default=0.0,
+            help="Fraction of replayed requests answered with HTTP 429",
+        )
+        parser.add_argument(
+            "--unavailable-rate",
+            type=float,
+            default=0.0,
+            help="Fraction of replayed requests answered with HTTP 503",
+        )
+        parser.add_argument(
+            "--incremental",
+            action="store_true",
+            help="Skip seasons and weeks whose stored schedule hash is unchanged (default: process all)",
+        )
+        parser.add_argument(
+            "--per-row",
+            action="store_true",
+            help="Write events row by row instead of in bulk, for comparison",
+        )
+        parser.add_argument(
+            "--commit",
+            action="store_true",
+            help="Keep the database changes (default: roll back every run)",
+        )
+
+    def handle(self, *args, **options):
+        corpus = ResponseCorpus(options["corpus"])
+        if not len(corpus):
+            raise CommandError(f"No recorded responses found in {corpus.root}")
+
+        try:
+            simulator = Simulator.objects.get(name="iRacing")
+        except Simulator.DoesNotExist as e:
+            raise CommandError("iRacing simulator not found in database") from e
+
+        transport = ReplayAdapter(
+            corpus,
+            latency=options["latency"],
+            rate_limit_rate=options["rate_limit_rate"],
+            unavailable_rate=options["unavailable_rate"],
+        )
+        # Replay credentials get their own rate limiter bucket and never reach iRacing
+        client = IRacingClient(
+            username="replay@simlane.local", password="replay", transport=transport
+        )
+
+        fetch_started = time.perf_counter()
+        try:
+            # Bypass the shared api cache so replayed data never leaks into it
+            seasons_data = client._make_request(
+                "/data/series/seasons", params={"include_series": True}, use_cache=False
+            )
+        except IRacingAPIError as e:
+            raise CommandError(f"Failed to replay series seasons: {e}") from e
+        fetch_seconds = time.perf_counter() - fetch_started
+
+        self.stdout.write(
+            f"Replayed {len(seasons_data)} seasons in {fetch_seconds:.3f}s "
+            f"({transport.requests_served} served, {transport.requests_missed} missing)"
+        )
+
+        for run in range(1, options["repeat"] + 1):
+            with CaptureQueriesContext(connection) as queries:
+                started = time.perf_counter()
+                with transaction.atomic():
+                    totals = sync_current_seasons_data(
+                        seasons_data,
+                        simulator,
+                        bulk=not options["per_row"],
+                        force=not options["incremental"],
+                    )
+                    if not options["commit"]:
+                        transaction.set_rollback(True)
+                elapsed = time.perf_counter() - started
+
+            events = totals["events_created"] + totals["events_updated"]
+            query_count = len(queries.captured_queries)
+            self.stdout.write(
+                f"Run {run}: {totals['seasons_processed']} seasons "
+                f"({totals['seasons_skipped']} unchanged), {events} events "
+                f"({totals['events_created']} created, {totals['events_updated']} updated) "
+                f"in {elapsed:.3f}s | "
+                f"{events / elapsed if elapsed else 0:.1f} events/sec | "
+                f"{query_count} queries, {query_count / events if events else 0:.1f} queries/event | "
+                f"{len(totals['errors'])} errors"
+            )
+
+        self.stdout.write(self.style.SUCCESS("Benchmark complete"))
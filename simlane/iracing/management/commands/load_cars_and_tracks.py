@@ -11,6 +11,7 @@ from django.core.files.base import ContentFile
 from django.core.management.base import BaseCommand
 from django.utils.text import slugify
 
+from simlane.iracing.lookups import SimContentResolver
 from simlane.iracing.services import IRacingServiceError
 from simlane.iracing.services import iracing_service
 from simlane.sim.models import CarModel
@@ -79,6 +80,9 @@ class Command(BaseCommand):
             cars_only = True
             tracks_only = True
 
+        # Existing cars and layouts are looked up in memory instead of per row
+        self.resolver = SimContentResolver(simulator)
+
         # Don't use atomic transaction to avoid cascading failures
         if cars_only:
             self.load_cars_data(simulator, force_update, verbose)
@@ -314,11 +318,8 @@ class Command(BaseCommand):
                 }
 
                 # Get or create by sim_api_id only (most reliable unique identifier)
-                try:
-                    sim_car = SimCar.objects.get(
-                        simulator=simulator,
-                        sim_api_id=str(car["car_id"]),
-                    )
+                sim_car = self.resolver.car(car["car_id"])
+                if sim_car is not None:
                     sim_created = False
 
                     if force_update:
@@ -343,7 +344,7 @@ class Command(BaseCommand):
                         sim_car.save()
                         updated_sim_cars += 1
 
-                except SimCar.DoesNotExist:
+                else:
                     sim_car = SimCar(
                         simulator=simulator,
                         sim_api_id=str(car["car_id"]),
@@ -365,6 +366,7 @@ class Command(BaseCommand):
                                 setattr(sim_car, field, image_file)
 
                     sim_car.save()  # Save again with images
+                    self.resolver.add(sim_car)
                     sim_created = True
                     created_sim_cars += 1
 
@@ -570,13 +572,16 @@ class Command(BaseCommand):
                         "fully_lit": config.get("fully_lit", False),
                     }
 
-                    layout, layout_created = SimLayout.objects.get_or_create(
-                        sim_track=sim_track,
-                        layout_code=str(
-                            config["track_id"],
-                        ),  # Use track_id as layout code
-                        defaults=layout_defaults,
-                    )
+                    # Use track_id as layout code
+                    layout = self.resolver.layout(config["track_id"])
+                    layout_created = False
+                    if layout is None or layout.sim_track_id != sim_track.pk:
+                        layout, layout_created = SimLayout.objects.get_or_create(
+                            sim_track=sim_track,
+                            layout_code=str(config["track_id"]),
+                            defaults=layout_defaults,
+                        )
+                        self.resolver.add(layout)
 
                     if not layout_created and force_update:
                         # Update existing layout
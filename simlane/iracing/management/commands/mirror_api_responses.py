@@ -0,0 +1,98 @@
+"""
+Management command to mirror the S3 API response archive to local disk.
+"""
+
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.management.base import BaseCommand
+from django.core.management.base import CommandError
+
+from simlane.iracing.archive_backends import build_archive_storage
+from simlane.iracing.archive_backends import walk
+from simlane.iracing.s3_cache_storage import APIResponseS3Storage
+
+
+class Command(BaseCommand):
+    help = (
+        "Copy the latest API responses, their manifests and zstd dictionaries from "
+        "S3 to a local archive so workers can run with API_RESPONSE_ARCHIVE_BACKEND=local"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--destination",
+            default=settings.API_RESPONSE_ARCHIVE["LOCAL_ROOT"],
+            help="Local archive directory",
+        )
+        parser.add_argument(
+            "--data-type",
+            action="append",
+            default=[],
+            help="Only mirror this data_type (repeatable)",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=8,
+            help="Concurrent downloads",
+        )
+
+    def handle(self, *args, **options):
+        source = build_archive_storage("s3")
+        destination = build_archive_storage("local", overwrite=True, location=options["destination"])
+        manifest_prefix = APIResponseS3Storage.MANIFEST_PREFIX
+        dictionary_prefix = APIResponseS3Storage.DICTIONARY_PREFIX
+
+        data_types = options["data_type"]
+        prefixes = (
+            [f"{manifest_prefix}/{data_type}" for data_type in data_types]
+            + [f"{dictionary_prefix}/{data_type}" for data_type in data_types]
+            if data_types
+            else [manifest_prefix, dictionary_prefix]
+        )
+
+        try:
+            keys = [key for prefix in prefixes for key in walk(source, prefix)]
+        except Exception as e:
+            raise CommandError(f"Failed to list the S3 archive: {e}") from e
+
+        self.stdout.write(f"Mirroring {len(keys)} manifests and dictionaries to {destination.location}")
+
+        copied = skipped = failed = 0
+        with ThreadPoolExecutor(max_workers=options["workers"]) as executor:
+            for result in executor.map(lambda key: self._mirror(source, destination, key), keys):
+                copied += result[0]
+                skipped += result[1]
+                failed += result[2]
+
+        style = self.style.SUCCESS if not failed else self.style.WARNING
+        self.stdout.write(style(f"Mirror complete: {copied} copied, {skipped} up to date, {failed} failed"))
+
+    def _mirror(self, source, destination, key: str) -> tuple[int, int, int]:
+        """Copy one manifest (and the object it points at) or dictionary."""
+        copied = skipped = failed = 0
+        try:
+            with source.open(key, "rb") as f:
+                content = f.read()
+            keys = [key]
+            if key.startswith(f"{APIResponseS3Storage.MANIFEST_PREFIX}/"):
+                keys.insert(0, json.loads(content)["key"])
+
+            for name in keys:
+                # Response objects are immutable, only manifests change
+                if name != key and destination.exists(name):
+                    skipped += 1
+                    continue
+                if name != key:
+                    with source.open(name, "rb") as f:
+                        destination.save(name, ContentFile(f.read()))
+                else:
+                    destination.save(name, ContentFile(content))
+                copied += 1
+        except Exception as e:
+            self.stdout.write(self.style.WARNING(f"Failed to mirror {key}: {e}"))
+            failed += 1
+        return copied, skipped, failed
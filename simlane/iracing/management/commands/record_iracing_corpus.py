@@ -0,0 +1,90 @@
+"""
+Management command to record iRacing API responses into a replay corpus.
+"""
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.core.management.base import CommandError
+
+from simlane.iracing.client import IRacingAPIError
+from simlane.iracing.client import IRacingClient
+from simlane.iracing.transport import RecordingAdapter
+from simlane.iracing.transport import ResponseCorpus
+
+# Endpoints needed by the series, season, car class and track map syncs
+CORPUS_ENDPOINTS = [
+    ("/data/member/info", {}),
+    ("/data/series/get", {}),
+    ("/data/series/assets", {}),
+    ("/data/series/seasons", {"include_series": True}),
+    ("/data/car/get", {}),
+    ("/data/car/assets", {}),
+    ("/data/track/get", {}),
+    ("/data/track/assets", {}),
+    ("/data/carclass/get", {}),
+]
+
+
+class Command(BaseCommand):
+    help = "Record live iRacing API responses into a compressed on-disk replay corpus"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--corpus",
+            default=settings.IRACING_TRANSPORT["CORPUS_DIR"],
+            help="Directory to write the corpus to",
+        )
+        parser.add_argument(
+            "--series-id",
+            type=int,
+            action="append",
+            default=[],
+            help="Also record past seasons and every season schedule for this series (repeatable)",
+        )
+
+    def handle(self, *args, **options):
+        corpus = ResponseCorpus(options["corpus"])
+        try:
+            client = IRacingClient(transport=RecordingAdapter(corpus))
+        except IRacingAPIError as e:
+            raise CommandError(str(e)) from e
+
+        endpoints = list(CORPUS_ENDPOINTS)
+        for series_id in options["series_id"]:
+            endpoints.append(("/data/series/past_seasons", {"series_id": series_id}))
+
+        recorded = 0
+        for endpoint, params in endpoints:
+            recorded += self._record(client, endpoint, params)
+
+        # Schedules for the past seasons of the requested series
+        for series_id in options["series_id"]:
+            try:
+                past_seasons = client._make_request(
+                    "/data/series/past_seasons", params={"series_id": series_id}
+                )
+            except IRacingAPIError:
+                continue
+            for season in past_seasons.get("series", {}).get("seasons", []):
+                if season.get("season_id"):
+                    recorded += self._record(
+                        client,
+                        "/data/series/season_schedule",
+                        {"season_id": season["season_id"]},
+                    )
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Recorded {recorded} endpoints ({len(corpus)} corpus entries) to {corpus.root}"
+            )
+        )
+
+    def _record(self, client: IRacingClient, endpoint: str, params: dict) -> int:
+        """Fetch one endpoint through the recording transport, bypassing caches."""
+        try:
+            client._make_request(endpoint, params=params, use_cache=False)
+        except IRacingAPIError as e:
+            self.stdout.write(self.style.WARNING(f"Failed to record {endpoint} {params}: {e}"))
+            return 0
+        self.stdout.write(f"Recorded {endpoint} {params}")
+        return 1
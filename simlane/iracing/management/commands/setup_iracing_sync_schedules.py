@@ -3,6 +3,8 @@
 This command creates the necessary periodic tasks for automated iRacing data synchronization:
 - Current seasons sync: Tuesday, Wednesday, Friday at 6 AM UTC
 - Past seasons sync: Every 3 months (quarterly)
+- API response archive retention: Daily at 4:30 AM UTC
+- Upcoming event sessions refresh: Every 15 minutes
 """
 
 from __future__ import annotations
@@ -71,6 +73,45 @@ class Command(BaseCommand):
                 },
                 "description": "Sync past seasons quarterly on the 1st of Jan, Apr, Jul, Oct at 7 AM UTC",
             },
+            {
+                "name": "iRacing API Response Retention",
+                "task": "simlane.iracing.tasks.enforce_api_response_retention_task",
+                "cron": {
+                    "minute": "30",
+                    "hour": "4",
+                    "day_of_week": "*",
+                    "day_of_month": "*",
+                    "month_of_year": "*",
+                },
+                "kwargs": {},
+                "description": "Prune and compact the stored iRacing API responses daily at 4:30 AM UTC",
+            },
+            {
+                "name": "Upcoming Event Sessions Refresh",
+                "task": "simlane.iracing.tasks.refresh_upcoming_sessions_task",
+                "cron": {
+                    "minute": "*/15",
+                    "hour": "*",
+                    "day_of_week": "*",
+                    "day_of_month": "*",
+                    "month_of_year": "*",
+                },
+                "kwargs": {},
+                "description": "Recompute the next session starts of events every 15 minutes",
+            },
+            {
+                "name": "iRacing Past Season Backfill Resume",
+                "task": "simlane.iracing.tasks.resume_past_season_backfill_task",
+                "cron": {
+                    "minute": "*/30",
+                    "hour": "*",
+                    "day_of_week": "*",
+                    "day_of_month": "*",
+                    "month_of_year": "*",
+                },
+                "kwargs": {},
+                "description": "Restart a stalled past season backfill every 30 minutes",
+            },
         ]
 
         created_count = 0
@@ -10,8 +10,21 @@ class Command(BaseCommand):
             action="store_true",
             help="Bypass API cache when fetching data",
         )
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Re-process every season and week, even if its schedule is unchanged",
+        )
+        parser.add_argument(
+            "--fanout",
+            type=int,
+            default=None,
+            help="Number of parallel batches (default: IRACING_SEASON_SYNC_FANOUT, 1 disables fan-out)",
+        )
 
     def handle(self, *args, **options):
         refresh = options.get("refresh", False)
-        task = sync_current_seasons_task.delay(refresh=refresh) # type: ignore[call-arg]
-        self.stdout.write(self.style.SUCCESS(f"Queued sync_current_seasons_task (id={task.id}) refresh={refresh}")) 
\ No newline at end of file
+        force = options.get("force", False)
+        fanout = options.get("fanout")
+        task = sync_current_seasons_task.delay(refresh=refresh, force=force, fanout=fanout) # type: ignore[call-arg]
+        self.stdout.write(self.style.SUCCESS(f"Queued sync_current_seasons_task (id={task.id}) refresh={refresh} force={force} fanout={fanout}")) 
\ No newline at end of file
@@ -1,17 +1,31 @@
 from django.core.management.base import BaseCommand
-from simlane.iracing.tasks import queue_all_past_seasons_sync_task
+from simlane.iracing.tasks import backfill_past_seasons_task
 
 class Command(BaseCommand):
-    help = "Queue Celery tasks to sync PAST seasons for every iRacing series in the DB."
+    help = "Queue the checkpointed backfill of PAST seasons for every iRacing series in the DB."
 
     def add_arguments(self, parser):
         parser.add_argument(
             "--refresh",
             action="store_true",
-            help="Bypass API cache when fetching data",
+            help="Bypass API cache and re-process finished seasons whose schedule changed",
+        )
+        parser.add_argument(
+            "--series",
+            type=int,
+            nargs="+",
+            default=None,
+            help="Only discover the past seasons of these iRacing series IDs",
+        )
+        parser.add_argument(
+            "--resume",
+            action="store_true",
+            help="Continue with the seasons already pending, without discovering new ones",
         )
 
     def handle(self, *args, **options):
         refresh = options.get("refresh", False)
-        task = queue_all_past_seasons_sync_task.delay(refresh=refresh)
-        self.stdout.write(self.style.SUCCESS(f"Queued queue_all_past_seasons_sync_task (id={task.id}) refresh={refresh}")) 
\ No newline at end of file
+        series_ids = options.get("series")
+        discover = not options.get("resume", False)
+        task = backfill_past_seasons_task.delay(refresh=refresh, series_ids=series_ids, discover=discover) # type: ignore[call-arg]
+        self.stdout.write(self.style.SUCCESS(f"Queued backfill_past_seasons_task (id={task.id}) refresh={refresh} series={series_ids} discover={discover}"))
@@ -0,0 +1,75 @@
+"""
+Management command to train a zstd dictionary for stored API responses.
+"""
+
+import json
+
+from django.core.management.base import BaseCommand
+from django.core.management.base import CommandError
+
+from simlane.iracing.response_codecs import DEFAULT_DICTIONARY_SIZE
+from simlane.iracing.response_codecs import train_dictionary
+from simlane.iracing.s3_cache_storage import api_response_storage
+
+
+class Command(BaseCommand):
+    help = (
+        "Train a zstd dictionary from the latest stored responses of one data_type "
+        "and make it active for new responses of that type"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "data_type",
+            help="Response data_type, e.g. schedule or past_seasons",
+        )
+        parser.add_argument(
+            "--samples",
+            type=int,
+            default=500,
+            help="Maximum number of stored responses to train on",
+        )
+        parser.add_argument(
+            "--size",
+            type=int,
+            default=DEFAULT_DICTIONARY_SIZE,
+            help="Dictionary size in bytes",
+        )
+
+    def handle(self, *args, **options):
+        data_type = options["data_type"]
+        storage = api_response_storage.manifest_storage
+        prefix = f"{api_response_storage.MANIFEST_PREFIX}/{data_type}"
+
+        try:
+            _dirs, files = storage.listdir(prefix)
+        except Exception as e:
+            raise CommandError(f"Failed to list {data_type} manifests: {e}") from e
+
+        samples = []
+        for name in files[: options["samples"]]:
+            try:
+                with storage.open(f"{prefix}/{name}", "rb") as f:
+                    manifest = json.loads(f.read())
+                samples.append(api_response_storage._read_payload(data_type, manifest))
+            except Exception as e:
+                self.stdout.write(self.style.WARNING(f"Skipping {name}: {e}"))
+
+        if len(samples) < 10:
+            raise CommandError(
+                f"Need at least 10 stored {data_type} responses to train a dictionary, found {len(samples)}"
+            )
+
+        try:
+            dictionary = train_dictionary(samples, size=options["size"])
+        except Exception as e:
+            raise CommandError(f"Failed to train {data_type} dictionary: {e}") from e
+
+        dict_id = api_response_storage.store_dictionary(data_type, dictionary)
+        sample_bytes = sum(len(sample) for sample in samples)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Trained dictionary {dict_id} for {data_type} "
+                f"({len(dictionary)} bytes from {len(samples)} samples, {sample_bytes} bytes)"
+            )
+        )
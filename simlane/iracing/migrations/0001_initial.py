@@ -0,0 +1,38 @@
+# Generated by Django 5.1.11 on 2026-10-16 20:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PastSeasonSyncCheckpoint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('external_series_id', models.IntegerField(help_text='Series ID from iRacing API')),
+                ('external_season_id', models.IntegerField(help_text='Season ID from iRacing API', unique=True)),
+                ('season_name', models.CharField(blank=True, max_length=255)),
+                ('status', models.CharField(choices=[('PENDING', 'Pending'), ('RUNNING', 'Running'), ('DONE', 'Done'), ('FAILED', 'Failed')], default='PENDING', max_length=10)),
+                ('payload_hash', models.CharField(blank=True, help_text='Hash of the schedule payload last synced successfully', max_length=64)),
+                ('duration_seconds', models.FloatField(blank=True, null=True)),
+                ('error', models.TextField(blank=True)),
+                ('attempts', models.PositiveIntegerField(default=0)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Past Season Sync Checkpoint',
+                'verbose_name_plural': 'Past Season Sync Checkpoints',
+                'ordering': ['external_series_id', 'external_season_id'],
+                'indexes': [models.Index(fields=['status', 'external_series_id', 'external_season_id'], name='iracing_pas_status_006306_idx'), models.Index(fields=['finished_at'], name='iracing_pas_finishe_88d0cd_idx')],
+            },
+        ),
+    ]
@@ -1 +1,40 @@
-# Create your models here.
+from django.db import models
+
+
+class PastSeasonSyncCheckpoint(models.Model):
+    """Backfill state of one past iRacing season (see simlane.iracing.backfill)"""
+
+    class Status(models.TextChoices):
+        PENDING = "PENDING", "Pending"
+        RUNNING = "RUNNING", "Running"
+        DONE = "DONE", "Done"
+        FAILED = "FAILED", "Failed"
+
+    external_series_id = models.IntegerField(help_text="Series ID from iRacing API")
+    external_season_id = models.IntegerField(unique=True, help_text="Season ID from iRacing API")
+    season_name = models.CharField(max_length=255, blank=True)
+    status = models.CharField(max_length=10, choices=Status.choices, default=Status.PENDING)
+    payload_hash = models.CharField(
+        max_length=64,
+        blank=True,
+        help_text="Hash of the schedule payload last synced successfully",
+    )
+    duration_seconds = models.FloatField(null=True, blank=True)
+    error = models.TextField(blank=True)
+    attempts = models.PositiveIntegerField(default=0)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Past Season Sync Checkpoint"
+        verbose_name_plural = "Past Season Sync Checkpoints"
+        ordering = ["external_series_id", "external_season_id"]
+        indexes = [
+            models.Index(fields=["status", "external_series_id", "external_season_id"]),
+            models.Index(fields=["finished_at"]),
+        ]
+
+    def __str__(self):
+        return f"Season {self.external_season_id} ({self.get_status_display()})"
@@ -0,0 +1,275 @@
+"""
+Cluster-wide rate limiting for the iRacing Data API.
+
+Every worker and process that talks to iRacing with the same account draws
+permits from one Redis token bucket. The bucket refills at a configured rate
+and is re-calibrated from the ``x-ratelimit-remaining`` / ``x-ratelimit-reset``
+headers iRacing returns, so the whole cluster stays inside the real budget.
+"""
+
+import contextvars
+import hashlib
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Iterator, Optional
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+
+class IRacingRateLimitError(Exception):
+    """Raised in non-blocking mode when no request permit is available."""
+
+    def __init__(self, retry_after: float, message: str = ""):
+        self.retry_after = retry_after
+        super().__init__(message or f"iRacing rate budget exhausted, retry in {retry_after:.1f}s")
+
+
+# Whether clients should sleep for a permit (default) or raise IRacingRateLimitError
+_blocking = contextvars.ContextVar("iracing_rate_limit_blocking", default=True)
+
+
+@contextmanager
+def rate_limit_mode(blocking: bool) -> Iterator[None]:
+    """
+    Choose how iRacing clients wait for request permits in this context.
+
+    Celery tasks use ``rate_limit_mode(blocking=False)`` so that an exhausted
+    budget raises IRacingRateLimitError and the task can retry with a countdown
+    instead of sleeping while it holds a worker slot.
+    """
+    token = _blocking.set(blocking)
+    try:
+        yield
+    finally:
+        _blocking.reset(token)
+
+
+def is_blocking() -> bool:
+    """Return True if clients should sleep until a permit is available."""
+    return _blocking.get()
+
+
+def get_retry_after(exc: BaseException) -> Optional[float]:
+    """
+    Return the retry delay if an exception was caused by the rate limiter.
+
+    Service layers wrap client errors, so the whole ``__cause__`` chain is
+    searched.
+    """
+    seen = set()
+    current: Optional[BaseException] = exc
+    while current is not None and id(current) not in seen:
+        if isinstance(current, IRacingRateLimitError):
+            return current.retry_after
+        seen.add(id(current))
+        current = current.__cause__ or current.__context__
+    return None
+
+
+def parse_rate_limit_headers(headers: Any) -> tuple[Optional[int], Optional[float]]:
+    """Extract (remaining, reset epoch) from iRacing response headers."""
+    try:
+        remaining = headers.get("x-ratelimit-remaining")
+        reset = headers.get("x-ratelimit-reset")
+        return (
+            int(remaining) if remaining is not None else None,
+            float(reset) if reset is not None else None,
+        )
+    except (AttributeError, TypeError, ValueError):
+        return None, None
+
+
+# Take one permit. Returns the seconds to wait (as a string) or "0" on success.
+_ACQUIRE_SCRIPT = """
+local key = KEYS[1]
+local capacity = tonumber(ARGV[1])
+local default_rate = tonumber(ARGV[2])
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local b = redis.call('HMGET', key, 'tokens', 'ts', 'rate', 'rate_until', 'paused_until')
+local tokens = tonumber(b[1]) or capacity
+local ts = tonumber(b[2]) or now
+local rate = default_rate
+if now < (tonumber(b[4]) or 0) then
+    rate = tonumber(b[3]) or default_rate
+end
+if rate <= 0 then
+    rate = default_rate
+end
+local paused_until = tonumber(b[5]) or 0
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+local wait = 0
+if now < paused_until then
+    wait = paused_until - now
+elseif tokens >= 1 then
+    tokens = tokens - 1
+else
+    wait = (1 - tokens) / rate
+end
+redis.call('HSET', key, 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('EXPIRE', key, 3600)
+return tostring(wait)
+"""
+
+# Re-calibrate the bucket from the server's view of the remaining budget.
+_UPDATE_SCRIPT = """
+local key = KEYS[1]
+local remaining = tonumber(ARGV[1])
+local reset = tonumber(ARGV[2])
+local capacity = tonumber(ARGV[3])
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local tokens = tonumber(redis.call('HGET', key, 'tokens')) or capacity
+tokens = math.min(tokens, remaining, capacity)
+local window = math.max(reset - now, 1)
+redis.call('HSET', key, 'tokens', tostring(tokens), 'ts', tostring(now),
+    'rate', tostring(math.max(remaining, 0) / window), 'rate_until', tostring(reset))
+if remaining <= 0 then
+    redis.call('HSET', key, 'paused_until', tostring(reset))
+end
+redis.call('EXPIRE', key, 3600)
+return 1
+"""
+
+# Stop handing out permits until the given epoch (after a 429).
+_PAUSE_SCRIPT = """
+local key = KEYS[1]
+local until_ts = tonumber(ARGV[1])
+local current = tonumber(redis.call('HGET', key, 'paused_until')) or 0
+redis.call('HSET', key, 'tokens', '0', 'paused_until', tostring(math.max(current, until_ts)))
+redis.call('EXPIRE', key, 3600)
+return 1
+"""
+
+
+class IRacingRateLimiter:
+    """
+    Redis-backed token bucket keyed by iRacing account.
+
+    Falls back to per-process request spacing when Redis is unavailable, which
+    matches the client's previous behaviour.
+    """
+
+    KEY_PREFIX = "iracing:ratelimit"
+    DEFAULT_CAPACITY = 10
+    DEFAULT_REFILL_PER_SECOND = 1.0
+    DEFAULT_PAUSE_SECONDS = 60.0
+
+    def __init__(
+        self,
+        account: str,
+        capacity: Optional[int] = None,
+        refill_per_second: Optional[float] = None,
+        redis_alias: str = "default",
+    ):
+        account_hash = hashlib.sha256(account.lower().encode("utf-8")).hexdigest()[:16]
+        self.key = f"{self.KEY_PREFIX}:{account_hash}"
+        self.capacity = capacity or getattr(
+            settings, "IRACING_RATE_LIMIT_CAPACITY", self.DEFAULT_CAPACITY
+        )
+        self.refill_per_second = refill_per_second or getattr(
+            settings, "IRACING_RATE_LIMIT_REFILL_PER_SECOND", self.DEFAULT_REFILL_PER_SECOND
+        )
+        self.redis_alias = redis_alias
+        self._scripts: Optional[dict] = None
+        self._local_lock = threading.Lock()
+        self._local_next_at = 0.0
+        self._local_paused_until = 0.0
+
+    def _get_scripts(self) -> dict:
+        """Register the Lua scripts on first use."""
+        if self._scripts is None:
+            from django_redis import get_redis_connection
+
+            redis_conn = get_redis_connection(self.redis_alias)
+            self._scripts = {
+                "acquire": redis_conn.register_script(_ACQUIRE_SCRIPT),
+                "update": redis_conn.register_script(_UPDATE_SCRIPT),
+                "pause": redis_conn.register_script(_PAUSE_SCRIPT),
+            }
+        return self._scripts
+
+    def _local_try_acquire(self) -> float:
+        """Per-process fallback: space requests by the refill interval."""
+        with self._local_lock:
+            now = time.monotonic()
+            start_at = max(now, self._local_next_at, self._local_paused_until)
+            if start_at > now:
+                return start_at - now
+            self._local_next_at = now + 1.0 / self.refill_per_second
+            return 0.0
+
+    def try_acquire(self) -> float:
+        """
+        Try to take one request permit without waiting.
+
+        Returns:
+            0.0 if a permit was granted, otherwise the seconds until one is
+            expected to be available.
+        """
+        try:
+            wait = self._get_scripts()["acquire"](
+                keys=[self.key], args=[self.capacity, self.refill_per_second]
+            )
+            return max(float(wait), 0.0)
+        except Exception as e:
+            logger.warning(f"Shared rate limiter unavailable, using local limit: {e}")
+            return self._local_try_acquire()
+
+    def acquire(self, blocking: Optional[bool] = None) -> None:
+        """
+        Take one request permit.
+
+        Args:
+            blocking: Sleep until a permit is available (True) or raise
+                IRacingRateLimitError (False). Defaults to the current
+                rate_limit_mode().
+        """
+        if blocking is None:
+            blocking = is_blocking()
+        while True:
+            wait = self.try_acquire()
+            if wait <= 0:
+                return
+            if not blocking:
+                raise IRacingRateLimitError(wait)
+            logger.debug(f"Rate limiting: sleeping for {wait:.2f} seconds")
+            time.sleep(wait)
+
+    def update_from_headers(self, headers: Any) -> None:
+        """Re-calibrate the shared bucket from iRacing rate limit headers."""
+        remaining, reset = parse_rate_limit_headers(headers)
+        if remaining is None or reset is None:
+            return
+        try:
+            self._get_scripts()["update"](
+                keys=[self.key], args=[remaining, reset, self.capacity]
+            )
+        except Exception as e:
+            logger.debug(f"Failed to update shared rate limiter: {e}")
+
+    def pause(self, headers: Any = None) -> float:
+        """
+        Stop all workers from calling iRacing until the rate limit resets.
+
+        Returns:
+            Seconds until requests may resume.
+        """
+        _remaining, reset = parse_rate_limit_headers(headers or {})
+        wait_time = self.DEFAULT_PAUSE_SECONDS
+        if reset is not None:
+            wait_time = max(reset - time.time() + 0.5, 0.5)
+        resume_at = time.time() + wait_time
+        try:
+            self._get_scripts()["pause"](keys=[self.key], args=[resume_at])
+        except Exception as e:
+            logger.warning(f"Failed to pause shared rate limiter: {e}")
+            with self._local_lock:
+                self._local_paused_until = max(
+                    self._local_paused_until, time.monotonic() + wait_time
+                )
+        return wait_time
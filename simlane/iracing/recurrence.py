@@ -0,0 +1,388 @@
+"""
+Recurring session starts of events.
+
+RecurrenceHandler expands the repeating race_time_descriptors of an event's
+time_pattern into session starts. refresh_upcoming_sessions() materialises
+the next starts of each event (scheduled TimeSlots and repeating patterns)
+on Event.next_session_start and Event.upcoming_session_starts, which the
+upcoming events listing filters and sorts on.
+"""
+
+import heapq
+import logging
+import math
+from collections import defaultdict
+from collections.abc import Iterable
+from collections.abc import Iterator
+from datetime import datetime
+from datetime import time
+from datetime import timedelta
+from datetime import timezone as dt_timezone
+from itertools import islice
+from itertools import repeat
+from typing import Any
+
+from django.db import transaction
+from django.db.models import F
+from django.db.models import Q
+from django.db.models import Window
+from django.db.models.functions import RowNumber
+from django.utils import timezone
+
+from simlane.sim.models import Event
+from simlane.sim.models import TimeSlot
+
+logger = logging.getLogger(__name__)
+
+
+# Session starts materialised on each Event by refresh_upcoming_sessions
+UPCOMING_SESSION_COUNT = 10
+
+# How far ahead repeating patterns are expanded when an event has no end_date
+UPCOMING_SESSION_HORIZON = timedelta(days=8)
+
+SECONDS_PER_DAY = 24 * 60 * 60
+
+
+class RecurrenceHandler:
+    """Handles dynamic generation of time slots from recurrence patterns."""
+
+    @staticmethod
+    def repeating_descriptors(event: Event) -> list[dict[str, Any]]:
+        """Repeating race_time_descriptors of an event's time_pattern."""
+        pattern = event.time_pattern
+        # Synced events store the descriptor list, older ones a dict holding it
+        if isinstance(pattern, dict):
+            pattern = pattern.get("race_time_descriptors", [])
+        if not isinstance(pattern, list):
+            return []
+        return [
+            descriptor
+            for descriptor in pattern
+            if isinstance(descriptor, dict) and descriptor.get("repeating", False)
+        ]
+
+    @staticmethod
+    def generate_time_slots_for_period(
+        event: Event,
+        start_date: datetime,
+        end_date: datetime,
+    ) -> list[dict[str, Any]]:
+        """
+        Generate time slots for an event within a specific period.
+
+        This is used for displaying upcoming races without creating
+        database records for every possible time slot.
+
+        Args:
+            event: Event with time_pattern data
+            start_date: Start of period to generate slots for
+            end_date: End of period to generate slots for
+
+        Returns:
+            List of time slot data dictionaries
+        """
+        time_slots = []
+        for descriptor in RecurrenceHandler.repeating_descriptors(event):
+            slots = RecurrenceHandler._generate_repeating_slots(
+                descriptor,
+                start_date,
+                end_date,
+                event,
+            )
+            time_slots.extend(slots)
+
+        return sorted(time_slots, key=lambda x: x["start_time"])
+
+    @staticmethod
+    def next_slots(
+        event: Event,
+        start_date: datetime,
+        end_date: datetime,
+        limit: int,
+    ) -> list[dict[str, Any]]:
+        """
+        The first ``limit`` time slots of an event's repeating patterns within
+        [start_date, end_date], in the same form as generate_time_slots_for_period.
+
+        Patterns are merged lazily, so only the returned slots are computed.
+        """
+        streams = [
+            zip(
+                RecurrenceHandler.iter_slot_starts(descriptor, start_date, end_date),
+                repeat(timedelta(minutes=descriptor.get("session_minutes", 60))),
+            )
+            for descriptor in RecurrenceHandler.repeating_descriptors(event)
+        ]
+        registration_lead = timedelta(hours=1)
+        return [
+            {
+                "start_time": slot_time,
+                "end_time": slot_time + session_length,
+                "registration_open": slot_time - registration_lead,
+                "registration_ends": slot_time,
+                "is_predicted": True,
+                "event": event,
+            }
+            for slot_time, session_length in islice(heapq.merge(*streams), limit)
+        ]
+
+    @staticmethod
+    def _parse_pattern(descriptor: dict[str, Any]) -> tuple[int, int, int, frozenset[int]] | None:
+        """
+        Parse a repeating descriptor.
+
+        Returns:
+            Tuple of (pattern start day as epoch seconds, first session offset
+            in seconds, repeat interval in seconds, day offsets), or None if
+            the descriptor can't be used
+        """
+        first_session_time = descriptor.get("first_session_time", "00:00:00")
+        repeat_minutes = descriptor.get("repeat_minutes", 60)
+        day_offsets = descriptor.get("day_offset", [0, 1, 2, 3, 4, 5, 6])
+        pattern_start_date = descriptor.get("start_date")
+
+        if not pattern_start_date:
+            logger.warning("No start_date in repeating pattern descriptor")
+            return None
+
+        try:
+            if isinstance(pattern_start_date, str):
+                # Handle both date strings and datetime strings
+                if "T" in pattern_start_date or "Z" in pattern_start_date:
+                    base_date = datetime.fromisoformat(
+                        pattern_start_date.replace("Z", "+00:00")
+                    )
+                else:
+                    # Just a date string like "2025-02-11"
+                    base_date = datetime.strptime(pattern_start_date, "%Y-%m-%d")
+            else:
+                base_date = pattern_start_date
+
+            # Make sure base_date is timezone aware
+            if base_date.tzinfo is None:
+                base_date = timezone.make_aware(base_date)
+
+            base_day = timezone.make_aware(datetime.combine(base_date.date(), time.min))
+
+            time_parts = first_session_time.split(":")
+            first_offset = (
+                int(time_parts[0]) * 3600
+                + int(time_parts[1]) * 60
+                + (int(time_parts[2]) if len(time_parts) > 2 else 0)
+            )
+            repeat_seconds = int(repeat_minutes) * 60
+        except (ValueError, AttributeError, TypeError) as e:
+            logger.warning(f"Error parsing time pattern: {e}")
+            return None
+
+        if repeat_seconds <= 0:
+            logger.warning(f"Invalid repeat_minutes in time pattern: {repeat_minutes}")
+            return None
+
+        return int(base_day.timestamp()), first_offset, repeat_seconds, frozenset(day_offsets)
+
+    @staticmethod
+    def iter_slot_starts(
+        descriptor: dict[str, Any],
+        start_date: datetime,
+        end_date: datetime,
+    ) -> Iterator[datetime]:
+        """
+        Start times of a repeating pattern within [start_date, end_date], in order.
+
+        Sessions run every repeat_minutes from first_session_time until the end
+        of each day whose offset from the pattern's start_date (mod 7) is in
+        day_offset. Each day's first and last session in range are computed
+        directly from the range bounds instead of stepping through the day.
+        """
+        pattern = RecurrenceHandler._parse_pattern(descriptor)
+        if pattern is None:
+            return
+        base, first_offset, repeat, day_offsets = pattern
+        if first_offset >= SECONDS_PER_DAY:
+            return
+
+        sessions_per_day = math.ceil((SECONDS_PER_DAY - first_offset) / repeat)
+        start = start_date.timestamp()
+        end = end_date.timestamp()
+
+        first_day = max(0, math.floor((start - base) / SECONDS_PER_DAY))
+        last_day = math.floor((end - base) / SECONDS_PER_DAY)
+        for day in range(first_day, last_day + 1):
+            if day % 7 not in day_offsets:
+                continue
+            day_first = base + day * SECONDS_PER_DAY + first_offset
+            first_session = max(0, math.ceil((start - day_first) / repeat))
+            last_session = min(sessions_per_day - 1, math.floor((end - day_first) / repeat))
+            for session in range(first_session, last_session + 1):
+                yield datetime.fromtimestamp(day_first + session * repeat, tz=dt_timezone.utc)
+
+    @staticmethod
+    def _generate_repeating_slots(
+        descriptor: dict[str, Any],
+        start_date: datetime,
+        end_date: datetime,
+        event: Event,
+    ) -> list[dict[str, Any]]:
+        """Generate time slots for a repeating pattern."""
+        session_length = timedelta(minutes=descriptor.get("session_minutes", 60))
+        registration_lead = timedelta(hours=1)
+
+        time_slots = [
+            {
+                "start_time": slot_time,
+                "end_time": slot_time + session_length,
+                "registration_open": slot_time - registration_lead,
+                "registration_ends": slot_time,
+                "is_predicted": True,
+                "event": event,
+            }
+            for slot_time in RecurrenceHandler.iter_slot_starts(descriptor, start_date, end_date)
+        ]
+
+        logger.debug(f"Generated {len(time_slots)} repeating slots for event {event.name}")
+        return time_slots
+
+    @staticmethod
+    def upcoming_session_starts(
+        event: Event,
+        now: datetime,
+        scheduled_starts: Iterable[datetime] = (),
+        count: int = UPCOMING_SESSION_COUNT,
+    ) -> list[datetime]:
+        """
+        The next ``count`` session starts of an event from ``now``.
+
+        Merges the event's scheduled TimeSlot starts (sorted) with its
+        repeating patterns, which are expanded up to the event's end_date or
+        UPCOMING_SESSION_HORIZON, whichever is sooner.
+        """
+        horizon = now + UPCOMING_SESSION_HORIZON
+        if event.end_date and event.end_date < horizon:
+            horizon = event.end_date
+
+        streams = [iter(scheduled_starts)] + [
+            RecurrenceHandler.iter_slot_starts(descriptor, now, horizon)
+            for descriptor in RecurrenceHandler.repeating_descriptors(event)
+        ]
+        starts: list[datetime] = []
+        for start in heapq.merge(*streams):
+            if starts and starts[-1] == start:
+                continue
+            starts.append(start)
+            if len(starts) >= count:
+                break
+        return starts
+
+
+def refresh_upcoming_sessions(
+    now: datetime | None = None,
+    count: int = UPCOMING_SESSION_COUNT,
+    event_ids: Iterable[Any] | None = None,
+) -> dict[str, int]:
+    """
+    Recompute Event.next_session_start and upcoming_session_starts.
+
+    Covers events with future time slots, events with a time pattern that
+    have not ended, and events that still have a next session stored, or only
+    the events in ``event_ids``.
+
+    Returns:
+        Dict with the number of events checked and updated
+    """
+    return fill_upcoming_sessions(Event, TimeSlot, now=now, count=count, event_ids=event_ids)
+
+
+def fill_upcoming_sessions(
+    event_model,
+    time_slot_model,
+    now: datetime | None = None,
+    count: int = UPCOMING_SESSION_COUNT,
+    event_ids: Iterable[Any] | None = None,
+) -> dict[str, int]:
+    """
+    refresh_upcoming_sessions() on the given Event and TimeSlot models.
+
+    Only plain fields of the models are used, so migrations can pass their
+    historical models.
+    """
+    now = now or timezone.now()
+
+    # The first ``count`` future TimeSlot starts of every event
+    scheduled: dict[Any, list[datetime]] = defaultdict(list)
+    time_slots = time_slot_model.objects.filter(start_time__gt=now)
+    events = event_model.objects.all()
+    if event_ids is not None:
+        event_ids = list(event_ids)
+        time_slots = time_slots.filter(event_id__in=event_ids)
+        events = events.filter(id__in=event_ids)
+    time_slots = (
+        time_slots
+        .annotate(
+            position=Window(
+                RowNumber(), partition_by=F("event_id"), order_by=F("start_time").asc()
+            )
+        )
+        .filter(position__lte=count)
+        .order_by("event_id", "start_time")
+        .values_list("event_id", "start_time")
+    )
+    for event_id, start_time in time_slots:
+        scheduled[event_id].append(start_time)
+
+    events = events.filter(
+        Q(id__in=list(scheduled))
+        | Q(next_session_start__isnull=False)
+        | (Q(time_pattern__isnull=False) & (Q(end_date__isnull=True) | Q(end_date__gt=now)))
+    ).only("id", "time_pattern", "end_date", "next_session_start", "upcoming_session_starts")
+
+    checked = 0
+    changed = []
+    for event in events.iterator(chunk_size=2000):
+        checked += 1
+        starts = RecurrenceHandler.upcoming_session_starts(
+            event, now, scheduled.get(event.id, ()), count
+        )
+        if starts != event.upcoming_session_starts:
+            event.upcoming_session_starts = starts
+            event.next_session_start = starts[0] if starts else None
+            changed.append(event)
+
+    event_model.objects.bulk_update(
+        changed, ["next_session_start", "upcoming_session_starts"], batch_size=500
+    )
+    logger.info(f"Refreshed upcoming sessions: {checked} events checked, {len(changed)} updated")
+    return {"events_checked": checked, "events_updated": len(changed)}
+
+
+class _PendingRefresh:
+    """on_commit callback refreshing the events queued during a transaction."""
+
+    def __init__(self):
+        self.event_ids: set[Any] = set()
+
+    def __call__(self):
+        refresh_upcoming_sessions(event_ids=self.event_ids)
+
+
+def refresh_upcoming_sessions_on_commit(event_ids: Iterable[Any]) -> None:
+    """
+    Refresh the upcoming sessions of some events once the transaction commits.
+
+    Ids queued during one transaction are collected and refreshed by a single
+    refresh_upcoming_sessions() call, however many rows were written.
+    Outside a transaction the events are refreshed immediately.
+    """
+    connection = transaction.get_connection()
+    if not connection.in_atomic_block:
+        refresh_upcoming_sessions(event_ids=set(event_ids))
+        return
+
+    pending = getattr(connection, "pending_upcoming_sessions_refresh", None)
+    # A rolled back transaction discards the callback along with its ids
+    if pending is None or not any(hook[1] is pending for hook in connection.run_on_commit):
+        pending = _PendingRefresh()
+        connection.pending_upcoming_sessions_refresh = pending
+        transaction.on_commit(pending)
+    pending.event_ids.update(event_ids)
@@ -0,0 +1,274 @@
+"""
+Tiered read cache for stored iRacing API responses.
+
+Lookups go through three tiers, and a hit in a lower tier populates the ones
+above it:
+
+1. memory: a per-process LRU bounded by payload bytes
+2. redis:  decoded payloads in the ``api_cache`` Redis database
+3. s3:     the manifest-indexed response archive (APIResponseS3Storage)
+
+Every entry carries the time its payload was stored, so callers get the same
+age whichever tier answered. Entries stay in a tier until the data_type's TTL
+plus its stale grace window has passed, capped by the tier's own lifetime from
+settings.API_RESPONSE_CACHE_TIER_TTL.
+"""
+
+import copy
+import json
+import logging
+import threading
+import time
+from collections import Counter, OrderedDict
+from datetime import datetime
+from typing import Any, Dict, NamedTuple, Optional
+
+from django.conf import settings
+from django.core.cache import caches
+
+from simlane.iracing.archive_backends import walk
+from simlane.iracing.s3_cache_storage import APIResponseS3Storage
+from simlane.iracing.s3_cache_storage import api_response_storage
+
+logger = logging.getLogger(__name__)
+
+TIERS = ("memory", "redis", "s3")
+DEFAULT_TTL = 3600
+DEFAULT_MEMORY_BYTES = 64 * 1024 * 1024
+
+
+class CachedResponse(NamedTuple):
+    """A cached payload and where it came from."""
+
+    data: Any
+    stored_at: float
+    size: int
+    tier: str
+
+    @property
+    def age(self) -> float:
+        return max(time.time() - self.stored_at, 0.0)
+
+
+class ByteBoundedLRU:
+    """
+    Thread-safe LRU that evicts by total payload size rather than entry count.
+
+    Payloads are copied in and out, so callers mutating what they stored or
+    got back do not change the cached entry.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self._entries: "OrderedDict[str, tuple[Any, float, int, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[tuple[Any, float, int]]:
+        """Return (data, stored_at, size), or None if missing or expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            data, stored_at, size, expires_at = entry
+            if time.monotonic() >= expires_at:
+                self._pop(key)
+                return None
+            self._entries.move_to_end(key)
+        return copy.deepcopy(data), stored_at, size
+
+    def set(self, key: str, data: Any, stored_at: float, size: int, timeout: float) -> None:
+        if size > self.max_bytes or timeout <= 0:
+            return
+        data = copy.deepcopy(data)
+        with self._lock:
+            self._pop(key)
+            self._entries[key] = (data, stored_at, size, time.monotonic() + timeout)
+            self.current_bytes += size
+            while self.current_bytes > self.max_bytes:
+                self._pop(next(iter(self._entries)))
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._pop(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+
+    def _pop(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.current_bytes -= entry[2]
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class TieredResponseCache:
+    """
+    memory -> Redis -> S3 lookups of stored API responses.
+
+    Usage::
+
+        cached = tiered_response_cache.get('schedule', season_id=4321)
+        if cached and cached.age < ttl:
+            return cached.data
+    """
+
+    REDIS_CACHE_ALIAS = "api_cache"
+    REDIS_KEY_PREFIX = "api_response"
+
+    def __init__(self, storage: Optional[APIResponseS3Storage] = None, max_bytes: Optional[int] = None):
+        self.storage = storage or api_response_storage
+        self.memory = ByteBoundedLRU(
+            max_bytes or getattr(settings, "API_RESPONSE_CACHE_MEMORY_BYTES", DEFAULT_MEMORY_BYTES)
+        )
+        self._stats: Counter = Counter()
+        self._stats_lock = threading.Lock()
+
+    # Configuration
+
+    @staticmethod
+    def ttl(data_type: str) -> float:
+        """Seconds a stored response is considered fresh."""
+        return getattr(settings, "API_RESPONSE_CACHE_TTL", {}).get(data_type, DEFAULT_TTL)
+
+    @staticmethod
+    def grace(data_type: str) -> float:
+        """Seconds past the TTL a stale response may still be served while it is refreshed."""
+        grace = getattr(settings, "API_RESPONSE_CACHE_GRACE", {})
+        return grace.get(data_type, grace.get("default", 0))
+
+    def _tier_timeout(self, tier: str, data_type: str, stored_at: float) -> float:
+        """Seconds an entry stored at ``stored_at`` may stay in a tier."""
+        remaining = self.ttl(data_type) + self.grace(data_type) - (time.time() - stored_at)
+        tier_ttl = getattr(settings, "API_RESPONSE_CACHE_TIER_TTL", {}).get(tier)
+        return min(remaining, tier_ttl) if tier_ttl else remaining
+
+    def _redis_key(self, manifest_id: str) -> str:
+        return f"{self.REDIS_KEY_PREFIX}:{manifest_id}"
+
+    # Stats
+
+    def _record(self, tier: str, data_type: str, hit: bool) -> None:
+        with self._stats_lock:
+            self._stats[(tier, data_type, "hit" if hit else "miss")] += 1
+
+    def stats(self) -> Dict[str, Dict[str, Dict[str, int]]]:
+        """Hit/miss counters of this process, as {tier: {data_type: {"hit": n, "miss": n}}}."""
+        result: Dict[str, Dict[str, Dict[str, int]]] = {tier: {} for tier in TIERS}
+        with self._stats_lock:
+            for (tier, data_type, outcome), count in self._stats.items():
+                result[tier].setdefault(data_type, {"hit": 0, "miss": 0})[outcome] = count
+        return result
+
+    def reset_stats(self) -> None:
+        with self._stats_lock:
+            self._stats.clear()
+
+    # Lookups
+
+    def get(self, data_type: str, **params) -> Optional[CachedResponse]:
+        """Return the latest stored response from the fastest tier holding it."""
+        manifest_id = self.storage._manifest_id(data_type, **params)
+
+        entry = self.memory.get(manifest_id)
+        self._record("memory", data_type, entry is not None)
+        if entry is not None:
+            return CachedResponse(*entry, tier="memory")
+
+        cached = self._get_redis(data_type, manifest_id)
+        if cached is None:
+            cached = self._get_s3(data_type, **params)
+            if cached is None:
+                return None
+            self._set_redis(data_type, manifest_id, cached)
+
+        self.memory.set(
+            manifest_id, cached.data, cached.stored_at, cached.size,
+            self._tier_timeout("memory", data_type, cached.stored_at),
+        )
+        return cached
+
+    def _get_redis(self, data_type: str, manifest_id: str) -> Optional[CachedResponse]:
+        try:
+            entry = caches[self.REDIS_CACHE_ALIAS].get(self._redis_key(manifest_id))
+        except Exception as e:
+            logger.warning(f"Failed to read cached {data_type} response from Redis: {e}")
+            entry = None
+        self._record("redis", data_type, entry is not None)
+        if entry is None:
+            return None
+        return CachedResponse(entry["data"], entry["stored_at"], entry["size"], tier="redis")
+
+    def _set_redis(self, data_type: str, manifest_id: str, cached: CachedResponse) -> None:
+        timeout = self._tier_timeout("redis", data_type, cached.stored_at)
+        if timeout <= 0:
+            return
+        try:
+            caches[self.REDIS_CACHE_ALIAS].set(
+                self._redis_key(manifest_id),
+                {"data": cached.data, "stored_at": cached.stored_at, "size": cached.size},
+                int(timeout) or 1,
+            )
+        except Exception as e:
+            logger.warning(f"Failed to cache {data_type} response in Redis: {e}")
+
+    def _get_s3(self, data_type: str, **params) -> Optional[CachedResponse]:
+        manifest = self.storage.get_manifest(data_type, **params)
+        data = self.storage.read_response(data_type, manifest) if manifest else None
+        self._record("s3", data_type, data is not None)
+        if data is None:
+            return None
+        stored_at = datetime.fromisoformat(manifest["stored_at"]).timestamp()
+        return CachedResponse(data, stored_at, manifest.get("size", 0), tier="s3")
+
+    # Writes
+
+    def set(self, data_type: str, data: Any, **params) -> None:
+        """Put a freshly stored response into the memory and Redis tiers."""
+        manifest_id = self.storage._manifest_id(data_type, **params)
+        size = len(json.dumps(data, separators=(",", ":"), default=str))
+        cached = CachedResponse(data, time.time(), size, tier="memory")
+        self._set_redis(data_type, manifest_id, cached)
+        self.memory.set(
+            manifest_id, data, cached.stored_at, size,
+            self._tier_timeout("memory", data_type, cached.stored_at),
+        )
+
+    def invalidate(self, data_type: str, **params) -> None:
+        """Drop a response from the memory and Redis tiers."""
+        manifest_id = self.storage._manifest_id(data_type, **params)
+        self.memory.delete(manifest_id)
+        try:
+            caches[self.REDIS_CACHE_ALIAS].delete(self._redis_key(manifest_id))
+        except Exception as e:
+            logger.warning(f"Failed to invalidate cached {data_type} response in Redis: {e}")
+
+    def invalidate_data_type(self, data_type: Optional[str] = None) -> None:
+        """
+        Drop every stored response of a data_type, or of all of them, from the
+        memory and Redis tiers.
+
+        Redis entries are found through the archive's manifests, so this must
+        run before the archive itself is cleared.
+        """
+        if data_type is None:
+            self.memory.clear()
+        manifest_ids = [
+            self.storage._manifest_id_of_key(key)
+            for name in ([data_type] if data_type else self.storage.data_types())
+            for key in walk(self.storage.manifest_storage, f"{self.storage.MANIFEST_PREFIX}/{name}")
+        ]
+        for manifest_id in manifest_ids:
+            self.memory.delete(manifest_id)
+        try:
+            caches[self.REDIS_CACHE_ALIAS].delete_many([self._redis_key(manifest_id) for manifest_id in manifest_ids])
+        except Exception as e:
+            logger.warning(f"Failed to invalidate cached {data_type or 'all'} responses in Redis: {e}")
+
+
+# Global instance for use throughout the application
+tiered_response_cache = TieredResponseCache()
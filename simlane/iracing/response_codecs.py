@@ -0,0 +1,117 @@
+"""
+Compression codecs for stored iRacing API responses.
+
+Responses are written with the codec configured for their data_type in
+settings.API_RESPONSE_CODECS. gzip is always available and remains the
+default; zstd (optionally with a dictionary trained on earlier responses of
+the same data_type) compresses the repetitive iRacing JSON much better and
+decodes faster. The codec name is recorded in each response manifest, so
+objects written with any codec stay readable after the setting changes.
+"""
+
+import gzip
+import logging
+import threading
+from typing import Optional
+
+from django.conf import settings
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+# Used when the manifest predates codec tracking
+DEFAULT_CODEC = "gzip"
+DEFAULT_DICTIONARY_SIZE = 112640  # 110 KB, the zstd CLI default
+
+
+class ResponseCodec:
+    """Base class for response codecs."""
+
+    name = ""
+    extension = ""
+    dict_id: Optional[int] = None
+
+    def encode(self, data: bytes) -> bytes:
+        raise NotImplementedError
+
+    def decode(self, data: bytes) -> bytes:
+        raise NotImplementedError
+
+
+class GzipCodec(ResponseCodec):
+    """gzip, compatible with every object written before codecs existed."""
+
+    name = "gzip"
+    extension = ".json.gz"
+
+    def __init__(self, level: int = 6):
+        self.level = level
+
+    def encode(self, data: bytes) -> bytes:
+        return gzip.compress(data, compresslevel=self.level)
+
+    def decode(self, data: bytes) -> bytes:
+        return gzip.decompress(data)
+
+
+class ZstdCodec(ResponseCodec):
+    """zstd, optionally with a trained dictionary."""
+
+    name = "zstd"
+    extension = ".json.zst"
+
+    def __init__(self, level: int = 10, dictionary: Optional[bytes] = None):
+        if zstandard is None:
+            raise ImportError("zstandard is required for the zstd response codec")
+        self.level = level
+        self.dictionary = zstandard.ZstdCompressionDict(dictionary) if dictionary else None
+        self.dict_id = self.dictionary.dict_id() if self.dictionary else None
+        # zstd (de)compressor objects must not be shared between threads
+        self._local = threading.local()
+
+    def encode(self, data: bytes) -> bytes:
+        compressor = getattr(self._local, "compressor", None)
+        if compressor is None:
+            compressor = zstandard.ZstdCompressor(level=self.level, dict_data=self.dictionary)
+            self._local.compressor = compressor
+        return compressor.compress(data)
+
+    def decode(self, data: bytes) -> bytes:
+        decompressor = getattr(self._local, "decompressor", None)
+        if decompressor is None:
+            decompressor = zstandard.ZstdDecompressor(dict_data=self.dictionary)
+            self._local.decompressor = decompressor
+        return decompressor.decompress(data)
+
+
+def codec_name_for(data_type: str) -> str:
+    """Return the configured codec name for a data_type."""
+    codecs = getattr(settings, "API_RESPONSE_CODECS", {})
+    name = codecs.get(data_type, codecs.get("default", DEFAULT_CODEC))
+    if name == ZstdCodec.name and zstandard is None:
+        logger.warning(f"zstandard is not installed, storing {data_type} responses with gzip")
+        return GzipCodec.name
+    return name
+
+
+def build_codec(name: str, dictionary: Optional[bytes] = None) -> ResponseCodec:
+    """Build a codec by name."""
+    if name == GzipCodec.name:
+        return GzipCodec()
+    if name == ZstdCodec.name:
+        return ZstdCodec(
+            level=getattr(settings, "API_RESPONSE_ZSTD_LEVEL", 10),
+            dictionary=dictionary,
+        )
+    raise ValueError(f"Unknown response codec: {name}")
+
+
+def train_dictionary(samples: list[bytes], size: int = DEFAULT_DICTIONARY_SIZE) -> bytes:
+    """Train a zstd dictionary from sample payloads of one data_type."""
+    if zstandard is None:
+        raise ImportError("zstandard is required to train a response dictionary")
+    return zstandard.train_dictionary(size, samples).as_bytes()
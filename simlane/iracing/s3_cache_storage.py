@@ -2,21 +2,36 @@
 S3 storage utility for iRacing API responses.
 
 This module provides a clean interface for storing and retrieving compressed
-JSON API responses in S3 using parameter-based keys (series_id, season_id, etc).
+JSON API responses in S3 (or a local/in-memory archive with the same layout,
+see archive_backends) using parameter-based keys (series_id, season_id, etc).
+
+The latest object for each (data_type, params) pair is tracked in a small
+manifest kept in Redis with a JSON copy in S3, so lookups never list the bucket.
 """
 
-import gzip
+import hashlib
 import json
 import logging
-import uuid
+import time
 from datetime import datetime
-from io import BytesIO
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional
 
-from django.conf import settings
+from django.core.cache import caches
 from django.core.files.base import ContentFile
 from django.utils import timezone
-from storages.backends.s3 import S3Storage
+
+from simlane.iracing.archive_backends import archive_backend_name
+from simlane.iracing.archive_backends import build_archive_storage
+from simlane.iracing.archive_backends import delete_many
+from simlane.iracing.archive_backends import read_bytes
+from simlane.iracing.archive_backends import walk
+from simlane.iracing.archive_retention import ARCHIVE_PREFIX
+from simlane.iracing.archive_retention import enforce_retention
+from simlane.iracing.response_codecs import DEFAULT_CODEC
+from simlane.iracing.response_codecs import ResponseCodec
+from simlane.iracing.response_codecs import ZstdCodec
+from simlane.iracing.response_codecs import build_codec
+from simlane.iracing.response_codecs import codec_name_for
 
 logger = logging.getLogger(__name__)
 
@@ -26,28 +41,220 @@ class APIResponseS3Storage:
     S3 storage for API responses with compression and parameter-based keys.
     
     This class handles:
-    - Automatic gzip compression of JSON data
+    - Per data_type compression (gzip, or zstd with a trained dictionary)
+    - Skipping uploads of payloads identical to the latest stored one
     - Parameter-based S3 key generation (series_id, season_id, etc)
     - Metadata storage (timestamp, data type, parameters)
-    - Efficient retrieval and caching
+    - O(1) lookups of the latest response through a manifest index
     """
     
-    def __init__(self):
-        # Initialize S3 storage with API response configuration
-        api_storage_config = settings.API_RESPONSE_STORAGE["OPTIONS"]
-        
-        self.storage = S3Storage(**{
-            'access_key': api_storage_config['access_key'],
-            'secret_key': api_storage_config['secret_key'],
-            'bucket_name': api_storage_config['bucket_name'],
-            'region_name': api_storage_config['region_name'],
-            'location': api_storage_config.get('location', 'api_responses'),
-            'file_overwrite': api_storage_config.get('file_overwrite', False),
-            'default_acl': api_storage_config.get('default_acl', 'private'),
-            'object_parameters': api_storage_config.get('object_parameters', {}),
-        })
+    MANIFEST_CACHE_ALIAS = "api_cache"
+    MANIFEST_CACHE_PREFIX = "api_response_manifest"
+    MANIFEST_PREFIX = "manifests"
+    DICTIONARY_PREFIX = "dictionaries"
+    
+    def __init__(self, backend: Optional[str] = None):
+        """
+        Initialize the archive.
+        
+        Args:
+            backend: "s3", "local" or "memory" (defaults to
+                settings.API_RESPONSE_ARCHIVE["BACKEND"])
+        """
+        self.backend = backend or archive_backend_name()
+        self.storage = build_archive_storage(self.backend)
+        # Manifests are rewritten in place, so they must overwrite existing keys
+        self.manifest_storage = build_archive_storage(
+            self.backend,
+            overwrite=True,
+            object_parameters={'ContentType': 'application/json'},
+        )
+        # Compacted snapshots are packed into tar segments (see archive_retention)
+        self.archive_storage = build_archive_storage(
+            self.backend,
+            object_parameters={'ContentType': 'application/x-tar'},
+        )
+        self._codecs: Dict[tuple, ResponseCodec] = {}
+        self._dictionaries: Dict[tuple, bytes] = {}
+    
+    # Manifest index
+    
+    @staticmethod
+    def _manifest_id(data_type: str, **params) -> str:
+        """Stable identifier for a (data_type, params) pair."""
+        canonical = json.dumps(params, sort_keys=True, separators=(',', ':'), default=str)
+        digest = hashlib.sha256(canonical.encode('utf-8')).hexdigest()[:32]
+        return f"{data_type}/{digest}"
+    
+    @property
+    def _cache_prefix(self) -> str:
+        # Non-S3 archives hold different objects, keep their Redis entries apart
+        if self.backend == 's3':
+            return self.MANIFEST_CACHE_PREFIX
+        return f"{self.MANIFEST_CACHE_PREFIX}:{self.backend}"
+    
+    def _manifest_cache_key(self, manifest_id: str) -> str:
+        return f"{self._cache_prefix}:{manifest_id}"
+    
+    def _manifest_key(self, manifest_id: str) -> str:
+        return f"{self.MANIFEST_PREFIX}/{manifest_id}.json"
+    
+    def _manifest_id_of_key(self, manifest_key: str) -> str:
+        return manifest_key[len(self.MANIFEST_PREFIX) + 1 : -len('.json')]
+    
+    def get_manifest(self, data_type: str, **params) -> Optional[Dict[str, Any]]:
+        """
+        Get the manifest of the latest stored response.
+        
+        Checks Redis first and falls back to the JSON copy in S3, re-populating
+        Redis on a fallback hit.
+        
+        Returns:
+            Dict with key, stored_at, size, compressed_size and sha256, or
+            None if nothing has been stored for these parameters
+        """
+        manifest_id = self._manifest_id(data_type, **params)
+        cache_key = self._manifest_cache_key(manifest_id)
+        
+        try:
+            manifest = caches[self.MANIFEST_CACHE_ALIAS].get(cache_key)
+            if manifest is not None:
+                return manifest
+        except Exception as e:
+            logger.warning(f"Failed to read {data_type} manifest from Redis: {e}")
+        
+        try:
+            manifest_key = self._manifest_key(manifest_id)
+            if not self.manifest_storage.exists(manifest_key):
+                return None
+            with self.manifest_storage.open(manifest_key, 'rb') as f:
+                manifest = json.loads(f.read())
+        except Exception as e:
+            logger.warning(f"Failed to read {data_type} manifest from S3: {e}")
+            return None
+        
+        try:
+            caches[self.MANIFEST_CACHE_ALIAS].set(cache_key, manifest, None)
+        except Exception as e:
+            logger.debug(f"Failed to cache {data_type} manifest in Redis: {e}")
+        return manifest
+    
+    def _write_manifest(self, data_type: str, manifest: Dict[str, Any], **params) -> None:
+        """Record a manifest in Redis and S3."""
+        manifest_id = self._manifest_id(data_type, **params)
+        
+        try:
+            caches[self.MANIFEST_CACHE_ALIAS].set(
+                self._manifest_cache_key(manifest_id), manifest, None
+            )
+        except Exception as e:
+            logger.warning(f"Failed to write {data_type} manifest to Redis: {e}")
+        
+        try:
+            self.manifest_storage.save(
+                self._manifest_key(manifest_id),
+                ContentFile(json.dumps(manifest, sort_keys=True).encode('utf-8')),
+            )
+        except Exception as e:
+            logger.warning(f"Failed to write {data_type} manifest to S3: {e}")
+    
+    # Codecs and dictionaries
+    
+    def _dictionary_key(self, data_type: str, dict_id: int) -> str:
+        return f"{self.DICTIONARY_PREFIX}/{data_type}/{dict_id}.zdict"
+    
+    def _active_dictionary_cache_key(self, data_type: str) -> str:
+        return f"{self._cache_prefix}:dictionary:{data_type}"
+    
+    def get_active_dictionary_id(self, data_type: str) -> Optional[int]:
+        """Return the id of the zstd dictionary new responses are written with."""
+        cache_key = self._active_dictionary_cache_key(data_type)
+        try:
+            dict_id = caches[self.MANIFEST_CACHE_ALIAS].get(cache_key)
+            if dict_id is not None:
+                return dict_id or None
+        except Exception as e:
+            logger.warning(f"Failed to read {data_type} dictionary id from Redis: {e}")
+        
+        try:
+            active_key = f"{self.DICTIONARY_PREFIX}/{data_type}/active.json"
+            dict_id = 0
+            if self.manifest_storage.exists(active_key):
+                with self.manifest_storage.open(active_key, 'rb') as f:
+                    dict_id = json.loads(f.read())['dict_id']
+        except Exception as e:
+            logger.warning(f"Failed to read {data_type} dictionary id from S3: {e}")
+            return None
+        
+        # 0 records "no dictionary" so the S3 check is not repeated
+        try:
+            caches[self.MANIFEST_CACHE_ALIAS].set(cache_key, dict_id, None)
+        except Exception as e:
+            logger.debug(f"Failed to cache {data_type} dictionary id in Redis: {e}")
+        return dict_id or None
+    
+    def store_dictionary(self, data_type: str, dictionary: bytes) -> int:
+        """
+        Store a trained zstd dictionary and make it active for a data_type.
+        
+        Earlier dictionaries are kept, because existing objects reference them.
+        
+        Returns:
+            The dictionary id
+        """
+        dict_id = ZstdCodec(dictionary=dictionary).dict_id
+        self.manifest_storage.save(self._dictionary_key(data_type, dict_id), ContentFile(dictionary))
+        self.manifest_storage.save(
+            f"{self.DICTIONARY_PREFIX}/{data_type}/active.json",
+            ContentFile(json.dumps({'dict_id': dict_id}).encode('utf-8')),
+        )
+        self._dictionaries[(data_type, dict_id)] = dictionary
+        try:
+            caches[self.MANIFEST_CACHE_ALIAS].set(self._active_dictionary_cache_key(data_type), dict_id, None)
+        except Exception as e:
+            logger.warning(f"Failed to cache {data_type} dictionary id in Redis: {e}")
+        logger.info(f"Activated zstd dictionary {dict_id} for {data_type} ({len(dictionary)} bytes)")
+        return dict_id
+    
+    def _get_codec(self, name: str, data_type: str, dict_id: Optional[int] = None) -> ResponseCodec:
+        """Build (once per process) the codec for a name and dictionary."""
+        codec_key = (name, data_type if dict_id else None, dict_id)
+        if codec_key not in self._codecs:
+            dictionary = None
+            if dict_id:
+                dictionary_key = (data_type, dict_id)
+                if dictionary_key not in self._dictionaries:
+                    with self.manifest_storage.open(self._dictionary_key(data_type, dict_id), 'rb') as f:
+                        self._dictionaries[dictionary_key] = f.read()
+                dictionary = self._dictionaries[dictionary_key]
+            self._codecs[codec_key] = build_codec(name, dictionary)
+        return self._codecs[codec_key]
     
-    def _generate_key(self, data_type: str, **params) -> str:
+    def _read_payload(self, data_type: str, manifest: Dict[str, Any]) -> bytes:
+        """
+        Download and decode the JSON bytes a manifest points at.
+        
+        Raises:
+            ValueError: If the content does not match the manifest hash
+        """
+        codec = self._get_codec(manifest.get('codec', DEFAULT_CODEC), data_type, manifest.get('dict_id'))
+        
+        encoded = read_bytes(self.storage, manifest['key'])
+        
+        started = time.perf_counter()
+        json_bytes = codec.decode(encoded)
+        decode_ms = (time.perf_counter() - started) * 1000
+        
+        if manifest.get('sha256') and hashlib.sha256(json_bytes).hexdigest() != manifest['sha256']:
+            raise ValueError(f"Content hash mismatch for {manifest['key']}")
+        
+        logger.debug(
+            f"Decoded {data_type} data with {codec.name}: "
+            f"{len(encoded)} -> {len(json_bytes)} bytes in {decode_ms:.1f}ms"
+        )
+        return json_bytes
+    
+    def _generate_key(self, data_type: str, extension: str = '.json.gz', **params) -> str:
         """
         Generate S3 key based on data type and parameters.
         
@@ -82,7 +289,7 @@ class APIResponseS3Storage:
         
         filename_parts.append(timestamp)
         
-        filename = '_'.join(filename_parts) + '.json.gz'
+        filename = '_'.join(filename_parts) + extension
         
         return f"{data_type}/{date_path}/{filename}"
     
@@ -99,30 +306,55 @@ class APIResponseS3Storage:
             S3 key if successful, None if failed
         """
         try:
-            # Generate S3 key
-            s3_key = self._generate_key(data_type, **params)
+            # Canonical JSON, so identical payloads hash identically
+            json_bytes = json.dumps(
+                data, sort_keys=True, separators=(',', ':'), ensure_ascii=False
+            ).encode('utf-8')
+            content_hash = hashlib.sha256(json_bytes).hexdigest()
+            timestamp = timezone.now().isoformat()
             
-            # Prepare metadata
-            metadata = {
-                'data_type': data_type,
-                'timestamp': timezone.now().isoformat(),
-                'params': json.dumps(params, sort_keys=True),
-                'compressed': 'true',
-            }
+            # Unchanged payload: keep the existing object, only mark it fresh
+            manifest = self.get_manifest(data_type, **params)
+            if manifest and manifest.get('sha256') == content_hash:
+                self._write_manifest(data_type, {**manifest, 'stored_at': timestamp}, **params)
+                logger.info(f"Unchanged {data_type} data, refreshed manifest for {manifest['key']}")
+                return manifest['key']
             
-            # Compress and store data
-            json_data = json.dumps(data, separators=(',', ':'), ensure_ascii=False)
-            compressed_data = gzip.compress(json_data.encode('utf-8'))
+            codec_name = codec_name_for(data_type)
+            dict_id = self.get_active_dictionary_id(data_type) if codec_name == ZstdCodec.name else None
+            codec = self._get_codec(codec_name, data_type, dict_id)
             
-            # Create file-like object for S3 storage
-            content_file = ContentFile(compressed_data)
+            # Generate S3 key
+            s3_key = self._generate_key(data_type, extension=codec.extension, **params)
+            
+            # Compress and store data
+            started = time.perf_counter()
+            compressed_data = codec.encode(json_bytes)
+            encode_ms = (time.perf_counter() - started) * 1000
             
             # Store in S3
-            saved_path = self.storage.save(s3_key, content_file)
+            saved_path = self.storage.save(s3_key, ContentFile(compressed_data))
             
+            # Point the manifest at the new object
+            self._write_manifest(
+                data_type,
+                {
+                    'key': saved_path,
+                    'stored_at': timestamp,
+                    'size': len(json_bytes),
+                    'compressed_size': len(compressed_data),
+                    'sha256': content_hash,
+                    'codec': codec.name,
+                    'dict_id': codec.dict_id,
+                },
+                **params,
+            )
+            
+            ratio = len(json_bytes) / max(len(compressed_data), 1)
             logger.info(
                 f"Stored {data_type} data to S3: {saved_path} "
-                f"(original: {len(json_data)} bytes, compressed: {len(compressed_data)} bytes)"
+                f"(original: {len(json_bytes)} bytes, compressed: {len(compressed_data)} bytes, "
+                f"codec: {codec.name}, ratio: {ratio:.1f}x, encode: {encode_ms:.1f}ms)"
             )
             
             return saved_path
@@ -142,69 +374,37 @@ class APIResponseS3Storage:
         Returns:
             Decompressed JSON data if found, None otherwise
         """
-        try:
-            # Find the most recent file for this data type and parameters
-            s3_key = self._find_latest_key(data_type, **params)
-            
-            if not s3_key:
-                logger.debug(f"No cached {data_type} data found in S3")
-                return None
-            
-            # Retrieve and decompress data
-            with self.storage.open(s3_key, 'rb') as f:
-                compressed_data = f.read()
-            
-            json_data = gzip.decompress(compressed_data).decode('utf-8')
-            data = json.loads(json_data)
-            
-            logger.info(f"Retrieved {data_type} data from S3: {s3_key}")
-            return data
-            
-        except Exception as e:
-            logger.warning(f"Failed to retrieve {data_type} data from S3: {e}")
+        # Find the most recent file for this data type and parameters
+        manifest = self.get_manifest(data_type, **params)
+        
+        if not manifest:
+            logger.debug(f"No cached {data_type} data found in S3")
             return None
+        
+        return self.read_response(data_type, manifest)
     
-    def _find_latest_key(self, data_type: str, **params) -> Optional[str]:
+    def read_response(self, data_type: str, manifest: Dict[str, Any]) -> Optional[Any]:
         """
-        Find the most recent S3 key for the given data type and parameters.
+        Read the response a manifest points at.
         
-        This is a simplified implementation - in production you might want to
-        use S3 list operations with proper filtering and sorting.
+        Returns:
+            Decompressed JSON data, or None if it could not be read
         """
         try:
-            # List files in the data type directory
-            prefix = f"{data_type}/"
+            data = json.loads(self._read_payload(data_type, manifest))
             
-            # Use storage's listdir if available, otherwise try direct S3 listing
-            if hasattr(self.storage, 'listdir'):
-                dirs, files = self.storage.listdir(prefix)
-                
-                # Find files that match our parameters
-                matching_files = []
-                for file in files:
-                    if file.endswith('.json.gz'):
-                        # Simple matching - check if params are in filename
-                        matches = True
-                        if 'series_id' in params:
-                            if str(params['series_id']) not in file:
-                                matches = False
-                        if 'season_id' in params:
-                            if str(params['season_id']) not in file:
-                                matches = False
-                        
-                        if matches:
-                            matching_files.append(f"{prefix}{file}")
-                
-                # Return the most recent (alphabetically last due to timestamp format)
-                if matching_files:
-                    return sorted(matching_files)[-1]
-            
-            return None
+            logger.info(f"Retrieved {data_type} data from S3: {manifest['key']}")
+            return data
             
         except Exception as e:
-            logger.warning(f"Failed to find latest key for {data_type}: {e}")
+            logger.warning(f"Failed to retrieve {data_type} data from S3: {e}")
             return None
     
+    def _find_latest_key(self, data_type: str, **params) -> Optional[str]:
+        """Find the most recent S3 key for the given data type and parameters."""
+        manifest = self.get_manifest(data_type, **params)
+        return manifest['key'] if manifest else None
+    
     def get_response_age(self, data_type: str, **params) -> Optional[float]:
         """
         Get the age of the most recent cached response in seconds.
@@ -213,49 +413,67 @@ class APIResponseS3Storage:
             Age in seconds if found, None if no cached data exists
         """
         try:
-            s3_key = self._find_latest_key(data_type, **params)
-            if not s3_key:
+            manifest = self.get_manifest(data_type, **params)
+            if not manifest:
                 return None
             
-            # Extract timestamp from filename
-            # Format: data_type_[params]_YYYYMMDD_HHMMSS.json.gz
-            filename = s3_key.split('/')[-1]
-            timestamp_part = filename.split('_')[-1].replace('.json.gz', '')
-            
-            if len(timestamp_part) == 15:  # YYYYMMDD_HHMMSS format
-                stored_time = datetime.strptime(timestamp_part, '%Y%m%d_%H%M%S')
-                stored_time = timezone.make_aware(stored_time)
-                
-                age_seconds = (timezone.now() - stored_time).total_seconds()
-                return age_seconds
-            
-            return None
+            stored_time = datetime.fromisoformat(manifest['stored_at'])
+            return (timezone.now() - stored_time).total_seconds()
             
         except Exception as e:
             logger.warning(f"Failed to get response age for {data_type}: {e}")
             return None
     
+    # Maintenance
+    
+    def data_types(self) -> List[str]:
+        """List the data types that have stored responses."""
+        reserved = {self.MANIFEST_PREFIX, self.DICTIONARY_PREFIX, ARCHIVE_PREFIX}
+        dirs, _files = self.storage.listdir('')
+        return sorted(name for name in dirs if name not in reserved)
+    
+    def enforce_retention(self, data_type: Optional[str] = None, dry_run: bool = False) -> List[Dict[str, Any]]:
+        """
+        Apply the configured retention policy (see archive_retention).
+        
+        Args:
+            data_type: Data type to prune, or None for all
+            dry_run: Only report what would be compacted and deleted
+        
+        Returns:
+            Per data_type counts of scanned, kept, compacted and deleted objects
+        """
+        data_types = [data_type] if data_type else self.data_types()
+        return [enforce_retention(self, name, dry_run=dry_run) for name in data_types]
+    
     def clear_cache(self, data_type: Optional[str] = None, **params):
         """
         Clear cached responses from S3.
         
         Args:
             data_type: Specific data type to clear, or None for all
-            **params: Additional parameters to filter which files to clear
+            **params: Clear only the response stored with these parameters
         """
         try:
-            if data_type:
-                # Clear specific data type
-                prefix = f"{data_type}/"
-                logger.info(f"Clearing {data_type} cache from S3")
-            else:
-                # Clear all API responses
-                prefix = ""
-                logger.info("Clearing all API response cache from S3")
+            if data_type and params:
+                manifest_id = self._manifest_id(data_type, **params)
+                manifest = self.get_manifest(data_type, **params)
+                if manifest:
+                    delete_many(self.storage, [manifest['key']])
+                delete_many(self.manifest_storage, [self._manifest_key(manifest_id)])
+                caches[self.MANIFEST_CACHE_ALIAS].delete(self._manifest_cache_key(manifest_id))
+                logger.info(f"Cleared {data_type} cache for {params}")
+                return
             
-            # This is a simplified implementation
-            # In production, you'd want to implement proper S3 bulk deletion
-            logger.warning("Cache clearing not fully implemented - manual S3 cleanup required")
+            for name in ([data_type] if data_type else self.data_types()):
+                manifest_keys = list(walk(self.manifest_storage, f"{self.MANIFEST_PREFIX}/{name}"))
+                caches[self.MANIFEST_CACHE_ALIAS].delete_many([
+                    self._manifest_cache_key(self._manifest_id_of_key(key))
+                    for key in manifest_keys
+                ])
+                deleted = delete_many(self.storage, walk(self.storage, name))
+                delete_many(self.manifest_storage, manifest_keys)
+                logger.info(f"Cleared {name} cache: {deleted} objects, {len(manifest_keys)} manifests")
             
         except Exception as e:
             logger.error(f"Failed to clear cache: {e}")
@@ -0,0 +1,306 @@
+"""
+Batched schedule writes for ScheduleProcessor.
+
+In bulk mode ScheduleProcessor collects the Event, EventClass, CarRestriction,
+EventSession and TimeSlot rows of every week it processes, and ScheduleBatch
+writes them with one prefetch query plus bulk_create/bulk_update per model
+instead of one update_or_create/get_or_create per row.
+
+Rows are matched on the same natural keys as the per-row path, e.g. an Event
+on (series, season, round_number, sim_layout), so the stored data and the
+created/updated counts are the same. Those keys are not backed by unique
+constraints, which rules out INSERT ... ON CONFLICT for most of these models.
+"""
+
+import logging
+from collections import Counter
+from collections import defaultdict
+from datetime import datetime
+from typing import Any
+
+from django.db import models
+from django.utils import timezone
+from django.utils.text import slugify
+
+from simlane.core.signals import invalidate_event_caches
+from simlane.iracing.lookups import SimContentResolver
+from simlane.sim.models import CarRestriction
+from simlane.sim.models import Event
+from simlane.sim.models import EventClass
+from simlane.sim.models import EventSession
+from simlane.sim.models import Simulator
+from simlane.sim.models import TimeSlot
+
+logger = logging.getLogger(__name__)
+
+# (series_id, season_id, round_number, sim_layout_id)
+EventKey = tuple[Any, Any, int, Any]
+
+BATCH_SIZE = 500
+
+
+def event_key(event: Event) -> EventKey:
+    """Natural key the per-row path uses to find an existing Event."""
+    return (event.series_id, event.season_id, event.round_number, event.sim_layout_id)
+
+
+def _unique_slug(base: str, taken: set[str]) -> str:
+    """Mirror the models' save() slug de-duplication against known slugs."""
+    slug = base
+    counter = 1
+    while slug in taken:
+        slug = f"{base}-{counter}"
+        counter += 1
+    taken.add(slug)
+    return slug
+
+
+def bulk_write(
+    model: type[models.Model],
+    rows: list[tuple[models.Model, tuple[str, ...]]],
+    batch_size: int = BATCH_SIZE,
+) -> tuple[int, int]:
+    """
+    bulk_create rows without a pk and bulk_update the rest.
+
+    Args:
+        rows: (instance, fields to update) pairs; instances matched to an
+            existing row carry its pk in ``_existing_pk``
+
+    Returns:
+        Tuple of (created, updated)
+    """
+    to_create = []
+    to_update: dict[tuple[str, ...], list[models.Model]] = defaultdict(list)
+    has_updated_at = any(field.name == "updated_at" for field in model._meta.fields)
+    now = timezone.now()
+
+    for instance, fields in rows:
+        existing_pk = getattr(instance, "_existing_pk", None)
+        if existing_pk is None:
+            to_create.append(instance)
+            continue
+        instance.pk = existing_pk
+        # bulk_update skips pre_save, so auto_now is applied by hand
+        if has_updated_at:
+            instance.updated_at = now
+            fields = (*fields, "updated_at")
+        to_update[fields].append(instance)
+
+    model.objects.bulk_create(to_create, batch_size=batch_size)
+    for fields, instances in to_update.items():
+        model.objects.bulk_update(instances, fields, batch_size=batch_size)
+    return len(to_create), sum(len(instances) for instances in to_update.values())
+
+
+class ScheduleBatch:
+    """Pending schedule rows of one or more seasons, written by flush()."""
+
+    def __init__(self, simulator: Simulator, resolver: SimContentResolver | None = None):
+        self.simulator = simulator
+        self.resolver = resolver or SimContentResolver(simulator)
+        self.clear()
+
+    def clear(self) -> None:
+        """Drop every pending row."""
+        self.events: dict[EventKey, Event] = {}
+        self.event_fields: set[str] = set()
+        self.event_classes: dict[tuple[EventKey, str], int] = {}
+        self.car_restrictions: dict[tuple[EventKey, str], dict[str, Any]] = {}
+        self.event_sessions: dict[tuple[EventKey, str], dict[str, Any]] = {}
+        self.time_slots: dict[tuple[EventKey, datetime], dict[str, Any]] = {}
+        self.weather_events: list[EventKey] = []
+        # Rows added more than once; the per-row path counts each repeat as an update
+        self.repeats: Counter = Counter()
+        # (season id, round number) of weeks with a car or car class not found
+        self.incomplete_weeks: set[tuple[Any, Any]] = set()
+
+    def __len__(self) -> int:
+        return len(self.events)
+
+    # Collection
+
+    def add_event(self, lookup: dict[str, Any], defaults: dict[str, Any]) -> Event:
+        """Queue an Event upsert and return the instance child rows should reference."""
+        event = Event(**{**lookup, **defaults})
+        key = event_key(event)
+        pending = self.events.get(key)
+        if pending is not None:
+            for field, value in defaults.items():
+                setattr(pending, field, value)
+            self.repeats[("events", key)] += 1
+            return pending
+        self.events[key] = event
+        self.event_fields.update(defaults)
+        return event
+
+    def add_event_class(self, event: Event, car_class_id: int, class_order: int) -> None:
+        key = (event_key(event), str(car_class_id))
+        if key in self.event_classes:
+            self.repeats[("event_classes", key)] += 1
+        self.event_classes[key] = class_order
+
+    def add_car_restriction(self, event: Event, car_id: int, defaults: dict[str, Any]) -> None:
+        self.car_restrictions[(event_key(event), str(car_id))] = defaults
+
+    def add_event_session(self, event: Event, session_type: str, defaults: dict[str, Any]) -> None:
+        key = (event_key(event), session_type)
+        if key in self.event_sessions:
+            self.repeats[("event_sessions", key)] += 1
+        self.event_sessions[key] = defaults
+
+    def add_time_slot(self, event: Event, start_time: datetime, defaults: dict[str, Any]) -> None:
+        # get_or_create semantics: the first row for a start time wins
+        self.time_slots.setdefault((event_key(event), start_time), defaults)
+
+    def add_weather_event(self, event: Event) -> None:
+        self.weather_events.append(event_key(event))
+
+    # Writing
+
+    def flush(self) -> dict[str, Any]:
+        """
+        Write every pending row and reset the batch.
+
+        Returns:
+            Dict of created/updated counters, the ids of written events and of
+            events needing a weather sync, and the weeks not fully written
+        """
+        if not self.events:
+            return {"weather_event_ids": []}
+
+        results: dict[str, Any] = {}
+        results["events_created"], results["events_updated"] = self._flush_events()
+        results["event_classes_created"], results["event_classes_updated"] = self._flush_event_classes()
+        self._flush_car_restrictions()
+        results["event_sessions_created"], results["event_sessions_updated"] = self._flush_event_sessions()
+        results["time_slots_created"] = self._flush_time_slots()
+        results["weather_event_ids"] = [self.events[key].id for key in self.weather_events]
+        results["incomplete_weeks"] = self.incomplete_weeks
+        results["event_ids"] = [event.id for event in self.events.values()]
+
+        invalidate_event_caches(list(self.events.values()))
+        logger.info(
+            f"Flushed schedule batch: {results['events_created']} events created, "
+            f"{results['events_updated']} updated, {results['time_slots_created']} time slots created"
+        )
+
+        self.clear()
+        return results
+
+    def _flush_events(self) -> tuple[int, int]:
+        season_ids = {key[1] for key in self.events}
+        existing: dict[EventKey, Any] = {}
+        for pk, *key in Event.objects.filter(season_id__in=season_ids).values_list(
+            "pk", "series_id", "season_id", "round_number", "sim_layout_id"
+        ):
+            existing.setdefault(tuple(key), pk)
+
+        fields = tuple(sorted(self.event_fields))
+        rows = []
+        for key, event in self.events.items():
+            event._existing_pk = existing.get(key)
+            rows.append((event, fields))
+        created, updated = bulk_write(Event, rows)
+        return created, updated + self._repeat_count("events")
+
+    def _existing_children(
+        self, model: type[models.Model], key_field: str
+    ) -> tuple[dict[tuple[Any, Any], Any], dict[Any, set[str]]]:
+        """Existing (event_id, key_field) -> pk, and the slugs already used per event."""
+        event_ids = [event.pk for event in self.events.values()]
+        values = ["pk", "event_id", key_field]
+        has_slug = any(field.name == "slug" for field in model._meta.fields)
+        if has_slug:
+            values.append("slug")
+
+        existing: dict[tuple[Any, Any], Any] = {}
+        slugs: dict[Any, set[str]] = defaultdict(set)
+        for row in model.objects.filter(event_id__in=event_ids).values_list(*values):
+            existing.setdefault((row[1], row[2]), row[0])
+            if has_slug:
+                slugs[row[1]].add(row[3])
+        return existing, slugs
+
+    def _flush_event_classes(self) -> tuple[int, int]:
+        if not self.event_classes:
+            return 0, 0
+        existing, slugs = self._existing_children(EventClass, "car_class_id")
+
+        rows = []
+        repeats = 0
+        for (key, api_id), class_order in self.event_classes.items():
+            car_class = self.resolver.car_class(api_id)
+            if car_class is None:
+                logger.warning(f"Error processing Event Class: CarClass {api_id} not found")
+                self.incomplete_weeks.add((key[1], key[2]))
+                continue
+            event = self.events[key]
+            event_class = EventClass(
+                event=event, car_class=car_class, name=car_class.name, class_order=class_order
+            )
+            event_class._existing_pk = existing.get((event.pk, car_class.pk))
+            if event_class._existing_pk is None:
+                event_class.slug = _unique_slug(slugify(car_class.name), slugs[event.pk])
+            rows.append((event_class, ("name", "class_order")))
+            repeats += self.repeats[("event_classes", (key, api_id))]
+
+        created, updated = bulk_write(EventClass, rows)
+        return created, updated + repeats
+
+    def _flush_car_restrictions(self) -> None:
+        if not self.car_restrictions:
+            return
+        existing, _slugs = self._existing_children(CarRestriction, "sim_car_id")
+
+        rows = []
+        for (key, api_id), defaults in self.car_restrictions.items():
+            sim_car = self.resolver.car(api_id)
+            if sim_car is None:
+                logger.warning(f"SimCar not found for car_id {api_id}")
+                self.incomplete_weeks.add((key[1], key[2]))
+                continue
+            event = self.events[key]
+            restriction = CarRestriction(event=event, sim_car=sim_car, **defaults)
+            restriction._existing_pk = existing.get((event.pk, sim_car.pk))
+            rows.append((restriction, tuple(sorted(defaults))))
+        bulk_write(CarRestriction, rows)
+
+    def _flush_event_sessions(self) -> tuple[int, int]:
+        if not self.event_sessions:
+            return 0, 0
+        existing, _slugs = self._existing_children(EventSession, "session_type")
+
+        rows = []
+        for (key, session_type), defaults in self.event_sessions.items():
+            event = self.events[key]
+            session = EventSession(event=event, session_type=session_type, **defaults)
+            session._existing_pk = existing.get((event.pk, session_type))
+            rows.append((session, tuple(sorted(defaults))))
+        created, updated = bulk_write(EventSession, rows)
+        return created, updated + self._repeat_count("event_sessions")
+
+    def _flush_time_slots(self) -> int:
+        if not self.time_slots:
+            return 0
+        existing, slugs = self._existing_children(TimeSlot, "start_time")
+
+        to_create = []
+        for (key, start_time), defaults in self.time_slots.items():
+            event = self.events[key]
+            if (event.pk, start_time) in existing:
+                continue
+            base_slug = slugify(f"{event.name} {start_time.strftime('%Y-%m-%d-%H%M')}")
+            to_create.append(
+                TimeSlot(
+                    event=event,
+                    start_time=start_time,
+                    slug=_unique_slug(base_slug, slugs[event.pk]),
+                    **defaults,
+                )
+            )
+        TimeSlot.objects.bulk_create(to_create, batch_size=BATCH_SIZE)
+        return len(to_create)
+
+    def _repeat_count(self, model_name: str) -> int:
+        return sum(count for (name, _key), count in self.repeats.items() if name == model_name)
@@ -2,20 +2,26 @@
 Season synchronization and schedule processing for iRacing.
 
 This module handles the processing of season schedules from the iRacing API,
-creating events, managing recurrence patterns, and handling time slots.
+creating events and handling time slots. Repeating session patterns are
+expanded by simlane.iracing.recurrence.
 """
 
+import hashlib
+import json
 import logging
 from datetime import datetime
 from datetime import timedelta
 from typing import Any
+from typing import Iterable
 
 from django.utils import timezone
 from django.utils.text import slugify
 
+from simlane.iracing.lookups import SimContentResolver
+from simlane.iracing.recurrence import refresh_upcoming_sessions_on_commit
+from simlane.iracing.schedule_batch import ScheduleBatch
 from simlane.iracing.types import Schedule
 from simlane.iracing.types import SeriesSeasons
-from simlane.sim.models import CarClass
 from simlane.sim.models import CarRestriction
 from simlane.sim.models import Event
 from simlane.sim.models import EventClass
@@ -25,7 +31,6 @@ from simlane.sim.models import EventStatus
 from simlane.sim.models import Season
 from simlane.sim.models import Series
 from simlane.sim.models import SessionType
-from simlane.sim.models import SimCar
 from simlane.sim.models import SimLayout
 from simlane.sim.models import Simulator
 from simlane.sim.models import TimeSlot
@@ -33,11 +38,77 @@ from simlane.sim.models import TimeSlot
 logger = logging.getLogger(__name__)
 
 
+def _hash_json(data: Any) -> str:
+    """sha256 of a canonical JSON encoding."""
+    encoded = json.dumps(data, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+def week_event_status(schedule_data: Schedule, now: datetime | None = None) -> str:
+    """Status of a week's event (completed, ongoing or scheduled) at ``now``."""
+    now = now or timezone.now()
+    start_date = datetime.fromisoformat(schedule_data.get("start_date"))
+    week_end_time = datetime.fromisoformat(schedule_data.get("week_end_time"))
+
+    if week_end_time < now:
+        return EventStatus.COMPLETED
+    if (
+        timezone.make_aware(start_date, timezone.get_default_timezone()) < now
+        and week_end_time > now
+    ):
+        return EventStatus.ONGOING
+    return EventStatus.SCHEDULED
+
+
+def schedule_fingerprints(
+    season_data: SeriesSeasons, now: datetime | None = None
+) -> tuple[str, dict[str, str]]:
+    """
+    Hash a season's schedule payload for change detection.
+
+    Each week's hash covers the week's payload, the season-level fields every
+    week's event is built from, and the event status the week would get now,
+    so a week is re-processed when its data changes or its event moves from
+    scheduled to ongoing to completed.
+
+    Returns:
+        Tuple of (season hash, {race_week_num: week hash})
+    """
+    season_fields_hash = _hash_json({k: v for k, v in season_data.items() if k != "schedules"})
+    week_hashes = {}
+    for schedule_data in season_data.get("schedules") or []:
+        try:
+            status = week_event_status(schedule_data, now)
+        except (TypeError, ValueError):
+            status = ""
+        week_hashes[str(schedule_data.get("race_week_num"))] = _hash_json(
+            [season_fields_hash, status, schedule_data]
+        )
+    return _hash_json([season_fields_hash, week_hashes]), week_hashes
+
+
 class ScheduleProcessor:
-    """Processes iRacing season schedules and creates events."""
+    """
+    Processes iRacing season schedules and creates events.
 
-    def __init__(self, simulator: Simulator):
+    By default every row is written as it is processed. With ``bulk=True`` the
+    rows are collected in a ScheduleBatch and written by flush() with a few
+    bulk queries per model; process_season_schedule() flushes automatically,
+    and collect_season_schedule() lets callers gather many seasons first.
+
+    Layouts, cars and car classes are resolved through a SimContentResolver,
+    which can be shared with other syncs of the same run.
+    """
+
+    def __init__(
+        self,
+        simulator: Simulator,
+        bulk: bool = False,
+        resolver: SimContentResolver | None = None,
+    ):
         self.simulator = simulator
+        self.resolver = resolver or SimContentResolver(simulator)
+        self.batch = ScheduleBatch(simulator, self.resolver) if bulk else None
         self.events_created = 0
         self.events_updated = 0
         self.time_slots_created = 0
@@ -48,33 +119,82 @@ class ScheduleProcessor:
         self.event_classes_created = 0
         self.event_classes_updated = 0
         self.weather_tasks = []
+        # (season pk, race_week_num) of weeks that raised while processing or
+        # were not fully written (missing layout, car or car class)
+        self.failed_weeks: set[tuple[Any, Any]] = set()
 
     def process_season_schedule(
         self,
         season: Season,
         season_data: SeriesSeasons,
+        schedules: Iterable[Schedule] | None = None,
     ) -> tuple[int, int, int, list[str], int, int, int, int, list[str]]:
         """
         Process a season's schedule data and create events.
 
         Args:
             season: Season instance
-            schedules: List of schedule data from API
+            season_data: Season data from API
+            schedules: Weekly schedules to process instead of
+                season_data["schedules"], e.g. weeks streamed by
+                IRacingAPIService.iter_series_season_schedule()
 
         Returns:
             Tuple of (events_created, events_updated, time_slots_created, errors)
         """
-        logger.info(
-            f"Processing schedule for season {season.name} with {len(season_data['schedules'])} weeks"
-        )
+        self.collect_season_schedule(season, season_data, schedules)
+        return self.flush()
+
+    def collect_season_schedule(
+        self,
+        season: Season,
+        season_data: SeriesSeasons,
+        schedules: Iterable[Schedule] | None = None,
+    ) -> None:
+        """
+        Process a season's weeks, queueing their rows in bulk mode.
 
-        for schedule_data in season_data["schedules"]:
+        ``schedules`` may be a stream; each week is processed as it is read.
+        In bulk mode nothing is written until flush().
+        """
+        if schedules is None:
+            schedules = season_data["schedules"]
+            logger.info(
+                f"Processing schedule for season {season.name} with {len(schedules)} weeks"
+            )
+        else:
+            logger.info(f"Processing streamed schedule for season {season.name}")
+
+        for schedule_data in schedules:
             try:
                 self._process_week_schedule(season, schedule_data, season_data)
             except Exception as e:
                 error_msg = f"Error processing week {schedule_data.get('race_week_num', 'unknown')}: {e}"
                 logger.exception(error_msg)
                 self.errors.append(error_msg)
+                self.failed_weeks.add((season.pk, schedule_data.get("race_week_num")))
+
+    def flush(self) -> tuple[int, int, int, list[str], int, int, int, int, list[str]]:
+        """
+        Write the rows collected in bulk mode and return the running totals.
+
+        Returns:
+            Same tuple as process_season_schedule()
+        """
+        if self.batch is not None:
+            results = self.batch.flush()
+            self.events_created += results.get("events_created", 0)
+            self.events_updated += results.get("events_updated", 0)
+            self.event_classes_created += results.get("event_classes_created", 0)
+            self.event_classes_updated += results.get("event_classes_updated", 0)
+            self.event_sessions_created += results.get("event_sessions_created", 0)
+            self.event_sessions_updated += results.get("event_sessions_updated", 0)
+            self.time_slots_created += results.get("time_slots_created", 0)
+            self.weather_tasks.extend(results["weather_event_ids"])
+            self.failed_weeks.update(results.get("incomplete_weeks", ()))
+            # Bulk writes skip the TimeSlot and Event signals that refresh these
+            if results.get("event_ids"):
+                refresh_upcoming_sessions_on_commit(results["event_ids"])
 
         return (
             self.events_created,
@@ -111,11 +231,13 @@ class ScheduleProcessor:
 
         if not track_id or round_num is None:
             logger.warning(f"Missing track_id ({track_id}) or round_num ({round_num})")
+            self.failed_weeks.add((season.pk, round_num))
             return
 
         # Find track layout
         sim_layout = self._find_sim_layout(track_id, track_name, layout_name)
         if not sim_layout:
+            self.failed_weeks.add((season.pk, round_num))
             return
 
         # Get team event data
@@ -183,7 +305,11 @@ class ScheduleProcessor:
 
         # Process weather
         if event.weather_forecast_url:
-            self.weather_tasks.append(event.id)
+            if self.batch is not None:
+                # The event id is only final once the batch is flushed
+                self.batch.add_weather_event(event)
+            else:
+                self.weather_tasks.append(event.id)
 
     def _process_event_sessions(
         self, event: Event, schedule_data: Schedule, simulated_start_time: str
@@ -208,38 +334,30 @@ class ScheduleProcessor:
 
         # Process event sessions
         if warmup_length:
-            _event_session, created = EventSession.objects.update_or_create(
-                event=event,
-                session_type=SessionType.WARMUP,
-                defaults={
+            self._upsert_event_session(
+                event,
+                SessionType.WARMUP,
+                {
                     "duration": warmup_length,
                     "in_game_time": in_game_time,
                 },
             )
-            if created:
-                self.event_sessions_created += 1
-            else:
-                self.event_sessions_updated += 1
 
         elif practice_length:
-            _event_session, created = EventSession.objects.update_or_create(
-                event=event,
-                session_type=SessionType.PRACTICE,
-                defaults={
+            self._upsert_event_session(
+                event,
+                SessionType.PRACTICE,
+                {
                     "duration": practice_length,
                     "in_game_time": in_game_time,
                 },
             )
-            if created:
-                self.event_sessions_created += 1
-            else:
-                self.event_sessions_updated += 1
 
         if qual_attached:
-            _event_session, created = EventSession.objects.update_or_create(
-                event=event,
-                session_type=SessionType.QUALIFYING,
-                defaults={
+            self._upsert_event_session(
+                event,
+                SessionType.QUALIFYING,
+                {
                     "duration": qualify_length,
                     "laps": qualify_laps,
                     "in_game_time": in_game_time
@@ -248,16 +366,12 @@ class ScheduleProcessor:
                     ),
                 },
             )
-            if created:
-                self.event_sessions_created += 1
-            else:
-                self.event_sessions_updated += 1
 
         if race_time_limit or race_lap_limit:
-            _event_session, created = EventSession.objects.update_or_create(
-                event=event,
-                session_type=SessionType.RACE,
-                defaults={
+            self._upsert_event_session(
+                event,
+                SessionType.RACE,
+                {
                     "duration": race_time_limit,
                     "laps": race_lap_limit,
                     "in_game_time": in_game_time
@@ -268,30 +382,35 @@ class ScheduleProcessor:
                     ),
                 },
             )
-            if created:
-                self.event_sessions_created += 1
-            else:
-                self.event_sessions_updated += 1
+
+    def _upsert_event_session(
+        self, event: Event, session_type: str, defaults: dict[str, Any]
+    ) -> None:
+        """Create or update one session of an event."""
+        if self.batch is not None:
+            self.batch.add_event_session(event, session_type, defaults)
+            return
+
+        _event_session, created = EventSession.objects.update_or_create(
+            event=event,
+            session_type=session_type,
+            defaults=defaults,
+        )
+        if created:
+            self.event_sessions_created += 1
+        else:
+            self.event_sessions_updated += 1
 
     def _find_sim_layout(
         self, track_id: int, track_name: str, layout_name: str
     ) -> SimLayout | None:
         """Find SimLayout by track_id or fallback to name matching."""
-        try:
-            # Try by layout_code first
-            return SimLayout.objects.get(layout_code=track_id)
-        except SimLayout.DoesNotExist:
-            # Fallback to name matching
-            try:
-                return SimLayout.objects.get(
-                    sim_track__name__icontains=track_name,
-                    name__icontains=layout_name,
-                )
-            except SimLayout.DoesNotExist:
-                logger.warning(
-                    f"Track layout not found for {track_name} ({track_id}) layout {layout_name}",
-                )
-                return None
+        sim_layout = self.resolver.layout(track_id, track_name, layout_name)
+        if sim_layout is None:
+            logger.warning(
+                f"Track layout not found for {track_name} ({track_id}) layout {layout_name}",
+            )
+        return sim_layout
 
     def _create_or_update_event(
         self,
@@ -330,22 +449,10 @@ class ScheduleProcessor:
 
         simulated_start_time = weather_data.get("simulated_start_time", None)
 
-        start_date = datetime.fromisoformat(schedule_data.get("start_date"))
-        week_end_time = datetime.fromisoformat(schedule_data.get("week_end_time"))
-
         time_pattern = schedule_data.get("race_time_descriptors", [])
 
         # event status if it's in the past, is ongoing, or is in the future
-        if week_end_time < timezone.now():
-            event_status = EventStatus.COMPLETED
-        elif (
-            timezone.make_aware(start_date, timezone.get_default_timezone())
-            < timezone.now()
-            and week_end_time > timezone.now()
-        ):
-            event_status = EventStatus.ONGOING
-        else:
-            event_status = EventStatus.SCHEDULED
+        event_status = week_event_status(schedule_data)
 
         # Prepare event data
         event_defaults = {
@@ -382,7 +489,6 @@ class ScheduleProcessor:
             "max_drivers_per_entry": max_team_drivers,
             "fair_share_pct": fair_share_pct,
             "allowed_car_class_ids": car_class_ids,
-            "fixed_setup": fixed_setup,
             "multiclass": multiclass,
             "created_at": schedule_data.get("created_at", timezone.now()),
             "required_compounds": required_compounds,
@@ -399,6 +505,9 @@ class ScheduleProcessor:
             "sim_layout": sim_layout,
         }
 
+        if self.batch is not None:
+            return self.batch.add_event(lookup_criteria, event_defaults)
+
         # Create or update event
         event, created = Event.objects.get_or_create(
             **lookup_criteria,
@@ -446,48 +555,50 @@ class ScheduleProcessor:
                 if not car_id:
                     continue
 
+                restriction_defaults = {
+                    "max_dry_tire_sets": restriction_data.get("max_dry_tire_sets", 0),
+                    "max_pct_fuel_fill": restriction_data.get("max_pct_fuel_fill", 100),
+                    "power_adjust_pct": restriction_data.get("power_adjust_pct", 0.0),
+                    "weight_penalty_kg": restriction_data.get("weight_penalty_kg", 0),
+                    "is_fixed_setup": fixed_setup or False,
+                }
+
+                if self.batch is not None:
+                    self.batch.add_car_restriction(event, car_id, restriction_defaults)
+                    continue
+
                 # Find the SimCar
-                try:
-                    sim_car = SimCar.objects.get(
-                        sim_api_id=car_id,
-                        simulator=self.simulator,
-                    )
-                except SimCar.DoesNotExist:
+                sim_car = self.resolver.car(car_id)
+                if sim_car is None:
                     logger.warning(f"SimCar not found for car_id {car_id}")
+                    self.failed_weeks.add((event.season_id, event.round_number))
                     continue
 
                 # Create or update car restriction
                 CarRestriction.objects.update_or_create(
                     event=event,
                     sim_car=sim_car,
-                    defaults={
-                        "max_dry_tire_sets": restriction_data.get(
-                            "max_dry_tire_sets", 0
-                        ),
-                        "max_pct_fuel_fill": restriction_data.get(
-                            "max_pct_fuel_fill", 100
-                        ),
-                        "power_adjust_pct": restriction_data.get(
-                            "power_adjust_pct", 0.0
-                        ),
-                        "weight_penalty_kg": restriction_data.get(
-                            "weight_penalty_kg", 0
-                        ),
-                        "is_fixed_setup": fixed_setup or False,
-                    },
+                    defaults=restriction_defaults,
                 )
 
             except Exception as e:
                 logger.warning(f"Error processing car restriction: {e}")
+                self.failed_weeks.add((event.season_id, event.round_number))
 
     def _process_car_classes(self, event: Event, car_class_ids: list[int]) -> None:
         """Process car classes for an event."""
         for car_class_id in car_class_ids:
             try:
                 car_class_order = car_class_ids.index(car_class_id) + 1
-                car_class = CarClass.objects.get(
-                    sim_api_id=car_class_id, simulator=self.simulator
-                )
+                if self.batch is not None:
+                    self.batch.add_event_class(event, car_class_id, car_class_order)
+                    continue
+
+                car_class = self.resolver.car_class(car_class_id)
+                if car_class is None:
+                    logger.warning(f"Error processing Event Class: CarClass {car_class_id} not found")
+                    self.failed_weeks.add((event.season_id, event.round_number))
+                    continue
 
                 # Create event class
                 event_class, created = EventClass.objects.update_or_create(
@@ -505,6 +616,7 @@ class ScheduleProcessor:
 
             except Exception as e:
                 logger.warning(f"Error processing Event Class: {e}")
+                self.failed_weeks.add((event.season_id, event.round_number))
 
     def _process_time_patterns(
         self, event: Event, race_time_descriptors: list[dict[str, Any]]
@@ -572,6 +684,19 @@ class ScheduleProcessor:
                 )
                 registration_ends = session_time
 
+                if self.batch is not None:
+                    self.batch.add_time_slot(
+                        event,
+                        session_time,
+                        {
+                            "end_time": end_time,
+                            "registration_open": registration_open,
+                            "registration_ends": registration_ends,
+                            "is_predicted": True,
+                        },
+                    )
+                    continue
+
                 # Create the time slot
                 time_slot, created = TimeSlot.objects.get_or_create(
                     event=event,
@@ -601,161 +726,6 @@ class ScheduleProcessor:
                 continue
 
 
-class RecurrenceHandler:
-    """Handles dynamic generation of time slots from recurrence patterns."""
-
-    @staticmethod
-    def generate_time_slots_for_period(
-        event: Event,
-        start_date: datetime,
-        end_date: datetime,
-    ) -> list[dict[str, Any]]:
-        """
-        Generate time slots for an event within a specific period.
-
-        This is used for displaying upcoming races without creating
-        database records for every possible time slot.
-
-        Args:
-            event: Event with time_pattern data
-            start_date: Start of period to generate slots for
-            end_date: End of period to generate slots for
-
-        Returns:
-            List of time slot data dictionaries
-        """
-        if not event.time_pattern or "race_time_descriptors" not in event.time_pattern:
-            return []
-
-        time_slots = []
-        race_time_descriptors = event.time_pattern["race_time_descriptors"]
-
-        for descriptor in race_time_descriptors:
-            if not descriptor.get("repeating", False):
-                continue
-
-            slots = RecurrenceHandler._generate_repeating_slots(
-                descriptor,
-                start_date,
-                end_date,
-                event,
-            )
-            time_slots.extend(slots)
-
-        return sorted(time_slots, key=lambda x: x["start_time"])
-
-    @staticmethod
-    def _generate_repeating_slots(
-        descriptor: dict[str, Any],
-        start_date: datetime,
-        end_date: datetime,
-        event: Event,
-    ) -> list[dict[str, Any]]:
-        """Generate time slots for a repeating pattern."""
-        time_slots = []
-
-        # Parse pattern data
-        first_session_time = descriptor.get("first_session_time", "00:00:00")
-        repeat_minutes = descriptor.get("repeat_minutes", 60)
-        session_minutes = descriptor.get("session_minutes", 60)
-        day_offsets = descriptor.get("day_offset", [0, 1, 2, 3, 4, 5, 6])
-        pattern_start_date = descriptor.get("start_date")
-
-        if not pattern_start_date:
-            logger.warning("No start_date in repeating pattern descriptor")
-            return time_slots
-
-        # Parse start date and first session time
-        try:
-            if isinstance(pattern_start_date, str):
-                # Handle both date strings and datetime strings
-                if "T" in pattern_start_date or "Z" in pattern_start_date:
-                    base_date = datetime.fromisoformat(
-                        pattern_start_date.replace("Z", "+00:00")
-                    )
-                else:
-                    # Just a date string like "2025-02-11"
-                    base_date = datetime.strptime(pattern_start_date, "%Y-%m-%d")
-            else:
-                base_date = pattern_start_date
-
-            # Make sure base_date is timezone aware
-            if base_date.tzinfo is None:
-                base_date = timezone.make_aware(base_date)
-
-            # Parse first session time
-            time_parts = first_session_time.split(":")
-            session_hour = int(time_parts[0])
-            session_minute = int(time_parts[1])
-            session_second = int(time_parts[2]) if len(time_parts) > 2 else 0
-
-        except (ValueError, AttributeError) as e:
-            logger.warning(f"Error parsing time pattern: {e}")
-            return time_slots
-
-        # Generate slots
-        current_date = max(start_date.date(), base_date.date())
-        end_date_only = end_date.date()
-
-        logger.debug(
-            f"Generating repeating slots from {current_date} to {end_date_only} for event {event.name}"
-        )
-        logger.debug(
-            f"Pattern: every {repeat_minutes}min starting at {first_session_time} on days {day_offsets}"
-        )
-
-        while current_date <= end_date_only:
-            # Calculate day offset from the pattern start date
-            # iRacing weeks typically start on Tuesday, but we use the pattern's start_date as reference
-            days_from_start = (current_date - base_date.date()).days
-            day_offset = days_from_start % 7
-
-            if day_offset in day_offsets:
-                # Generate slots for this day
-                current_datetime = timezone.make_aware(
-                    datetime.combine(current_date, datetime.min.time()),
-                )
-
-                # Start from first session time
-                slot_time = current_datetime.replace(
-                    hour=session_hour,
-                    minute=session_minute,
-                    second=session_second,
-                    microsecond=0,
-                )
-
-                # Generate slots throughout the day (24 hour period from first session)
-                day_end = slot_time + timedelta(hours=24)
-
-                slot_count = 0
-                while slot_time < day_end and slot_time.date() == current_date:
-                    if start_date <= slot_time <= end_date:
-                        end_time = slot_time + timedelta(minutes=session_minutes)
-
-                        time_slots.append(
-                            {
-                                "start_time": slot_time,
-                                "end_time": end_time,
-                                "registration_open": slot_time - timedelta(hours=1),
-                                "registration_ends": slot_time,
-                                "is_predicted": True,
-                                "event": event,
-                            }
-                        )
-                        slot_count += 1
-
-                    slot_time += timedelta(minutes=repeat_minutes)
-
-                logger.debug(
-                    f"Generated {slot_count} slots for {current_date} (day_offset {day_offset})"
-                )
-
-            current_date += timedelta(days=1)
-
-        logger.debug(f"Total slots generated: {len(time_slots)}")
-        return time_slots
-
-
 def create_season_from_schedule_data(
     series: Series,
     season_data: dict[str, Any] | Any,
@@ -7,11 +7,12 @@ various types of data from the iRacing platform.
 """
 
 import logging
+from collections.abc import Iterator
 from typing import Any
 
 from django.conf import settings
 
-from simlane.iracing.types import Car, CarAsset, CarClass, MemberInfo, PastSeasonsResponse, SeasonScheduleResponse, Series, SeriesAsset, SeriesSeasons, Season, Track, TrackAsset
+from simlane.iracing.types import Car, CarAsset, CarClass, MemberInfo, PastSeasonsResponse, Schedule, SeasonScheduleResponse, Series, SeriesAsset, SeriesSeasons, Season, Track, TrackAsset
 
 from .client import IRacingClient, IRacingAPIError
 
@@ -508,6 +509,54 @@ class IRacingAPIService:
             msg = f"Failed to fetch season schedule for season {season_id}"
             raise IRacingServiceError(msg) from e
 
+    def iter_series_season_schedule(self, season_id: int) -> Iterator[Schedule]:
+        """
+        Stream the weekly schedules of a season one week at a time.
+
+        Unlike get_series_season_schedule() the payload is never held in
+        memory as a whole; responses are not cached.
+
+        Args:
+            season_id: iRacing season ID
+
+        Yields:
+            Weekly schedule dicts
+        """
+        if not self.client:
+            msg = "iRacing API client not available"
+            raise IRacingServiceError(msg)
+
+        try:
+            yield from self.client.iter_series_season_schedule(season_id)
+        except Exception as e:
+            logger.exception("Error streaming season schedule for season %s", season_id)
+            msg = f"Failed to stream season schedule for season {season_id}"
+            raise IRacingServiceError(msg) from e
+
+    def iter_subsession_results(
+        self, subsession_id: int, simsession_number: int = 0
+    ) -> Iterator[dict[str, Any]]:
+        """
+        Stream the result rows of one session of a subsession.
+
+        Args:
+            subsession_id: iRacing subsession ID
+            simsession_number: Session of the subsession, 0 for the race
+
+        Yields:
+            Result dicts; team events yield one per team with driver_results
+        """
+        if not self.client:
+            msg = "iRacing API client not available"
+            raise IRacingServiceError(msg)
+
+        try:
+            yield from self.client.iter_subsession_results(subsession_id, simsession_number)
+        except Exception as e:
+            logger.exception("Error streaming results for subsession %s", subsession_id)
+            msg = f"Failed to stream results for subsession {subsession_id}"
+            raise IRacingServiceError(msg) from e
+
     def get_series_assets(self) -> dict[str, SeriesAsset]:
         """
         Retrieve logo/asset metadata for every series.
@@ -0,0 +1,180 @@
+"""
+Incremental JSON parsing for large iRacing payloads.
+
+Linked (S3) payloads and ``chunk_info`` chunk files can hold thousands of
+records. Parsing them with ``response.json()`` builds the whole document in
+memory at once; the reader here decodes one array element at a time from a
+byte stream so records can be processed and released as they arrive.
+"""
+
+import codecs
+import json
+from collections.abc import Iterable, Iterator
+from typing import Any, Optional
+
+_WHITESPACE = " \t\n\r"
+
+
+class JSONStreamError(ValueError):
+    """Raised when a streamed payload is not valid JSON."""
+
+
+class JSONItemStream:
+    """
+    Iterate the elements of a JSON array read from a stream of byte chunks.
+
+    With ``item_key`` the top-level value is expected to be an object and the
+    elements of its ``item_key`` array are yielded; the object's other keys
+    are collected in ``fields`` as they are passed. A top-level array yields
+    its elements, and any other top-level value is yielded as a single item.
+
+    Usage::
+
+        stream = JSONItemStream(response.iter_content(65536), item_key="schedules")
+        for week in stream:
+            ...
+        season_id = stream.fields.get("season_id")
+    """
+
+    def __init__(self, chunks: Iterable[bytes], item_key: Optional[str] = None):
+        self._chunks = iter(chunks)
+        self._decoder = codecs.getincrementaldecoder("utf-8")()
+        self._json = json.JSONDecoder()
+        self._buffer = ""
+        self._pos = 0
+        self._eof = False
+        self.item_key = item_key
+        self.fields: dict[str, Any] = {}
+
+    # Buffer handling
+
+    def _refill(self, min_size: int = 1) -> bool:
+        """
+        Append chunks until at least ``min_size`` new characters were read.
+
+        Returns False once the stream is exhausted.
+        """
+        if self._eof:
+            return False
+        # Drop the consumed prefix so the buffer only holds unparsed text
+        if self._pos:
+            self._buffer = self._buffer[self._pos :]
+            self._pos = 0
+        parts = []
+        read = 0
+        for chunk in self._chunks:
+            text = self._decoder.decode(chunk)
+            parts.append(text)
+            read += len(text)
+            if read >= min_size:
+                self._buffer += "".join(parts)
+                return True
+        parts.append(self._decoder.decode(b"", final=True))
+        self._buffer += "".join(parts)
+        self._eof = True
+        return bool(read)
+
+    def _peek(self) -> str:
+        """Return the next non-whitespace character without consuming it."""
+        while True:
+            while self._pos < len(self._buffer) and self._buffer[self._pos] in _WHITESPACE:
+                self._pos += 1
+            if self._pos < len(self._buffer):
+                return self._buffer[self._pos]
+            if not self._refill():
+                return ""
+
+    def _expect(self, char: str) -> None:
+        found = self._peek()
+        if found != char:
+            raise JSONStreamError(f"Expected {char!r} but found {found or 'end of stream'!r}")
+        self._pos += 1
+
+    def _decode_value(self) -> Any:
+        """Decode one complete JSON value, reading more chunks as needed."""
+        self._peek()
+        while True:
+            try:
+                value, end = self._json.raw_decode(self._buffer, self._pos)
+            except json.JSONDecodeError as e:
+                # Double the pending text so a large value is re-parsed O(log n) times
+                if self._refill(len(self._buffer) - self._pos):
+                    continue
+                raise JSONStreamError(f"Invalid JSON in stream: {e}") from e
+            # A number ending at the buffer edge may continue in the next chunk
+            if end == len(self._buffer) and not self._eof and self._refill():
+                continue
+            self._pos = end
+            return value
+
+    # Iteration
+
+    def _iter_array(self) -> Iterator[Any]:
+        self._expect("[")
+        if self._peek() == "]":
+            self._pos += 1
+            return
+        while True:
+            yield self._decode_value()
+            separator = self._peek()
+            self._pos += 1
+            if separator == "]":
+                return
+            if separator != ",":
+                raise JSONStreamError(f"Expected ',' or ']' but found {separator or 'end of stream'!r}")
+
+    def _iter_object_items(self) -> Iterator[Any]:
+        self._expect("{")
+        if self._peek() == "}":
+            self._pos += 1
+            return
+        while True:
+            key = self._decode_value()
+            self._expect(":")
+            if key == self.item_key and self._peek() == "[":
+                yield from self._iter_array()
+            else:
+                self.fields[key] = self._decode_value()
+            separator = self._peek()
+            self._pos += 1
+            if separator == "}":
+                return
+            if separator != ",":
+                raise JSONStreamError(f"Expected ',' or '}}' but found {separator or 'end of stream'!r}")
+
+    def __iter__(self) -> Iterator[Any]:
+        first = self._peek()
+        if first == "[":
+            yield from self._iter_array()
+        elif first == "{" and self.item_key:
+            yield from self._iter_object_items()
+        elif first:
+            yield self._decode_value()
+
+
+def iter_json_items(chunks: Iterable[bytes], item_key: Optional[str] = None) -> Iterator[Any]:
+    """Yield the elements of a streamed JSON array (see JSONItemStream)."""
+    return iter(JSONItemStream(chunks, item_key=item_key))
+
+
+def find_chunk_info(data: Any) -> Optional[dict]:
+    """
+    Return the ``chunk_info`` block of an iRacing response, if any.
+
+    Results endpoints nest it under ``data`` (``{"type": ..., "data": {"chunk_info": ...}}``),
+    linked payloads carry it at the top level.
+    """
+    if not isinstance(data, dict):
+        return None
+    if isinstance(data.get("chunk_info"), dict):
+        return data["chunk_info"]
+    nested = data.get("data")
+    if isinstance(nested, dict) and isinstance(nested.get("chunk_info"), dict):
+        return nested["chunk_info"]
+    return None
+
+
+def chunk_urls(chunk_info: dict) -> list[str]:
+    """Build the download URLs of every chunk file listed in a chunk_info block."""
+    base_url = chunk_info.get("base_download_url", "")
+    return [f"{base_url}{name}" for name in chunk_info.get("chunk_file_names") or []]
@@ -7,33 +7,65 @@ This module contains the new modular approach to syncing iRacing data:
 - Separate recurrence handling
 """
 
+import functools
+import itertools
 import logging
+import math
+import time
+from collections.abc import Iterable
+from collections.abc import Iterator
 from typing import Any
 
 import requests
+from celery import chord
+from celery import group
 from celery import shared_task
 from celery.signals import task_postrun
+from django.conf import settings
 from django.contrib.contenttypes.models import ContentType
 from django.core.files.base import ContentFile
 from django.db import connections
 from django.db import transaction
+from django.db.models import Q
 from django.utils import timezone
 
 from simlane.core.models import MediaGallery
 from simlane.iracing.api_cache_service import cached_iracing_service
-from simlane.iracing.auto_create import create_weather_forecasts_from_iracing_data
+from simlane.iracing.backfill import backfill_concurrency
+from simlane.iracing.backfill import backfill_progress
+from simlane.iracing.backfill import backfill_stalled
+from simlane.iracing.backfill import claim_pending
+from simlane.iracing.backfill import finish_run
+from simlane.iracing.backfill import record_outcome
+from simlane.iracing.backfill import register_past_seasons
+from simlane.iracing.backfill import start_run
+from simlane.iracing.lookups import SimContentResolver
+from simlane.iracing.models import PastSeasonSyncCheckpoint
+from simlane.iracing.rate_limiter import IRacingRateLimitError
+from simlane.iracing.rate_limiter import get_retry_after
+from simlane.iracing.rate_limiter import rate_limit_mode
+from simlane.iracing.recurrence import refresh_upcoming_sessions
+from simlane.iracing.s3_cache_storage import api_response_storage
 from simlane.iracing.season_sync import ScheduleProcessor
 from simlane.iracing.season_sync import create_season_from_schedule_data
+from simlane.iracing.season_sync import schedule_fingerprints
 from simlane.iracing.services import IRacingServiceError
 from simlane.iracing.services import iracing_service
 from simlane.iracing.types import PastSeasonsResponse
+from simlane.iracing.types import Schedule
 from simlane.iracing.types import Series as SeriesType
+from simlane.iracing.types import SeriesSeasons as SeriesSeasonsType
+from simlane.iracing.weather_sync import WeatherSync
 from simlane.sim.models import CarClass
-from simlane.sim.models import Event
+from simlane.sim.models import EventResult
 from simlane.sim.models import Season
 from simlane.sim.models import Series
 from simlane.sim.models import SimLayout
+from simlane.sim.models import SimProfile
+from simlane.sim.models import SimProfileCarOwnership
+from simlane.sim.models import SimProfileTrackOwnership
 from simlane.sim.models import Simulator
+from simlane.sim.utils.result_processing import ingest_team_results
 
 logger = logging.getLogger(__name__)
 
@@ -45,6 +77,34 @@ def _ensure_service_available() -> None:
         raise IRacingServiceError(msg)
 
 
+def _raise_if_rate_limited(exc: Exception) -> None:
+    """Re-raise rate limiter errors that a service layer wrapped."""
+    retry_after = get_retry_after(exc)
+    if retry_after is not None:
+        raise IRacingRateLimitError(retry_after) from exc
+
+
+def _reschedule_when_rate_limited(task_func):
+    """
+    Run a bound task with a non-blocking iRacing rate limiter.
+
+    When the shared request budget is exhausted the task is retried with a
+    countdown instead of sleeping while it holds a worker slot.
+    """
+
+    @functools.wraps(task_func)
+    def wrapper(self, *args, **kwargs):
+        try:
+            with rate_limit_mode(blocking=False):
+                return task_func(self, *args, **kwargs)
+        except IRacingRateLimitError as e:
+            countdown = math.ceil(e.retry_after)
+            logger.info(f"{self.name} rate limited, retrying in {countdown}s")
+            raise self.retry(exc=e, countdown=countdown)
+
+    return wrapper
+
+
 def _get_or_create_iracing_series(
     series_id: int,
     series_info: SeriesType,
@@ -99,6 +159,7 @@ def _get_or_create_iracing_series(
 
 
 @shared_task(bind=True, max_retries=3, default_retry_delay=60)
+@_reschedule_when_rate_limited
 def sync_series_task(self, refresh: bool = False) -> dict[str, Any]:
     """
     Sync series data only (no seasons or events).
@@ -194,18 +255,137 @@ def sync_series_task(self, refresh: bool = False) -> dict[str, Any]:
         return result
 
     except Exception as e:
+        _raise_if_rate_limited(e)
         logger.exception("Failed to sync series")
         return {"success": False, "error": str(e)}
 
 
+def _sync_season_schedule(
+    season_id: int,
+    schedule_data: dict[str, Any],
+    schedules: Iterable[Schedule] | None = None,
+) -> dict[str, Any]:
+    """
+    Create or update a season and its events from its schedule payload.
+
+    With ``schedules`` the weeks are read from that iterable instead of
+    schedule_data["schedules"], and the season's dates are set again from
+    schedule_data["schedules"] once it has been consumed.
+
+    Returns:
+        Dict containing sync results
+    """
+    # Get iRacing simulator
+    try:
+        iracing_simulator = Simulator.objects.get(name="iRacing")
+    except Simulator.DoesNotExist:
+        error_msg = "iRacing simulator not found in database"
+        logger.error(error_msg)
+        return {"success": False, "error": error_msg}
+
+    # Get series information
+    series_id = schedule_data.get("series_id")
+    if not series_id:
+        error_msg = f"No series_id in schedule data for season {season_id}"
+        logger.error(error_msg)
+        return {"success": False, "error": error_msg}
+
+    try:
+        series = Series.objects.get(external_series_id=series_id)
+    except Series.DoesNotExist:
+        error_msg = f"Series {series_id} not found. Run series sync first."
+        logger.error(error_msg)
+        return {"success": False, "error": error_msg}
+
+    # Create or update season
+    season = create_season_from_schedule_data(series, schedule_data)
+
+    # Process schedule
+    processor = ScheduleProcessor(iracing_simulator, bulk=True)
+    (
+        events_created,
+        events_updated,
+        time_slots_created,
+        weather_event_ids,
+        _event_sessions_created,
+        _event_sessions_updated,
+        _event_classes_created,
+        _event_classes_updated,
+        errors,
+    ) = processor.process_season_schedule(season, schedule_data, schedules)
+    if schedules is not None:
+        season = create_season_from_schedule_data(series, schedule_data)
+
+    result = {
+        "success": True,
+        "season_id": season_id,
+        "season_name": season.name,
+        "events_created": events_created,
+        "events_updated": events_updated,
+        "time_slots_created": time_slots_created,
+        "weather_sync_queued": _queue_weather_sync(weather_event_ids),
+        "errors": errors,
+        "completed_at": timezone.now().isoformat(),
+    }
+
+    logger.info(
+        f"Season {season_id} sync completed: {events_created} events created, "
+        f"{events_updated} events updated, {time_slots_created} time slots created, "
+        f"{len(errors)} errors",
+    )
+
+    return result
+
+
+def _sync_streamed_season_schedule(season_id: int) -> dict[str, Any]:
+    """
+    Create or update a season and its events from its streamed schedule.
+
+    The schedule is parsed and processed one week at a time instead of being
+    fetched whole. Weeks carry the season's series and name; only their
+    dates are kept, to set the season's date range at the end.
+
+    Returns:
+        Dict containing sync results
+    """
+    weeks = iracing_service.iter_series_season_schedule(season_id)
+    first_week = next(weeks, None)
+    if first_week is None:
+        error_msg = f"No schedule data found for season {season_id}"
+        logger.warning(error_msg)
+        return {"success": False, "error": error_msg}
+
+    week_dates: list[dict[str, Any]] = []
+    schedule_data = {
+        "season_id": season_id,
+        "series_id": first_week.get("series_id"),
+        "season_name": first_week.get("season_name", ""),
+        "schedules": week_dates,
+    }
+
+    def dated_weeks() -> Iterator[Schedule]:
+        for week in itertools.chain([first_week], weeks):
+            week_dates.append(
+                {"start_date": week.get("start_date"), "week_end_time": week.get("week_end_time")}
+            )
+            yield week
+
+    return _sync_season_schedule(season_id, schedule_data, dated_weeks())
+
+
 @shared_task(bind=True, max_retries=3, default_retry_delay=60)
-def sync_season_task(self, season_id: int, refresh: bool = False) -> dict[str, Any]:
+@_reschedule_when_rate_limited
+def sync_season_task(
+    self, season_id: int, refresh: bool = False, stream: bool = False
+) -> dict[str, Any]:
     """
     Sync a specific season by ID and process its schedule.
 
     Args:
         season_id: iRacing season ID
         refresh: Whether to bypass cache
+        stream: Stream the schedule from the API one week at a time, in
+            bounded memory; the response cache is neither read nor written
 
     Returns:
         Dict containing sync results
@@ -216,13 +396,8 @@ def sync_season_task(self, season_id: int, refresh: bool = False) -> dict[str, A
         logger.info(f"Syncing season {season_id}")
         _ensure_service_available()
 
-        # Get iRacing simulator
-        try:
-            iracing_simulator = Simulator.objects.get(name="iRacing")
-        except Simulator.DoesNotExist:
-            error_msg = "iRacing simulator not found in database"
-            logger.error(error_msg)
-            return {"success": False, "error": error_msg}
+        if stream:
+            return _sync_streamed_season_schedule(season_id)
 
         # Fetch season schedule (with S3 caching)
         schedule_data = cached_iracing_service.get_series_season_schedule(
@@ -234,69 +409,270 @@ def sync_season_task(self, season_id: int, refresh: bool = False) -> dict[str, A
             logger.warning(error_msg)
             return {"success": False, "error": error_msg}
 
-        # Get series information
-        series_id = schedule_data.get("series_id")
-        if not series_id:
-            error_msg = f"No series_id in schedule data for season {season_id}"
-            logger.error(error_msg)
-            return {"success": False, "error": error_msg}
+        return _sync_season_schedule(season_id, schedule_data)
 
-        try:
-            series = Series.objects.get(external_series_id=series_id)
-        except Series.DoesNotExist:
-            error_msg = f"Series {series_id} not found. Run series sync first."
-            logger.error(error_msg)
-            return {"success": False, "error": error_msg}
+    except Exception as e:
+        _raise_if_rate_limited(e)
+        logger.exception(f"Failed to sync season {season_id}")
+        return {"success": False, "error": str(e)}
 
-        # Create or update season
-        season = create_season_from_schedule_data(series, schedule_data)
 
-        # Process schedule
-        processor = ScheduleProcessor(iracing_simulator)
-        events_created, events_updated, time_slots_created, errors = (
-            processor.process_season_schedule(
-                season,
-                schedule_data,
-            )
-        )
+def _store_schedule_hashes(
+    synced_hashes: list[tuple[Season, str, dict[str, str]]],
+    failed_weeks: set[tuple[Any, Any]],
+) -> None:
+    """
+    Record the schedule hashes of synced seasons.
 
-        result = {
-            "success": True,
-            "season_id": season_id,
-            "season_name": season.name,
-            "events_created": events_created,
-            "events_updated": events_updated,
-            "time_slots_created": time_slots_created,
-            "errors": errors,
-            "completed_at": timezone.now().isoformat(),
+    Weeks that failed or were not fully written (see
+    ScheduleProcessor.failed_weeks) keep no hash, and their season no season
+    hash, so the next sync retries them.
+    """
+    seasons = []
+    for season, season_hash, week_hashes in synced_hashes:
+        failed = {str(week) for season_pk, week in failed_weeks if season_pk == season.pk}
+        season.schedule_hash = "" if failed else season_hash
+        season.schedule_week_hashes = {
+            week: week_hash for week, week_hash in week_hashes.items() if week not in failed
         }
+        seasons.append(season)
+    Season.objects.bulk_update(seasons, ["schedule_hash", "schedule_week_hashes"], batch_size=500)
 
-        logger.info(
-            f"Season {season_id} sync completed: {events_created} events created, "
-            f"{events_updated} events updated, {time_slots_created} time slots created, "
-            f"{len(errors)} errors",
-        )
 
-        return result
+def sync_current_seasons_data(
+    seasons_data: list[SeriesSeasonsType],
+    iracing_simulator: Simulator,
+    bulk: bool = True,
+    force: bool = False,
+) -> dict[str, Any]:
+    """
+    Create or update seasons and their events from a series_seasons payload.
+
+    Shared by sync_current_seasons_task and the offline sync benchmark. Weather
+    syncs are not queued here; the ids of events that need one are returned in
+    ``weather_event_ids``.
 
+    Seasons whose schedule hash matches the one stored at their last sync are
+    skipped, and only the changed weeks of the others are processed (see
+    schedule_fingerprints).
+
+    Args:
+        seasons_data: Payload from the series_seasons API (include_series=True)
+        iracing_simulator: iRacing simulator instance
+        bulk: Collect the events of every season and write them with bulk
+            queries in one transaction, instead of row by row per season
+        force: Process every season and week, even if unchanged
+
+    Returns:
+        Dict of aggregated counters, errors and weather_event_ids
+    """
+    seasons_processed = 0
+    seasons_skipped = 0
+    weeks_skipped = 0
+    all_errors: list[str] = []
+    resolver = SimContentResolver(iracing_simulator)
+    processor = ScheduleProcessor(iracing_simulator, bulk=bulk, resolver=resolver)
+
+    # Hashes stored at the last sync, by external season id
+    stored_hashes: dict[int, tuple[str, dict[str, str]]] = {}
+    if not force:
+        stored_hashes = {
+            season_id: (schedule_hash, week_hashes or {})
+            for season_id, schedule_hash, week_hashes in Season.objects.filter(
+                external_season_id__in=[data.get("season_id") for data in seasons_data]
+            ).values_list("external_season_id", "schedule_hash", "schedule_week_hashes")
+        }
+    # (season, season hash, week hashes) to store once the events are written
+    synced_hashes: list[tuple[Season, str, dict[str, str]]] = []
+
+    for season_data in seasons_data:
+        season_hash, week_hashes = schedule_fingerprints(season_data)
+        stored_hash, stored_week_hashes = stored_hashes.get(season_data.get("season_id"), ("", {}))
+        if stored_hash == season_hash:
+            seasons_skipped += 1
+            continue
+
+        with transaction.atomic():
+            try:
+                series_id = season_data.get("series_id")
+                if not series_id:
+                    continue
+
+                # Ensure series exists
+                try:
+                    series = Series.objects.get(external_series_id=series_id)
+                except Series.DoesNotExist:
+                    logger.warning(
+                        f"Series {series_id} not found. Skipping seasons."
+                    )
+                    continue
+
+                # Create season if it doesn't exist
+                season_id = season_data.get("season_id")
+                if not season_id:
+                    continue
+
+                schedules = season_data.get("schedules", [])
+
+                season, created = Season.objects.update_or_create(
+                    external_season_id=season_id,
+                    series=series,
+                    defaults={
+                        "name": season_data.get("season_name", ""),
+                        "start_date": season_data.get("start_date"),
+                        "end_date": schedules[-1].get("week_end_time")
+                        if schedules
+                        else None,
+                        "active": season_data.get("active", False),
+                        "complete": season_data.get("complete", False),
+                        "series": series,
+                        "schedule_description": season_data.get(
+                            "schedule_description", ""
+                        ),
+                        "season_settings": {
+                            "week_count": season_data.get("week_count", 1),
+                            "season_year": season_data.get("season_year"),
+                            "season_quarter": season_data.get("season_quarter"),
+                            "season_short_name": season_data.get(
+                                "season_short_name"
+                            ),
+                            "start_on_qual_tire": season_data.get(
+                                "start_on_qual_tire", False
+                            ),
+                            "start_zone": season_data.get("start_zone", False),
+                            "short_parade_lap": season_data.get(
+                                "short_parade_lap", False
+                            ),
+                        },
+                    },
+                )
+
+                changed_schedules = [
+                    schedule_data
+                    for schedule_data in schedules
+                    if stored_week_hashes.get(str(schedule_data.get("race_week_num")))
+                    != week_hashes.get(str(schedule_data.get("race_week_num")))
+                ]
+                weeks_skipped += len(schedules) - len(changed_schedules)
+
+                processor.collect_season_schedule(season, season_data, changed_schedules)
+                synced_hashes.append((season, season_hash, week_hashes))
+
+                seasons_processed += 1
+
+            except Exception as e:
+                error_msg = f"Error processing series current season for {season_data.get('series_id', 'unknown')}: {e}"
+                logger.exception(error_msg)
+                all_errors.append(error_msg)
+
+    # In bulk mode nothing has been written to the events tables yet
+    try:
+        with transaction.atomic():
+            processor.flush()
+            _store_schedule_hashes(synced_hashes, processor.failed_weeks)
     except Exception as e:
-        logger.exception(f"Failed to sync season {season_id}")
-        return {"success": False, "error": str(e)}
+        error_msg = f"Error writing current season events: {e}"
+        logger.exception(error_msg)
+        all_errors.append(error_msg)
+        if processor.batch is not None:
+            processor.batch.clear()
+
+    return {
+        "seasons_processed": seasons_processed,
+        "seasons_skipped": seasons_skipped,
+        "weeks_skipped": weeks_skipped,
+        "events_created": processor.events_created,
+        "events_updated": processor.events_updated,
+        "time_slots_created": processor.time_slots_created,
+        "event_sessions_created": processor.event_sessions_created,
+        "event_sessions_updated": processor.event_sessions_updated,
+        "event_classes_created": processor.event_classes_created,
+        "event_classes_updated": processor.event_classes_updated,
+        "errors": all_errors + processor.errors,
+        "weather_event_ids": processor.weather_tasks,
+        "lookup_stats": resolver.stats(),
+    }
+
+
+def _split_season_ids(season_ids: list[int], batches: int) -> list[list[int]]:
+    """Deal season ids round-robin into at most ``batches`` non-empty batches."""
+    batches = max(1, min(batches, len(season_ids)))
+    return [season_ids[i::batches] for i in range(batches) if season_ids[i::batches]]
+
+
+def _merge_current_seasons_results(results: list[dict[str, Any]]) -> dict[str, Any]:
+    """
+    Add up the results of several current season sync batches.
+
+    Integer counters are summed, lists concatenated and lookup_stats merged.
+    A failed batch contributes its error to ``errors``.
+    """
+    totals: dict[str, Any] = {"errors": [], "lookup_stats": {}}
+    for result in results:
+        if not result.get("success", True):
+            totals["errors"].append(result.get("error", "Unknown error"))
+            continue
+        for key, value in result.items():
+            if key == "lookup_stats":
+                for kind, counters in value.items():
+                    merged = totals["lookup_stats"].setdefault(kind, {})
+                    for outcome, count in counters.items():
+                        merged[outcome] = merged.get(outcome, 0) + count
+            elif isinstance(value, list):
+                totals.setdefault(key, []).extend(value)
+            elif isinstance(value, int) and not isinstance(value, bool):
+                totals[key] = totals.get(key, 0) + value
+    return totals
+
+
+def _sync_current_seasons_batch(
+    seasons_data: list[SeriesSeasonsType],
+    iracing_simulator: Simulator,
+    force: bool = False,
+) -> dict[str, Any]:
+    """Sync some seasons and queue weather syncs for the events that need one."""
+    totals = sync_current_seasons_data(seasons_data, iracing_simulator, force=force)
+
+    weather_sync_queued = _queue_weather_sync(totals.pop("weather_event_ids"))
+
+    return {"success": True, **totals, "weather_sync_queued": weather_sync_queued}
+
+
+def _log_current_seasons_result(result: dict[str, Any]) -> None:
+    logger.info(
+        f"Current seasons sync completed: {result.get('seasons_processed', 0)} seasons processed, "
+        f"{result.get('seasons_skipped', 0)} unchanged seasons and {result.get('weeks_skipped', 0)} unchanged weeks skipped, "
+        f"{result.get('events_created', 0)} events created, {result.get('events_updated', 0)} events updated, "
+        f"{result.get('time_slots_created', 0)} time slots created, {result.get('weather_sync_queued', 0)} weather sync queued, "
+        f"{result.get('event_sessions_created', 0)} event sessions created, {result.get('event_sessions_updated', 0)} event sessions updated, "
+        f"{result.get('event_classes_created', 0)} event classes created, {result.get('event_classes_updated', 0)} event classes updated, "
+        f"{len(result['errors'])} errors",
+    )
 
 
 @shared_task(bind=True, max_retries=3, default_retry_delay=60)
-def sync_current_seasons_task(self, refresh: bool = False) -> dict[str, Any]:
+@_reschedule_when_rate_limited
+def sync_current_seasons_task(
+    self, refresh: bool = False, force: bool = False, fanout: int | None = None
+) -> dict[str, Any]:
     """
     Sync current and future seasons for all series.
 
     This uses the series_seasons API which returns current season data
     and schedules for all series in a single call.
 
+    The seasons are split into ``fanout`` batches that run in parallel as a
+    group of sync_current_seasons_batch_task subtasks;
+    aggregate_current_seasons_results_task adds up their results once all
+    have finished. With a fanout of 1 every season is synced in this task.
+
     Args:
         refresh: Whether to bypass cache
+        force: Re-process seasons and weeks whose schedule is unchanged
+        fanout: Number of parallel batches (defaults to IRACING_SEASON_SYNC_FANOUT)
 
     Returns:
-        Dict containing sync results
+        Dict containing sync results, or the queued batches when fanned out
     """
     try:
         logger.info("Syncing current and future seasons for all series")
@@ -315,274 +691,336 @@ def sync_current_seasons_task(self, refresh: bool = False) -> dict[str, Any]:
             include_series=True, refresh=refresh
         )
 
-        total_seasons_processed = 0
-        total_events_created = 0
-        total_events_updated = 0
-        total_time_slots_created = 0
-        all_errors = []
-        total_weather_sync_queued = 0
-        total_event_sessions_created = 0
-        total_event_sessions_updated = 0
-        total_event_classes_created = 0
-        total_event_classes_updated = 0
-        weather_tasks = []
-        for season_data in seasons_data:
-            with transaction.atomic():
-                try:
-                    series_id = season_data.get("series_id")
-                    if not series_id:
-                        continue
-
-                    # Ensure series exists
-                    try:
-                        series = Series.objects.get(external_series_id=series_id)
-                    except Series.DoesNotExist:
-                        logger.warning(
-                            f"Series {series_id} not found. Skipping seasons."
-                        )
-                        continue
-
-                    # Create season if it doesn't exist
-                    season_id = season_data.get("season_id")
-                    if not season_id:
-                        continue
-
-                    schedules = season_data.get("schedules", [])
-
-                    season, created = Season.objects.update_or_create(
-                        external_season_id=season_id,
-                        series=series,
-                        defaults={
-                            "name": season_data.get("season_name", ""),
-                            "start_date": season_data.get("start_date"),
-                            "end_date": schedules[-1].get("week_end_time")
-                            if schedules
-                            else None,
-                            "active": season_data.get("active", False),
-                            "complete": season_data.get("complete", False),
-                            "series": series,
-                            "schedule_description": season_data.get(
-                                "schedule_description", ""
-                            ),
-                            "season_settings": {
-                                "week_count": season_data.get("week_count", 1),
-                                "season_year": season_data.get("season_year"),
-                                "season_quarter": season_data.get("season_quarter"),
-                                "season_short_name": season_data.get(
-                                    "season_short_name"
-                                ),
-                                "start_on_qual_tire": season_data.get(
-                                    "start_on_qual_tire", False
-                                ),
-                                "start_zone": season_data.get("start_zone", False),
-                                "short_parade_lap": season_data.get(
-                                    "short_parade_lap", False
-                                ),
-                            },
-                        },
-                    )
-
-                    processor = ScheduleProcessor(iracing_simulator)
-                    (
-                        events_created,
-                        events_updated,
-                        time_slots_created,
-                        weather_tasks,
-                        event_sessions_created,
-                        event_sessions_updated,
-                        event_classes_created,
-                        event_classes_updated,
-                        errors,
-                    ) = processor.process_season_schedule(season, season_data)
-
-                    for event_id in weather_tasks:
-                        sync_iracing_weather_task.delay(event_id=event_id) # type: ignore
-                        weather_sync_queued += 1
-
-                    total_events_created += events_created
-                    total_events_updated += events_updated
-                    total_time_slots_created += time_slots_created
-                    # total_weather_sync_queued += weather_sync_queued
-                    total_event_sessions_created += event_sessions_created
-                    total_event_sessions_updated += event_sessions_updated
-                    total_event_classes_created += event_classes_created
-                    total_event_classes_updated += event_classes_updated
-
-                    all_errors.extend(errors)
-
-                    total_seasons_processed += 1
+        if fanout is None:
+            fanout = settings.IRACING_SEASON_SYNC_FANOUT
+        season_ids = [data["season_id"] for data in seasons_data if data.get("season_id")]
 
-                except Exception as e:
-                    error_msg = f"Error processing series current season for {season_data.get('series_id', 'unknown')}: {e}"
-                    logger.exception(error_msg)
-                    all_errors.append(error_msg)
+        if fanout <= 1 or len(season_ids) <= 1:
+            result = {
+                **_sync_current_seasons_batch(seasons_data, iracing_simulator, force=force),
+                "completed_at": timezone.now().isoformat(),
+            }
+            _log_current_seasons_result(result)
+            return result
+
+        # The subtasks read the payload cached above, so only ids are queued
+        batches = _split_season_ids(season_ids, fanout)
+        header = group(
+            sync_current_seasons_batch_task.s(batch, force=force)  # type: ignore
+            for batch in batches
+        )
+        aggregate = chord(header)(aggregate_current_seasons_results_task.s())  # type: ignore
 
-        result = {
+        logger.info(
+            f"Queued {len(season_ids)} current seasons in {len(batches)} batches, "
+            f"results will be aggregated by task {aggregate.id}"
+        )
+        return {
             "success": True,
-            "seasons_processed": total_seasons_processed,
-            "events_created": total_events_created,
-            "events_updated": total_events_updated,
-            "time_slots_created": total_time_slots_created,
-            "weather_sync_queued": total_weather_sync_queued,
-            "event_sessions_created": total_event_sessions_created,
-            "event_sessions_updated": total_event_sessions_updated,
-            "event_classes_created": total_event_classes_created,
-            "event_classes_updated": total_event_classes_updated,
-            "event_classes_created": total_event_classes_created,
-            "errors": all_errors,
-            "completed_at": timezone.now().isoformat(),
+            "seasons_queued": len(season_ids),
+            "batches_queued": len(batches),
+            "aggregate_task_id": aggregate.id,
         }
 
-        logger.info(
-            f"Current seasons sync completed: {total_seasons_processed} seasons processed, "
-            f"{total_events_created} events created, {total_events_updated} events updated, "
-            f"{total_time_slots_created} time slots created, {total_weather_sync_queued} weather sync queued, "
-            f"{total_event_sessions_created} event sessions created, {total_event_sessions_updated} event sessions updated, "
-            f"{total_event_classes_created} event classes created, {total_event_classes_updated} event classes updated, "
-            f"{len(all_errors)} errors",
-        )
+    except Exception as e:
+        _raise_if_rate_limited(e)
+        logger.exception("Failed to sync current seasons")
+        return {"success": False, "error": str(e)}
 
-        return result
+
+@shared_task(bind=True, max_retries=3, default_retry_delay=60)
+@_reschedule_when_rate_limited
+def sync_current_seasons_batch_task(
+    self, season_ids: list[int], force: bool = False
+) -> dict[str, Any]:
+    """
+    Sync a batch of current seasons from the cached series_seasons payload.
+
+    Every write is an upsert keyed on the season and event natural keys, so
+    a batch can be retried or re-run on its own.
+
+    Args:
+        season_ids: External ids of the seasons to sync
+        force: Re-process seasons and weeks whose schedule is unchanged
+
+    Returns:
+        Dict containing the batch's sync results
+    """
+    try:
+        logger.info(f"Syncing batch of {len(season_ids)} current seasons")
+        _ensure_service_available()
+
+        iracing_simulator = Simulator.objects.get(name="iRacing")
+
+        wanted = set(season_ids)
+        seasons_data = [
+            data
+            for data in cached_iracing_service.get_series_seasons(include_series=True)
+            if data.get("season_id") in wanted
+        ]
+        missing = len(wanted) - len(seasons_data)
+        if missing:
+            logger.warning(f"{missing} seasons of the batch are no longer in the series_seasons payload")
+
+        return _sync_current_seasons_batch(seasons_data, iracing_simulator, force=force)
 
     except Exception as e:
-        logger.exception("Failed to sync current seasons")
+        _raise_if_rate_limited(e)
+        logger.exception(f"Failed to sync current seasons batch {season_ids}")
         return {"success": False, "error": str(e)}
 
 
+@shared_task(bind=True)
+def aggregate_current_seasons_results_task(
+    self, results: list[dict[str, Any]]
+) -> dict[str, Any]:
+    """Chord callback adding up the results of the current season batches."""
+    result = {
+        "success": True,
+        **_merge_current_seasons_results(results),
+        "batches": len(results),
+        "completed_at": timezone.now().isoformat(),
+    }
+    _log_current_seasons_result(result)
+    return result
+
+
 @shared_task(bind=True, max_retries=3, default_retry_delay=60)
-def sync_past_seasons_for_series_task(
+@_reschedule_when_rate_limited
+def backfill_past_seasons_task(
     self,
-    series_id: int,
     refresh: bool = False,
+    series_ids: list[int] | None = None,
+    discover: bool = True,
 ) -> dict[str, Any]:
     """
-    Sync past seasons for a specific series.
+    Sync past seasons from the checkpoint table, one bounded batch at a time.
+
+    With ``discover`` the past seasons of the series are first registered in
+    the checkpoint table and a new run is started. The task then claims up to
+    backfill_concurrency() pending seasons, syncs them as a group of
+    backfill_past_season_task subtasks and re-queues itself, without
+    ``discover``, as the group's chord callback, until no season is pending.
+    The schedules of a claimed batch are fetched in one concurrent pass
+    before the group is queued, so the subtasks read them from the cache.
+    The continuation also runs as the callback's error handler, so a failed
+    subtask does not stop the backfill.
+
+    Starting the task again resumes an interrupted backfill: finished seasons
+    are kept and seasons left running are claimed again once stale.
+    resume_past_season_backfill_task does so periodically when a backfill
+    stalled, e.g. because its continuation was lost with a worker.
 
     Args:
-        series_id: iRacing series ID
-        refresh: Whether to bypass cache
+        refresh: Bypass the cache and re-check finished seasons, re-processing
+            those whose schedule payload changed
+        series_ids: iRacing series IDs to discover and claim seasons of
+            (defaults to all active iRacing series, and claims of any series)
+        discover: Register past seasons and start a new run before claiming
 
     Returns:
-        Dict containing sync results
+        Dict containing the discovery counts and the backfill progress
     """
     try:
-        logger.info(f"Syncing past seasons for series {series_id}")
-        _ensure_service_available()
+        result: dict[str, Any] = {"success": True}
+
+        if discover:
+            _ensure_service_available()
+            discover_ids = series_ids
+            if discover_ids is None:
+                discover_ids = list(
+                    Series.objects.filter(simulator__name="iRacing", is_active=True)
+                    .exclude(external_series_id=None)
+                    .values_list("external_series_id", flat=True)
+                )
+            logger.info(f"Discovering past seasons of {len(discover_ids)} series")
 
-        # Ensure series exists
+            registered = requeued = 0
+            for series_id in discover_ids:
+                past_seasons_data: PastSeasonsResponse = (
+                    cached_iracing_service.get_series_past_seasons(series_id, refresh=refresh)
+                )
+                past_seasons = (past_seasons_data or {}).get("series", {}).get("seasons") or []
+                counts = register_past_seasons(series_id, past_seasons, recheck=refresh)
+                registered += counts["registered"]
+                requeued += counts["requeued"]
+
+            start_run()
+            result.update(
+                {"series_discovered": len(discover_ids), "seasons_registered": registered, "seasons_requeued": requeued}
+            )
+
+        season_ids = claim_pending(backfill_concurrency(), series_ids=series_ids)
+        if not season_ids:
+            finish_run()
+            progress = backfill_progress()
+            logger.info(
+                f"Past season backfill complete: {progress['done']} of {progress['total']} seasons done, "
+                f"{progress['failed']} failed"
+            )
+            return {**result, **progress, "complete": True}
+
+        # Pull the claimed schedules in one concurrent pass; the subtasks then
+        # read them from the response cache
         try:
-            series = Series.objects.get(external_series_id=series_id)
-        except Series.DoesNotExist:
-            error_msg = f"Series {series_id} not found. Run series sync first."
-            logger.error(error_msg)
-            return {"success": False, "error": error_msg}
+            prefetched = cached_iracing_service.get_series_season_schedules(season_ids, refresh=refresh)
+        except Exception as e:
+            logger.warning(f"Prefetching schedules of seasons {season_ids} failed, fetching them one by one: {e}")
+            prefetched = {}
 
-        # Get past seasons for this series (with S3 caching)
-        past_seasons_data: PastSeasonsResponse = (
-            cached_iracing_service.get_series_past_seasons(series_id, refresh=refresh)
+        header = group(
+            backfill_past_season_task.s(  # type: ignore
+                season_id, refresh=refresh and not prefetched.get(season_id)
+            )
+            for season_id in season_ids
+        )
+        callback = backfill_past_seasons_task.si(  # type: ignore
+            refresh=refresh, series_ids=series_ids, discover=False
         )
+        # A failed subtask fails the chord; carry on with the next batch anyway
+        callback.link_error(
+            backfill_past_seasons_task.si(  # type: ignore
+                refresh=refresh, series_ids=series_ids, discover=False
+            )
+        )
+        continuation = chord(header)(callback)
 
-        if not past_seasons_data:
-            logger.info(f"No past seasons found for series {series_id}")
-            return {
-                "success": True,
-                "series_id": series_id,
-                "seasons_queued": 0,
-                "message": "No past seasons found",
-            }
+        progress = backfill_progress()
+        logger.info(
+            f"Past season backfill {progress['percent_done']}% done, syncing {len(season_ids)} seasons, "
+            f"{progress['pending']} pending, ETA {progress['eta_seconds']}s"
+        )
+        return {
+            **result,
+            **progress,
+            "complete": False,
+            "seasons_claimed": len(season_ids),
+            "schedules_prefetched": sum(1 for schedule in prefetched.values() if schedule),
+            "next_task_id": continuation.id,
+        }
 
-        # Queue individual season sync tasks
-        seasons_queued = 0
-        series = past_seasons_data["series"]
-        past_seasons = series["seasons"]
-
-        for season_info in past_seasons:
-            season_id = season_info.get("season_id")
-            if season_id:
-                # Queue the season sync task - using apply_async to avoid naming conflicts
-                from celery import current_app
-
-                current_app.send_task(
-                    "simlane.iracing.tasks.sync_season_task",
-                    args=[season_id],
-                    kwargs={"refresh": refresh},
-                )
-                seasons_queued += 1
-                logger.debug(f"Queued season {season_id} for sync")
+    except Exception as e:
+        _raise_if_rate_limited(e)
+        logger.exception("Failed to run past season backfill")
+        return {"success": False, "error": str(e)}
 
-        result = {
-            "success": True,
-            "series_id": series_id,
-            "series_name": series["series_name"],
-            "seasons_queued": seasons_queued,
-            "completed_at": timezone.now().isoformat(),
-        }
 
-        logger.info(
-            f"Past seasons sync for series {series_id} completed: "
-            f"{seasons_queued} seasons queued for processing",
-        )
+@shared_task(bind=True)
+def resume_past_season_backfill_task(self) -> dict[str, Any]:
+    """
+    Restart a stalled past season backfill.
 
-        return result
+    Runs periodically. A backfill with seasons left to claim but none in
+    flight has lost its continuation, so it is started again without
+    discovery.
+    """
+    try:
+        if not backfill_stalled():
+            return {"success": True, "resumed": False}
+
+        task = backfill_past_seasons_task.delay(discover=False)  # type: ignore
+        logger.warning(f"Resumed stalled past season backfill. Task ID: {task.id}")
+        return {"success": True, "resumed": True, "backfill_task_id": task.id}
 
     except Exception as e:
-        logger.exception(f"Failed to sync past seasons for series {series_id}")
+        logger.exception("Failed to resume past season backfill")
         return {"success": False, "error": str(e)}
 
 
 @shared_task(bind=True, max_retries=3, default_retry_delay=60)
-def queue_all_past_seasons_sync_task(self, refresh: bool = False) -> dict[str, Any]:
+@_reschedule_when_rate_limited
+def backfill_past_season_task(self, season_id: int, refresh: bool = False) -> dict[str, Any]:
     """
-    Queue past season sync tasks for all series.
+    Sync one claimed past season and record the outcome in its checkpoint.
 
-    This task finds all series and queues individual past season sync tasks.
+    A season whose schedule payload hash matches the hash recorded by its
+    last successful sync is marked done without being processed again.
 
     Args:
+        season_id: iRacing season ID
         refresh: Whether to bypass cache
 
     Returns:
         Dict containing sync results
     """
+    started = time.monotonic()
     try:
-        logger.info("Queuing past seasons sync for all series")
+        _ensure_service_available()
 
-        # Get all iRacing series
-        iracing_series = Series.objects.filter(
-            simulator__name="iRacing",
-            is_active=True,
-        ).values_list("external_series_id", flat=True)
+        schedule_data = cached_iracing_service.get_series_season_schedule(
+            season_id, refresh=refresh
+        )
+        if not schedule_data or "schedules" not in schedule_data:
+            result = {"success": False, "error": f"No schedule data found for season {season_id}"}
+            payload_hash = ""
+        else:
+            payload_hash, _week_hashes = schedule_fingerprints(schedule_data)
+            unchanged = PastSeasonSyncCheckpoint.objects.filter(
+                external_season_id=season_id, payload_hash=payload_hash
+            ).exists()
+            if unchanged:
+                result = {"success": True, "season_id": season_id, "unchanged": True}
+            else:
+                result = _sync_season_schedule(season_id, schedule_data)
 
-        series_queued = 0
+    except Exception as e:
+        _raise_if_rate_limited(e)
+        logger.exception(f"Failed to backfill season {season_id}")
+        result = {"success": False, "error": str(e)}
+        payload_hash = ""
+
+    record_outcome(
+        season_id,
+        result["success"],
+        payload_hash=payload_hash,
+        duration=time.monotonic() - started,
+        error=result.get("error", ""),
+    )
+    return result
 
-        for series_id in iracing_series:
-            if series_id:
-                # Queue past seasons sync for this series - using apply_async to avoid naming conflicts
-                from celery import current_app
 
-                current_app.send_task(
-                    "simlane.iracing.tasks.sync_past_seasons_for_series_task",
-                    args=[series_id],
-                    kwargs={"refresh": refresh},
-                )
-                series_queued += 1
-                logger.debug(f"Queued past seasons sync for series {series_id}")
+@shared_task(bind=True, max_retries=3, default_retry_delay=60)
+def sync_past_seasons_for_series_task(
+    self,
+    series_id: int,
+    refresh: bool = False,
+) -> dict[str, Any]:
+    """
+    Backfill the past seasons of a specific series.
 
-        result = {
-            "success": True,
-            "series_queued": series_queued,
-            "completed_at": timezone.now().isoformat(),
-        }
+    Only that series' seasons are claimed, here and in the continuations;
+    pending seasons of other series wait for a backfill of their own.
 
-        logger.info(f"Queued past seasons sync for {series_queued} series")
+    Args:
+        series_id: iRacing series ID
+        refresh: Whether to bypass cache
 
-        return result
+    Returns:
+        Dict containing the queued backfill task
+    """
+    task = backfill_past_seasons_task.delay(refresh=refresh, series_ids=[series_id])  # type: ignore
+    logger.info(f"Queued past season backfill for series {series_id}. Task ID: {task.id}")
+    return {"success": True, "series_id": series_id, "backfill_task_id": task.id}
 
-    except Exception as e:
-        logger.exception("Failed to queue past seasons sync")
-        return {"success": False, "error": str(e)}
+
+@shared_task(bind=True, max_retries=3, default_retry_delay=60)
+def queue_all_past_seasons_sync_task(self, refresh: bool = False) -> dict[str, Any]:
+    """
+    Backfill the past seasons of all series.
+
+    Args:
+        refresh: Whether to bypass cache
+
+    Returns:
+        Dict containing the queued backfill task
+    """
+    task = backfill_past_seasons_task.delay(refresh=refresh)  # type: ignore
+    logger.info(f"Queued past season backfill for all series. Task ID: {task.id}")
+    return {"success": True, "backfill_task_id": task.id}
 
 
 @shared_task(bind=True, max_retries=3, default_retry_delay=60)
+@_reschedule_when_rate_limited
 def sync_car_classes_task(self, refresh: bool = False) -> dict[str, Any]:
     """
     Sync car classes from iRacing API.
@@ -611,6 +1049,7 @@ def sync_car_classes_task(self, refresh: bool = False) -> dict[str, Any]:
         classes_created = 0
         classes_updated = 0
         errors = []
+        resolver = SimContentResolver(iracing_simulator)
 
         for car_class_info in car_classes_data:
             try:
@@ -618,17 +1057,19 @@ def sync_car_classes_task(self, refresh: bool = False) -> dict[str, Any]:
                 if not car_class_id:
                     continue
 
-                car_class, created = CarClass.objects.get_or_create(
-                    sim_api_id=car_class_id,
-                    simulator=iracing_simulator,
-                    defaults={
-                        "name": car_class_info.get("name", ""),
-                        "short_name": car_class_info.get("short_name", ""),
-                        "relative_speed": car_class_info.get("relative_speed"),
-                        "rain_enabled": car_class_info.get("rain_enabled", False),
-                        "car_sim_api_ids": car_class_info.get("cars_in_class", []),
-                    },
-                )
+                car_class = resolver.car_class(car_class_id)
+                created = car_class is None
+                if created:
+                    car_class = CarClass.objects.create(
+                        sim_api_id=car_class_id,
+                        simulator=iracing_simulator,
+                        name=car_class_info.get("name", ""),
+                        short_name=car_class_info.get("short_name", ""),
+                        relative_speed=car_class_info.get("relative_speed"),
+                        rain_enabled=car_class_info.get("rain_enabled", False),
+                        car_sim_api_ids=car_class_info.get("cars_in_class", []),
+                    )
+                    resolver.add(car_class)
 
                 if not created:
                     # Update existing car class
@@ -675,16 +1116,126 @@ def sync_car_classes_task(self, refresh: bool = False) -> dict[str, Any]:
         return result
 
     except Exception as e:
+        _raise_if_rate_limited(e)
         logger.exception("Failed to sync car classes")
         return {"success": False, "error": str(e)}
 
 
 # Keep the existing owned content sync task as it works fine
+def _sync_ownership(
+    model: type[SimProfileCarOwnership] | type[SimProfileTrackOwnership],
+    content_field: str,
+    targets: dict[Any, set[Any]],
+    revoke: bool = True,
+) -> tuple[int, int]:
+    """
+    Make the ownership rows of some profiles match their target content ids.
+
+    Missing rows are added with one bulk_create and, with ``revoke``, revoked
+    ones removed with one delete; rows that stay keep their favourite flag
+    and notes.
+
+    Args:
+        model: SimProfileCarOwnership or SimProfileTrackOwnership
+        content_field: "sim_car" or "sim_track"
+        targets: {sim_profile_id: content pks the profile owns}
+        revoke: Remove rows missing from the targets
+
+    Returns:
+        Tuple of (rows added, rows removed)
+    """
+    current: dict[Any, set[Any]] = {profile_id: set() for profile_id in targets}
+    for profile_id, content_id in model.objects.filter(sim_profile_id__in=targets).values_list(
+        "sim_profile_id", f"{content_field}_id"
+    ):
+        current[profile_id].add(content_id)
+
+    to_add = [
+        model(sim_profile_id=profile_id, **{f"{content_field}_id": content_id})
+        for profile_id, target in targets.items()
+        for content_id in target - current[profile_id]
+    ]
+    revoked = Q()
+    for profile_id, target in targets.items():
+        if revoke and current[profile_id] - target:
+            revoked |= Q(sim_profile_id=profile_id) & ~Q(**{f"{content_field}_id__in": target})
+
+    model.objects.bulk_create(to_add, ignore_conflicts=True, batch_size=500)
+    removed = model.objects.filter(revoked).delete()[0] if revoked else 0
+    return len(to_add), removed
+
+
+def _sync_owned_content(sim_profile: SimProfile, member_info: dict[str, Any]) -> dict[str, Any]:
+    """
+    Sync owned cars and tracks of a profile from a member info payload.
+
+    Member info describes the authenticated account. Content it no longer
+    owns is only revoked when that account is the profile's member; for any
+    other profile owned content is added but nothing is removed.
+    """
+    owned = member_info.get("owned")
+    if not isinstance(owned, dict):
+        # Without the owned section every ownership row would look revoked
+        msg = "Member info has no owned content"
+        raise IRacingServiceError(msg)
+
+    revoke = str(member_info.get("cust_id", "")) == str(sim_profile.sim_api_id)
+    if not revoke:
+        logger.warning(
+            f"Member info of cust_id {member_info.get('cust_id')} does not belong to "
+            f"sim profile {sim_profile.pk} ({sim_profile.sim_api_id}), not revoking ownership",
+        )
+
+    resolver = SimContentResolver(sim_profile.simulator)
+    car_ids: set[Any] = set()
+    track_ids: set[Any] = set()
+    unresolved = {"cars": set(), "tracks": set()}
+    for car_id in owned.get("cars") or []:
+        sim_car = resolver.car(car_id)
+        if sim_car is None:
+            unresolved["cars"].add(car_id)
+        else:
+            car_ids.add(sim_car.pk)
+    for track_id in owned.get("tracks") or []:
+        sim_track = resolver.track(track_id)
+        if sim_track is None:
+            unresolved["tracks"].add(track_id)
+        else:
+            track_ids.add(sim_track.pk)
+
+    for kind, ids in unresolved.items():
+        if ids:
+            logger.warning(f"Owned {kind} not found: {sorted(ids, key=str)}")
+
+    with transaction.atomic():
+        cars_added, cars_removed = _sync_ownership(
+            SimProfileCarOwnership, "sim_car", {sim_profile.pk: car_ids}, revoke=revoke
+        )
+        tracks_added, tracks_removed = _sync_ownership(
+            SimProfileTrackOwnership, "sim_track", {sim_profile.pk: track_ids}, revoke=revoke
+        )
+
+    return {
+        "cars_synced": len(car_ids),
+        "tracks_synced": len(track_ids),
+        "cars_added": cars_added,
+        "cars_removed": cars_removed,
+        "tracks_added": tracks_added,
+        "tracks_removed": tracks_removed,
+        "cars_unresolved": len(unresolved["cars"]),
+        "tracks_unresolved": len(unresolved["tracks"]),
+        "revoked": revoke,
+    }
+
+
 @shared_task(bind=True, max_retries=3, default_retry_delay=60)
 def sync_iracing_owned_content(self, sim_profile_id: int) -> dict[str, Any]:
     """
     Sync owned cars and tracks for a specific sim profile.
 
+    Ownership the member no longer has is removed when the member info
+    belongs to the profile's member (see _sync_owned_content).
+
     Args:
         sim_profile_id: SimProfile ID
 
@@ -692,16 +1243,12 @@ def sync_iracing_owned_content(self, sim_profile_id: int) -> dict[str, Any]:
         Dict containing sync results
     """
     try:
-        from simlane.sim.models import SimProfile
-        from simlane.sim.models import SimProfileCarOwnership
-        from simlane.sim.models import SimProfileTrackOwnership
-
         logger.info(f"Syncing owned content for sim profile {sim_profile_id}")
         _ensure_service_available()
 
         # Get the sim profile
         try:
-            sim_profile = SimProfile.objects.get(id=sim_profile_id)
+            sim_profile = SimProfile.objects.select_related("simulator").get(id=sim_profile_id)
         except SimProfile.DoesNotExist:
             error_msg = f"SimProfile {sim_profile_id} not found"
             logger.error(error_msg)
@@ -714,129 +1261,149 @@ def sync_iracing_owned_content(self, sim_profile_id: int) -> dict[str, Any]:
 
         # Get member info which includes owned content
         member_info = iracing_service.get_member_info()
+        counts = _sync_owned_content(sim_profile, member_info)
 
-        owned_cars = member_info.get("owned", {}).get("cars", [])
-        owned_tracks = member_info.get("owned", {}).get("tracks", [])
+        result = {
+            "success": True,
+            "sim_profile_id": sim_profile_id,
+            **counts,
+            "completed_at": timezone.now().isoformat(),
+        }
 
-        # Sync owned cars
-        cars_synced = 0
-        for car_id in owned_cars:
-            from simlane.sim.models import SimCar
+        logger.info(
+            f"Owned content sync completed for profile {sim_profile_id}: "
+            f"{counts['cars_synced']} cars ({counts['cars_added']} added, {counts['cars_removed']} removed), "
+            f"{counts['tracks_synced']} tracks ({counts['tracks_added']} added, {counts['tracks_removed']} removed)",
+        )
 
-            try:
-                sim_car = SimCar.objects.get(
-                    sim_api_id=car_id,
-                    simulator=sim_profile.simulator,
-                )
+        return result
 
-                SimProfileCarOwnership.objects.get_or_create(
-                    sim_profile=sim_profile,
-                    sim_car=sim_car,
-                )
-                cars_synced += 1
+    except Exception as e:
+        logger.exception(f"Failed to sync owned content for profile {sim_profile_id}")
+        return {"success": False, "error": str(e)}
 
-            except SimCar.DoesNotExist:
-                logger.warning(f"SimCar not found for car_id {car_id}")
 
-        # Sync owned tracks
-        tracks_synced = 0
-        for track_id in owned_tracks:
-            from simlane.sim.models import SimTrack
+@shared_task(bind=True, max_retries=3, default_retry_delay=60)
+@_reschedule_when_rate_limited
+def sync_subsession_results_task(self, event_result_id: int, upsert: bool = True) -> dict[str, Any]:
+    """
+    Ingest the team and participant results of an event result's subsession.
 
-            try:
-                sim_track = SimTrack.objects.get(
-                    sim_api_id=track_id,
-                    simulator=sim_profile.simulator,
-                )
+    The race results are streamed from the API and written in batches (see
+    ingest_team_results), so large subsessions are processed in bounded
+    memory.
 
-                SimProfileTrackOwnership.objects.get_or_create(
-                    sim_profile=sim_profile,
-                    sim_track=sim_track,
-                )
-                tracks_synced += 1
+    Args:
+        event_result_id: EventResult ID
+        upsert: Update results already stored for the event result and
+            delete the ones no longer in the subsession
 
-            except SimTrack.DoesNotExist:
-                logger.warning(f"SimTrack not found for track_id {track_id}")
+    Returns:
+        Dict containing sync results
+    """
+    try:
+        logger.info(f"Syncing subsession results for event result {event_result_id}")
+        _ensure_service_available()
 
-        result = {
+        try:
+            event_result = EventResult.objects.select_related("time_slot__event__simulator").get(
+                id=event_result_id
+            )
+        except EventResult.DoesNotExist:
+            error_msg = f"EventResult {event_result_id} not found"
+            logger.error(error_msg)
+            return {"success": False, "error": error_msg}
+
+        team_results, participant_results = ingest_team_results(
+            event_result,
+            iracing_service.iter_subsession_results(event_result.subsession_id),
+            upsert=upsert,
+        )
+
+        logger.info(
+            f"Subsession {event_result.subsession_id} results synced: {team_results} team results, "
+            f"{participant_results} participant results",
+        )
+
+        return {
             "success": True,
-            "sim_profile_id": sim_profile_id,
-            "cars_synced": cars_synced,
-            "tracks_synced": tracks_synced,
+            "event_result_id": event_result_id,
+            "team_results": team_results,
+            "participant_results": participant_results,
             "completed_at": timezone.now().isoformat(),
         }
 
-        logger.info(
-            f"Owned content sync completed for profile {sim_profile_id}: "
-            f"{cars_synced} cars, {tracks_synced} tracks",
-        )
+    except Exception as e:
+        _raise_if_rate_limited(e)
+        logger.exception(f"Failed to sync subsession results for event result {event_result_id}")
+        return {"success": False, "error": str(e)}
 
-        return result
+
+@shared_task(bind=True, max_retries=3, default_retry_delay=60)
+def sync_iracing_weather_batch_task(
+    self, event_ids: list[str], refresh: bool = False
+) -> dict[str, Any]:
+    """
+    Sync weather forecasts for a batch of events.
+
+    Events sharing a forecast URL are fetched once; see WeatherSync.
+
+    Args:
+        event_ids: Ids of the events to sync
+        refresh: Download every forecast, ignoring stored validators
+    """
+    try:
+        logger.info(f"Syncing weather for {len(event_ids)} events")
+        return {"success": True, **WeatherSync().sync(event_ids, refresh=refresh)}
 
     except Exception as e:
-        logger.exception(f"Failed to sync owned content for profile {sim_profile_id}")
+        logger.exception(f"Failed to sync weather for {len(event_ids)} events")
         return {"success": False, "error": str(e)}
 
 
 @shared_task(bind=True, max_retries=3, default_retry_delay=60)
 def sync_iracing_weather_task(
-    self, event_id: int, refresh: bool = False
+    self, event_id: str, refresh: bool = False
 ) -> dict[str, Any]:
     """
     Sync weather data for an event.
     """
     try:
         logger.debug(f"Syncing weather for event {event_id}")
-        _ensure_service_available()
-
-        event = Event.objects.get(id=event_id)
-        weather_forecast_version = event.weather_forecast_version
-        if not event.weather_forecast_url:
+        result = WeatherSync(max_workers=1).sync([event_id], refresh=refresh)
+        if not result["events"]:
             logger.debug(f"Event {event_id} has no weather forecast url")
             return {"success": False, "error": "No weather forecast url"}
+        if result["errors"]:
+            return {"success": False, "error": result["errors"][0]}
 
-        if event.weather_forecast_data and not refresh:
-            logger.debug(f"Event {event_id} already has weather data, skipping refresh")
-            weather_data = event.weather_forecast_data
-        else:
-            logger.debug(f"Refreshing weather data for event {event_id}")
+        return {"success": True, "event_id": event_id, **result}
 
-            response = requests.get(event.weather_forecast_url, timeout=10)
-            response.raise_for_status()
-            weather_data: list[dict[str, Any]] = response.json()
+    except Exception as e:
+        logger.exception(f"Failed to sync weather for event {event_id}")
+        return {"success": False, "error": str(e)}
 
-            event.weather_forecast_data = weather_data
-            event.save()
 
-        if not weather_data:
-            logger.info(f"No weather data found for event {event_id}")
-            return {
-                "success": False,
-                "error": "No weather data",
-                "weather_data": weather_data,
-            }
+def _queue_weather_sync(event_ids: list[Any]) -> int:
+    """Queue one batched weather sync for some events; returns how many."""
+    if event_ids:
+        sync_iracing_weather_batch_task.delay([str(event_id) for event_id in event_ids])  # type: ignore
+    return len(event_ids)
 
-        # Create weather forecast
-        # time_slots = list(TimeSlot.objects.filter(event=event))
-        # for now link the weather to the event
-        # for time_slot in time_slots:
-        #     logger.info(f"Syncing weather for time slot {time_slot.id}")
-        #     created  = create_weather_forecasts_from_iracing_data(event=event, weather_forecast_data=weather_data, time_slot=time_slot, forecast_version=weather_forecast_version)
-        #     if created:
-        created = create_weather_forecasts_from_iracing_data(
-            event=event,
-            weather_forecast_data=weather_data,
-            forecast_version=weather_forecast_version,
-        )
-        if created:
-            logger.info(f"Created weather forecast for event {event.id}")
-        else:
-            logger.info(f"weather forecast updated for event {event.id}")
 
-        return {"success": True, "event_id": event_id, "event_name": event.name}
+@shared_task(bind=True, max_retries=3, default_retry_delay=60)
+def refresh_upcoming_sessions_task(self) -> dict[str, Any]:
+    """
+    Refresh the materialised next session starts of every event.
+
+    Listings sort and filter on Event.next_session_start instead of
+    expanding repeating time patterns per request.
+    """
+    try:
+        return {"success": True, **refresh_upcoming_sessions()}
 
     except Exception as e:
-        logger.exception(f"Failed to sync weather for event {event_id}")
+        logger.exception("Failed to refresh upcoming sessions")
         return {"success": False, "error": str(e)}
 
 
@@ -964,6 +1531,58 @@ def sync_track_svg_maps_task(self, refresh: bool = False):
     return sync_track_svg_maps(refresh)
 
 
+@shared_task(bind=True, max_retries=3, default_retry_delay=60)
+def enforce_api_response_retention_task(
+    self, data_type: str | None = None, dry_run: bool = False
+) -> dict[str, Any]:
+    """
+    Prune and compact the API response archive per API_RESPONSE_RETENTION.
+
+    Args:
+        data_type: Data type to prune, or None for all
+        dry_run: Only report what would be compacted and deleted
+
+    Returns:
+        Dict containing per data_type retention results
+    """
+    try:
+        results = api_response_storage.enforce_retention(data_type, dry_run=dry_run)
+        return {
+            "success": True,
+            "dry_run": dry_run,
+            "results": results,
+            "deleted": sum(result["deleted"] for result in results),
+        }
+    except Exception as e:
+        logger.exception("Error enforcing API response retention")
+        return {"success": False, "error": str(e)}
+
+
+@shared_task(bind=True, max_retries=3, default_retry_delay=60)
+@_reschedule_when_rate_limited
+def refresh_api_response_task(self, data_type: str, params: dict[str, Any]) -> dict[str, Any]:
+    """
+    Re-fetch a stale cached API response in the background.
+
+    Queued by CachedIRacingAPIService when it serves a response inside its
+    stale grace window.
+
+    Args:
+        data_type: Cached data type ("series", "seasons", "past_seasons", "schedule")
+        params: Cache parameters of the response
+
+    Returns:
+        Dict containing refresh results
+    """
+    try:
+        cached_iracing_service.refresh(data_type, **params)
+        return {"success": True, "data_type": data_type, "params": params}
+    except Exception as e:
+        _raise_if_rate_limited(e)
+        logger.exception(f"Error refreshing cached {data_type} response")
+        return {"success": False, "error": str(e)}
+
+
 @task_postrun.connect
 def close_db_connections(**kwargs):
     connections.close_all()
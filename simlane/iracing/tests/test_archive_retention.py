@@ -0,0 +1,146 @@
+"""
+Tests for API response archive retention
+"""
+
+import io
+import tarfile
+from datetime import datetime
+from datetime import timedelta
+from datetime import timezone
+from unittest import mock
+
+from django.core.cache import caches
+from django.core.files.base import ContentFile
+from django.test import SimpleTestCase
+from django.test import override_settings
+
+from simlane.core.testing import LocMemCacheTestCase
+from simlane.iracing.archive_backends import walk
+from simlane.iracing.archive_retention import ArchivedObject
+from simlane.iracing.archive_retention import RetentionPolicy
+from simlane.iracing.archive_retention import _protected_keys
+from simlane.iracing.archive_retention import plan_retention
+from simlane.iracing.s3_cache_storage import APIResponseS3Storage
+
+NOW = datetime(2025, 3, 31, 12, 0, tzinfo=timezone.utc)
+
+
+def _key(stream: str, stored_at: datetime) -> str:
+    return f"schedule/{stored_at:%Y/%m}/{stream}_{stored_at:%Y%m%d_%H%M%S}.json.gz"
+
+
+class PlanRetentionTest(SimpleTestCase):
+    """Test the retention decisions"""
+
+    def test_keeps_latest_and_one_per_day(self):
+        # Two snapshots a day for 60 days
+        objects = [
+            ArchivedObject.parse(_key("schedule_1", NOW - timedelta(days=day, hours=hour)))
+            for day in range(60)
+            for hour in (0, 6)
+        ]
+
+        plan = plan_retention(objects, RetentionPolicy(keep_latest=3, daily_days=30), protected=set(), now=NOW)
+
+        # Latest 3 (covering days 0-1), then one per day for days 2-29
+        self.assertEqual(len(plan.keep), 3 + 28)
+        self.assertEqual(len(plan.compact), 30)  # one per day beyond the window
+        self.assertEqual(len(plan.keep) + len(plan.compact) + len(plan.delete), 120)
+
+    def test_protected_keys_and_streams_are_independent(self):
+        old = NOW - timedelta(days=90)
+        objects = [
+            ArchivedObject.parse(_key("schedule_1", old)),
+            ArchivedObject.parse(_key("schedule_1", old - timedelta(days=1))),
+            ArchivedObject.parse(_key("schedule_2", old)),
+        ]
+
+        plan = plan_retention(
+            objects,
+            RetentionPolicy(keep_latest=0, daily_days=30, compact=False),
+            protected={objects[1].key},
+            now=NOW,
+        )
+
+        self.assertEqual([obj.key for obj in plan.keep], [objects[1].key])
+        self.assertEqual(len(plan.delete), 2)
+
+    def test_alternate_names_are_parsed(self):
+        obj = ArchivedObject.parse("schedule/2025/01/schedule_1_20250102_030405.json_AbC1234.gz")
+
+        self.assertEqual(obj.stream, "schedule_1")
+        self.assertEqual(obj.stored_at, datetime(2025, 1, 2, 3, 4, 5, tzinfo=timezone.utc))
+
+
+@override_settings(
+    API_RESPONSE_CODECS={"default": "gzip"},
+    API_RESPONSE_RETENTION={"default": {"keep_latest": 1, "daily_days": 0, "compact": True}},
+)
+class EnforceRetentionTest(LocMemCacheTestCase):
+    """Test retention against an in-memory archive"""
+
+    def setUp(self):
+        super().setUp()
+        self.store = APIResponseS3Storage(backend="memory")
+
+    def test_compacts_deletes_and_keeps_manifest_object(self):
+        latest = self.store.store_response("schedule", {"season_id": 1}, season_id=1)
+        stream = latest.rsplit("/", 1)[-1].rsplit("_", 2)[0]
+        old_keys = []
+        for day in (40, 41):
+            for hour in (1, 2):
+                key = _key(stream, NOW - timedelta(days=day, hours=hour))
+                old_keys.append(self.store.storage.save(key, ContentFile(b"old")))
+
+        [result] = self.store.enforce_retention("schedule")
+
+        self.assertEqual(result["scanned"], 5)
+        self.assertEqual(result["compacted"], 2)
+        self.assertEqual(result["deleted"], 4)
+        self.assertEqual(list(walk(self.store.storage, "schedule")), [latest])
+        self.assertEqual(self.store.retrieve_response("schedule", season_id=1), {"season_id": 1})
+
+        [segment] = walk(self.store.archive_storage, f"archives/schedule/{NOW - timedelta(days=40):%Y-%m}")
+        self.assertEqual(self._segment_names(segment), sorted(old_keys[::2]))
+
+    def test_each_run_writes_a_new_segment(self):
+        latest = self.store.store_response("schedule", {"season_id": 1}, season_id=1)
+        stream = latest.rsplit("/", 1)[-1].rsplit("_", 2)[0]
+        old_keys = []
+        for day in (40, 41):
+            self.store.storage.save(_key(stream, NOW - timedelta(days=day)), ContentFile(b"old"))
+            self.store.enforce_retention("schedule")
+            old_keys.append(_key(stream, NOW - timedelta(days=day)))
+
+        segments = sorted(walk(self.store.archive_storage, "archives/schedule"))
+
+        self.assertEqual(len(segments), 2)
+        self.assertEqual(sorted(name for segment in segments for name in self._segment_names(segment)), sorted(old_keys))
+
+    def test_protected_keys_fall_back_to_stored_manifests(self):
+        latest = self.store.store_response("schedule", {"season_id": 1}, season_id=1)
+        caches["api_cache"].clear()
+
+        with mock.patch.object(caches["api_cache"], "get_many", side_effect=ConnectionError("down")):
+            self.assertEqual(_protected_keys(self.store, "schedule"), {latest})
+
+        self.assertEqual(_protected_keys(self.store, "schedule"), {latest})
+
+    def _segment_names(self, segment):
+        with self.store.archive_storage.open(segment, "rb") as f:
+            with tarfile.open(fileobj=io.BytesIO(f.read())) as archive:
+                return sorted(archive.getnames())
+
+    def test_clear_cache_removes_objects_and_manifests(self):
+        self.store.store_response("series", [{"series_id": 1}])
+        self.store.store_response("schedule", {"season_id": 2}, season_id=2)
+
+        self.store.clear_cache("series")
+
+        self.assertIsNone(self.store.retrieve_response("series"))
+        self.assertEqual(list(walk(self.store.storage, "series")), [])
+        self.assertEqual(len(list(walk(self.store.storage, "schedule"))), 1)
+
+        self.store.clear_cache("schedule", season_id=2)
+
+        self.assertIsNone(self.store.get_manifest("schedule", season_id=2))
@@ -0,0 +1,53 @@
+"""
+Tests for the asynchronous iRacing client
+"""
+
+import asyncio
+import time
+from unittest.mock import Mock
+
+from django.test import SimpleTestCase
+
+from simlane.iracing.async_client import AsyncIRacingClient
+from simlane.iracing.client import IRacingAPIError
+
+
+class AsyncIRacingClientTest(SimpleTestCase):
+    """Test AsyncIRacingClient helpers that do not touch the network"""
+
+    def setUp(self):
+        self.client = AsyncIRacingClient(client=Mock(rate_limiter=None), concurrency=2, min_interval=0.05)
+
+    def test_encode_params_matches_requests(self):
+        """Booleans and ints are sent as requests would send them, None is dropped"""
+        params = {"include_series": True, "season_id": 5001, "cust_id": None}
+
+        self.assertEqual(
+            AsyncIRacingClient._encode_params(params),
+            {"include_series": "True", "season_id": "5001"},
+        )
+
+    def test_rate_limit_spaces_concurrent_requests(self):
+        """Concurrent callers share one request budget"""
+
+        async def run():
+            started = time.monotonic()
+            await asyncio.gather(*(self.client._rate_limit() for _ in range(4)))
+            return time.monotonic() - started
+
+        elapsed = asyncio.run(run())
+
+        self.assertGreaterEqual(elapsed, 0.15)
+
+    def test_gather_drops_failed_calls(self):
+        """One failed request does not abort the batch"""
+
+        async def ok(value):
+            return value
+
+        async def fail():
+            raise IRacingAPIError("boom", status_code=500)
+
+        result = asyncio.run(self.client.gather({1: ok("a"), 2: fail(), 3: ok("c")}))
+
+        self.assertEqual(result, {1: "a", 3: "c"})
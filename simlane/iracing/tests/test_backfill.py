@@ -0,0 +1,163 @@
+"""
+Tests for the checkpointed past season backfill
+"""
+
+from datetime import datetime
+from datetime import timedelta
+from datetime import timezone as dt_timezone
+from unittest import mock
+
+from django.test import SimpleTestCase
+from django.test import override_settings
+
+from simlane.iracing import tasks
+from simlane.iracing.backfill import Status
+from simlane.iracing.backfill import backfill_concurrency
+from simlane.iracing.backfill import estimate_progress
+
+NOW = datetime(2025, 1, 7, 12, tzinfo=dt_timezone.utc)
+
+
+class BackfillProgressTest(SimpleTestCase):
+    """Test concurrency and progress figures"""
+
+    @override_settings(IRACING_RATE_LIMIT_CAPACITY=10, IRACING_BACKFILL_RATE_SHARE=0.5)
+    def test_concurrency_is_share_of_rate_limit(self):
+        self.assertEqual(backfill_concurrency(), 5)
+
+    @override_settings(IRACING_RATE_LIMIT_CAPACITY=1, IRACING_BACKFILL_RATE_SHARE=0.5)
+    def test_concurrency_is_at_least_one(self):
+        self.assertEqual(backfill_concurrency(), 1)
+
+    def test_percent_and_eta(self):
+        counts = {Status.DONE: 30, Status.FAILED: 10, Status.RUNNING: 5, Status.PENDING: 55}
+
+        progress = estimate_progress(counts, 20, NOW - timedelta(minutes=10), NOW)
+
+        self.assertEqual(progress["total"], 100)
+        self.assertEqual(progress["percent_done"], 40.0)
+        # 20 seasons in 600s, 60 left
+        self.assertEqual(progress["eta_seconds"], 1800)
+        self.assertEqual(progress["eta"], NOW + timedelta(minutes=30))
+
+    def test_no_eta_before_first_season(self):
+        progress = estimate_progress({Status.PENDING: 5}, 0, NOW, NOW)
+
+        self.assertEqual(progress["percent_done"], 0.0)
+        self.assertIsNone(progress["eta"])
+
+    def test_empty_table_is_done(self):
+        self.assertEqual(estimate_progress({}, 0, None, NOW)["percent_done"], 100.0)
+
+
+@mock.patch.object(tasks, "_ensure_service_available")
+@mock.patch.object(tasks, "record_outcome")
+@mock.patch.object(tasks, "cached_iracing_service")
+class BackfillPastSeasonTaskTest(SimpleTestCase):
+    """Test the per-season backfill task"""
+
+    SCHEDULE = {"season_id": 5001, "series_id": 1, "schedules": []}
+
+    def test_unchanged_payload_is_not_processed(self, service, record_outcome, _ensure):
+        service.get_series_season_schedule.return_value = self.SCHEDULE
+        checkpoints = mock.patch.object(tasks.PastSeasonSyncCheckpoint.objects, "filter")
+        with checkpoints as filter_, mock.patch.object(tasks, "_sync_season_schedule") as sync:
+            filter_.return_value.exists.return_value = True
+            result = tasks.backfill_past_season_task.run(5001)
+
+        sync.assert_not_called()
+        self.assertTrue(result["unchanged"])
+        self.assertTrue(record_outcome.call_args.args[1])
+        self.assertEqual(
+            record_outcome.call_args.kwargs["payload_hash"], filter_.call_args.kwargs["payload_hash"]
+        )
+
+    def test_failure_is_recorded(self, service, record_outcome, _ensure):
+        service.get_series_season_schedule.side_effect = ValueError("boom")
+
+        result = tasks.backfill_past_season_task.run(5001)
+
+        self.assertFalse(result["success"])
+        self.assertEqual(record_outcome.call_args.args, (5001, False))
+        self.assertEqual(record_outcome.call_args.kwargs["error"], "boom")
+
+
+class BackfillPastSeasonsTaskTest(SimpleTestCase):
+    """Test batch dispatch of the backfill orchestrator"""
+
+    @mock.patch.object(tasks, "backfill_progress", return_value={"percent_done": 0.0, "pending": 3, "eta_seconds": None})
+    @mock.patch.object(tasks, "backfill_concurrency", return_value=2)
+    @mock.patch.object(tasks, "claim_pending", return_value=[11, 12])
+    def test_dispatches_claimed_batch_and_continues(self, claim_pending, _concurrency, _progress):
+        with (
+            mock.patch.object(tasks, "cached_iracing_service") as service,
+            mock.patch.object(tasks, "chord") as chord,
+            mock.patch.object(tasks, "group") as group,
+        ):
+            service.get_series_season_schedules.return_value = {11: {"schedules": []}, 12: None}
+            result = tasks.backfill_past_seasons_task.run(discover=False)
+
+        claim_pending.assert_called_once_with(2, series_ids=None)
+        service.get_series_season_schedules.assert_called_once_with([11, 12], refresh=False)
+        header = list(group.call_args.args[0])
+        self.assertEqual([signature.args for signature in header], [(11,), (12,)])
+        continuation = chord.return_value.call_args.args[0]
+        self.assertEqual(continuation.kwargs, {"refresh": False, "series_ids": None, "discover": False})
+        self.assertTrue(continuation.immutable)
+        [on_error] = continuation.options["link_error"]
+        self.assertEqual((on_error["task"], on_error["kwargs"]), (continuation.task, continuation.kwargs))
+        self.assertEqual((result["seasons_claimed"], result["complete"]), (2, False))
+        self.assertEqual(result["schedules_prefetched"], 1)
+
+    @mock.patch.object(tasks, "backfill_progress", return_value={"percent_done": 0.0, "pending": 2, "eta_seconds": None})
+    @mock.patch.object(tasks, "backfill_concurrency", return_value=2)
+    @mock.patch.object(tasks, "claim_pending", return_value=[11, 12])
+    def test_refresh_is_left_to_seasons_not_prefetched(self, _claim_pending, _concurrency, _progress):
+        with (
+            mock.patch.object(tasks, "cached_iracing_service") as service,
+            mock.patch.object(tasks, "chord"),
+            mock.patch.object(tasks, "group") as group,
+        ):
+            service.get_series_season_schedules.return_value = {11: {"schedules": []}}
+            tasks.backfill_past_seasons_task.run(refresh=True, discover=False)
+            service.get_series_season_schedules.side_effect = RuntimeError("down")
+            tasks.backfill_past_seasons_task.run(refresh=True, discover=False)
+
+        prefetched, failed = (list(call.args[0]) for call in group.call_args_list)
+        self.assertEqual([signature.kwargs["refresh"] for signature in prefetched], [False, True])
+        self.assertEqual([signature.kwargs["refresh"] for signature in failed], [True, True])
+
+    @mock.patch.object(tasks, "backfill_progress", return_value={"done": 4, "total": 4, "failed": 0})
+    @mock.patch.object(tasks, "finish_run")
+    @mock.patch.object(tasks, "claim_pending", return_value=[])
+    def test_finishes_when_nothing_pending(self, _claim_pending, finish_run, _progress):
+        with mock.patch.object(tasks, "chord") as chord:
+            result = tasks.backfill_past_seasons_task.run(discover=False)
+
+        chord.assert_not_called()
+        finish_run.assert_called_once()
+        self.assertTrue(result["complete"])
+
+    @mock.patch.object(tasks, "backfill_progress", return_value={"percent_done": 0.0, "pending": 1, "eta_seconds": None})
+    @mock.patch.object(tasks, "backfill_concurrency", return_value=2)
+    @mock.patch.object(tasks, "claim_pending", return_value=[11])
+    def test_series_backfill_claims_only_its_seasons(self, claim_pending, _concurrency, _progress):
+        with (
+            mock.patch.object(tasks, "cached_iracing_service"),
+            mock.patch.object(tasks, "chord") as chord,
+            mock.patch.object(tasks, "group"),
+        ):
+            tasks.backfill_past_seasons_task.run(series_ids=[7], discover=False)
+
+        claim_pending.assert_called_once_with(2, series_ids=[7])
+        self.assertEqual(chord.return_value.call_args.args[0].kwargs["series_ids"], [7])
+
+    @mock.patch.object(tasks, "backfill_stalled", side_effect=[False, True])
+    def test_resume_only_stalled_backfill(self, _stalled):
+        with mock.patch.object(tasks.backfill_past_seasons_task, "delay") as delay:
+            idle = tasks.resume_past_season_backfill_task.run()
+            resumed = tasks.resume_past_season_backfill_task.run()
+
+        self.assertFalse(idle["resumed"])
+        self.assertTrue(resumed["resumed"])
+        delay.assert_called_once_with(discover=False)
@@ -0,0 +1,94 @@
+"""
+Tests for the synchronous iRacing client
+"""
+
+import threading
+import time
+from unittest.mock import patch
+
+from django.core.cache import cache
+
+from simlane.core.cache_utils import SingleFlight
+from simlane.core.testing import LocMemCacheTestCase
+from simlane.iracing.client import IRacingClient
+
+
+class IRacingClientCacheKeyTest(LocMemCacheTestCase):
+    """Test cache key generation"""
+
+    def setUp(self):
+        super().setUp()
+        self.client = IRacingClient(username="driver@example.com", password="secret")
+
+    def test_cache_key_is_deterministic(self):
+        """Keys do not depend on param order or the process hash seed"""
+        key = self.client._get_cache_key(
+            "/data/series/seasons", {"include_series": True, "season_id": 1}
+        )
+
+        self.assertEqual(
+            key,
+            self.client._get_cache_key(
+                "/data/series/seasons", {"season_id": 1, "include_series": True}
+            ),
+        )
+        self.assertTrue(key.startswith("iracing_api:v1:/data/series/seasons:"))
+
+    def test_cache_key_includes_endpoint_version(self):
+        with patch.dict(IRacingClient.ENDPOINT_CACHE_VERSIONS, {"/data/car/get": 3}):
+            self.assertTrue(
+                self.client._get_cache_key("/data/car/get").startswith("iracing_api:v3:")
+            )
+
+    def test_concurrent_requests_are_coalesced(self):
+        """Threads asking for the same endpoint share one upstream request"""
+        calls = []
+
+        def slow_request(endpoint, params=None):
+            calls.append(endpoint)
+            time.sleep(0.1)
+            return [{"car_id": 1}]
+
+        results = []
+        with patch.object(self.client, "_request", side_effect=slow_request):
+            threads = [
+                threading.Thread(
+                    target=lambda: results.append(self.client._make_request("/data/car/get"))
+                )
+                for _ in range(5)
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, [[{"car_id": 1}]] * 5)
+
+
+class SingleFlightTest(LocMemCacheTestCase):
+    """Test cross-process coalescing through the cache lock"""
+
+    def test_waits_for_lock_holder_result(self):
+        single_flight = SingleFlight(wait_timeout=2)
+        cache.add("lock:shared-key", "locked", 60)
+
+        def publish():
+            time.sleep(0.1)
+            cache.set("shared-key", {"from": "other process"}, 60)
+
+        threading.Thread(target=publish).start()
+
+        result = single_flight.do("shared-key", lambda: {"from": "here"}, 60)
+
+        self.assertEqual(result, {"from": "other process"})
+
+    def test_computes_when_lock_holder_fails(self):
+        single_flight = SingleFlight(wait_timeout=2)
+        cache.add("lock:failed-key", "locked", 60)
+        threading.Timer(0.1, lambda: cache.delete("lock:failed-key")).start()
+
+        result = single_flight.do("failed-key", lambda: "computed", 60)
+
+        self.assertEqual(result, "computed")
+        self.assertEqual(cache.get("failed-key"), "computed")
@@ -0,0 +1,69 @@
+"""
+Tests for the sync-scoped content resolver
+"""
+
+from simlane.core.testing import PatchingTestCase
+from simlane.iracing.lookups import SimContentResolver
+from simlane.iracing.lookups import normalize_name
+from simlane.sim.models import CarClass
+from simlane.sim.models import SimCar
+from simlane.sim.models import SimLayout
+from simlane.sim.models import SimTrack
+from simlane.sim.models import Simulator
+from simlane.sim.models import TrackModel
+
+
+def _layout(layout_code, track_name, layout_name):
+    sim_track = SimTrack(display_name=track_name, track_model=TrackModel(name=track_name))
+    return SimLayout(layout_code=layout_code, name=layout_name, sim_track=sim_track)
+
+
+class SimContentResolverTest(PatchingTestCase):
+    """Test in-memory lookups and their counters"""
+
+    def setUp(self):
+        self.rows = {
+            "layout": [
+                _layout("101", "Circuit de Spa-Francorchamps", "Grand Prix Pits"),
+                _layout("102", "Circuit de Spa-Francorchamps", "Endurance"),
+            ],
+            "car": [SimCar(sim_api_id="1"), SimCar(sim_api_id="2"), SimCar(sim_api_id="2")],
+            "car_class": [CarClass(sim_api_id="7", name="GT3 Class")],
+            "track": [],
+        }
+        self.resolver = SimContentResolver(Simulator(name="iRacing"))
+        self.queryset = self.patch_object(
+            SimContentResolver, "_queryset", side_effect=lambda kind: self.rows[kind]
+        )
+
+    def test_normalize_name(self):
+        self.assertEqual(normalize_name("Spa-Francorchamps (GP)"), "spafrancorchampsgp")
+        self.assertEqual(normalize_name(None), "")
+
+    def test_loads_each_kind_once(self):
+        self.assertEqual(self.resolver.car_class(7).name, "GT3 Class")
+        self.assertIsNone(self.resolver.car_class("8"))
+        self.resolver.car_class(7)
+
+        self.assertEqual(self.queryset.call_count, 1)
+        self.assertEqual(self.resolver.stats()["car_class"], {"hit": 2, "miss": 1})
+
+    def test_ambiguous_ids_are_skipped(self):
+        self.assertIsNotNone(self.resolver.car(1))
+        self.assertIsNone(self.resolver.car(2))
+
+    def test_layout_falls_back_to_names(self):
+        by_id = self.resolver.layout(101)
+        by_name = self.resolver.layout(999, "Spa-Francorchamps", "Endurance")
+        missing = self.resolver.layout(999, "Monza", "Grand Prix")
+
+        self.assertEqual(by_id.layout_code, "101")
+        self.assertEqual(by_name.layout_code, "102")
+        self.assertIsNone(missing)
+        self.assertEqual(self.resolver.stats()["layout"], {"hit": 1, "miss": 1, "fallback": 1})
+
+    def test_added_rows_are_found(self):
+        self.resolver.car(1)
+        self.resolver.add(SimCar(sim_api_id="3"))
+
+        self.assertIsNotNone(self.resolver.car(3))
@@ -0,0 +1,91 @@
+"""
+Tests for the set-based owned content sync
+"""
+
+from unittest import mock
+
+from simlane.core.testing import PatchingTestCase
+from simlane.iracing import tasks
+from simlane.iracing.services import IRacingServiceError
+from simlane.sim.models import SimCar
+from simlane.sim.models import SimProfile
+from simlane.sim.models import SimProfileCarOwnership
+from simlane.sim.models import SimTrack
+from simlane.sim.models import Simulator
+
+
+class SyncOwnershipTest(PatchingTestCase):
+    """Test the ownership diff and its two write queries"""
+
+    def setUp(self):
+        self.objects = self.patch_object(SimProfileCarOwnership, "objects")
+        self.objects.filter.return_value.values_list.return_value = [("p1", 1), ("p1", 2), ("p2", 3)]
+        self.objects.filter.return_value.delete.return_value = (2, {})
+
+    def test_adds_missing_and_removes_revoked(self):
+        added, removed = tasks._sync_ownership(SimProfileCarOwnership, "sim_car", {"p1": {2, 4}, "p2": {3}})
+
+        rows = self.objects.bulk_create.call_args.args[0]
+        self.assertEqual([(row.sim_profile_id, row.sim_car_id) for row in rows], [("p1", 4)])
+        self.assertEqual(self.objects.bulk_create.call_args.kwargs["ignore_conflicts"], True)
+        revoked = self.objects.filter.call_args.args[0]
+        self.assertIn("p1", str(revoked))
+        self.assertNotIn("p2", str(revoked))
+        self.assertEqual((added, removed), (1, 2))
+
+    def test_unchanged_ownership_deletes_nothing(self):
+        added, removed = tasks._sync_ownership(SimProfileCarOwnership, "sim_car", {"p1": {1, 2}, "p2": {3}})
+
+        self.assertEqual(self.objects.bulk_create.call_args.args[0], [])
+        self.objects.filter.return_value.delete.assert_not_called()
+        self.assertEqual((added, removed), (0, 0))
+
+    def test_without_revoke_only_adds(self):
+        added, removed = tasks._sync_ownership(
+            SimProfileCarOwnership, "sim_car", {"p1": {2, 4}, "p2": {3}}, revoke=False
+        )
+
+        self.objects.filter.return_value.delete.assert_not_called()
+        self.assertEqual((added, removed), (1, 0))
+
+
+class SyncOwnedContentTest(PatchingTestCase):
+    """Test id resolution and when revocation is allowed"""
+
+    def setUp(self):
+        self.profile = SimProfile(pk="p1", simulator=Simulator(name="iRacing"), sim_api_id="123")
+        self.rows = {
+            "car": [SimCar(pk=10, sim_api_id="1"), SimCar(pk=20, sim_api_id="2")],
+            "track": [SimTrack(pk=30, sim_api_id="5")],
+        }
+        self.queryset = self.patch_object(
+            tasks.SimContentResolver, "_queryset", side_effect=lambda kind: self.rows[kind]
+        )
+        self.sync_ownership = self.patch_object(tasks, "_sync_ownership", return_value=(0, 0))
+
+    def _sync(self, member_info):
+        with mock.patch.object(tasks.transaction, "atomic"):
+            return tasks._sync_owned_content(self.profile, member_info)
+
+    def test_resolves_owned_ids(self):
+        result = self._sync({"cust_id": 123, "owned": {"cars": [1, 2, 9], "tracks": [5]}})
+
+        self.assertEqual(self.queryset.call_count, 2)
+        car_call, track_call = self.sync_ownership.call_args_list
+        self.assertEqual(car_call.args[2], {"p1": {10, 20}})
+        self.assertEqual(track_call.args[2], {"p1": {30}})
+        self.assertTrue(car_call.kwargs["revoke"])
+        self.assertEqual((result["cars_synced"], result["cars_unresolved"]), (2, 1))
+
+    def test_other_members_info_does_not_revoke(self):
+        result = self._sync({"cust_id": 999, "owned": {"cars": [1], "tracks": []}})
+
+        self.assertFalse(result["revoked"])
+        for call in self.sync_ownership.call_args_list:
+            self.assertFalse(call.kwargs["revoke"])
+
+    def test_missing_owned_section_changes_nothing(self):
+        with self.assertRaises(IRacingServiceError):
+            self._sync({"cust_id": 123})
+
+        self.sync_ownership.assert_not_called()
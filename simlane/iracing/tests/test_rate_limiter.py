@@ -0,0 +1,67 @@
+"""
+Tests for the shared iRacing rate limiter
+"""
+
+from django.test import SimpleTestCase
+
+from simlane.core.testing import PatchingTestCase
+from simlane.iracing.rate_limiter import IRacingRateLimiter
+from simlane.iracing.rate_limiter import IRacingRateLimitError
+from simlane.iracing.rate_limiter import get_retry_after
+from simlane.iracing.rate_limiter import is_blocking
+from simlane.iracing.rate_limiter import parse_rate_limit_headers
+from simlane.iracing.rate_limiter import rate_limit_mode
+
+
+class RateLimiterHelpersTest(SimpleTestCase):
+    """Test header parsing and exception helpers"""
+
+    def test_parse_rate_limit_headers(self):
+        headers = {"x-ratelimit-remaining": "42", "x-ratelimit-reset": "1700000000"}
+
+        self.assertEqual(parse_rate_limit_headers(headers), (42, 1700000000.0))
+        self.assertEqual(parse_rate_limit_headers({}), (None, None))
+        self.assertEqual(
+            parse_rate_limit_headers({"x-ratelimit-remaining": "n/a"}), (None, None)
+        )
+
+    def test_get_retry_after_follows_wrapped_errors(self):
+        """Service layers wrap client errors, the retry delay is still found"""
+        try:
+            try:
+                raise IRacingRateLimitError(12.5)
+            except IRacingRateLimitError as e:
+                raise RuntimeError("wrapped") from e
+        except RuntimeError as wrapped:
+            self.assertEqual(get_retry_after(wrapped), 12.5)
+
+        self.assertIsNone(get_retry_after(ValueError("other")))
+
+    def test_rate_limit_mode_is_scoped(self):
+        self.assertTrue(is_blocking())
+        with rate_limit_mode(blocking=False):
+            self.assertFalse(is_blocking())
+        self.assertTrue(is_blocking())
+
+
+class RateLimiterFallbackTest(PatchingTestCase):
+    """Test behaviour when Redis is unavailable"""
+
+    def setUp(self):
+        self.limiter = IRacingRateLimiter("driver@example.com", capacity=5, refill_per_second=2.0)
+        self.patch_object(self.limiter, "_get_scripts", side_effect=ConnectionError("down"))
+
+    def test_key_does_not_contain_account(self):
+        self.assertNotIn("driver@example.com", self.limiter.key)
+
+    def test_local_fallback_spaces_requests(self):
+        self.assertEqual(self.limiter.try_acquire(), 0.0)
+        self.assertGreater(self.limiter.try_acquire(), 0.0)
+
+    def test_non_blocking_acquire_raises(self):
+        self.limiter.acquire()
+
+        with self.assertRaises(IRacingRateLimitError) as ctx:
+            self.limiter.acquire(blocking=False)
+
+        self.assertGreater(ctx.exception.retry_after, 0.0)
@@ -0,0 +1,196 @@
+"""
+Tests for the tiered API response cache
+"""
+
+import time
+from unittest import mock
+
+from django.core.cache import caches
+from django.test import SimpleTestCase
+from django.test import override_settings
+
+from simlane.core.testing import LocMemCacheTestCase
+from simlane.iracing import api_cache_service
+from simlane.iracing.api_cache_service import CachedIRacingAPIService
+from simlane.iracing.response_cache import ByteBoundedLRU
+from simlane.iracing.response_cache import TieredResponseCache
+from simlane.iracing.s3_cache_storage import APIResponseS3Storage
+
+CACHE_SETTINGS = {
+    "API_RESPONSE_CODECS": {"default": "gzip"},
+    "API_RESPONSE_CACHE_TTL": {"schedule": 60},
+    "API_RESPONSE_CACHE_GRACE": {"default": 60},
+    "API_RESPONSE_CACHE_TIER_TTL": {"memory": 300, "redis": None},
+}
+
+
+class ByteBoundedLRUTest(SimpleTestCase):
+    """Test the per-process memory tier"""
+
+    def test_evicts_least_recently_used_by_size(self):
+        lru = ByteBoundedLRU(max_bytes=10)
+        lru.set("a", "a", 0, 4, timeout=60)
+        lru.set("b", "b", 0, 4, timeout=60)
+        lru.get("a")
+
+        lru.set("c", "c", 0, 4, timeout=60)
+
+        self.assertIsNone(lru.get("b"))
+        self.assertIsNotNone(lru.get("a"))
+        self.assertEqual(lru.current_bytes, 8)
+
+    def test_skips_entries_larger_than_budget(self):
+        lru = ByteBoundedLRU(max_bytes=10)
+        lru.set("big", "x", 0, 11, timeout=60)
+
+        self.assertEqual(len(lru), 0)
+
+    def test_entries_are_copied_in_and_out(self):
+        lru = ByteBoundedLRU(max_bytes=10)
+        data = {"schedules": []}
+        lru.set("a", data, 0, 4, timeout=60)
+        data["schedules"].append(1)
+
+        lru.get("a")[0]["schedules"].append(2)
+
+        self.assertEqual(lru.get("a")[0], {"schedules": []})
+
+    def test_expired_entries_are_dropped(self):
+        lru = ByteBoundedLRU(max_bytes=10)
+        lru.set("a", "a", 0, 4, timeout=60)
+
+        with mock.patch("simlane.iracing.response_cache.time.monotonic", return_value=time.monotonic() + 61):
+            self.assertIsNone(lru.get("a"))
+        self.assertEqual(lru.current_bytes, 0)
+
+
+@override_settings(**CACHE_SETTINGS)
+class TieredResponseCacheTest(LocMemCacheTestCase):
+    """Test tier population and hit counters"""
+
+    def setUp(self):
+        super().setUp()
+        self.store = APIResponseS3Storage(backend="memory")
+        self.cache = TieredResponseCache(storage=self.store, max_bytes=1024 * 1024)
+
+    def test_s3_hit_populates_upper_tiers(self):
+        self.store.store_response("schedule", {"season_id": 1}, season_id=1)
+
+        first = self.cache.get("schedule", season_id=1)
+        second = self.cache.get("schedule", season_id=1)
+        self.cache.memory.clear()
+        third = self.cache.get("schedule", season_id=1)
+
+        self.assertEqual((first.tier, second.tier, third.tier), ("s3", "memory", "redis"))
+        self.assertEqual(third.data, {"season_id": 1})
+        stats = self.cache.stats()
+        self.assertEqual(stats["memory"]["schedule"], {"hit": 1, "miss": 2})
+        self.assertEqual(stats["redis"]["schedule"], {"hit": 1, "miss": 1})
+        self.assertEqual(stats["s3"]["schedule"], {"hit": 1, "miss": 0})
+
+    def test_miss_everywhere(self):
+        self.assertIsNone(self.cache.get("schedule", season_id=2))
+        self.assertEqual(self.cache.stats()["s3"]["schedule"], {"hit": 0, "miss": 1})
+
+    def test_invalidate_drops_upper_tiers(self):
+        self.cache.set("schedule", {"season_id": 3}, season_id=3)
+
+        self.cache.invalidate("schedule", season_id=3)
+
+        self.assertIsNone(self.cache.get("schedule", season_id=3))
+
+    def test_clear_cache_drops_redis_entries_of_data_type(self):
+        service = CachedIRacingAPIService(base_service=mock.Mock(), response_cache=self.cache)
+        for season_id in (4, 5):
+            self.store.store_response("schedule", {"season_id": season_id}, season_id=season_id)
+            self.cache.get("schedule", season_id=season_id)
+        self.store.store_response("series", [{"series_id": 1}])
+        self.cache.get("series")
+
+        with mock.patch("simlane.iracing.api_cache_service.api_response_storage", self.store):
+            service.clear_cache("schedule")
+
+        redis_keys = [
+            self.cache._redis_key(self.store._manifest_id(data_type, **params))
+            for data_type, params in (("schedule", {"season_id": 4}), ("schedule", {"season_id": 5}), ("series", {}))
+        ]
+        self.assertEqual(list(caches["api_cache"].get_many(redis_keys)), redis_keys[2:])
+        self.assertIsNone(self.cache.get("schedule", season_id=4))
+        self.assertEqual(self.cache.get("series").tier, "memory")
+
+
+@override_settings(**CACHE_SETTINGS)
+class StaleWhileRevalidateTest(LocMemCacheTestCase):
+    """Test stale responses are served while a refresh is queued"""
+
+    def setUp(self):
+        super().setUp()
+        self.store = APIResponseS3Storage(backend="memory")
+        self.base_service = mock.Mock()
+        self.base_service.get_series_season_schedule.return_value = {"season_id": 1, "fresh": True}
+        self.service = CachedIRacingAPIService(
+            base_service=self.base_service,
+            response_cache=TieredResponseCache(storage=self.store, max_bytes=1024 * 1024),
+        )
+        self.patch_object(api_cache_service, "api_response_storage", self.store)
+        self.service.response_cache.set("schedule", {"season_id": 1, "fresh": False}, season_id=1)
+
+    def _age(self, seconds):
+        return mock.patch(
+            "simlane.iracing.response_cache.time.time", return_value=time.time() + seconds
+        )
+
+    def test_fresh_response_skips_api(self):
+        with mock.patch("simlane.iracing.tasks.refresh_api_response_task") as task:
+            data = self.service.get_series_season_schedule(1)
+
+        self.assertFalse(data["fresh"])
+        task.delay.assert_not_called()
+        self.base_service.get_series_season_schedule.assert_not_called()
+
+    def test_stale_response_queues_one_refresh(self):
+        with self._age(90), mock.patch("simlane.iracing.tasks.refresh_api_response_task") as task:
+            first = self.service.get_series_season_schedule(1)
+            second = self.service.get_series_season_schedule(1)
+
+        self.assertFalse(first["fresh"])
+        self.assertFalse(second["fresh"])
+        task.delay.assert_called_once_with("schedule", {"season_id": 1})
+        self.base_service.get_series_season_schedule.assert_not_called()
+
+    def test_freshness_follows_response_cache_ttl(self):
+        self.patch_object(self.service.response_cache, "ttl", return_value=120)
+
+        with self._age(90), mock.patch("simlane.iracing.tasks.refresh_api_response_task") as task:
+            data = self.service.get_series_season_schedule(1)
+
+        self.assertFalse(data["fresh"])
+        task.delay.assert_not_called()
+
+    def test_expired_response_fetches_from_api(self):
+        with self._age(150), mock.patch("simlane.iracing.tasks.refresh_api_response_task") as task:
+            data = self.service.get_series_season_schedule(1)
+
+        self.assertTrue(data["fresh"])
+        task.delay.assert_not_called()
+
+    def test_refresh_releases_lock(self):
+        with self._age(90), mock.patch("simlane.iracing.tasks.refresh_api_response_task") as task:
+            self.service.get_series_season_schedule(1)
+            self.service.refresh("schedule", season_id=1)
+
+        self.assertEqual(task.delay.call_count, 1)
+        self.assertIsNone(caches["api_cache"].get(self.service._refresh_lock_key("schedule", {"season_id": 1})))
+        self.assertTrue(self.service.get_series_season_schedule(1)["fresh"])
+
+    def test_batch_fetches_misses_in_one_pass_for_later_reads(self):
+        fetched = {2: {"season_id": 2, "fresh": True}, 3: {"season_id": 3, "fresh": True}}
+
+        with mock.patch.object(api_cache_service, "fetch_series_season_schedules", return_value=fetched) as fetch:
+            schedules = self.service.get_series_season_schedules([1, 2, 3])
+
+        fetch.assert_called_once_with([2, 3], client=self.base_service.client)
+        self.assertEqual(schedules, {1: {"season_id": 1, "fresh": False}, **fetched})
+        # A season sync reading one schedule finds the prefetched copy
+        self.assertEqual(self.service.get_series_season_schedule(3), fetched[3])
+        self.base_service.get_series_season_schedule.assert_not_called()
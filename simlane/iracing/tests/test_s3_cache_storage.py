@@ -0,0 +1,122 @@
+"""
+Tests for the API response storage manifest index
+"""
+
+import gzip
+import json
+import tempfile
+import unittest
+
+from django.core.cache import caches
+from django.core.files.base import ContentFile
+from django.test import override_settings
+
+from simlane.core.testing import LocMemCacheTestCase
+from simlane.iracing import response_codecs
+from simlane.iracing.s3_cache_storage import APIResponseS3Storage
+
+
+@override_settings(API_RESPONSE_CODECS={"default": "gzip"})
+class ManifestIndexTest(LocMemCacheTestCase):
+    """Test manifest-based lookups"""
+
+    def setUp(self):
+        super().setUp()
+        self.store = APIResponseS3Storage(backend="memory")
+
+    def test_store_then_retrieve_uses_manifest(self):
+        path = self.store.store_response("schedule", {"season_id": 1, "schedules": []}, season_id=1)
+
+        manifest = self.store.get_manifest("schedule", season_id=1)
+
+        self.assertEqual(manifest["key"], path)
+        self.assertEqual(len(manifest["sha256"]), 64)
+        self.assertEqual(self.store.retrieve_response("schedule", season_id=1), {"season_id": 1, "schedules": []})
+        self.assertLess(self.store.get_response_age("schedule", season_id=1), 5)
+        self.assertIsNone(self.store.get_manifest("schedule", season_id=2))
+
+    def test_latest_store_wins(self):
+        self.store.store_response("series", [{"series_id": 1}])
+        self.store.store_response("series", [{"series_id": 2}])
+
+        self.assertEqual(self.store.retrieve_response("series"), [{"series_id": 2}])
+
+    def test_falls_back_to_s3_manifest(self):
+        self.store.store_response("seasons", [{"season_id": 1}], include_series=True)
+        caches["api_cache"].clear()
+
+        self.assertEqual(self.store.retrieve_response("seasons", include_series=True), [{"season_id": 1}])
+        # The fallback hit re-populates Redis
+        manifest_id = self.store._manifest_id("seasons", include_series=True)
+        self.assertIsNotNone(caches["api_cache"].get(self.store._manifest_cache_key(manifest_id)))
+
+    def test_content_hash_mismatch_is_a_miss(self):
+        path = self.store.store_response("cars", [{"car_id": 1}])
+        self.store.storage.delete(path)
+        self.store.storage.save(path, ContentFile(gzip.compress(b"[]")))
+
+        self.assertIsNone(self.store.retrieve_response("cars"))
+
+    def test_identical_payload_only_refreshes_manifest(self):
+        first = self.store.store_response("series", [{"series_id": 1, "name": "GT3"}])
+        first_stored_at = self.store.get_manifest("series")["stored_at"]
+
+        # Key order does not matter for the content hash
+        second = self.store.store_response("series", [{"name": "GT3", "series_id": 1}])
+
+        self.assertEqual(first, second)
+        self.assertEqual(len(self.store.storage.listdir(first.rsplit("/", 1)[0])[1]), 1)
+        self.assertGreaterEqual(self.store.get_manifest("series")["stored_at"], first_stored_at)
+
+
+@unittest.skipUnless(response_codecs.zstandard, "zstandard is not installed")
+@override_settings(API_RESPONSE_CODECS={"default": "zstd"})
+class ZstdCodecTest(LocMemCacheTestCase):
+    """Test zstd storage with a trained dictionary"""
+
+    def setUp(self):
+        super().setUp()
+        self.store = APIResponseS3Storage(backend="memory")
+
+    def test_roundtrip_with_dictionary(self):
+        samples = [
+            json.dumps({"season_id": i, "schedules": [{"race_week_num": w, "track": {"track_id": i * w}} for w in range(12)]}).encode()
+            for i in range(200)
+        ]
+        dict_id = self.store.store_dictionary("schedule", response_codecs.train_dictionary(samples, size=4096))
+
+        path = self.store.store_response("schedule", {"season_id": 7, "schedules": []}, season_id=7)
+        # A fresh instance loads the dictionary from storage
+        self.store._codecs.clear()
+        self.store._dictionaries.clear()
+
+        self.assertTrue(path.endswith(".json.zst"))
+        self.assertEqual(self.store.get_manifest("schedule", season_id=7)["dict_id"], dict_id)
+        self.assertEqual(self.store.retrieve_response("schedule", season_id=7), {"season_id": 7, "schedules": []})
+
+
+@override_settings(API_RESPONSE_CODECS={"default": "gzip"})
+class LocalArchiveTest(LocMemCacheTestCase):
+    """Test the local disk archive backend"""
+
+    def setUp(self):
+        super().setUp()
+        self.tmpdir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_roundtrip_with_memory_mapped_reads(self):
+        archive = {"BACKEND": "local", "LOCAL_ROOT": self.tmpdir.name, "MMAP_THRESHOLD": 0}
+        with override_settings(API_RESPONSE_ARCHIVE=archive):
+            store = APIResponseS3Storage()
+            store.store_response("schedule", {"season_id": 3}, season_id=3)
+            store.store_response("schedule", {"season_id": 3, "changed": True}, season_id=3)
+
+            self.assertEqual(
+                store.retrieve_response("schedule", season_id=3), {"season_id": 3, "changed": True}
+            )
+            # Manifests are overwritten in place, not renamed
+            manifest_id = store._manifest_id("schedule", season_id=3)
+            self.assertTrue(store.manifest_storage.exists(store._manifest_key(manifest_id)))
+            self.assertEqual(len(store.manifest_storage.listdir("manifests/schedule")[1]), 1)
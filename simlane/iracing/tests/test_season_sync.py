@@ -0,0 +1,335 @@
+"""
+Tests for season schedule processing
+"""
+
+import copy
+from datetime import datetime
+from datetime import timedelta
+from datetime import timezone as dt_timezone
+from unittest import mock
+
+from django.test import SimpleTestCase
+from django.test import TestCase
+
+from simlane.iracing.recurrence import RecurrenceHandler
+from simlane.iracing.season_sync import ScheduleProcessor
+from simlane.iracing.season_sync import schedule_fingerprints
+from simlane.sim.models import CarClass
+from simlane.sim.models import Event
+from simlane.sim.models import EventClass
+from simlane.sim.models import EventSession
+from simlane.sim.models import Season
+from simlane.sim.models import Series
+from simlane.sim.models import SimLayout
+from simlane.sim.models import SimTrack
+from simlane.sim.models import Simulator
+from simlane.sim.models import TimeSlot
+from simlane.sim.models import TrackModel
+
+
+def _week(round_num, start_date):
+    return {
+        "race_week_num": round_num,
+        "start_date": start_date,
+        "week_end_time": f"{start_date}T23:59:59+00:00",
+        "track": {"track_id": 101, "track_name": "Spa", "config_name": "Grand Prix"},
+        "weather": {
+            "simulated_start_time": f"{start_date}T13:00:00",
+            "simulated_time_offsets": [30, 60],
+            "weather_url": "https://example.com/forecast.json",
+        },
+        "practice_length": 20,
+        "race_time_limit": 40,
+        "race_time_descriptors": [
+            {
+                "repeating": False,
+                "session_minutes": 60,
+                "session_times": [f"{start_date}T18:00:00Z", f"{start_date}T20:00:00Z"],
+            }
+        ],
+    }
+
+
+class ScheduleProcessorBulkTest(TestCase):
+    """Bulk mode writes the same rows and counts as the per-row path"""
+
+    def setUp(self):
+        self.simulator = Simulator.objects.create(name="iRacing")
+        self.series = Series.objects.create(name="GT3", simulator=self.simulator)
+        self.season = Season.objects.create(
+            series=self.series,
+            external_season_id=5001,
+            name="2025 S1",
+            season_settings={"max_weeks": 12},
+        )
+        track = TrackModel.objects.create(name="Spa")
+        sim_track = SimTrack.objects.create(
+            simulator=self.simulator, track_model=track, sim_api_id="101", display_name="Spa"
+        )
+        SimLayout.objects.create(
+            sim_track=sim_track, layout_code="101", name="Grand Prix", type="ROAD", length_km=7.0
+        )
+        CarClass.objects.create(simulator=self.simulator, sim_api_id="7", name="GT3 Class")
+        self.season_data = {
+            "car_class_ids": [7],
+            "schedules": [_week(0, "2025-01-07"), _week(1, "2025-01-14")],
+        }
+
+    def _snapshot(self):
+        return {
+            "events": sorted(
+                Event.objects.values_list("round_number", "name", "slug", "status", "weather_forecast_url")
+            ),
+            "classes": sorted(EventClass.objects.values_list("event__round_number", "name", "slug", "class_order")),
+            "sessions": sorted(
+                EventSession.objects.values_list("event__round_number", "session_type", "duration", "in_game_time")
+            ),
+            "slots": sorted(TimeSlot.objects.values_list("event__round_number", "slug", "start_time", "end_time")),
+        }
+
+    def test_bulk_matches_per_row(self):
+        per_row = ScheduleProcessor(self.simulator).process_season_schedule(self.season, self.season_data)
+        per_row_rows = self._snapshot()
+        Event.objects.all().delete()
+
+        bulk = ScheduleProcessor(self.simulator, bulk=True).process_season_schedule(self.season, self.season_data)
+
+        self.assertEqual(self._snapshot(), per_row_rows)
+        self.assertEqual(bulk[:3], per_row[:3])
+        self.assertEqual(bulk[4:8], per_row[4:8])
+        self.assertEqual(len(bulk[3]), 2)
+        self.assertEqual(bulk[:3], (2, 0, 4))
+
+    def test_bulk_rerun_updates_existing_rows(self):
+        ScheduleProcessor(self.simulator, bulk=True).process_season_schedule(self.season, self.season_data)
+        event_ids = set(Event.objects.values_list("id", flat=True))
+
+        result = ScheduleProcessor(self.simulator, bulk=True).process_season_schedule(
+            self.season, self.season_data
+        )
+
+        events_created, events_updated, time_slots_created, weather_ids, *counts, errors = result
+        self.assertEqual((events_created, events_updated, time_slots_created), (0, 2, 0))
+        self.assertEqual(counts, [0, 4, 0, 2])
+        self.assertEqual(set(weather_ids), event_ids)
+        self.assertEqual(errors, [])
+        self.assertEqual(Event.objects.count(), 2)
+        self.assertEqual(TimeSlot.objects.count(), 4)
+
+    def test_weeks_with_missing_car_class_are_failed(self):
+        season_data = {**self.season_data, "car_class_ids": [7, 99]}
+        for bulk in (False, True):
+            with self.subTest(bulk=bulk):
+                processor = ScheduleProcessor(self.simulator, bulk=bulk)
+
+                processor.process_season_schedule(self.season, season_data)
+
+                self.assertEqual(processor.failed_weeks, {(self.season.pk, 0), (self.season.pk, 1)})
+
+
+class ScheduleProcessorFailedWeeksTest(SimpleTestCase):
+    """Test reporting of unwritten weeks and follow-ups of written ones"""
+
+    def test_weeks_without_layout_are_failed(self):
+        resolver = mock.Mock()
+        resolver.layout.return_value = None
+        processor = ScheduleProcessor(mock.Mock(), resolver=resolver)
+        season = mock.Mock(pk=1)
+
+        processor.collect_season_schedule(season, {"schedules": [_week(0, "2025-01-07"), _week(1, "2025-01-14")]})
+
+        self.assertEqual(processor.failed_weeks, {(1, 0), (1, 1)})
+
+    def test_bulk_flush_refreshes_upcoming_sessions(self):
+        processor = ScheduleProcessor(mock.Mock(), bulk=True, resolver=mock.Mock())
+        processor.batch = mock.Mock()
+        processor.batch.flush.return_value = {"weather_event_ids": [], "event_ids": [1, 2]}
+
+        with mock.patch("simlane.iracing.season_sync.refresh_upcoming_sessions_on_commit") as refresh:
+            processor.flush()
+
+        refresh.assert_called_once_with([1, 2])
+
+
+class UpcomingSessionsRefreshTest(TestCase):
+    """Time slot writes refresh the upcoming sessions once per transaction"""
+
+    def setUp(self):
+        self.simulator = Simulator.objects.create(name="iRacing")
+        track = TrackModel.objects.create(name="Spa")
+        sim_track = SimTrack.objects.create(
+            simulator=self.simulator, track_model=track, sim_api_id="101", display_name="Spa"
+        )
+        self.layout = SimLayout.objects.create(
+            sim_track=sim_track, layout_code="101", name="Grand Prix", type="ROAD", length_km=7.0
+        )
+
+    def _slot(self, event, start):
+        return TimeSlot(
+            event=event,
+            start_time=start,
+            end_time=start + timedelta(hours=1),
+            registration_open=start - timedelta(hours=1),
+            registration_ends=start,
+        )
+
+    def test_writes_of_one_transaction_are_refreshed_together(self):
+        start = datetime(2030, 1, 7, 18, tzinfo=dt_timezone.utc)
+
+        with (
+            mock.patch("simlane.iracing.recurrence.refresh_upcoming_sessions") as refresh,
+            self.captureOnCommitCallbacks(execute=True) as callbacks,
+        ):
+            events = [
+                Event.objects.create(simulator=self.simulator, sim_layout=self.layout, name=name)
+                for name in ("A", "B")
+            ]
+            for event in events:
+                for hours in (0, 2):
+                    self._slot(event, start + timedelta(hours=hours)).save()
+
+        self.assertEqual(len(callbacks), 1)
+        refresh.assert_called_once_with(event_ids={event.id for event in events})
+
+    def test_refresh_fills_next_session_start(self):
+        start = datetime(2030, 1, 7, 18, tzinfo=dt_timezone.utc)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            event = Event.objects.create(simulator=self.simulator, sim_layout=self.layout, name="A")
+            self._slot(event, start).save()
+
+        event.refresh_from_db()
+        self.assertEqual(event.next_session_start, start)
+        self.assertEqual(event.upcoming_session_starts, [start])
+
+
+class ScheduleFingerprintTest(SimpleTestCase):
+    """Test change detection hashes"""
+
+    NOW = datetime(2025, 1, 10, tzinfo=dt_timezone.utc)
+
+    def setUp(self):
+        self.season_data = {
+            "season_id": 5001,
+            "car_class_ids": [7],
+            "schedules": [_week(0, "2025-01-07"), _week(1, "2025-01-14")],
+        }
+
+    def test_stable_across_key_order(self):
+        reordered = {key: self.season_data[key] for key in reversed(list(self.season_data))}
+
+        self.assertEqual(
+            schedule_fingerprints(reordered, self.NOW), schedule_fingerprints(self.season_data, self.NOW)
+        )
+
+    def test_week_change_only_changes_that_week(self):
+        season_hash, week_hashes = schedule_fingerprints(self.season_data, self.NOW)
+        changed = copy.deepcopy(self.season_data)
+        changed["schedules"][1]["race_time_limit"] = 60
+
+        changed_hash, changed_weeks = schedule_fingerprints(changed, self.NOW)
+
+        self.assertNotEqual(changed_hash, season_hash)
+        self.assertEqual(changed_weeks["0"], week_hashes["0"])
+        self.assertNotEqual(changed_weeks["1"], week_hashes["1"])
+
+    def test_season_field_change_changes_every_week(self):
+        _season_hash, week_hashes = schedule_fingerprints(self.season_data, self.NOW)
+        changed = {**self.season_data, "fixed_setup": True}
+
+        _changed_hash, changed_weeks = schedule_fingerprints(changed, self.NOW)
+
+        self.assertTrue(all(changed_weeks[week] != week_hashes[week] for week in week_hashes))
+
+    def test_status_transition_changes_week(self):
+        _season_hash, week_hashes = schedule_fingerprints(self.season_data, self.NOW)
+        later = datetime(2025, 1, 14, 12, tzinfo=dt_timezone.utc)
+
+        _later_hash, later_weeks = schedule_fingerprints(self.season_data, later)
+
+        self.assertEqual(later_weeks["0"], week_hashes["0"])
+        self.assertNotEqual(later_weeks["1"], week_hashes["1"])
+
+
+def _stepped_starts(descriptor, start, end):
+    """Reference: step day by day and session by session."""
+    base = datetime.fromisoformat(descriptor["start_date"]).replace(tzinfo=dt_timezone.utc)
+    hour, minute, second = (int(part) for part in descriptor["first_session_time"].split(":"))
+    starts = []
+    day = max(start.date(), base.date())
+    while day <= end.date():
+        if (day - base.date()).days % 7 in descriptor["day_offset"]:
+            slot = datetime(day.year, day.month, day.day, hour, minute, second, tzinfo=dt_timezone.utc)
+            while slot.date() == day:
+                if start <= slot <= end:
+                    starts.append(slot)
+                slot += timedelta(minutes=descriptor["repeat_minutes"])
+        day += timedelta(days=1)
+    return starts
+
+
+class RecurrenceHandlerTest(SimpleTestCase):
+    """Test closed-form session start generation"""
+
+    DESCRIPTOR = {
+        "repeating": True,
+        "start_date": "2025-01-07",
+        "first_session_time": "00:45:00",
+        "repeat_minutes": 120,
+        "session_minutes": 60,
+        "day_offset": [0, 2, 4, 6],
+    }
+
+    def test_matches_stepped_generation(self):
+        start = datetime(2025, 1, 6, 10, 30, tzinfo=dt_timezone.utc)
+        for repeat_minutes in (45, 120, 180):
+            for first_session_time in ("00:00:00", "00:45:00", "23:15:30"):
+                descriptor = {
+                    **self.DESCRIPTOR,
+                    "repeat_minutes": repeat_minutes,
+                    "first_session_time": first_session_time,
+                }
+                for days in (0.1, 1, 9.5):
+                    end = start + timedelta(days=days)
+                    self.assertEqual(
+                        list(RecurrenceHandler.iter_slot_starts(descriptor, start, end)),
+                        _stepped_starts(descriptor, start, end),
+                    )
+
+    def test_generates_slots_from_descriptor_list(self):
+        event = Event(name="GT3", time_pattern=[self.DESCRIPTOR, {"repeating": False}])
+        start = datetime(2025, 1, 7, tzinfo=dt_timezone.utc)
+
+        slots = RecurrenceHandler.generate_time_slots_for_period(event, start, start + timedelta(hours=5))
+
+        self.assertEqual(
+            [slot["start_time"].strftime("%H:%M") for slot in slots], ["00:45", "02:45", "04:45"]
+        )
+        self.assertEqual(slots[0]["end_time"] - slots[0]["start_time"], timedelta(minutes=60))
+
+    def test_next_slots_merge_patterns_up_to_limit(self):
+        other = {**self.DESCRIPTOR, "first_session_time": "01:15:00", "session_minutes": 30}
+        event = Event(name="GT3", time_pattern=[self.DESCRIPTOR, other])
+        start = datetime(2025, 1, 7, tzinfo=dt_timezone.utc)
+        end = start + timedelta(hours=5)
+
+        slots = RecurrenceHandler.next_slots(event, start, end, limit=3)
+
+        self.assertEqual(
+            slots, RecurrenceHandler.generate_time_slots_for_period(event, start, end)[:3]
+        )
+        self.assertEqual(
+            [slot["start_time"].strftime("%H:%M") for slot in slots], ["00:45", "01:15", "02:45"]
+        )
+
+    def test_upcoming_starts_merge_scheduled_slots(self):
+        end_date = datetime(2025, 1, 8, 3, tzinfo=dt_timezone.utc)
+        event = Event(name="GT3", time_pattern=[self.DESCRIPTOR], end_date=end_date)
+        now = datetime(2025, 1, 7, 22, tzinfo=dt_timezone.utc)
+        scheduled = [datetime(2025, 1, 7, 22, 30, tzinfo=dt_timezone.utc)]
+
+        starts = RecurrenceHandler.upcoming_session_starts(event, now, scheduled, count=3)
+
+        self.assertEqual(
+            [start.strftime("%d %H:%M") for start in starts], ["07 22:30", "07 22:45"]
+        )
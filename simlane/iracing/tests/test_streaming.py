@@ -0,0 +1,111 @@
+"""
+Tests for streaming iRacing payloads
+"""
+
+import json
+from unittest.mock import patch
+
+from django.test import SimpleTestCase
+
+from simlane.core.testing import LocMemCacheTestCase
+from simlane.iracing.client import IRacingClient
+from simlane.iracing.streaming import JSONItemStream
+from simlane.iracing.streaming import JSONStreamError
+from simlane.iracing.streaming import find_chunk_info
+from simlane.iracing.streaming import iter_json_items
+
+
+def _split(payload, size: int) -> list[bytes]:
+    data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+    return [data[i : i + size] for i in range(0, len(data), size)]
+
+
+class JSONItemStreamTest(SimpleTestCase):
+    """Test incremental JSON parsing"""
+
+    def test_array_items_across_chunk_boundaries(self):
+        """Items split mid-number and mid multi-byte character still decode"""
+        records = [{"driver": "Jérôme Ünal", "lap_time": 1234567}, 98765, "x", None, [1, 2]]
+
+        for size in (1, 2, 3, 7, 1024):
+            self.assertEqual(list(iter_json_items(_split(records, size))), records)
+
+    def test_item_key_streams_nested_array_and_collects_fields(self):
+        payload = {"season_id": 5001, "schedules": [{"race_week_num": 0}, {"race_week_num": 1}], "success": True}
+        stream = JSONItemStream(_split(payload, 5), item_key="schedules")
+
+        self.assertEqual([week["race_week_num"] for week in stream], [0, 1])
+        self.assertEqual(stream.fields, {"season_id": 5001, "success": True})
+
+    def test_object_without_item_key_is_single_item(self):
+        payload = {"chunk_info": {"num_chunks": 0}}
+
+        self.assertEqual(list(iter_json_items(_split(payload, 4))), [payload])
+
+    def test_truncated_stream_raises(self):
+        with self.assertRaises(JSONStreamError):
+            list(iter_json_items([b'[{"a": 1}, {"b": ']))
+
+    def test_find_chunk_info_in_results_envelope(self):
+        chunk_info = {"base_download_url": "https://s3/", "chunk_file_names": ["a.json"]}
+
+        self.assertEqual(find_chunk_info({"type": "event_log", "data": {"chunk_info": chunk_info}}), chunk_info)
+        self.assertIsNone(find_chunk_info([{"chunk_info": chunk_info}]))
+
+
+class ChunkedRecordsTest(LocMemCacheTestCase):
+    """Test expansion of chunk_info results"""
+
+    def setUp(self):
+        super().setUp()
+        self.client = IRacingClient(username="driver@example.com", password="secret")
+
+    def test_chunk_records_are_yielded_in_order(self):
+        chunks = {
+            "https://s3/c0.json": json.dumps([{"row": 0}, {"row": 1}]).encode(),
+            "https://s3/c1.json": json.dumps([{"row": 2}]).encode(),
+            "https://s3/c2.json": json.dumps([]).encode(),
+            "https://s3/c3.json": json.dumps([{"row": 3}]).encode(),
+        }
+        response = {
+            "type": "event_log",
+            "data": {
+                "chunk_info": {
+                    "base_download_url": "https://s3/",
+                    "chunk_file_names": ["c0.json", "c1.json", "c2.json", "c3.json"],
+                }
+            },
+        }
+
+        with (
+            patch.object(self.client, "_request", return_value=response),
+            patch.object(self.client, "_download_chunk", side_effect=chunks.__getitem__),
+        ):
+            rows = list(self.client.iter_records("/data/results/event_log", {"subsession_id": 1}))
+
+        self.assertEqual([row["row"] for row in rows], [0, 1, 2, 3])
+
+    def test_in_memory_payload_uses_item_key(self):
+        response = {"season_id": 1, "schedules": [{"race_week_num": 0}]}
+
+        with patch.object(self.client, "_request", return_value=response):
+            weeks = list(self.client.iter_series_season_schedule(1))
+
+        self.assertEqual(weeks, [{"race_week_num": 0}])
+
+    def test_subsession_results_stream_the_requested_session(self):
+        payload = {
+            "subsession_id": 9,
+            "session_results": [
+                {"simsession_number": -1, "results": [{"team_id": 1, "finish_position": 1}]},
+                {"simsession_number": 0, "results": [{"team_id": 1, "finish_position": 2}, {"team_id": 2}]},
+            ],
+        }
+
+        with (
+            patch.object(self.client, "_request", return_value={"link": "https://s3/results.json"}),
+            patch.object(self.client, "_iter_link_content", return_value=_split(payload, 16)),
+        ):
+            rows = list(self.client.iter_subsession_results(9))
+
+        self.assertEqual(rows, [{"team_id": 1, "finish_position": 2}, {"team_id": 2}])
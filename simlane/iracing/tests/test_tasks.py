@@ -0,0 +1,127 @@
+"""
+Tests for the current season sync fan-out
+"""
+
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from simlane.iracing import tasks
+
+
+class CurrentSeasonsFanoutTest(SimpleTestCase):
+    """Test batch splitting, dispatch and result aggregation"""
+
+    def test_split_season_ids(self):
+        self.assertEqual(tasks._split_season_ids([1, 2, 3, 4, 5], 2), [[1, 3, 5], [2, 4]])
+        self.assertEqual(tasks._split_season_ids([1, 2], 8), [[1], [2]])
+        self.assertEqual(tasks._split_season_ids([1, 2], 0), [[1, 2]])
+
+    def test_merge_results(self):
+        merged = tasks._merge_current_seasons_results(
+            [
+                {
+                    "success": True,
+                    "seasons_processed": 2,
+                    "events_created": 5,
+                    "errors": ["a"],
+                    "lookup_stats": {"layout": {"hit": 3, "miss": 1}},
+                },
+                {
+                    "success": True,
+                    "seasons_processed": 1,
+                    "events_created": 1,
+                    "errors": [],
+                    "lookup_stats": {"layout": {"hit": 2, "fallback": 1}},
+                },
+                {"success": False, "error": "boom"},
+            ]
+        )
+
+        self.assertEqual(merged["seasons_processed"], 3)
+        self.assertEqual(merged["events_created"], 6)
+        self.assertEqual(merged["errors"], ["a", "boom"])
+        self.assertEqual(merged["lookup_stats"], {"layout": {"hit": 5, "miss": 1, "fallback": 1}})
+        self.assertNotIn("success", merged)
+
+    @mock.patch.object(tasks, "_ensure_service_available")
+    @mock.patch.object(tasks.Simulator.objects, "get")
+    @mock.patch.object(tasks, "cached_iracing_service")
+    def test_fans_out_one_subtask_per_batch(self, service, _get_simulator, _ensure):
+        service.get_series_seasons.return_value = [{"season_id": i} for i in range(1, 6)]
+
+        with mock.patch.object(tasks, "chord") as chord, mock.patch.object(tasks, "group") as group:
+            result = tasks.sync_current_seasons_task.run(force=True, fanout=2)
+
+        header = list(group.call_args.args[0])
+        self.assertEqual([signature.args for signature in header], [([1, 3, 5],), ([2, 4],)])
+        self.assertTrue(all(signature.kwargs == {"force": True} for signature in header))
+        chord.assert_called_once_with(group.return_value)
+        self.assertEqual((result["seasons_queued"], result["batches_queued"]), (5, 2))
+
+
+class SyncCurrentSeasonsDataTest(SimpleTestCase):
+    """Test failures while writing the collected events"""
+
+    @mock.patch.object(tasks, "transaction")
+    @mock.patch.object(tasks, "SimContentResolver")
+    @mock.patch.object(tasks.ScheduleProcessor, "flush", side_effect=RuntimeError("boom"))
+    def test_write_failure_without_bulk_batch(self, _flush, _resolver, _transaction):
+        result = tasks.sync_current_seasons_data([], mock.Mock(), bulk=False, force=True)
+
+        self.assertEqual(result["errors"], ["Error writing current season events: boom"])
+
+    @mock.patch.object(tasks.Season.objects, "bulk_update")
+    def test_hashes_of_failed_weeks_are_not_stored(self, bulk_update):
+        synced, failed = mock.Mock(pk=1), mock.Mock(pk=2)
+
+        tasks._store_schedule_hashes(
+            [(synced, "season-1", {"0": "a", "1": "b"}), (failed, "season-2", {"0": "c", "1": "d"})],
+            {(2, 1)},
+        )
+
+        self.assertEqual((synced.schedule_hash, synced.schedule_week_hashes), ("season-1", {"0": "a", "1": "b"}))
+        self.assertEqual((failed.schedule_hash, failed.schedule_week_hashes), ("", {"0": "c"}))
+        bulk_update.assert_called_once()
+
+
+class StreamedSeasonSyncTest(SimpleTestCase):
+    """Test syncing a season from its streamed schedule"""
+
+    @mock.patch.object(tasks, "create_season_from_schedule_data")
+    @mock.patch.object(tasks, "ScheduleProcessor")
+    @mock.patch.object(tasks.Series.objects, "get")
+    @mock.patch.object(tasks.Simulator.objects, "get")
+    @mock.patch.object(tasks, "iracing_service")
+    def test_weeks_are_processed_from_the_stream(self, service, _get_simulator, _get_series, processor, create_season):
+        weeks = [
+            {"series_id": 7, "season_name": "S1", "race_week_num": 0, "start_date": "2025-01-07", "week_end_time": "2025-01-13T23:59:59Z"},
+            {"series_id": 7, "season_name": "S1", "race_week_num": 1, "start_date": "2025-01-14", "week_end_time": "2025-01-20T23:59:59Z"},
+        ]
+        service.iter_series_season_schedule.return_value = iter(weeks)
+        processed = []
+
+        def process(season, season_data, schedules):
+            processed.extend(schedules)
+            return (0, 0, 0, [], 0, 0, 0, 0, [])
+
+        processor.return_value.process_season_schedule.side_effect = process
+
+        with mock.patch.object(tasks, "_queue_weather_sync", return_value=0):
+            result = tasks.sync_season_task.run(5001, stream=True)
+
+        self.assertTrue(result["success"])
+        self.assertEqual(processed, weeks)
+        season_data = create_season.call_args.args[1]
+        self.assertEqual((season_data["season_id"], season_data["series_id"]), (5001, 7))
+        # The date range is set again once every week was read
+        self.assertEqual(create_season.call_count, 2)
+        self.assertEqual([week["start_date"] for week in season_data["schedules"]], ["2025-01-07", "2025-01-14"])
+
+    @mock.patch.object(tasks, "iracing_service")
+    def test_empty_stream_fails(self, service):
+        service.iter_series_season_schedule.return_value = iter([])
+
+        result = tasks.sync_season_task.run(5001, stream=True)
+
+        self.assertFalse(result["success"])
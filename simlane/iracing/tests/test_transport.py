@@ -0,0 +1,96 @@
+"""
+Tests for the iRacing record/replay transports
+"""
+
+import json
+import tempfile
+from unittest.mock import Mock
+
+import requests
+from django.test import SimpleTestCase
+
+from simlane.core.testing import LocMemCacheTestCase
+from simlane.iracing.client import IRacingClient
+from simlane.iracing.transport import ReplayAdapter
+from simlane.iracing.transport import ResponseCorpus
+from simlane.iracing.transport import _build_response
+
+
+def _recorded(url: str, payload) -> requests.Response:
+    request = requests.Request("GET", url).prepare()
+    return _build_response(request, 200, json.dumps(payload))
+
+
+class ResponseCorpusTest(SimpleTestCase):
+    """Test the on-disk response corpus"""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.corpus = ResponseCorpus(self.tmpdir.name)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_save_and_load_roundtrip(self):
+        url = "https://members-ng.iracing.com/data/car/get?b=2&a=1"
+        self.corpus.save("GET", url, _recorded(url, [{"car_id": 1}]))
+
+        # Parameter order does not change the key
+        entry = self.corpus.load("GET", "https://members-ng.iracing.com/data/car/get?a=1&b=2")
+
+        self.assertEqual(entry["status"], 200)
+        self.assertEqual(json.loads(entry["body"]), [{"car_id": 1}])
+        self.assertEqual(len(self.corpus), 1)
+
+    def test_presigned_links_ignore_signature(self):
+        first = "https://scorpio-assets.s3.amazonaws.com/data/car.json?X-Amz-Signature=abc"
+        second = "https://scorpio-assets.s3.amazonaws.com/data/car.json?X-Amz-Signature=def"
+
+        self.assertEqual(
+            ResponseCorpus.request_key("GET", first),
+            ResponseCorpus.request_key("GET", second),
+        )
+
+
+class ReplayAdapterTest(LocMemCacheTestCase):
+    """Test serving client requests from a corpus"""
+
+    def setUp(self):
+        super().setUp()
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.corpus = ResponseCorpus(self.tmpdir.name)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def _client(self, adapter: ReplayAdapter) -> IRacingClient:
+        client = IRacingClient(username="replay@example.com", password="replay", transport=adapter)
+        client.rate_limiter = Mock()
+        client.RETRY_DELAY = 0
+        return client
+
+    def test_replayed_session_is_cached_apart_from_live_session(self):
+        client = self._client(ReplayAdapter(self.corpus))
+
+        self.assertNotEqual(client.session_cache_key, IRacingClient.SESSION_CACHE_KEY)
+
+    def test_replays_recorded_and_linked_responses(self):
+        link = "https://scorpio-assets.s3.amazonaws.com/data/cars.json?X-Amz-Signature=abc"
+        endpoint_url = f"{IRacingClient.BASE_URL}/data/car/get"
+        self.corpus.save("GET", endpoint_url, _recorded(endpoint_url, {"link": link}))
+        self.corpus.save("GET", link, _recorded(link, [{"car_id": 7}]))
+        adapter = ReplayAdapter(self.corpus)
+
+        data = self._client(adapter)._make_request("/data/car/get", use_cache=False)
+
+        self.assertEqual(data, [{"car_id": 7}])
+        self.assertEqual(adapter.requests_served, 2)
+        self.assertEqual(adapter.requests_missed, 0)
+
+    def test_missing_entries_are_counted(self):
+        adapter = ReplayAdapter(self.corpus)
+
+        response = self._client(adapter).session.get(f"{IRacingClient.BASE_URL}/data/track/get")
+
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(adapter.requests_missed, 1)
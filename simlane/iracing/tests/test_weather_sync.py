@@ -0,0 +1,180 @@
+"""
+Tests for the batched weather forecast sync
+"""
+
+from unittest import mock
+
+from django.conf import settings
+from django.core.cache import caches
+from django.test import SimpleTestCase
+from django.test import TestCase
+from django.test import override_settings
+
+from simlane.core.testing import LOCMEM_CACHES
+from simlane.core.testing import LocMemCacheTestCase
+from simlane.iracing.auto_create import weather_forecast_fields
+from simlane.iracing.weather_sync import WeatherSync
+from simlane.iracing.weather_sync import _forecast_hash
+from simlane.iracing.weather_sync import _validator_key
+from simlane.sim.models import Event
+from simlane.sim.models import SimLayout
+from simlane.sim.models import SimTrack
+from simlane.sim.models import Simulator
+from simlane.sim.models import TrackModel
+
+URL = "https://example.com/forecast.json"
+FORECAST = [{"timestamp": "2025-01-07T13:00:00Z", "air_temp": 2150}]
+OLD_FORECAST = [{"timestamp": "2025-01-07T12:00:00Z", "air_temp": 1800}]
+
+
+def _response(status_code=200, data=None, headers=None):
+    response = mock.Mock(status_code=status_code, headers=headers or {})
+    response.json.return_value = data
+    return response
+
+
+class WeatherFetchTest(LocMemCacheTestCase):
+    """Test conditional, concurrent forecast downloads"""
+
+    def setUp(self):
+        super().setUp()
+        self.session = mock.Mock()
+        self.weather_sync = WeatherSync(max_workers=2, session=self.session)
+
+    def test_sends_stored_validators(self):
+        caches["api_cache"].set(_validator_key(URL), {"etag": '"abc"', "last_modified": ""})
+        self.session.get.return_value = _response(304)
+
+        fetch = self.weather_sync.fetch(URL)
+
+        self.assertTrue(fetch.not_modified)
+        self.assertEqual(self.session.get.call_args.kwargs["headers"], {"If-None-Match": '"abc"'})
+
+    def test_unconditional_fetch_returns_validators(self):
+        caches["api_cache"].set(_validator_key(URL), {"etag": '"abc"'})
+        self.session.get.return_value = _response(data=[{"time_offset": 0}], headers={"ETag": '"def"'})
+
+        fetch = self.weather_sync.fetch(URL, conditional=False)
+
+        self.assertEqual(self.session.get.call_args.kwargs["headers"], {})
+        self.assertEqual(fetch.data, [{"time_offset": 0}])
+        self.assertEqual(fetch.validators["etag"], '"def"')
+
+    def test_rejects_non_list_payload(self):
+        self.session.get.return_value = _response(data={"error": "nope"})
+
+        self.assertEqual(self.weather_sync.fetch(URL).error, "Weather forecast data is not a list")
+
+    def test_fetch_all_fetches_each_url_once(self):
+        self.session.get.return_value = _response(data=[])
+
+        fetches = self.weather_sync.fetch_all({URL: True, f"{URL}?v=2": False})
+
+        self.assertEqual(set(fetches), {URL, f"{URL}?v=2"})
+        self.assertEqual(self.session.get.call_count, 2)
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class WeatherSyncTest(TestCase):
+    """Test which forecast a sync sends validators for and reuses on a 304"""
+
+    def setUp(self):
+        for alias in settings.CACHES:
+            caches[alias].clear()
+        simulator = Simulator.objects.create(name="iRacing")
+        track = TrackModel.objects.create(name="Spa")
+        sim_track = SimTrack.objects.create(
+            simulator=simulator, track_model=track, sim_api_id="101", display_name="Spa"
+        )
+        layout = SimLayout.objects.create(
+            sim_track=sim_track, layout_code="101", name="Grand Prix", type="ROAD", length_km=7.0
+        )
+        self.stale, self.current = (
+            Event.objects.create(
+                simulator=simulator,
+                sim_layout=layout,
+                name=name,
+                weather_forecast_url=URL,
+                weather_forecast_data=data,
+            )
+            for name, data in (("Stale", OLD_FORECAST), ("Current", FORECAST))
+        )
+        self.session = mock.Mock()
+        self.weather_sync = WeatherSync(max_workers=2, session=self.session)
+
+    def _store_validators(self, data):
+        caches["api_cache"].set(
+            _validator_key(URL), {"etag": '"abc"', "last_modified": "", "data_hash": _forecast_hash(data)}
+        )
+
+    def _sync(self):
+        result = self.weather_sync.sync([self.stale.id, self.current.id])
+        self.stale.refresh_from_db()
+        self.current.refresh_from_db()
+        return result
+
+    def test_not_modified_reuses_the_forecast_the_validators_describe(self):
+        self._store_validators(FORECAST)
+        self.session.get.return_value = _response(304)
+
+        result = self._sync()
+
+        self.assertEqual(self.session.get.call_args.kwargs["headers"], {"If-None-Match": '"abc"'})
+        self.assertEqual((result["not_modified"], result["events_unchanged"], result["events_updated"]), (1, 1, 1))
+        self.assertEqual(self.stale.weather_forecast_data, FORECAST)
+        self.assertEqual(self.current.weather_forecast_data, FORECAST)
+
+    def test_unconditional_when_no_event_has_the_described_forecast(self):
+        self._store_validators([{"timestamp": "2025-01-07T14:00:00Z"}])
+        self.session.get.return_value = _response(data=FORECAST, headers={"ETag": '"def"'})
+
+        result = self._sync()
+
+        self.assertEqual(self.session.get.call_args.kwargs["headers"], {})
+        self.assertEqual(result["not_modified"], 0)
+        self.assertEqual(self.stale.weather_forecast_data, FORECAST)
+        self.assertEqual(
+            caches["api_cache"].get(_validator_key(URL)),
+            {"etag": '"def"', "last_modified": "", "data_hash": _forecast_hash(FORECAST)},
+        )
+
+    def test_refetches_when_validators_change_before_the_request(self):
+        # The events were checked against validators that were then replaced
+        self._store_validators([{"timestamp": "2025-01-07T14:00:00Z"}])
+        self.session.get.side_effect = [_response(304), _response(data=FORECAST, headers={"ETag": '"def"'})]
+
+        with mock.patch.object(WeatherSync, "_conditional_urls", return_value={URL: True}):
+            result = self._sync()
+
+        self.assertEqual(self.session.get.call_count, 2)
+        self.assertEqual(self.session.get.call_args.kwargs["headers"], {})
+        self.assertEqual((result["not_modified"], result["errors"]), (0, []))
+        self.assertEqual(self.stale.weather_forecast_data, FORECAST)
+
+    def test_refresh_ignores_validators(self):
+        self._store_validators(FORECAST)
+        self.session.get.return_value = _response(data=FORECAST)
+
+        result = self.weather_sync.sync([self.stale.id, self.current.id], refresh=True)
+
+        self.assertEqual(self.session.get.call_args.kwargs["headers"], {})
+        self.assertEqual(result["events_updated"], 2)
+
+
+class WeatherForecastFieldsTest(SimpleTestCase):
+    """Test unit conversion of forecast items"""
+
+    def test_converts_units(self):
+        timestamp, defaults = weather_forecast_fields(
+            {"timestamp": "2025-01-07T13:00:00Z", "air_temp": 2150, "pressure": 10130, "cloud_cover": 1500},
+            forecast_version=3,
+        )
+
+        self.assertEqual(timestamp.isoformat(), "2025-01-07T13:00:00+00:00")
+        self.assertEqual(defaults["air_temperature"], 21.5)
+        self.assertEqual(defaults["pressure"], 1013.0)
+        self.assertEqual(defaults["cloud_cover"], 100)
+        self.assertEqual(defaults["forecast_version"], 3)
+
+    def test_missing_timestamp(self):
+        self.assertIsNone(weather_forecast_fields({})[0])
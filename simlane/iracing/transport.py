@@ -0,0 +1,215 @@
+"""
+Record/replay transports for the iRacing client.
+
+The transports are ``requests`` adapters mounted on IRacingClient.session:
+
+- RecordingAdapter forwards requests to the network and writes every response
+  to a gzip-compressed on-disk corpus.
+- ReplayAdapter serves responses from that corpus without network access,
+  optionally injecting latency and 429/503 responses, so syncs can be run and
+  benchmarked without iRacing credentials.
+"""
+
+import gzip
+import hashlib
+import json
+import logging
+import random
+import time
+from http import HTTPStatus
+from pathlib import Path
+from typing import Any, Optional
+from urllib.parse import parse_qsl, urlsplit
+
+import requests
+from django.conf import settings
+from requests.adapters import BaseAdapter, HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+logger = logging.getLogger(__name__)
+
+# Only the headers the client reads are kept in the corpus
+RECORDED_HEADERS = ("content-type", "x-ratelimit-limit", "x-ratelimit-remaining", "x-ratelimit-reset")
+
+
+class ResponseCorpus:
+    """
+    On-disk store of recorded responses.
+
+    Entries are keyed by method, host, path and sorted query parameters.
+    Linked S3 payloads are keyed without their query string, because their
+    pre-signed signatures change on every request.
+    """
+
+    def __init__(self, root: str | Path):
+        self.root = Path(root)
+
+    @staticmethod
+    def request_key(method: str, url: str) -> str:
+        parts = urlsplit(url)
+        params = sorted(parse_qsl(parts.query, keep_blank_values=True))
+        # Pre-signed links carry volatile auth params, identify them by path only
+        if any(name.startswith("X-Amz-") for name, _ in params):
+            params = []
+        canonical = json.dumps(
+            [method.upper(), parts.netloc, parts.path, params], separators=(",", ":")
+        )
+        return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.root / key[:2] / f"{key}.json.gz"
+
+    def save(self, method: str, url: str, response: requests.Response) -> None:
+        key = self.request_key(method, url)
+        entry = {
+            "method": method.upper(),
+            "url": url.split("?")[0],
+            "status": response.status_code,
+            "headers": {
+                name: response.headers[name]
+                for name in RECORDED_HEADERS
+                if name in response.headers
+            },
+            "body": response.content.decode(response.encoding or "utf-8", errors="replace"),
+        }
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(gzip.compress(json.dumps(entry, ensure_ascii=False).encode("utf-8")))
+
+    def load(self, method: str, url: str) -> Optional[dict[str, Any]]:
+        path = self._path(self.request_key(method, url))
+        if not path.exists():
+            return None
+        return json.loads(gzip.decompress(path.read_bytes()))
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self.root.glob("*/*.json.gz")) if self.root.exists() else 0
+
+
+def _build_response(
+    request: requests.PreparedRequest,
+    status: int,
+    body: str,
+    headers: Optional[dict[str, str]] = None,
+) -> requests.Response:
+    """Build a requests.Response as HTTPAdapter would."""
+    response = requests.Response()
+    response.status_code = status
+    response.headers = CaseInsensitiveDict(headers or {"content-type": "application/json"})
+    response._content = body.encode("utf-8")
+    response.encoding = "utf-8"
+    response.url = request.url or ""
+    response.request = request
+    response.reason = HTTPStatus(status).phrase
+    return response
+
+
+class RecordingAdapter(HTTPAdapter):
+    """HTTP adapter that records every live response to a ResponseCorpus."""
+
+    def __init__(self, corpus: ResponseCorpus, **kwargs):
+        super().__init__(**kwargs)
+        self.corpus = corpus
+
+    def send(self, request: requests.PreparedRequest, **kwargs) -> requests.Response:
+        response = super().send(request, **kwargs)
+        # Never persist the login exchange, it carries credentials and cookies
+        if request.method == "GET":
+            try:
+                self.corpus.save(request.method, request.url or "", response)
+            except OSError as e:
+                logger.warning(f"Failed to record response for {request.url}: {e}")
+        return response
+
+
+class ReplayAdapter(BaseAdapter):
+    """
+    Adapter that answers requests from a ResponseCorpus.
+
+    Args:
+        corpus: Recorded responses
+        latency: Seconds added to every response
+        rate_limit_rate: Fraction of requests answered with HTTP 429
+        unavailable_rate: Fraction of requests answered with HTTP 503
+        seed: Seed for the injected failures, so runs are repeatable
+    """
+
+    def __init__(
+        self,
+        corpus: ResponseCorpus,
+        latency: float = 0.0,
+        rate_limit_rate: float = 0.0,
+        unavailable_rate: float = 0.0,
+        seed: int = 0,
+    ):
+        super().__init__()
+        self.corpus = corpus
+        self.latency = latency
+        self.rate_limit_rate = rate_limit_rate
+        self.unavailable_rate = unavailable_rate
+        self.random = random.Random(seed)
+        self.requests_served = 0
+        self.requests_missed = 0
+
+    def send(self, request: requests.PreparedRequest, **kwargs) -> requests.Response:
+        if self.latency:
+            time.sleep(self.latency)
+
+        url = request.url or ""
+        method = request.method or "GET"
+
+        # Logins are never recorded, answer them with a synthetic success
+        if method == "POST" and urlsplit(url).path == "/auth":
+            return _build_response(request, 200, json.dumps({"authcode": "replay"}))
+
+        roll = self.random.random()
+        if roll < self.rate_limit_rate:
+            return _build_response(
+                request,
+                429,
+                json.dumps({"error": "Rate limited"}),
+                {
+                    "content-type": "application/json",
+                    "x-ratelimit-remaining": "0",
+                    "x-ratelimit-reset": str(int(time.time()) + 1),
+                },
+            )
+        if roll < self.rate_limit_rate + self.unavailable_rate:
+            return _build_response(request, 503, json.dumps({"error": "Service Unavailable"}))
+
+        entry = self.corpus.load(method, url)
+        if entry is None:
+            self.requests_missed += 1
+            logger.warning(f"No recorded response for {method} {url}")
+            return _build_response(request, 404, json.dumps({"error": "Not recorded"}))
+
+        self.requests_served += 1
+        return _build_response(request, entry["status"], entry["body"], entry["headers"])
+
+    def close(self) -> None:
+        pass
+
+
+def build_transport_from_settings() -> Optional[BaseAdapter]:
+    """
+    Build the adapter configured in settings.IRACING_TRANSPORT.
+
+    Returns None for the default live transport.
+    """
+    config = getattr(settings, "IRACING_TRANSPORT", {}) or {}
+    mode = config.get("MODE", "live")
+    if mode == "live":
+        return None
+
+    corpus = ResponseCorpus(config["CORPUS_DIR"])
+    if mode == "record":
+        return RecordingAdapter(corpus)
+    if mode == "replay":
+        return ReplayAdapter(
+            corpus,
+            latency=config.get("LATENCY", 0.0),
+            rate_limit_rate=config.get("RATE_LIMIT_RATE", 0.0),
+            unavailable_rate=config.get("UNAVAILABLE_RATE", 0.0),
+            seed=config.get("SEED", 0),
+        )
+    raise ValueError(f"Unknown IRACING_TRANSPORT mode: {mode}")
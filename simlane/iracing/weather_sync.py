@@ -0,0 +1,246 @@
+"""
+Batched weather forecast sync.
+
+Many events share one weather forecast URL. WeatherSync groups a batch of
+events by weather_forecast_url, downloads each unique URL once over a pooled
+requests.Session on a small thread pool, and writes the events' cached
+forecasts and their WeatherTimeline rows with bulk queries in one transaction.
+
+The ETag/Last-Modified validators of every URL are kept in the api_cache
+together with a hash of the forecast they describe. Later syncs send a
+conditional request only when one of the events still has that forecast, and
+on a 304 the forecast of that event is reused and events that have it are
+left untouched.
+"""
+
+import hashlib
+import json
+import logging
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from dataclasses import field
+from typing import Any, Optional
+
+import requests
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from requests.adapters import HTTPAdapter
+
+from simlane.core.signals import invalidate_event_caches
+from simlane.iracing.auto_create import WEATHER_TIMELINE_FIELDS
+from simlane.iracing.auto_create import build_weather_timeline
+from simlane.sim.models import Event
+from simlane.sim.models import WeatherTimeline
+
+logger = logging.getLogger(__name__)
+
+FETCH_TIMEOUT = 10
+
+# Validators outliving the forecast only cost one unconditional request
+VALIDATOR_TIMEOUT = 7 * 24 * 60 * 60
+
+
+def _validator_key(url: str) -> str:
+    return f"weather_forecast_validators:{hashlib.sha256(url.encode()).hexdigest()}"
+
+
+def _forecast_hash(data: Any) -> str:
+    return hashlib.sha256(json.dumps(data, sort_keys=True, separators=(",", ":")).encode()).hexdigest()
+
+
+def _pooled_session(pool_size: int) -> requests.Session:
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+@dataclass
+class ForecastFetch:
+    """Outcome of fetching one forecast URL."""
+
+    url: str
+    data: Optional[list[dict[str, Any]]] = None
+    not_modified: bool = False
+    error: str = ""
+    validators: dict[str, str] = field(default_factory=dict)
+
+
+class WeatherSync:
+    """
+    Fetch and store the weather forecasts of many events.
+
+    Usage::
+
+        result = WeatherSync().sync(event_ids)
+    """
+
+    def __init__(self, max_workers: Optional[int] = None, session: Optional[requests.Session] = None):
+        self.max_workers = max_workers or settings.IRACING_WEATHER_FETCH_CONCURRENCY
+        self.session = session or _pooled_session(self.max_workers)
+
+    # Fetching
+
+    def fetch(self, url: str, conditional: bool = True) -> ForecastFetch:
+        """
+        GET a forecast URL, sending stored validators if ``conditional``.
+
+        A 304 carries the validators that were sent, so the caller can tell
+        which forecast was confirmed by their data_hash.
+        """
+        headers = {}
+        validators = {}
+        if conditional:
+            validators = caches["api_cache"].get(_validator_key(url)) or {}
+            if validators.get("etag"):
+                headers["If-None-Match"] = validators["etag"]
+            if validators.get("last_modified"):
+                headers["If-Modified-Since"] = validators["last_modified"]
+
+        try:
+            response = self.session.get(url, headers=headers, timeout=FETCH_TIMEOUT)
+            if response.status_code == 304:
+                return ForecastFetch(url=url, not_modified=True, validators=validators)
+            response.raise_for_status()
+            data = response.json()
+        except Exception as e:
+            logger.warning(f"Failed to fetch weather forecast {url}: {e}")
+            return ForecastFetch(url=url, error=str(e))
+
+        if not isinstance(data, list):
+            return ForecastFetch(url=url, error="Weather forecast data is not a list")
+
+        validators = {
+            "etag": response.headers.get("ETag", ""),
+            "last_modified": response.headers.get("Last-Modified", ""),
+            "data_hash": _forecast_hash(data),
+        }
+        return ForecastFetch(url=url, data=data, validators=validators)
+
+    def fetch_all(self, urls: dict[str, bool]) -> dict[str, ForecastFetch]:
+        """Fetch {url: conditional} concurrently."""
+        if not urls:
+            return {}
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(urls))) as executor:
+            fetches = executor.map(lambda item: self.fetch(*item), urls.items())
+            return {fetch.url: fetch for fetch in fetches}
+
+    # Syncing
+
+    def sync(self, event_ids: list[Any], refresh: bool = False) -> dict[str, Any]:
+        """
+        Sync the weather forecasts of some events.
+
+        Args:
+            event_ids: Ids of the events to sync
+            refresh: Download every forecast, ignoring stored validators, and
+                rewrite the forecasts of every event
+
+        Returns:
+            Dict of counters and errors
+        """
+        events_by_url: dict[str, list[Event]] = defaultdict(list)
+        for event in Event.objects.filter(id__in=event_ids).exclude(weather_forecast_url=""):
+            events_by_url[event.weather_forecast_url].append(event)
+
+        fetches = self.fetch_all(self._conditional_urls(events_by_url, refresh))
+
+        changed: list[tuple[Event, list[dict[str, Any]]]] = []
+        validators: dict[str, dict[str, str]] = {}
+        result = {
+            "events": sum(len(events) for events in events_by_url.values()),
+            "urls": len(events_by_url),
+            "not_modified": 0,
+            "events_unchanged": 0,
+            "errors": [],
+        }
+        for url, events in events_by_url.items():
+            fetch = fetches[url]
+            data = None
+            if fetch.not_modified:
+                data = self._cached_forecast(events, fetch.validators.get("data_hash"))
+                if data is None:
+                    # The validators were replaced after the events were checked
+                    fetch = self.fetch(url, conditional=False)
+            if fetch.error:
+                result["errors"].append(f"{url}: {fetch.error}")
+                continue
+            if data is not None:
+                result["not_modified"] += 1
+            else:
+                data = fetch.data
+                validators[url] = fetch.validators
+            for event in events:
+                if not refresh and event.weather_forecast_data == data:
+                    result["events_unchanged"] += 1
+                else:
+                    changed.append((event, data))
+
+        with transaction.atomic():
+            result["timelines_written"] = self._write(changed)
+
+        # Only remember validators once the forecast they describe is stored
+        for url, url_validators in validators.items():
+            if url_validators["etag"] or url_validators["last_modified"]:
+                caches["api_cache"].set(_validator_key(url), url_validators, VALIDATOR_TIMEOUT)
+
+        result["events_updated"] = len(changed)
+        logger.info(
+            f"Weather sync: {result['urls']} forecast urls for {result['events']} events, "
+            f"{result['not_modified']} not modified, {result['events_updated']} events updated, "
+            f"{result['timelines_written']} forecast timelines written, "
+            f"{len(result['errors'])} errors"
+        )
+        return result
+
+    def _conditional_urls(self, events_by_url: dict[str, list[Event]], refresh: bool) -> dict[str, bool]:
+        """
+        {url: conditional} for fetch_all().
+
+        A 304 is only useful if one of the events still has the forecast the
+        stored validators describe.
+        """
+        if refresh:
+            return dict.fromkeys(events_by_url, False)
+        stored = caches["api_cache"].get_many([_validator_key(url) for url in events_by_url])
+        return {
+            url: self._cached_forecast(events, stored.get(_validator_key(url), {}).get("data_hash")) is not None
+            for url, events in events_by_url.items()
+        }
+
+    @staticmethod
+    def _cached_forecast(events: list[Event], data_hash: Optional[str]) -> Optional[list[dict[str, Any]]]:
+        """The forecast of the first event whose forecast hashes to ``data_hash``."""
+        if not data_hash:
+            return None
+        for event in events:
+            if event.weather_forecast_data and _forecast_hash(event.weather_forecast_data) == data_hash:
+                return event.weather_forecast_data
+        return None
+
+    def _write(self, changed: list[tuple[Event, list[dict[str, Any]]]]) -> int:
+        """Store forecasts on the events and upsert their WeatherTimeline rows."""
+        if not changed:
+            return 0
+
+        events = []
+        timelines = {}
+        for event, data in changed:
+            event.weather_forecast_data = data
+            events.append(event)
+            timeline = build_weather_timeline(event, data, event.weather_forecast_version or 1)
+            timelines[(event.pk, timeline.forecast_version)] = timeline
+        Event.objects.bulk_update(events, ["weather_forecast_data"], batch_size=500)
+        WeatherTimeline.objects.bulk_create(
+            list(timelines.values()),
+            update_conflicts=True,
+            unique_fields=["event", "forecast_version"],
+            update_fields=[*WEATHER_TIMELINE_FIELDS, "updated_at"],
+            batch_size=500,
+        )
+
+        invalidate_event_caches(events)
+        return len(timelines)
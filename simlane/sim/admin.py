@@ -29,6 +29,7 @@ from .models import TeamResult
 from .models import TimeSlot
 from .models import TrackModel
 from .models import WeatherForecast
+from .models import WeatherTimeline
 
 
 # Inline classes for tabular displays
@@ -269,6 +270,7 @@ class ProfileRatingAdmin(ModelAdmin):
 
 @admin.register(WeatherForecast)
 class WeatherForecastAdmin(ModelAdmin):
+    # Deprecated rows, kept read-only until they are pruned
     list_display = [
         "event",
         "timestamp",
@@ -287,6 +289,29 @@ class WeatherForecastAdmin(ModelAdmin):
     raw_id_fields = ["event"]
     date_hierarchy = "timestamp"
 
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(WeatherTimeline)
+class WeatherTimelineAdmin(ModelAdmin):
+    list_display = [
+        "event",
+        "forecast_version",
+        "start_time",
+        "end_time",
+        "point_count",
+    ]
+    list_filter = ["forecast_version"]
+    search_fields = ["event__name"]
+    exclude = ["columns"]
+    readonly_fields = ["point_count", "start_time", "end_time", "created_at", "updated_at"]
+    raw_id_fields = ["event"]
+    date_hierarchy = "start_time"
+
 
 @admin.register(SimProfileCarOwnership)
 class SimProfileCarOwnershipAdmin(admin.ModelAdmin):
@@ -0,0 +1,59 @@
+"""
+Management command to delete legacy WeatherForecast rows.
+"""
+
+from django.core.management.base import BaseCommand
+from django.db.models import Exists
+from django.db.models import OuterRef
+
+from simlane.sim.models import WeatherForecast
+from simlane.sim.models import WeatherTimeline
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete WeatherForecast rows whose event and forecast version are stored "
+        "as a WeatherTimeline. Rows without a timeline are kept unless --all is given"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--all",
+            action="store_true",
+            help="Also delete rows that have no WeatherTimeline",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=5000,
+            help="Rows deleted per query",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only report how many rows would be deleted",
+        )
+
+    def handle(self, *args, **options):
+        forecasts = WeatherForecast.objects.all()
+        if not options["all"]:
+            forecasts = forecasts.filter(
+                Exists(
+                    WeatherTimeline.objects.filter(
+                        event_id=OuterRef("event_id"),
+                        forecast_version=OuterRef("forecast_version"),
+                    )
+                )
+            )
+
+        if options["dry_run"]:
+            self.stdout.write(f"Would delete {forecasts.count()} legacy weather forecasts")
+            return
+
+        deleted = 0
+        while True:
+            batch = list(forecasts.values_list("pk", flat=True)[: options["batch_size"]])
+            if not batch:
+                break
+            deleted += WeatherForecast.objects.filter(pk__in=batch).delete()[0]
+        self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} legacy weather forecasts"))
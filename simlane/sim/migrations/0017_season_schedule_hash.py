@@ -0,0 +1,23 @@
+# Generated by Django 5.1.11 on 2026-10-16 20:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sim', '0016_remove_event_registration_deadline_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='season',
+            name='schedule_hash',
+            field=models.CharField(blank=True, help_text='Hash of the schedule payload at the last complete sync', max_length=64),
+        ),
+        migrations.AddField(
+            model_name='season',
+            name='schedule_week_hashes',
+            field=models.JSONField(blank=True, default=dict, help_text='Hash of each synced week of the schedule, keyed by race week number'),
+        ),
+    ]
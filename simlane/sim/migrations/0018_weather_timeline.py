@@ -0,0 +1,108 @@
+# Generated by Django 5.1.11 on 2026-10-16 20:39
+
+import django.db.models.deletion
+import sys
+import uuid
+from array import array
+from django.db import migrations, models
+
+# Frozen copy of simlane.sim.utils.weather_timeline as of this migration, so
+# later changes to the codec do not change what the migration writes
+COLUMNS = (
+    ("timestamp", "q"),
+    ("time_offset", "i"),
+    ("is_sun_up", "B"),
+    ("affects_session", "B"),
+    ("air_temperature", "f"),
+    ("pressure", "f"),
+    ("wind_speed", "f"),
+    ("wind_direction", "H"),
+    ("precipitation_chance", "B"),
+    ("precipitation_amount", "f"),
+    ("allow_precipitation", "B"),
+    ("cloud_cover", "B"),
+    ("relative_humidity", "B"),
+    ("valid_stats", "B"),
+)
+
+
+def encode(points):
+    """Pack points, sorted by timestamp, into little-endian column arrays."""
+    points = sorted(points, key=lambda point: point["timestamp"])
+    blob = bytearray()
+    for name, typecode in COLUMNS:
+        if name == "timestamp":
+            values = [int(point["timestamp"].timestamp()) for point in points]
+        elif typecode == "f":
+            values = [float(point[name]) for point in points]
+        else:
+            values = [int(point[name]) for point in points]
+        column = array(typecode, values)
+        if sys.byteorder == "big":
+            column.byteswap()
+        blob += column.tobytes()
+    return bytes(blob)
+
+
+def forecasts_to_timelines(apps, schema_editor):
+    """Build a timeline from the WeatherForecast rows of every event and version."""
+    WeatherForecast = apps.get_model("sim", "WeatherForecast")
+    WeatherTimeline = apps.get_model("sim", "WeatherTimeline")
+
+    names = [name for name, _typecode in COLUMNS]
+    groups = {}
+    forecasts = WeatherForecast.objects.filter(event__isnull=False).order_by(
+        "event_id", "forecast_version", "timestamp"
+    )
+    for forecast in forecasts.iterator():
+        group = groups.setdefault(
+            (forecast.event_id, forecast.forecast_version),
+            {"points": {}, "units_info": forecast.units_info or {}},
+        )
+        # Later duplicates of a timestamp win, as with update_or_create
+        group["points"][forecast.timestamp] = {name: getattr(forecast, name) for name in names}
+
+    timelines = []
+    for (event_id, forecast_version), group in groups.items():
+        points = list(group["points"].values())
+        timelines.append(
+            WeatherTimeline(
+                event_id=event_id,
+                forecast_version=forecast_version,
+                start_time=points[0]["timestamp"],
+                end_time=points[-1]["timestamp"],
+                point_count=len(points),
+                columns=encode(points),
+                units_info=group["units_info"],
+            )
+        )
+    WeatherTimeline.objects.bulk_create(timelines, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sim', '0017_season_schedule_hash'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WeatherTimeline',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('forecast_version', models.IntegerField(help_text='Weather forecast API version (1=Forecast/hourly, 3=Timeline/15min)')),
+                ('start_time', models.DateTimeField(blank=True, help_text='Timestamp of the first forecast point', null=True)),
+                ('end_time', models.DateTimeField(blank=True, help_text='Timestamp of the last forecast point', null=True)),
+                ('point_count', models.PositiveIntegerField(default=0)),
+                ('columns', models.BinaryField(help_text='Packed little-endian arrays, one per forecast column')),
+                ('units_info', models.JSONField(blank=True, default=dict, help_text='Units and conversion factors of the columns')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('event', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='weather_timelines', to='sim.event')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('event', 'forecast_version'), name='unique_weather_timeline_per_event_version')],
+            },
+        ),
+        migrations.RunPython(forecasts_to_timelines, migrations.RunPython.noop),
+    ]
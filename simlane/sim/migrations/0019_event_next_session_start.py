@@ -0,0 +1,37 @@
+# Generated by Django 5.1.11 on 2026-10-16 20:41
+
+import django.contrib.postgres.fields
+from django.db import migrations, models
+
+
+def fill_upcoming_sessions(apps, schema_editor):
+    # Fill the new columns now, the upcoming events list filters on them and
+    # would stay empty until the periodic refresh runs
+    from simlane.iracing.recurrence import fill_upcoming_sessions
+
+    fill_upcoming_sessions(apps.get_model('sim', 'Event'), apps.get_model('sim', 'TimeSlot'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sim', '0018_weather_timeline'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='event',
+            name='next_session_start',
+            field=models.DateTimeField(blank=True, help_text='Start of the next session, if any', null=True),
+        ),
+        migrations.AddField(
+            model_name='event',
+            name='upcoming_session_starts',
+            field=django.contrib.postgres.fields.ArrayField(base_field=models.DateTimeField(), blank=True, default=list, help_text='Starts of the next few sessions, soonest first', size=None),
+        ),
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(fields=['next_session_start'], name='sim_event_next_se_1167ce_idx'),
+        ),
+        migrations.RunPython(fill_upcoming_sessions, migrations.RunPython.noop),
+    ]
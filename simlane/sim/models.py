@@ -1092,6 +1092,18 @@ class Season(models.Model):
     schedule_description = models.TextField(blank=True)
     season_settings = models.JSONField(null=True, blank=True)
 
+    # Change detection for schedule syncs
+    schedule_hash = models.CharField(
+        max_length=64,
+        blank=True,
+        help_text="Hash of the schedule payload at the last complete sync",
+    )
+    schedule_week_hashes = models.JSONField(
+        default=dict,
+        blank=True,
+        help_text="Hash of each synced week of the schedule, keyed by race week number",
+    )
+
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -1348,6 +1360,21 @@ class Event(models.Model):
         help_text="Maximum precipitation chance percentage (0-100)",
     )
 
+    # Next session starts from time slots and repeating time patterns,
+    # refreshed when the event or its time slots are written and
+    # periodically by refresh_upcoming_sessions_task as sessions pass
+    next_session_start = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text="Start of the next session, if any",
+    )
+    upcoming_session_starts = ArrayField(
+        models.DateTimeField(),
+        default=list,
+        blank=True,
+        help_text="Starts of the next few sessions, soonest first",
+    )
+
     # Track state
     track_state = models.JSONField(
         null=True,
@@ -1382,6 +1409,7 @@ class Event(models.Model):
             # Indexes for round_number and merged fields
             models.Index(fields=["round_number"]),
             models.Index(fields=["start_date", "end_date"]),
+            models.Index(fields=["next_session_start"]),
         ]
         constraints = [
             models.CheckConstraint(
@@ -1918,6 +1946,15 @@ class ProfileRating(models.Model):
 
 
 class WeatherForecast(models.Model):
+    """
+    Deprecated per-point forecast rows, no longer written.
+
+    Forecasts are stored as WeatherTimeline; migration 0018 converted the
+    existing rows. Remove converted rows with
+    ``manage.py prune_legacy_weather_forecasts``; the model will be dropped
+    once that has run everywhere.
+    """
+
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     time_slot = models.ForeignKey(
         TimeSlot,
@@ -2012,6 +2049,92 @@ class WeatherForecast(models.Model):
         return f"{self.event.name} - {self.time_offset} minutes"
 
 
+class WeatherTimeline(models.Model):
+    """
+    Every point of an event's weather forecast, stored column-wise.
+
+    Replaces one WeatherForecast row per point; see
+    simlane.sim.utils.weather_timeline for the encoding.
+    """
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    event = models.ForeignKey(
+        Event,
+        on_delete=models.CASCADE,
+        related_name="weather_timelines",
+    )
+    forecast_version = models.IntegerField(
+        help_text="Weather forecast API version (1=Forecast/hourly, 3=Timeline/15min)",
+    )
+    start_time = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text="Timestamp of the first forecast point",
+    )
+    end_time = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text="Timestamp of the last forecast point",
+    )
+    point_count = models.PositiveIntegerField(default=0)
+    columns = models.BinaryField(
+        help_text="Packed little-endian arrays, one per forecast column",
+    )
+    units_info = models.JSONField(
+        default=dict,
+        blank=True,
+        help_text="Units and conversion factors of the columns",
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["event", "forecast_version"],
+                name="unique_weather_timeline_per_event_version",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.event.name} - v{self.forecast_version} ({self.point_count} points)"
+
+    def set_points(self, points: list[dict]) -> None:
+        """Encode forecast points into this timeline."""
+        from simlane.sim.utils import weather_timeline
+
+        self.columns = weather_timeline.encode(points)
+        self.point_count = len(points)
+        timestamps = [point["timestamp"] for point in points]
+        self.start_time = min(timestamps, default=None)
+        self.end_time = max(timestamps, default=None)
+
+    def decode(self, resolution_minutes: int | None = None) -> dict[str, list]:
+        """Column arrays of the forecast, optionally downsampled."""
+        from simlane.sim.utils import weather_timeline
+
+        columns = weather_timeline.decode(bytes(self.columns), self.point_count)
+        if resolution_minutes:
+            columns = weather_timeline.downsample(columns, resolution_minutes)
+        return columns
+
+    def points(self, resolution_minutes: int | None = None) -> list[dict]:
+        """
+        Forecast points as dicts, optionally downsampled.
+
+        Each point carries the timeline's forecast_version and an id derived
+        from the timeline and the point's timestamp, stable across reads, in
+        place of the WeatherForecast row fields of the same names.
+        """
+        from simlane.sim.utils import weather_timeline
+
+        points = weather_timeline.to_points(self.decode(resolution_minutes))
+        for point in points:
+            point["id"] = uuid.uuid5(self.id, str(int(point["timestamp"].timestamp())))
+            point["forecast_version"] = self.forecast_version
+        return points
+
+
 class SimProfileCarOwnership(models.Model):
     sim_profile = models.ForeignKey(
         "sim.SimProfile",
@@ -1 +1,260 @@
-# Create your tests here.
+from datetime import datetime
+from datetime import timedelta
+from datetime import timezone as dt_timezone
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from simlane.core.testing import PatchingTestCase
+from simlane.sim.models import EventResult
+from simlane.sim.models import ParticipantResult
+from simlane.sim.models import SimProfile
+from simlane.sim.models import Simulator
+from simlane.sim.models import TeamResult
+from simlane.sim.models import WeatherTimeline
+from simlane.sim.utils import result_processing
+from simlane.sim.utils.result_processing import PARTICIPANT_RESULT_UPDATE_FIELDS
+from simlane.sim.utils.result_processing import TEAM_RESULT_UPDATE_FIELDS
+from simlane.sim.utils.result_processing import create_team_and_participant_results
+from simlane.sim.utils.result_processing import ingest_team_results
+from simlane.sim.utils.result_processing import resolve_sim_profiles
+from simlane.sim.utils.result_processing import resolve_teams
+from simlane.sim.utils.weather_timeline import chart_resolution
+from simlane.sim.utils.weather_timeline import decode
+from simlane.sim.utils.weather_timeline import downsample
+from simlane.sim.utils.weather_timeline import encode
+from simlane.teams.models import Team
+
+START = datetime(2025, 1, 7, 13, tzinfo=dt_timezone.utc)
+
+
+def _point(minutes, **fields):
+    return {
+        "timestamp": START + timedelta(minutes=minutes),
+        "time_offset": minutes,
+        "is_sun_up": True,
+        "affects_session": minutes < 60,
+        "air_temperature": 21.5,
+        "pressure": 1013.2,
+        "wind_speed": 3.25,
+        "wind_direction": 180,
+        "precipitation_chance": 0,
+        "precipitation_amount": 0.0,
+        "allow_precipitation": False,
+        "cloud_cover": 40,
+        "relative_humidity": 55,
+        "valid_stats": True,
+        **fields,
+    }
+
+
+class WeatherTimelineCodecTest(SimpleTestCase):
+    """Test columnar encoding, decoding and downsampling of forecasts"""
+
+    def test_round_trip(self):
+        points = [_point(15), _point(0, precipitation_chance=30)]
+
+        columns = decode(encode(points), len(points))
+
+        self.assertEqual(columns["time_offset"], [0, 15])
+        self.assertEqual(columns["timestamp"][0], int(START.timestamp()))
+        self.assertEqual(columns["pressure"], [1013.2, 1013.2])
+        self.assertEqual(columns["precipitation_chance"], [30, 0])
+        self.assertEqual(columns["affects_session"], [True, True])
+
+    def test_rejects_wrong_point_count(self):
+        with self.assertRaises(ValueError):
+            decode(encode([_point(0)]), 2)
+
+    def test_downsample(self):
+        points = [
+            _point(0, air_temperature=20.0),
+            _point(15, air_temperature=22.0, precipitation_chance=40),
+            _point(60, air_temperature=25.0),
+        ]
+
+        columns = downsample(decode(encode(points), len(points)), 30)
+
+        self.assertEqual(columns["time_offset"], [0, 60])
+        self.assertEqual(columns["air_temperature"], [21.0, 25.0])
+        self.assertEqual(columns["precipitation_chance"], [40, 0])
+        self.assertEqual(columns["affects_session"], [True, False])
+
+    def test_model_points(self):
+        timeline = WeatherTimeline(forecast_version=3)
+        timeline.set_points([_point(0), _point(15), _point(30)])
+
+        points = timeline.points(resolution_minutes=30)
+
+        self.assertEqual((timeline.point_count, timeline.end_time), (3, START + timedelta(minutes=30)))
+        self.assertEqual([point["timestamp"] for point in points], [START, START + timedelta(minutes=30)])
+        self.assertEqual({point["forecast_version"] for point in points}, {3})
+        self.assertEqual([point["id"] for point in timeline.points(30)], [point["id"] for point in points])
+        self.assertEqual(len({point["id"] for point in points}), 2)
+
+    def test_chart_resolution(self):
+        self.assertEqual(chart_resolution(START, START + timedelta(hours=24), 200), 8)
+        self.assertIsNone(chart_resolution(START, START + timedelta(hours=2), 200))
+        self.assertIsNone(chart_resolution(None, START, 200))
+
+
+class ResultIngestionTest(PatchingTestCase):
+    """Test set-based SimProfile resolution for results ingestion"""
+
+    def setUp(self):
+        self.simulator = Simulator(name="iRacing")
+        self.existing = SimProfile(simulator=self.simulator, sim_api_id="100", profile_name="A")
+        self.objects = self.patch_object(SimProfile, "objects")
+
+    def test_creates_only_missing_profiles(self):
+        created = SimProfile(simulator=self.simulator, sim_api_id="200", profile_name="B")
+        self.objects.filter.side_effect = [[self.existing], [created]]
+
+        profiles = resolve_sim_profiles(self.simulator, {100: "A", 200: "B", 300: ""})
+
+        new_profiles = self.objects.bulk_create.call_args.args[0]
+        self.assertEqual(
+            [(profile.sim_api_id, profile.profile_name) for profile in new_profiles],
+            [("200", "B"), ("300", "Driver 300")],
+        )
+        self.assertEqual(self.objects.filter.call_args.kwargs["sim_api_id__in"], ["200", "300"])
+        self.assertEqual(set(profiles), {"100", "200"})
+
+    def test_all_known_profiles_need_one_query(self):
+        self.objects.filter.return_value = [self.existing]
+
+        profiles = resolve_sim_profiles(self.simulator, {100: "A"})
+
+        self.objects.bulk_create.assert_not_called()
+        self.assertEqual(profiles, {"100": self.existing})
+
+    def test_upsert_fields_exclude_keys(self):
+        self.assertNotIn("team", TEAM_RESULT_UPDATE_FIELDS)
+        self.assertNotIn("sim_profile", PARTICIPANT_RESULT_UPDATE_FIELDS)
+        self.assertIn("raw_participant_data", PARTICIPANT_RESULT_UPDATE_FIELDS)
+
+
+class ResolveTeamsTest(PatchingTestCase):
+    """Test set-based Team resolution for results ingestion"""
+
+    def setUp(self):
+        self.simulator = Simulator(name="iRacing")
+        self.profiles = {
+            cust_id: SimProfile(simulator=self.simulator, sim_api_id=cust_id) for cust_id in ("100", "200")
+        }
+        self.existing = Team(sim_api_id="1", name="Known")
+        self.objects = self.patch_object(Team, "objects")
+
+    def test_creates_only_missing_teams_with_an_owner(self):
+        created = Team(sim_api_id="2", name="New")
+        self.objects.filter.side_effect = [[self.existing], [created]]
+
+        teams = resolve_teams(
+            self.simulator,
+            {1: ("Known", None), 2: ("New", 100), 3: ("", None)},
+            self.profiles,
+        )
+
+        new_teams = self.objects.bulk_create.call_args.args[0]
+        self.assertEqual(
+            [(team.sim_api_id, team.slug, team.owner_sim_profile) for team in new_teams],
+            [("2", "new", self.profiles["100"])],
+        )
+        self.assertEqual(teams, {"1": self.existing, "2": created})
+
+    def test_teams_without_a_source_simulator_are_matched(self):
+        legacy = Team(sim_api_id="1", name="Legacy")
+        imported = Team(sim_api_id="2", name="Imported", source_simulator=self.simulator)
+        self.objects.filter.return_value = [legacy, Team(sim_api_id="2", name="Old"), imported]
+
+        teams = resolve_teams(self.simulator, {1: ("Legacy", 100), 2: ("Imported", 200)}, self.profiles)
+
+        self.assertIn("source_simulator__isnull", str(self.objects.filter.call_args.args[0]))
+        self.objects.bulk_create.assert_not_called()
+        self.assertEqual(teams, {"1": legacy, "2": imported})
+
+    def test_slug_clash_saves_with_a_free_slug(self):
+        self.objects.filter.side_effect = [[], []]
+
+        with mock.patch.object(Team, "save", autospec=True) as save:
+            teams = resolve_teams(self.simulator, {2: ("New", 200)}, self.profiles)
+
+        [team] = [call.args[0] for call in save.call_args_list]
+        self.assertEqual((team.sim_api_id, team.slug), ("2", ""))
+        self.assertEqual(teams, {"2": team})
+
+
+class TeamResultIngestionTest(PatchingTestCase):
+    """Test the bulk team and participant result writes"""
+
+    def setUp(self):
+        self.simulator = Simulator(name="iRacing")
+        self.event_result = EventResult(pk=1)
+        self.profiles = {
+            cust_id: SimProfile(pk=index, simulator=self.simulator, sim_api_id=cust_id)
+            for index, cust_id in enumerate(("100", "200"), start=1)
+        }
+        self.teams = {team_id: Team(pk=index, sim_api_id=team_id) for index, team_id in enumerate(("1", "2"), start=1)}
+        for target, name, value in [
+            (EventResult, "simulator", mock.PropertyMock(return_value=self.simulator)),
+            (result_processing, "resolve_sim_profiles", mock.Mock(return_value=self.profiles)),
+            (result_processing, "resolve_teams", mock.Mock(return_value=self.teams)),
+            (result_processing.transaction, "atomic", mock.MagicMock()),
+            (TeamResult, "objects", mock.Mock()),
+            (ParticipantResult, "objects", mock.Mock()),
+        ]:
+            self.patch_object(target, name, value)
+        for model in (TeamResult, ParticipantResult):
+            model.objects.bulk_create.side_effect = lambda rows, **options: rows
+        self.data = [
+            {"team_id": 1, "display_name": "A", "driver_results": [{"cust_id": 100}, {"cust_id": 200}]},
+            # Known team without drivers
+            {"team_id": 2, "display_name": "B", "driver_results": []},
+            # Unknown team without drivers
+            {"team_id": 3, "display_name": "C"},
+        ]
+
+    def test_driverless_results_of_known_teams_are_kept(self):
+        with self.assertLogs(result_processing.logger, "WARNING") as logs:
+            team_results, participant_results = create_team_and_participant_results(self.event_result, self.data)
+
+        owners = result_processing.resolve_teams.call_args.args[1]
+        self.assertEqual(owners, {1: ("A", 100), 2: ("B", None), 3: ("C", None)})
+        self.assertEqual([result.team for result in team_results], [self.teams["1"], self.teams["2"]])
+        self.assertEqual(len(participant_results), 2)
+        self.assertIn("[3]", logs.output[0])
+        TeamResult.objects.filter.assert_not_called()
+        self.assertEqual(TeamResult.objects.bulk_create.call_args.kwargs, {})
+
+    def test_upsert_deletes_stale_rows_and_updates_the_rest(self):
+        self.data[0]["driver_results"].pop()
+
+        with self.assertLogs(result_processing.logger, "WARNING"):
+            create_team_and_participant_results(self.event_result, self.data, upsert=True)
+
+        stale_teams = TeamResult.objects.filter.return_value.exclude
+        stale_teams.assert_called_once_with(team__in=[self.teams["1"], self.teams["2"]])
+        stale_teams.return_value.delete.assert_called_once_with()
+        kept = [
+            lookup[1]
+            for team_filter in ParticipantResult.objects.filter.call_args.args[0].children
+            for negated in team_filter.children[1:]
+            for lookup in negated.children
+        ]
+        self.assertEqual(kept, [[self.profiles["100"]], []])
+        ParticipantResult.objects.filter.return_value.delete.assert_called_once_with()
+        options = TeamResult.objects.bulk_create.call_args.kwargs
+        self.assertEqual(options["unique_fields"], ["event_result", "team"])
+        self.assertTrue(options["update_conflicts"])
+        options = ParticipantResult.objects.bulk_create.call_args.kwargs
+        self.assertEqual(options["unique_fields"], ["team_result", "sim_profile"])
+
+    def test_streamed_results_are_written_in_batches(self):
+        with self.assertLogs(result_processing.logger, "WARNING"):
+            counts = ingest_team_results(self.event_result, iter(self.data), upsert=True, batch_size=2)
+
+        self.assertEqual(counts, (2, 2))
+        batches = [call.args[0] for call in TeamResult.objects.bulk_create.call_args_list]
+        self.assertEqual([[result.team for result in batch] for batch in batches], [[self.teams["1"], self.teams["2"]], []])
+        stale_teams = TeamResult.objects.filter.return_value.exclude
+        stale_teams.assert_called_once_with(team__in=[self.teams["1"].pk, self.teams["2"].pk])
@@ -4,10 +4,12 @@ from .result_processing import calculate_average_irating_change
 from .result_processing import create_event_result_from_api
 from .result_processing import create_team_and_participant_results
 from .result_processing import get_all_participants_for_event
+from .result_processing import ingest_team_results
 
 __all__ = [
     "calculate_average_irating_change",
     "create_event_result_from_api",
     "create_team_and_participant_results",
     "get_all_participants_for_event",
+    "ingest_team_results",
 ]
@@ -1,4 +1,9 @@
+import logging
+from itertools import islice
+
 from django.db import transaction
+from django.db.models import Q
+from django.utils.text import slugify
 
 from simlane.sim.models import EventResult
 from simlane.sim.models import ParticipantResult
@@ -6,6 +11,8 @@ from simlane.sim.models import SimProfile
 from simlane.sim.models import TeamResult
 from simlane.teams.models import Team
 
+logger = logging.getLogger(__name__)
+
 
 def create_event_result_from_api(time_slot, api_data):
     """
@@ -55,89 +62,296 @@ def calculate_average_irating_change(event_result):
     return sum(changes) / len(changes)
 
 
-def create_team_and_participant_results(event_result, team_results_data):
+def _team_result_fields(team_data):
+    """TeamResult field values from a team result dict."""
+    return {
+        "team_display_name": team_data.get("display_name", ""),
+        "finish_position": team_data.get("finish_position"),
+        "finish_position_in_class": team_data.get("finish_position_in_class"),
+        "laps_complete": team_data.get("laps_complete", 0),
+        "laps_lead": team_data.get("laps_lead", 0),
+        "incidents": team_data.get("incidents", 0),
+        "best_lap_time": team_data.get("best_lap_time"),
+        "best_lap_num": team_data.get("best_lap_num"),
+        "average_lap": team_data.get("average_lap"),
+        "champ_points": team_data.get("champ_points", 0),
+        "reason_out": team_data.get("reason_out", ""),
+        "reason_out_id": team_data.get("reason_out_id"),
+        "drop_race": team_data.get("drop_race", False),
+        "car_id": team_data.get("car_id"),
+        "car_class_id": team_data.get("car_class_id"),
+        "car_class_name": team_data.get("car_class_name", ""),
+        "car_name": team_data.get("car_name", ""),
+        "country_code": team_data.get("country_code", ""),
+        "division": team_data.get("division"),
+        "raw_team_data": team_data,
+    }
+
+
+def _participant_result_fields(driver_data):
+    """ParticipantResult field values from a driver result dict."""
+    return {
+        "driver_display_name": driver_data.get("display_name", ""),
+        "finish_position": driver_data.get("finish_position"),
+        "finish_position_in_class": driver_data.get("finish_position_in_class"),
+        "starting_position": driver_data.get("starting_position"),
+        "starting_position_in_class": driver_data.get("starting_position_in_class"),
+        "laps_complete": driver_data.get("laps_complete", 0),
+        "laps_lead": driver_data.get("laps_lead", 0),
+        "incidents": driver_data.get("incidents", 0),
+        "best_lap_time": driver_data.get("best_lap_time"),
+        "best_lap_num": driver_data.get("best_lap_num"),
+        "average_lap": driver_data.get("average_lap"),
+        "champ_points": driver_data.get("champ_points", 0),
+        "oldi_rating": driver_data.get("oldi_rating"),
+        "newi_rating": driver_data.get("newi_rating"),
+        "old_license_level": driver_data.get("old_license_level"),
+        "new_license_level": driver_data.get("new_license_level"),
+        "old_sub_level": driver_data.get("old_sub_level"),
+        "new_sub_level": driver_data.get("new_sub_level"),
+        "reason_out": driver_data.get("reason_out", ""),
+        "reason_out_id": driver_data.get("reason_out_id"),
+        "drop_race": driver_data.get("drop_race", False),
+        "car_id": driver_data.get("car_id"),
+        "car_class_id": driver_data.get("car_class_id"),
+        "car_class_name": driver_data.get("car_class_name", ""),
+        "car_name": driver_data.get("car_name", ""),
+        "country_code": driver_data.get("country_code", ""),
+        "division": driver_data.get("division"),
+        "raw_participant_data": driver_data,
+    }
+
+
+TEAM_RESULT_UPDATE_FIELDS = list(_team_result_fields({}))
+PARTICIPANT_RESULT_UPDATE_FIELDS = list(_participant_result_fields({}))
+
+# Teams written per batch by ingest_team_results()
+RESULT_BATCH_SIZE = 200
+
+
+def resolve_sim_profiles(simulator, drivers):
+    """
+    Get or create the SimProfiles of some drivers with two or three queries.
+
+    drivers: {cust_id: display name}. Returns {cust_id as str: SimProfile}.
+    """
+    names = {str(cust_id): name for cust_id, name in drivers.items()}
+    profiles = {
+        profile.sim_api_id: profile
+        for profile in SimProfile.objects.filter(simulator=simulator, sim_api_id__in=names)
+    }
+    missing = [cust_id for cust_id in names if cust_id not in profiles]
+    if missing:
+        SimProfile.objects.bulk_create(
+            [
+                SimProfile(
+                    simulator=simulator,
+                    sim_api_id=cust_id,
+                    profile_name=names[cust_id] or f"Driver {cust_id}",
+                )
+                for cust_id in missing
+            ],
+            ignore_conflicts=True,
+        )
+        # Re-read so rows created concurrently by another ingestion are used
+        profiles.update(
+            (profile.sim_api_id, profile)
+            for profile in SimProfile.objects.filter(simulator=simulator, sim_api_id__in=missing)
+        )
+    return profiles
+
+
+def resolve_teams(simulator, teams, profiles):
+    """
+    Get or create the imported Teams of some team results.
+
+    teams: {team_id: (display name, cust_id of the first driver or None)}.
+    New teams are owned by their first driver's SimProfile; teams without a
+    driver can only be found, not created. Teams imported before their
+    simulator was recorded match on sim_api_id alone. Returns
+    {team_id as str: Team}.
+    """
+    teams = {str(team_id): team for team_id, team in teams.items()}
+    found = {}
+    for team in Team.objects.filter(
+        Q(source_simulator=simulator) | Q(source_simulator__isnull=True),
+        sim_api_id__in=teams,
+    ):
+        if team.sim_api_id not in found or team.source_simulator_id is not None:
+            found[team.sim_api_id] = team
+    missing = {
+        team_id: team
+        for team_id, team in teams.items()
+        if team_id not in found and team[1] is not None
+    }
+    if missing:
+        new_teams = []
+        for team_id, (name, owner_cust_id) in missing.items():
+            name = name or f"Team {team_id}"
+            new_teams.append(
+                Team(
+                    sim_api_id=team_id,
+                    source_simulator=simulator,
+                    owner_sim_profile=profiles[str(owner_cust_id)],
+                    name=name,
+                    slug=slugify(name),
+                )
+            )
+        Team.objects.bulk_create(new_teams, ignore_conflicts=True)
+        found.update(
+            (team.sim_api_id, team)
+            for team in Team.objects.filter(source_simulator=simulator, sim_api_id__in=missing)
+        )
+        # A slug clash with another team of the same owner skipped the row;
+        # save() picks a free slug
+        for team in new_teams:
+            if team.sim_api_id not in found:
+                team.slug = ""
+                team.save()
+                found[team.sim_api_id] = team
+    return found
+
+
+def _write_team_results(event_result, team_results_data, upsert):
+    """
+    Resolve the teams and drivers of some team results and bulk write them.
+
+    Results of teams unknown and without drivers are skipped. With upsert,
+    stored participant results of the written teams that are no longer in
+    the data are deleted; stale team results are left to the caller.
+    Must run inside a transaction. Returns (team_results, participant_results).
+    """
+    simulator = event_result.simulator
+    team_results_data = [team_data for team_data in team_results_data if "team_id" in team_data]
+    drivers = {
+        driver_data["cust_id"]: driver_data.get("display_name", "")
+        for team_data in team_results_data
+        for driver_data in team_data.get("driver_results", [])
+    }
+
+    profiles = resolve_sim_profiles(simulator, drivers)
+    teams = resolve_teams(
+        simulator,
+        {
+            team_data["team_id"]: (
+                team_data.get("display_name", ""),
+                team_data["driver_results"][0]["cust_id"] if team_data.get("driver_results") else None,
+            )
+            for team_data in team_results_data
+        },
+        profiles,
+    )
+    # A team seen for the first time without drivers has no owner for a
+    # new Team
+    unresolved = [
+        team_data["team_id"]
+        for team_data in team_results_data
+        if str(team_data["team_id"]) not in teams
+    ]
+    if unresolved:
+        logger.warning(
+            f"Skipping results of unknown teams without drivers in event result "
+            f"{event_result.pk}: {unresolved}",
+        )
+        team_results_data = [
+            team_data for team_data in team_results_data if str(team_data["team_id"]) in teams
+        ]
+
+    team_results = [
+        TeamResult(
+            event_result=event_result,
+            team=teams[str(team_data["team_id"])],
+            **_team_result_fields(team_data),
+        )
+        for team_data in team_results_data
+    ]
+    conflict_options = {}
+    if upsert:
+        conflict_options = {
+            "update_conflicts": True,
+            "unique_fields": ["event_result", "team"],
+            "update_fields": TEAM_RESULT_UPDATE_FIELDS,
+        }
+    team_results = TeamResult.objects.bulk_create(team_results, **conflict_options)
+
+    participant_results = [
+        ParticipantResult(
+            sim_profile=profiles[str(driver_data["cust_id"])],
+            team_result=team_result,
+            **_participant_result_fields(driver_data),
+        )
+        for team_result, team_data in zip(team_results, team_results_data)
+        for driver_data in team_data.get("driver_results", [])
+    ]
+    if upsert:
+        stale = Q()
+        for team_result in team_results:
+            stale |= Q(team_result=team_result) & ~Q(
+                sim_profile__in=[
+                    participant.sim_profile
+                    for participant in participant_results
+                    if participant.team_result is team_result
+                ]
+            )
+        if stale:
+            ParticipantResult.objects.filter(stale).delete()
+        conflict_options = {
+            "update_conflicts": True,
+            "unique_fields": ["team_result", "sim_profile"],
+            "update_fields": PARTICIPANT_RESULT_UPDATE_FIELDS,
+        }
+    participant_results = ParticipantResult.objects.bulk_create(
+        participant_results, **conflict_options
+    )
+    return team_results, participant_results
+
+
+def create_team_and_participant_results(event_result, team_results_data, upsert=False):
     """
     Bulk create TeamResult and ParticipantResult objects from API data.
     team_results_data: list of team result dicts from API.
+
+    Teams and drivers are resolved, and missing ones created, in set-based
+    batches, and each result table is written with one bulk_create. With
+    upsert, results already stored for the event result are updated in place
+    and results no longer in the data are deleted, so ingesting a subsession
+    again does not duplicate or fail on its rows.
+
+    Returns (team_results, participant_results).
     """
     with transaction.atomic():
-        for team_data in team_results_data:
-            # Team lookup or creation
-            team_obj, _ = Team.objects.get_or_create(
-                sim_api_id=team_data["team_id"],
-                defaults={
-                    "name": team_data.get(
-                        "display_name", f"Team {team_data['team_id']}"
-                    ),
-                },
-            )
-            team_result = TeamResult.objects.create(
-                event_result=event_result,
-                team=team_obj,
-                team_display_name=team_data.get("display_name", ""),
-                finish_position=team_data.get("finish_position"),
-                finish_position_in_class=team_data.get("finish_position_in_class"),
-                laps_complete=team_data.get("laps_complete", 0),
-                laps_lead=team_data.get("laps_lead", 0),
-                incidents=team_data.get("incidents", 0),
-                best_lap_time=team_data.get("best_lap_time"),
-                best_lap_num=team_data.get("best_lap_num"),
-                average_lap=team_data.get("average_lap"),
-                champ_points=team_data.get("champ_points", 0),
-                reason_out=team_data.get("reason_out", ""),
-                reason_out_id=team_data.get("reason_out_id"),
-                drop_race=team_data.get("drop_race", False),
-                car_id=team_data.get("car_id"),
-                car_class_id=team_data.get("car_class_id"),
-                car_class_name=team_data.get("car_class_name", ""),
-                car_name=team_data.get("car_name", ""),
-                country_code=team_data.get("country_code", ""),
-                division=team_data.get("division"),
-                raw_team_data=team_data,
-            )
-            for driver_data in team_data.get("driver_results", []):
-                # SimProfile lookup or creation
-                sim_profile_obj, _ = SimProfile.objects.get_or_create(
-                    sim_api_id=driver_data["cust_id"],
-                    defaults={
-                        "display_name": driver_data.get(
-                            "display_name", f"Driver {driver_data['cust_id']}"
-                        ),
-                    },
-                )
-                ParticipantResult.objects.create(
-                    sim_profile=sim_profile_obj,
-                    team_result=team_result,
-                    driver_display_name=driver_data.get("display_name", ""),
-                    finish_position=driver_data.get("finish_position"),
-                    finish_position_in_class=driver_data.get(
-                        "finish_position_in_class"
-                    ),
-                    starting_position=driver_data.get("starting_position"),
-                    starting_position_in_class=driver_data.get(
-                        "starting_position_in_class"
-                    ),
-                    laps_complete=driver_data.get("laps_complete", 0),
-                    laps_lead=driver_data.get("laps_lead", 0),
-                    incidents=driver_data.get("incidents", 0),
-                    best_lap_time=driver_data.get("best_lap_time"),
-                    best_lap_num=driver_data.get("best_lap_num"),
-                    average_lap=driver_data.get("average_lap"),
-                    champ_points=driver_data.get("champ_points", 0),
-                    oldi_rating=driver_data.get("oldi_rating"),
-                    newi_rating=driver_data.get("newi_rating"),
-                    old_license_level=driver_data.get("old_license_level"),
-                    new_license_level=driver_data.get("new_license_level"),
-                    old_sub_level=driver_data.get("old_sub_level"),
-                    new_sub_level=driver_data.get("new_sub_level"),
-                    reason_out=driver_data.get("reason_out", ""),
-                    reason_out_id=driver_data.get("reason_out_id"),
-                    drop_race=driver_data.get("drop_race", False),
-                    car_id=driver_data.get("car_id"),
-                    car_class_id=driver_data.get("car_class_id"),
-                    car_class_name=driver_data.get("car_class_name", ""),
-                    car_name=driver_data.get("car_name", ""),
-                    country_code=driver_data.get("country_code", ""),
-                    division=driver_data.get("division"),
-                    raw_participant_data=driver_data,
-                )
+        team_results, participant_results = _write_team_results(
+            event_result, team_results_data, upsert
+        )
+        if upsert:
+            TeamResult.objects.filter(event_result=event_result).exclude(
+                team__in=[team_result.team for team_result in team_results]
+            ).delete()
+
+    return team_results, participant_results
+
+
+def ingest_team_results(event_result, team_results_data, upsert=False, batch_size=RESULT_BATCH_SIZE):
+    """
+    Write team results read from a stream, batch_size teams at a time.
+
+    Behaves like create_team_and_participant_results() but only holds one
+    batch of results in memory, so a subsession streamed with
+    IRacingClient.iter_subsession_results() is ingested in bounded memory.
+    All batches and the removal of stale rows run in one transaction, so a
+    failed stream leaves the previous results in place.
+
+    Returns (team results written, participant results written).
+    """
+    rows = iter(team_results_data)
+    team_ids = []
+    participants_written = 0
+    with transaction.atomic():
+        while batch := list(islice(rows, batch_size)):
+            team_results, participant_results = _write_team_results(event_result, batch, upsert)
+            team_ids.extend(team_result.team_id for team_result in team_results)
+            participants_written += len(participant_results)
+        if upsert:
+            TeamResult.objects.filter(event_result=event_result).exclude(team__in=team_ids).delete()
+
+    return len(team_ids), participants_written
@@ -0,0 +1,153 @@
+"""
+Columnar encoding of weather forecasts.
+
+An event's forecast is a few dozen to a few hundred points that all have the
+same fields. WeatherTimeline stores them as one packed little-endian array per
+column, concatenated in COLUMNS order into a single binary value, instead of a
+WeatherForecast row per point. Decoding is one array.frombytes() per column.
+
+Points are plain dicts keyed by column name, with ``timestamp`` as an aware
+datetime.
+"""
+
+import math
+import sys
+from array import array
+from datetime import datetime
+from datetime import timezone as dt_timezone
+from typing import Any, Optional
+
+# (column, array typecode, aggregate used when downsampling)
+COLUMNS: tuple[tuple[str, str, str], ...] = (
+    ("timestamp", "q", "first"),  # seconds since the epoch
+    ("time_offset", "i", "first"),
+    ("is_sun_up", "B", "first"),
+    ("affects_session", "B", "any"),
+    ("air_temperature", "f", "mean"),
+    ("pressure", "f", "mean"),
+    ("wind_speed", "f", "mean"),
+    ("wind_direction", "H", "first"),
+    ("precipitation_chance", "B", "max"),
+    ("precipitation_amount", "f", "max"),
+    ("allow_precipitation", "B", "any"),
+    ("cloud_cover", "B", "mean"),
+    ("relative_humidity", "B", "mean"),
+    ("valid_stats", "B", "all"),
+)
+
+BOOLEAN_COLUMNS = frozenset(
+    {"is_sun_up", "affects_session", "allow_precipitation", "valid_stats"}
+)
+
+# float32 keeps about 7 significant digits; the API values have at most 2 decimals
+FLOAT_DECIMALS = 2
+
+_BIG_ENDIAN = sys.byteorder == "big"
+
+
+def encode(points: list[dict[str, Any]]) -> bytes:
+    """Pack points, sorted by timestamp, into column arrays."""
+    points = sorted(points, key=lambda point: point["timestamp"])
+    blob = bytearray()
+    for name, typecode, _aggregate in COLUMNS:
+        if name == "timestamp":
+            values = [int(point["timestamp"].timestamp()) for point in points]
+        elif typecode == "f":
+            values = [float(point[name]) for point in points]
+        else:
+            values = [int(point[name]) for point in points]
+        column = array(typecode, values)
+        if _BIG_ENDIAN:
+            column.byteswap()
+        blob += column.tobytes()
+    return bytes(blob)
+
+
+def decode(blob: bytes, point_count: int) -> dict[str, list]:
+    """Unpack a blob into {column: values}; timestamps stay epoch seconds."""
+    columns: dict[str, list] = {}
+    offset = 0
+    for name, typecode, _aggregate in COLUMNS:
+        column = array(typecode)
+        size = column.itemsize * point_count
+        column.frombytes(blob[offset : offset + size])
+        if _BIG_ENDIAN:
+            column.byteswap()
+        offset += size
+        if typecode == "f":
+            columns[name] = [round(value, FLOAT_DECIMALS) for value in column]
+        elif name in BOOLEAN_COLUMNS:
+            columns[name] = [bool(value) for value in column]
+        else:
+            columns[name] = column.tolist()
+    if offset != len(blob):
+        raise ValueError(f"Weather timeline is {len(blob)} bytes, expected {offset} for {point_count} points")
+    return columns
+
+
+def downsample(columns: dict[str, list], resolution_minutes: int) -> dict[str, list]:
+    """
+    Merge points into buckets of ``resolution_minutes`` from the first point.
+
+    Each bucket keeps its first timestamp; other columns are aggregated as
+    listed in COLUMNS (mean, max, any, all or first).
+    """
+    timestamps = columns["timestamp"]
+    if not timestamps or resolution_minutes <= 0:
+        return columns
+
+    step = resolution_minutes * 60
+    start = timestamps[0]
+    buckets: list[list[int]] = []
+    last_bucket = None
+    for index, timestamp in enumerate(timestamps):
+        bucket = (timestamp - start) // step
+        if bucket != last_bucket:
+            buckets.append([])
+            last_bucket = bucket
+        buckets[-1].append(index)
+
+    if len(buckets) == len(timestamps):
+        return columns
+
+    result: dict[str, list] = {}
+    for name, typecode, aggregate in COLUMNS:
+        values = columns[name]
+        merged = []
+        for indexes in buckets:
+            bucket_values = [values[index] for index in indexes]
+            if aggregate == "mean":
+                mean = sum(bucket_values) / len(bucket_values)
+                merged.append(round(mean, FLOAT_DECIMALS) if typecode == "f" else round(mean))
+            elif aggregate == "max":
+                merged.append(max(bucket_values))
+            elif aggregate == "any":
+                merged.append(any(bucket_values))
+            elif aggregate == "all":
+                merged.append(all(bucket_values))
+            else:
+                merged.append(bucket_values[0])
+        result[name] = merged
+    return result
+
+
+def to_points(columns: dict[str, list]) -> list[dict[str, Any]]:
+    """Turn decoded columns back into point dicts with datetime timestamps."""
+    names = [name for name, _typecode, _aggregate in COLUMNS]
+    points = []
+    for values in zip(*(columns[name] for name in names)):
+        point = dict(zip(names, values))
+        point["timestamp"] = datetime.fromtimestamp(point["timestamp"], tz=dt_timezone.utc)
+        points.append(point)
+    return points
+
+
+def chart_resolution(
+    start_time: Optional[datetime], end_time: Optional[datetime], max_points: int
+) -> Optional[int]:
+    """Smallest whole-minute resolution that fits a time span into ``max_points``."""
+    if start_time is None or end_time is None or max_points <= 0:
+        return None
+    span_minutes = (end_time - start_time).total_seconds() / 60
+    resolution = math.ceil(span_minutes / max_points)
+    return resolution if resolution > 1 else None
@@ -31,6 +31,7 @@ from simlane.sim.models import SimProfileCarOwnership
 from simlane.sim.models import SimTrack
 from simlane.sim.models import Simulator
 from simlane.sim.models import TrackModel
+from simlane.sim.utils.weather_timeline import chart_resolution
 
 logger = logging.getLogger(__name__)
 
@@ -1025,14 +1026,11 @@ def events_list(request):
 # @cache_for_anonymous(timeout=900)  # 15 minutes
 def upcoming_events_list(request):
     """Public listing of upcoming events only"""
-    from django.utils import timezone
-
     events = get_events_queryset()
 
-    # Filter to only upcoming events (events with future time slots)
-    events = events.filter(
-        time_slots__start_time__gt=timezone.now(),
-    ).distinct()
+    # Filter to only upcoming events, using the next session start kept up to
+    # date for time slots and repeating patterns (see refresh_upcoming_sessions)
+    events = events.filter(next_session_start__gt=timezone.now())
 
     # Apply search filter
     search_query = request.GET.get("q")
@@ -1081,7 +1079,7 @@ def upcoming_events_list(request):
                 "sim_layout__sim_track__track_model",
             )
             .prefetch_related("time_slots")
-            .order_by("time_slots__start_time")[:10]
+            .order_by("next_session_start")[:10]
         )
 
         context = {
@@ -1092,7 +1090,7 @@ def upcoming_events_list(request):
         return render(request, "sim/events/dropdown_results_partial.html", context)
 
     # Normal page mode - with pagination
-    events = events.order_by("time_slots__start_time")
+    events = events.order_by("next_session_start")
     paginator = Paginator(events, 24)
     page_number = request.GET.get("page")
     page_obj = paginator.get_page(page_number)
@@ -1145,7 +1143,6 @@ def event_detail(request, event_slug):
             "organizing_club",
             "organizing_user",
         ).prefetch_related(
-            "weather_forecasts",
             "time_slots__result",
             "sessions",
             "classes",
@@ -1170,22 +1167,19 @@ def event_detail(request, event_slug):
         and event.simulator.slug == "iracing"
         and event.time_pattern
     ):
-        print("Generating upcoming time slots for repeating schedule")
         try:
             from datetime import timedelta
 
-            from simlane.iracing.season_sync import RecurrenceHandler
+            from simlane.iracing.recurrence import RecurrenceHandler
 
             now = timezone.now()
-            # Generate slots for the next 1 days
-            generated_slots = RecurrenceHandler.generate_time_slots_for_period(
+            # First 6 slots of the next day, computed without expanding the day
+            upcoming_time_slots = RecurrenceHandler.next_slots(
                 event,
                 start_date=now,
                 end_date=now + timedelta(days=1),
+                limit=6,
             )
-            # Take first 6 generated slots for display
-            print(generated_slots)
-            upcoming_time_slots = generated_slots[0:6]
         except Exception as e:
             # Fallback: leave upcoming_time_slots empty and log the error (logger already configured)
             import logging
@@ -1201,7 +1195,7 @@ def event_detail(request, event_slug):
         start_time__lte=timezone.now(),
     ).order_by("-start_time")[:6]
 
-    weather_forecasts = event.weather_forecasts.order_by("timestamp")
+    has_weather_data = event.weather_timelines.exists()
     # Check if current user can join this event
     can_join = False
     can_manage = False
@@ -1228,7 +1222,7 @@ def event_detail(request, event_slug):
         "event": event,
         "upcoming_time_slots": upcoming_time_slots,
         "recent_time_slots": recent_time_slots,
-        "weather_forecasts": weather_forecasts,
+        "has_weather_data": has_weather_data,
         "can_join": can_join,
         "can_manage": can_manage,
         "series_context": series_context,
@@ -1270,17 +1264,16 @@ def event_timeslots_tab(request, event_slug):
     ):
         try:
             from datetime import timedelta
-            from simlane.iracing.season_sync import RecurrenceHandler
+            from simlane.iracing.recurrence import RecurrenceHandler
 
             now = timezone.now()
-            # Generate slots for the next 1 days
-            generated_slots = RecurrenceHandler.generate_time_slots_for_period(
+            # First 10 slots of the next day, computed without expanding the day
+            upcoming_time_slots = RecurrenceHandler.next_slots(
                 event,
                 start_date=now,
                 end_date=now + timedelta(days=1),
+                limit=10,
             )
-            # Take first 10 generated slots for display
-            upcoming_time_slots = generated_slots[0:10]
         except Exception as e:
             # Fallback: leave upcoming_time_slots empty and log the error
             import logging
@@ -1304,6 +1297,10 @@ def event_timeslots_tab(request, event_slug):
     return render(request, "sim/events/tabs/timeslots.html", context)
 
 
+# Points the weather chart draws before the forecast is downsampled
+WEATHER_CHART_MAX_POINTS = 200
+
+
 def event_weather_tab(request, event_slug):
     """HTMX view for event weather tab"""
     event = get_object_or_404(
@@ -1316,8 +1313,19 @@ def event_weather_tab(request, event_slug):
     if not event.can_user_view(request.user):
         raise Http404("Event not found")
     
+    # Let the API downsample long forecasts to what the chart can show
+    timeline = (
+        event.weather_timelines.order_by("-updated_at").only("start_time", "end_time").first()
+    )
+    resolution = (
+        chart_resolution(timeline.start_time, timeline.end_time, WEATHER_CHART_MAX_POINTS)
+        if timeline
+        else None
+    )
+
     context = {
         "event": event,
+        "weather_resolution": resolution,
     }
     
     return render(request, "sim/events/tabs/weather.html", context)
@@ -0,0 +1,248 @@
+"""
+Per-event availability bitmaps kept in Redis.
+
+Each event has one Redis hash with an entry per user holding that user's role
+and preference masks (see coverage.UserAvailability) at CACHE_RESOLUTION,
+packed and zlib-compressed. Masks start at the user's first bucket counted
+from the Unix epoch, so a user's entry can be replaced without touching the
+others. A "built" field marks a hash filled from all of the event's windows,
+and a counter next to it, bumped on every change, is the version readers get
+with the data so they can tell when what they hold is stale.
+
+Window saves and deletes refresh the owner's entry once the transaction
+commits (see simlane.core.signals); bulk writers call refresh_users_on_commit
+themselves. Readers fall back to the windows when Redis is unavailable.
+"""
+
+import logging
+import math
+import struct
+import zlib
+from collections import defaultdict
+from collections.abc import Iterable
+from datetime import datetime
+from datetime import timedelta
+from datetime import timezone as dt_timezone
+from typing import Any
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.utils import timezone
+from django_redis import get_redis_connection
+from redis.exceptions import RedisError
+from redis.exceptions import WatchError
+
+from .coverage import ROLES
+from .coverage import WINDOW_FIELDS
+from .coverage import AvailabilityGrid
+from .coverage import UserAvailability
+from .models import AvailabilityWindow
+
+logger = logging.getLogger(__name__)
+
+CACHE_RESOLUTION = timedelta(minutes=15)
+EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+
+CACHE_ALIAS = "default"
+BUILT_FIELD = "built"
+USER_FIELD_PREFIX = "user:"
+
+# Errors that make the cache unusable: Redis being down, or a cache backend
+# that is not Redis
+CACHE_ERRORS = (RedisError, NotImplementedError)
+
+
+def cache_key(event_id) -> str:
+    return f"teams:availability:{event_id}"
+
+
+def version_key(event_id) -> str:
+    return f"teams:availability:{event_id}:version"
+
+
+def user_field(user_id) -> str:
+    return f"{USER_FIELD_PREFIX}{user_id}"
+
+
+# Encoding
+
+
+def _pack_mask(mask: int) -> bytes:
+    data = mask.to_bytes((mask.bit_length() + 7) // 8, "little")
+    return struct.pack(">I", len(data)) + data
+
+
+def encode_user(base: int, user: UserAvailability) -> bytes:
+    """Pack and compress one user's masks starting at bucket ``base``."""
+    parts = [struct.pack(">qB", base, len(user.preferences))]
+    parts += [_pack_mask(user.roles[role]) for role in ROLES]
+    for level, mask in sorted(user.preferences.items()):
+        parts.append(struct.pack(">B", level) + _pack_mask(mask))
+    return zlib.compress(b"".join(parts))
+
+
+def decode_user(data: bytes) -> tuple[int, UserAvailability]:
+    data = zlib.decompress(data)
+    base, preference_count = struct.unpack_from(">qB", data)
+    offset = struct.calcsize(">qB")
+
+    def read_mask() -> int:
+        nonlocal offset
+        (length,) = struct.unpack_from(">I", data, offset)
+        offset += 4
+        mask = int.from_bytes(data[offset : offset + length], "little")
+        offset += length
+        return mask
+
+    user = UserAvailability()
+    for role in ROLES:
+        user.roles[role] = read_mask()
+    for _ in range(preference_count):
+        level = data[offset]
+        offset += 1
+        user.preferences[level] = read_mask()
+    return base, user
+
+
+def user_masks(windows: Iterable[tuple]) -> dict[Any, tuple[int, UserAvailability]]:
+    """
+    Per-user (first bucket since EPOCH, masks) of window tuples laid out as
+    WINDOW_FIELDS. Windows without a user are left out.
+    """
+    windows_by_user = defaultdict(list)
+    for window in windows:
+        if window[0] is not None:
+            windows_by_user[window[0]].append(window)
+
+    users = {}
+    for user_id, user_windows in windows_by_user.items():
+        first = min(math.floor((window[1] - EPOCH) / CACHE_RESOLUTION) for window in user_windows)
+        last = max(math.ceil((window[2] - EPOCH) / CACHE_RESOLUTION) for window in user_windows)
+        grid = AvailabilityGrid(EPOCH + first * CACHE_RESOLUTION, CACHE_RESOLUTION, max(last - first, 0))
+        for window in user_windows:
+            grid.add(*window)
+        users[user_id] = (first, grid.users[user_id])
+    return users
+
+
+# Reading
+
+
+def _event_windows(event_id, user_ids=None):
+    windows = AvailabilityWindow.objects.filter(participation__event_id=event_id)
+    if user_ids is not None:
+        windows = windows.filter(participation__user_id__in=user_ids)
+    return windows.values_list(*WINDOW_FIELDS)
+
+
+def event_availability(event_id) -> tuple[int | None, dict[Any, tuple[int, UserAvailability]]]:
+    """
+    Cache version and per-user masks of an event, rebuilding the cache from
+    the event's windows when it is missing. The version is None when the data
+    did not come from or go into the cache.
+    """
+    try:
+        connection = get_redis_connection(CACHE_ALIAS)
+        pipeline = connection.pipeline(transaction=False)
+        pipeline.hgetall(cache_key(event_id))
+        pipeline.get(version_key(event_id))
+        fields, version = pipeline.execute()
+    except CACHE_ERRORS as e:
+        logger.warning(f"Availability cache unavailable for event {event_id}: {e}")
+        return None, user_masks(_event_windows(event_id))
+
+    if BUILT_FIELD.encode() not in fields:
+        return _rebuild(connection, event_id)
+
+    to_user_id = get_user_model()._meta.pk.to_python
+    prefix = USER_FIELD_PREFIX.encode()
+    return int(version or 0), {
+        to_user_id(field[len(prefix) :].decode()): decode_user(data)
+        for field, data in fields.items()
+        if field.startswith(prefix)
+    }
+
+
+def _rebuild(connection, event_id) -> tuple[int | None, dict[Any, tuple[int, UserAvailability]]]:
+    """Fill an event's hash from its windows unless they change meanwhile."""
+    key = cache_key(event_id)
+    timeout = settings.TEAM_AVAILABILITY_CACHE_TIMEOUT
+    try:
+        with connection.pipeline() as pipeline:
+            # Any refresh bumps the version, which aborts this rebuild
+            pipeline.watch(version_key(event_id))
+            users = user_masks(_event_windows(event_id))
+            pipeline.multi()
+            pipeline.delete(key)
+            pipeline.hset(
+                key,
+                mapping={
+                    BUILT_FIELD: timezone.now().isoformat(),
+                    **{user_field(user_id): encode_user(*masks) for user_id, masks in users.items()},
+                },
+            )
+            pipeline.expire(key, timeout)
+            pipeline.incr(version_key(event_id))
+            pipeline.expire(version_key(event_id), timeout)
+            version = pipeline.execute()[3]
+    except WatchError:
+        # Windows changed while they were read; the next reader rebuilds
+        return None, users
+    except CACHE_ERRORS as e:
+        logger.warning(f"Failed to rebuild availability cache of event {event_id}: {e}")
+        return None, user_masks(_event_windows(event_id))
+    return version, users
+
+
+# Updating
+
+
+def refresh_users(event_id, user_ids: Iterable[Any]) -> None:
+    """Replace the entries of users whose windows changed and bump the version."""
+    user_ids = {user_id for user_id in user_ids if user_id is not None}
+    users = user_masks(_event_windows(event_id, user_ids)) if user_ids else {}
+    key = cache_key(event_id)
+    timeout = settings.TEAM_AVAILABILITY_CACHE_TIMEOUT
+    try:
+        connection = get_redis_connection(CACHE_ALIAS)
+        pipeline = connection.pipeline()
+        # Only complete hashes are updated; a missing one is rebuilt by the
+        # next reader
+        if connection.hexists(key, BUILT_FIELD):
+            if users:
+                pipeline.hset(
+                    key,
+                    mapping={user_field(user_id): encode_user(*masks) for user_id, masks in users.items()},
+                )
+            removed = [user_field(user_id) for user_id in user_ids if user_id not in users]
+            if removed:
+                pipeline.hdel(key, *removed)
+            pipeline.expire(key, timeout)
+        pipeline.incr(version_key(event_id))
+        pipeline.expire(version_key(event_id), timeout)
+        pipeline.execute()
+    except CACHE_ERRORS as e:
+        logger.warning(f"Failed to refresh availability cache of event {event_id}: {e}")
+
+
+def drop_event(event_id) -> None:
+    """Forget an event's cached availability; the next reader rebuilds it."""
+    try:
+        connection = get_redis_connection(CACHE_ALIAS)
+        pipeline = connection.pipeline()
+        pipeline.delete(cache_key(event_id))
+        pipeline.incr(version_key(event_id))
+        pipeline.expire(version_key(event_id), settings.TEAM_AVAILABILITY_CACHE_TIMEOUT)
+        pipeline.execute()
+    except CACHE_ERRORS as e:
+        logger.warning(f"Failed to drop availability cache of event {event_id}: {e}")
+
+
+def refresh_users_on_commit(event_id, user_ids: Iterable[Any]) -> None:
+    user_ids = set(user_ids)
+    transaction.on_commit(lambda: refresh_users(event_id, user_ids))
+
+
+def drop_event_on_commit(event_id) -> None:
+    transaction.on_commit(lambda: drop_event(event_id))
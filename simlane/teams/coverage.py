@@ -0,0 +1,324 @@
+"""
+In-memory availability coverage of an event.
+
+AvailabilityGrid splits the span of an event's availability windows into
+fixed-size buckets and keeps, per user, one bitmask per role and per
+preference level, stored as Python ints where bit ``i`` is bucket ``i``. A
+window is OR-ed into its user's masks as a run of set bits, so building the
+grid is one query and one shift per window, and per-bucket questions (who is
+available, with which roles, at which best preference, how many drivers) are
+bit tests and popcounts instead of queries.
+
+for_event reads the per-user masks of the event's availability cache (see
+availability_cache) rather than the windows whenever the requested buckets
+line up with the cached ones.
+"""
+
+import math
+from collections.abc import Iterable
+from collections.abc import Iterator
+from dataclasses import dataclass
+from dataclasses import field
+from datetime import datetime
+from datetime import timedelta
+from typing import Any
+
+from .models import AvailabilityWindow
+
+ROLES = ("drive", "spot", "strategize")
+
+# Role names used in chart and report data
+ROLE_LABELS = {"drive": "driver", "spot": "spotter", "strategize": "strategist"}
+
+PREFERENCE_LEVELS = (1, 2, 3, 4, 5)
+
+# (user_id, start_time, end_time, can_drive, can_spot, can_strategize, preference_level)
+WINDOW_FIELDS = (
+    "participation__user_id",
+    "start_time",
+    "end_time",
+    "can_drive",
+    "can_spot",
+    "can_strategize",
+    "preference_level",
+)
+
+
+def iter_bits(mask: int) -> Iterator[int]:
+    """Yield the indexes of the set bits of a mask, lowest first."""
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+def bucket_mask(first: int, last: int) -> int:
+    """Mask with bits ``first`` up to, not including, ``last`` set."""
+    assert first >= 0, "bucket masks start at bucket 0"
+    if last <= first:
+        return 0
+    return ((1 << (last - first)) - 1) << first
+
+
+def iter_runs(mask: int) -> Iterator[tuple[int, int]]:
+    """Yield (first, last) bucket bounds, last excluded, of each run of set bits."""
+    # A negative mask has infinitely many set bits
+    assert mask >= 0, "cannot iterate the runs of a negative mask"
+    while mask:
+        first = (mask & -mask).bit_length() - 1
+        rest = mask >> first
+        length = (~rest & (rest + 1)).bit_length() - 1
+        yield first, first + length
+        mask &= -1 << (first + length)
+
+
+def coarsen_mask(mask: int, factor: int) -> int:
+    """Mask of ``factor``-times larger buckets, set where any of their buckets is set."""
+    if factor == 1:
+        return mask
+    coarse = 0
+    while mask:
+        bucket = ((mask & -mask).bit_length() - 1) // factor
+        coarse |= 1 << bucket
+        # Skip the remaining bits of this coarse bucket
+        mask &= -1 << ((bucket + 1) * factor)
+    return coarse
+
+
+def shift_mask(mask: int, offset: int) -> int:
+    """Move a mask ``offset`` buckets later; bits moved before bucket 0 are dropped."""
+    return mask << offset if offset >= 0 else mask >> -offset
+
+
+@dataclass
+class UserAvailability:
+    """Bucket masks of one user."""
+
+    roles: dict[str, int] = field(default_factory=lambda: dict.fromkeys(ROLES, 0))
+    preferences: dict[int, int] = field(default_factory=dict)
+
+    @property
+    def available(self) -> int:
+        mask = 0
+        for role_mask in self.roles.values():
+            mask |= role_mask
+        return mask
+
+    def best_preference(self, bucket: int) -> int | None:
+        """Lowest (most preferred) preference level of the windows in a bucket."""
+        bit = 1 << bucket
+        for level in sorted(self.preferences):
+            if self.preferences[level] & bit:
+                return level
+        return None
+
+    def roles_at(self, bucket: int) -> list[str]:
+        bit = 1 << bucket
+        return [ROLE_LABELS[role] for role in ROLES if self.roles[role] & bit]
+
+    def remapped(self, offset: int, factor: int, limit: int) -> "UserAvailability":
+        """Masks shifted by ``offset``, coarsened by ``factor`` and cut to ``limit`` mask."""
+        return UserAvailability(
+            roles={
+                role: coarsen_mask(shift_mask(mask, offset), factor) & limit
+                for role, mask in self.roles.items()
+            },
+            preferences={
+                level: coarsen_mask(shift_mask(mask, offset), factor) & limit
+                for level, mask in self.preferences.items()
+            },
+        )
+
+
+class AvailabilityGrid:
+    """
+    Per-user availability bitmasks over fixed-size buckets.
+
+    Usage::
+
+        grid = AvailabilityGrid.for_event(event, timedelta(minutes=15))
+        grid.counts()[0]  # {"drive": 2, "spot": 1, "strategize": 0, "users": [4, 7, 9]}
+    """
+
+    def __init__(
+        self,
+        start: datetime,
+        resolution: timedelta,
+        bucket_count: int,
+        version: int | None = None,
+    ):
+        self.start = start
+        self.resolution = resolution
+        self.bucket_count = bucket_count
+        self.users: dict[Any, UserAvailability] = {}
+        # Availability cache version the grid was read at, None when built
+        # from the windows
+        self.version = version
+
+    @classmethod
+    def from_windows(
+        cls,
+        windows: Iterable[tuple],
+        resolution: timedelta,
+        start: datetime | None = None,
+        end: datetime | None = None,
+    ) -> "AvailabilityGrid":
+        """
+        Build a grid from window tuples laid out as WINDOW_FIELDS.
+
+        Without ``start``/``end`` the grid spans the windows, from the hour
+        the first one starts in to the hour after the last one ends. Windows
+        without a user are left out.
+        """
+        windows = [window for window in windows if window[0] is not None]
+        if start is None:
+            start = min((window[1] for window in windows), default=None)
+            start = start.replace(minute=0, second=0, microsecond=0) if start else None
+        if end is None:
+            end = max((window[2] for window in windows), default=None)
+            end = end.replace(minute=0, second=0, microsecond=0) + timedelta(hours=1) if end else None
+        if start is None or end is None or end <= start:
+            return cls(start, resolution, 0)
+
+        grid = cls(start, resolution, math.ceil((end - start) / resolution))
+        for window in windows:
+            grid.add(*window)
+        return grid
+
+    @classmethod
+    def from_user_masks(
+        cls,
+        users: dict[Any, tuple[int, UserAvailability]],
+        origin: datetime,
+        base_resolution: timedelta,
+        resolution: timedelta,
+        start: datetime | None = None,
+        end: datetime | None = None,
+        version: int | None = None,
+    ) -> "AvailabilityGrid | None":
+        """
+        Build a grid from per-user masks at ``base_resolution``, each given as
+        (first bucket since ``origin``, masks relative to that bucket).
+
+        The default span follows from_windows. Returns None when the grid's
+        buckets would not be whole runs of base buckets.
+        """
+        available = [(base, user.available) for base, user in users.values() if user.available]
+        if start is None and available:
+            first = min(base + (mask & -mask).bit_length() - 1 for base, mask in available)
+            start = (origin + first * base_resolution).replace(minute=0, second=0, microsecond=0)
+        if end is None and available:
+            last = max(base + mask.bit_length() for base, mask in available)
+            end = (origin + last * base_resolution).replace(
+                minute=0, second=0, microsecond=0
+            ) + timedelta(hours=1)
+        if start is None or end is None or end <= start:
+            return cls(start, resolution, 0, version)
+
+        factor, remainder = divmod(resolution, base_resolution)
+        if remainder or not factor or (start - origin) % base_resolution:
+            return None
+
+        grid = cls(start, resolution, math.ceil((end - start) / resolution), version)
+        start_bucket = (start - origin) // base_resolution
+        limit = bucket_mask(0, grid.bucket_count)
+        for user_id, (base, user) in users.items():
+            grid.users[user_id] = user.remapped(base - start_bucket, factor, limit)
+        return grid
+
+    @classmethod
+    def for_event(
+        cls,
+        event,
+        resolution: timedelta,
+        start: datetime | None = None,
+        end: datetime | None = None,
+    ) -> "AvailabilityGrid":
+        """
+        Build the grid of an event's availability, from the availability
+        cache or, when its buckets do not line up, from the windows with one
+        query.
+        """
+        from .availability_cache import CACHE_RESOLUTION
+        from .availability_cache import EPOCH
+        from .availability_cache import event_availability
+
+        aligned = start is None or not (start - EPOCH) % CACHE_RESOLUTION
+        if aligned and not resolution % CACHE_RESOLUTION:
+            version, users = event_availability(event.pk)
+            grid = cls.from_user_masks(
+                users, EPOCH, CACHE_RESOLUTION, resolution, start, end, version
+            )
+            if grid is not None:
+                return grid
+
+        windows = AvailabilityWindow.objects.filter(participation__event=event).values_list(
+            *WINDOW_FIELDS
+        )
+        return cls.from_windows(windows, resolution, start, end)
+
+    # Building
+
+    def bucket_range(self, start: datetime, end: datetime) -> tuple[int, int]:
+        """Buckets overlapping [start, end), clipped to the grid."""
+        first = math.floor((start - self.start) / self.resolution)
+        last = math.ceil((end - self.start) / self.resolution)
+        return max(first, 0), min(last, self.bucket_count)
+
+    def add(
+        self,
+        user_id: Any,
+        start: datetime,
+        end: datetime,
+        can_drive: bool,
+        can_spot: bool,
+        can_strategize: bool,
+        preference_level: int,
+    ) -> None:
+        """OR one window into its user's masks."""
+        mask = bucket_mask(*self.bucket_range(start, end))
+        user = self.users.setdefault(user_id, UserAvailability())
+        if not mask:
+            return
+        for role, allowed in zip(ROLES, (can_drive, can_spot, can_strategize)):
+            if allowed:
+                user.roles[role] |= mask
+        user.preferences[preference_level] = user.preferences.get(preference_level, 0) | mask
+
+    # Reading
+
+    def bucket_start(self, bucket: int) -> datetime:
+        return self.start + bucket * self.resolution
+
+    def bucket_starts(self) -> list[datetime]:
+        return [self.bucket_start(bucket) for bucket in range(self.bucket_count)]
+
+    def cell(self, user_id: Any, bucket: int) -> dict[str, Any]:
+        """Availability of one user in one bucket, as heatmap cell data."""
+        user = self.users.get(user_id)
+        if user is None or not user.available >> bucket & 1:
+            return {"available": False, "preference_level": 0, "roles": []}
+        return {
+            "available": True,
+            "preference_level": user.best_preference(bucket),
+            "roles": user.roles_at(bucket),
+        }
+
+    def row(self, user_id: Any) -> list[dict[str, Any]]:
+        return [self.cell(user_id, bucket) for bucket in range(self.bucket_count)]
+
+    def counts(self) -> list[dict[str, Any]]:
+        """
+        Per bucket, the number of users available for each role and the ids
+        of the users available at all.
+        """
+        buckets = [
+            {"drive": 0, "spot": 0, "strategize": 0, "users": []} for _ in range(self.bucket_count)
+        ]
+        for user_id, user in self.users.items():
+            for role, mask in user.roles.items():
+                for bucket in iter_bits(mask):
+                    buckets[bucket][role] += 1
+            for bucket in iter_bits(user.available):
+                buckets[bucket]["users"].append(user_id)
+        return buckets
@@ -0,0 +1,283 @@
+"""
+Team formation for an event's signups.
+
+TeamFormationSolver builds a dense matrix of pairwise drive overlap once,
+from the AvailabilityGrid bitmasks (the popcount of the AND of two users'
+drive masks), seeds teams greedily from the highest-overlap pairs and then
+improves them with member swaps, between teams and with unassigned signups,
+until no swap helps or the time budget runs out.
+
+A team scores higher the more hours its members can drive together (mean
+pairwise overlap) and the more hours at least one of them can drive
+(coverage), and lower the more their experience levels differ (variance).
+"""
+
+import time
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import Any
+
+from django.conf import settings
+
+from .coverage import AvailabilityGrid
+from .models import EventParticipation
+
+EXPERIENCE_LEVELS = {
+    "beginner": 1,
+    "intermediate": 2,
+    "advanced": 3,
+    "professional": 4,
+}
+DEFAULT_EXPERIENCE = EXPERIENCE_LEVELS["intermediate"]
+
+RESOLUTION = timedelta(minutes=15)
+
+# Smallest objective gain a swap must bring, so the search always terminates
+MIN_GAIN = 1e-9
+
+
+def variance(numbers: list[float]) -> float:
+    """Population variance of a list of numbers."""
+    if len(numbers) < 2:
+        return 0.0
+    mean = sum(numbers) / len(numbers)
+    return sum((x - mean) ** 2 for x in numbers) / len(numbers)
+
+
+@dataclass
+class FormedTeam:
+    """One team of a solution and the parts of its score."""
+
+    member_ids: list[Any]
+    score: float
+    overlap_hours: float
+    average_overlap_hours: float
+    coverage_hours: float
+    experience_variance: float
+    average_experience: float
+
+
+class TeamFormationSolver:
+    """
+    Greedy seeding plus local search over a dense overlap matrix.
+
+    Usage::
+
+        solver = TeamFormationSolver.for_event(event, team_size=3)
+        teams = solver.solve(max_teams=10)  # list[FormedTeam], best first
+    """
+
+    def __init__(
+        self,
+        user_ids: list[Any],
+        drive_masks: dict[Any, int],
+        experience: dict[Any, int],
+        bucket_hours: float,
+        team_size: int = 3,
+        coverage_target: float | None = None,
+        overlap_weight: float = 1.0,
+        coverage_weight: float = 0.5,
+        variance_weight: float = 2.0,
+    ):
+        self.user_ids = list(user_ids)
+        self.masks = [drive_masks.get(user_id, 0) for user_id in self.user_ids]
+        self.experience = [experience.get(user_id, DEFAULT_EXPERIENCE) for user_id in self.user_ids]
+        self.bucket_hours = bucket_hours
+        self.team_size = team_size
+        # Coverage beyond the target earns nothing, so spare drivers go to
+        # teams that still need them
+        self.coverage_target = coverage_target
+        self.overlap_weight = overlap_weight
+        self.coverage_weight = coverage_weight
+        self.variance_weight = variance_weight
+
+        size = len(self.user_ids)
+        self.overlap = [[0.0] * size for _ in range(size)]
+        for i in range(size):
+            mask = self.masks[i]
+            if not mask:
+                continue
+            row = self.overlap[i]
+            for j in range(i + 1, size):
+                hours = (mask & self.masks[j]).bit_count() * bucket_hours
+                row[j] = hours
+                self.overlap[j][i] = hours
+
+    @classmethod
+    def for_event(
+        cls,
+        event,
+        team_size: int = 3,
+        participation_type: str | None = "team_signup",
+        **options,
+    ) -> "TeamFormationSolver":
+        """Build the solver for an event's signed up users with two queries."""
+        participations = EventParticipation.objects.filter(
+            event=event,
+            status="signed_up",
+            user__isnull=False,
+        )
+        if participation_type:
+            participations = participations.filter(participation_type=participation_type)
+
+        experience = {
+            user_id: EXPERIENCE_LEVELS.get(level, DEFAULT_EXPERIENCE)
+            for user_id, level in participations.values_list("user_id", "experience_level")
+        }
+        grid = AvailabilityGrid.for_event(event, RESOLUTION)
+        drive_masks = {user_id: user.roles["drive"] for user_id, user in grid.users.items()}
+
+        return cls(
+            list(experience),
+            drive_masks,
+            experience,
+            RESOLUTION / timedelta(hours=1),
+            team_size=team_size,
+            **options,
+        )
+
+    # Objective
+
+    def coverage_hours(self, team: list[int]) -> float:
+        mask = 0
+        for member in team:
+            mask |= self.masks[member]
+        return mask.bit_count() * self.bucket_hours
+
+    def overlap_hours(self, team: list[int]) -> float:
+        """Sum of the pairwise overlap hours of a team."""
+        return sum(
+            self.overlap[member][other] for i, member in enumerate(team) for other in team[i + 1 :]
+        )
+
+    def team_score(self, team: list[int]) -> float:
+        pairs = len(team) * (len(team) - 1) / 2
+        mean_overlap = self.overlap_hours(team) / pairs if pairs else 0.0
+        coverage = self.coverage_hours(team)
+        if self.coverage_target is not None:
+            coverage = min(coverage, self.coverage_target)
+        spread = variance([self.experience[member] for member in team])
+        return (
+            self.overlap_weight * mean_overlap
+            + self.coverage_weight * coverage
+            - self.variance_weight * spread
+        )
+
+    # Search
+
+    def solve(
+        self,
+        max_teams: int | None = None,
+        time_budget: float | None = None,
+    ) -> list[FormedTeam]:
+        """
+        Form full teams, best scoring first.
+
+        The greedy seed is always completed; ``time_budget`` (seconds,
+        default TEAM_FORMATION_TIME_BUDGET) bounds the swap search after it.
+        """
+        if time_budget is None:
+            time_budget = settings.TEAM_FORMATION_TIME_BUDGET
+        deadline = time.monotonic() + time_budget
+
+        teams, bench = self._seed(max_teams)
+        self._improve(teams, bench, deadline)
+
+        return sorted(
+            (self._describe(team) for team in teams),
+            key=lambda team: team.score,
+            reverse=True,
+        )
+
+    def _seed(self, max_teams: int | None) -> tuple[list[list[int]], set[int]]:
+        """
+        Start a team from each highest-overlap pair of unassigned users and
+        fill it with the users that raise its score most.
+        """
+        size = len(self.user_ids)
+        free = set(range(size))
+        teams = []
+        if self.team_size < 2:
+            teams = [[member] for member in range(size)][:max_teams]
+            return teams, free.difference(*teams)
+
+        pairs = sorted(
+            (
+                (self.overlap[i][j], i, j)
+                for i in range(size)
+                for j in range(i + 1, size)
+                if self.overlap[i][j] > 0
+            ),
+            reverse=True,
+        )
+        for _hours, i, j in pairs:
+            if len(free) < self.team_size or (max_teams and len(teams) >= max_teams):
+                break
+            if i not in free or j not in free:
+                continue
+            team = [i, j]
+            free.difference_update(team)
+            while len(team) < self.team_size:
+                best = max(free, key=lambda candidate: self.team_score([*team, candidate]))
+                team.append(best)
+                free.remove(best)
+            teams.append(team)
+
+        return teams, free
+
+    def _improve(self, teams: list[list[int]], bench: set[int], deadline: float) -> None:
+        """Apply improving swaps in place until none is left or time is up."""
+        scores = [self.team_score(team) for team in teams]
+        improved = True
+        while improved:
+            improved = False
+            for a in range(len(teams)):
+                for b in range(a + 1, len(teams)):
+                    if time.monotonic() >= deadline:
+                        return
+                    improved |= self._swap_between(teams, scores, a, b)
+                if time.monotonic() >= deadline:
+                    return
+                improved |= self._swap_with_bench(teams, scores, a, bench)
+
+    def _swap_between(self, teams, scores, a: int, b: int) -> bool:
+        team_a, team_b = teams[a], teams[b]
+        current = scores[a] + scores[b]
+        for i, member_a in enumerate(team_a):
+            for j, member_b in enumerate(team_b):
+                new_a = [*team_a[:i], member_b, *team_a[i + 1 :]]
+                new_b = [*team_b[:j], member_a, *team_b[j + 1 :]]
+                score_a = self.team_score(new_a)
+                score_b = self.team_score(new_b)
+                if score_a + score_b > current + MIN_GAIN:
+                    teams[a], teams[b] = new_a, new_b
+                    scores[a], scores[b] = score_a, score_b
+                    return True
+        return False
+
+    def _swap_with_bench(self, teams, scores, a: int, bench: set[int]) -> bool:
+        team = teams[a]
+        for i, member in enumerate(team):
+            for candidate in bench:
+                new_team = [*team[:i], candidate, *team[i + 1 :]]
+                score = self.team_score(new_team)
+                if score > scores[a] + MIN_GAIN:
+                    teams[a], scores[a] = new_team, score
+                    bench.remove(candidate)
+                    bench.add(member)
+                    return True
+        return False
+
+    def _describe(self, team: list[int]) -> FormedTeam:
+        pairs = len(team) * (len(team) - 1) / 2
+        overlap = self.overlap_hours(team)
+        experience = [self.experience[member] for member in team]
+        return FormedTeam(
+            member_ids=[self.user_ids[member] for member in team],
+            score=self.team_score(team),
+            overlap_hours=overlap,
+            average_overlap_hours=overlap / pairs if pairs else 0.0,
+            coverage_hours=self.coverage_hours(team),
+            experience_variance=variance(experience),
+            average_experience=sum(experience) / len(experience),
+        )
@@ -0,0 +1,180 @@
+"""
+Management command to benchmark availability overlap queries on a synthetic signup sheet.
+"""
+
+import time
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.core.management.base import CommandError
+from django.db import connection
+from django.db import transaction
+from django.test.utils import CaptureQueriesContext
+
+from simlane.sim.models import Event
+from simlane.teams.models import AvailabilityWindow
+from simlane.teams.models import EventParticipation
+from simlane.teams.utils import AvailabilityConflictDetector
+
+User = get_user_model()
+
+QUARTER = timedelta(minutes=15)
+
+
+class Command(BaseCommand):
+    help = (
+        "Time find_overlapping_availability, find_available_for_time_range and "
+        "stint conflict detection against synthetic availability windows"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--event",
+            help="Event id to attach the synthetic signups to (default: the first event)",
+        )
+        parser.add_argument(
+            "--participants",
+            type=int,
+            default=200,
+            help="Number of synthetic participants",
+        )
+        parser.add_argument(
+            "--windows",
+            type=int,
+            default=5000,
+            help="Total number of availability windows, spread over the participants",
+        )
+        parser.add_argument(
+            "--repeat",
+            type=int,
+            default=3,
+            help="Number of timed runs per query",
+        )
+        parser.add_argument(
+            "--explain",
+            action="store_true",
+            help="Print the query plan of the overlap lookups",
+        )
+        parser.add_argument(
+            "--commit",
+            action="store_true",
+            help="Keep the synthetic data (default: roll back)",
+        )
+
+    def handle(self, *args, **options):
+        events = Event.objects.order_by("created_at")
+        event = events.filter(pk=options["event"]).first() if options["event"] else events.first()
+        if event is None:
+            raise CommandError("No event found to attach the synthetic signups to")
+
+        participants = options["participants"]
+        if participants < 2:
+            raise CommandError("At least two participants are needed")
+        per_participant = max(options["windows"] // participants, 1)
+
+        with transaction.atomic():
+            start = self._populate(event, participants, per_participant)
+            user_ids = list(
+                EventParticipation.objects.filter(
+                    event=event, user__username__startswith="overlap-bench-"
+                ).values_list("user_id", flat=True)
+            )
+            span_end = start + per_participant * 8 * QUARTER
+
+            # A stint inside the busiest part of the sheet for every fourth driver
+            stints = [
+                {
+                    "user_id": user_id,
+                    "start_time": start + (index % per_participant) * 8 * QUARTER,
+                    "end_time": start + (index % per_participant) * 8 * QUARTER + 3 * QUARTER,
+                }
+                for index, user_id in enumerate(user_ids[::4])
+            ]
+            cases = [
+                (
+                    "find_overlapping_availability",
+                    lambda: AvailabilityWindow.find_overlapping_availability(
+                        user_ids[:20], event, min_overlap_hours=1
+                    ),
+                ),
+                (
+                    "find_available_for_time_range",
+                    lambda: list(
+                        AvailabilityWindow.find_available_for_time_range(
+                            event, start + 8 * QUARTER, start + 10 * QUARTER
+                        )
+                    ),
+                ),
+                (
+                    "detect_stint_conflicts",
+                    lambda: AvailabilityConflictDetector.detect_stint_conflicts(user_ids, stints),
+                ),
+            ]
+
+            self.stdout.write(
+                f"{participants} participants, {participants * per_participant} windows "
+                f"from {start:%Y-%m-%d %H:%M} to {span_end:%Y-%m-%d %H:%M}"
+            )
+            for name, case in cases:
+                for run in range(1, options["repeat"] + 1):
+                    with CaptureQueriesContext(connection) as queries:
+                        started = time.perf_counter()
+                        result = case()
+                        elapsed = time.perf_counter() - started
+                    self.stdout.write(
+                        f"{name} run {run}: {len(result)} rows in {elapsed * 1000:.1f}ms | "
+                        f"{len(queries.captured_queries)} queries"
+                    )
+                if options["explain"]:
+                    self._explain(queries.captured_queries[-1]["sql"])
+
+            if not options["commit"]:
+                transaction.set_rollback(True)
+
+        self.stdout.write(self.style.SUCCESS("Benchmark complete"))
+
+    def _populate(self, event, participants, per_participant):
+        """Create participants with back-to-back, non-overlapping windows."""
+        start = (event.end_date or event.created_at).replace(minute=0, second=0, microsecond=0)
+
+        users = User.objects.bulk_create(
+            [
+                User(username=f"overlap-bench-{event.pk.hex[:8]}-{index}", email=f"bench{index}@example.com")
+                for index in range(participants)
+            ]
+        )
+        participations = EventParticipation.objects.bulk_create(
+            [
+                EventParticipation(
+                    event=event, user=user, participation_type="team_signup", status="signed_up"
+                )
+                for user in users
+            ]
+        )
+
+        windows = []
+        for index, participation in enumerate(participations):
+            # Windows of 15 minutes to 1h45, staggered per participant so
+            # every slot has a different subset of drivers available
+            offset = (index % 4) * QUARTER
+            for slot in range(per_participant):
+                window_start = start + offset + slot * 8 * QUARTER
+                windows.append(
+                    AvailabilityWindow(
+                        participation=participation,
+                        start_time=window_start,
+                        end_time=window_start + (1 + (index + slot) % 7) * QUARTER,
+                        can_drive=True,
+                        can_spot=slot % 3 == 0,
+                        preference_level=1 + (index + slot) % 5,
+                    )
+                )
+        AvailabilityWindow.objects.bulk_create(windows, batch_size=1000)
+        return start
+
+    def _explain(self, sql):
+        with connection.cursor() as cursor:
+            cursor.execute(f"EXPLAIN ANALYZE {sql}")
+            for (line,) in cursor.fetchall():
+                self.stdout.write(f"  {line}")
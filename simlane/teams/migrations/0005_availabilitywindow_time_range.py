@@ -0,0 +1,24 @@
+# Generated by Django 5.1.11 on 2026-10-16 20:51
+
+import django.contrib.postgres.fields.ranges
+import django.contrib.postgres.indexes
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('teams', '0004_clubjoinrequest_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='availabilitywindow',
+            name='time_range',
+            field=models.GeneratedField(db_persist=True, expression=models.Func(models.F('start_time'), models.F('end_time'), function='TSTZRANGE'), output_field=django.contrib.postgres.fields.ranges.DateTimeRangeField()),
+        ),
+        migrations.AddIndex(
+            model_name='availabilitywindow',
+            index=django.contrib.postgres.indexes.GistIndex(fields=['time_range'], name='availability_window_range'),
+        ),
+    ]
@@ -4,9 +4,12 @@ import uuid
 import zoneinfo
 from datetime import timedelta
 
+from django.contrib.postgres.fields import DateTimeRangeField
+from django.contrib.postgres.indexes import GistIndex
 from django.core.exceptions import ValidationError
 from django.db import models
 from django.db import transaction
+from django.db.backends.postgresql.psycopg_any import DateTimeTZRange
 from django.utils import timezone
 from django.utils.text import slugify
 
@@ -865,6 +868,17 @@ class AvailabilityWindow(models.Model):
     # Absolute times stored in UTC
     start_time = models.DateTimeField(help_text="Start time in UTC")
     end_time = models.DateTimeField(help_text="End time in UTC")
+    # [start_time, end_time) kept by the database, for GiST-indexed overlap
+    # (&&) and containment (@>) queries
+    time_range = models.GeneratedField(
+        expression=models.Func(
+            models.F("start_time"),
+            models.F("end_time"),
+            function="TSTZRANGE",
+        ),
+        output_field=DateTimeRangeField(),
+        db_persist=True,
+    )
 
     # Role-specific availability during this window
     can_drive = models.BooleanField(default=False)
@@ -908,6 +922,7 @@ class AvailabilityWindow(models.Model):
             models.Index(fields=["preference_level"]),
             # Compound index for overlap queries
             models.Index(fields=["participation", "start_time", "end_time"]),
+            GistIndex(fields=["time_range"], name="availability_window_range"),
         ]
         constraints = [
             # Basic time validation - start must be before end
@@ -975,8 +990,7 @@ class AvailabilityWindow(models.Model):
         if self.participation:
             overlapping_windows = AvailabilityWindow.objects.filter(
                 participation=self.participation,
-                start_time__lt=self.end_time,
-                end_time__gt=self.start_time,
+                time_range__overlap=DateTimeTZRange(self.start_time, self.end_time),
             ).exclude(pk=self.pk)
 
             if overlapping_windows.exists():
@@ -1059,8 +1073,7 @@ class AvailabilityWindow(models.Model):
 
         return cls.objects.filter(
             participation__event=event,
-            start_time__lte=start_time,
-            end_time__gte=end_time,
+            time_range__contains=DateTimeTZRange(start_time, end_time),
             **{role_field: True},
         ).select_related("participation__user")
 
@@ -1115,59 +1128,40 @@ class AvailabilityWindow(models.Model):
     @classmethod
     def find_overlapping_availability(cls, user_ids, event, min_overlap_hours=2):
         """
-        Find overlapping availability between multiple users using optimized SQL
+        Find overlapping availability between multiple users with a range-overlap self join
         """
         from django.db import connection
 
+        # Pairs are matched with && on the GiST-indexed time_range and the
+        # overlap is the range intersection (*)
         sql = """
-        WITH user_windows AS (
-            SELECT
-                aw.participation_id,
-                p.user_id,
-                aw.start_time,
-                aw.end_time,
-                aw.can_drive,
-                aw.can_spot,
-                aw.preference_level
-            FROM teams_availabilitywindow aw
-            JOIN teams_eventparticipation p ON aw.participation_id = p.id
-            WHERE p.event_id = %s
-              AND p.user_id = ANY(%s)
-              AND aw.can_drive = true
-        ),
-        overlaps AS (
-            SELECT
-                w1.user_id as user1_id,
-                w2.user_id as user2_id,
-                GREATEST(w1.start_time, w2.start_time) as overlap_start,
-                LEAST(w1.end_time, w2.end_time) as overlap_end,
-                EXTRACT(EPOCH FROM (
-                    LEAST(w1.end_time, w2.end_time) -
-                    GREATEST(w1.start_time, w2.start_time)
-                )) / 3600 as overlap_hours
-            FROM user_windows w1
-            JOIN user_windows w2 ON w1.user_id < w2.user_id
-            WHERE w1.start_time < w2.end_time
-              AND w1.end_time > w2.start_time
-              AND EXTRACT(EPOCH FROM (
-                  LEAST(w1.end_time, w2.end_time) -
-                  GREATEST(w1.start_time, w2.start_time)
-              )) / 3600 >= %s
-        )
         SELECT
-            user1_id,
-            user2_id,
-            SUM(overlap_hours) as total_overlap_hours,
-            COUNT(*) as overlap_count,
-            MIN(overlap_start) as first_overlap_start,
-            MAX(overlap_end) as last_overlap_end
-        FROM overlaps
-        GROUP BY user1_id, user2_id
+            p1.user_id AS user1_id,
+            p2.user_id AS user2_id,
+            SUM(EXTRACT(EPOCH FROM upper(o.overlap) - lower(o.overlap))) / 3600
+                AS total_overlap_hours,
+            COUNT(*) AS overlap_count,
+            MIN(lower(o.overlap)) AS first_overlap_start,
+            MAX(upper(o.overlap)) AS last_overlap_end
+        FROM teams_availabilitywindow w1
+        JOIN teams_eventparticipation p1 ON w1.participation_id = p1.id
+        JOIN teams_availabilitywindow w2 ON w1.time_range && w2.time_range
+        JOIN teams_eventparticipation p2 ON w2.participation_id = p2.id
+        CROSS JOIN LATERAL (SELECT w1.time_range * w2.time_range AS overlap) o
+        WHERE p1.event_id = %s
+          AND p2.event_id = %s
+          AND p1.user_id = ANY(%s)
+          AND p2.user_id = ANY(%s)
+          AND p1.user_id < p2.user_id
+          AND w1.can_drive = true
+          AND w2.can_drive = true
+          AND EXTRACT(EPOCH FROM upper(o.overlap) - lower(o.overlap)) / 3600 >= %s
+        GROUP BY p1.user_id, p2.user_id
         ORDER BY total_overlap_hours DESC
         """
 
         with connection.cursor() as cursor:
-            cursor.execute(sql, [event.id, user_ids, min_overlap_hours])
+            cursor.execute(sql, [event.id, event.id, user_ids, user_ids, min_overlap_hours])
             columns = [col[0] for col in cursor.description]
             return [dict(zip(columns, row, strict=False)) for row in cursor.fetchall()]
 
@@ -1181,79 +1175,23 @@ class AvailabilityWindow(models.Model):
         """
         Advanced team formation algorithm using availability overlap analysis
         """
+        from .formation import TeamFormationSolver
 
-        # Get all signed up participants
-        participants = EventParticipation.objects.filter(
-            event=event,
-            status="signed_up",
-        ).values_list("user_id", flat=True)
-
-        if len(participants) < team_size:
-            return []
-
-        # Find all pairwise overlaps
-        overlaps = cls.find_overlapping_availability(
-            list(participants),
+        solver = TeamFormationSolver.for_event(
             event,
-            min_overlap_hours=1,  # Start with any overlap
+            team_size=team_size,
+            participation_type=None,
+            coverage_target=min_coverage_hours,
         )
 
-        # Group formation algorithm (simplified)
-        # In practice, you'd want a more sophisticated algorithm
-        recommendations = []
-        used_users = set()
-
-        # Sort by total overlap hours
-        overlap_dict = {}
-        for overlap in overlaps:
-            user1, user2 = overlap["user1_id"], overlap["user2_id"]
-            if user1 not in overlap_dict:
-                overlap_dict[user1] = {}
-            if user2 not in overlap_dict:
-                overlap_dict[user2] = {}
-
-            overlap_dict[user1][user2] = overlap["total_overlap_hours"]
-            overlap_dict[user2][user1] = overlap["total_overlap_hours"]
-
-        # Simple greedy team formation
-        for user1 in participants:
-            if user1 in used_users:
-                continue
-
-            potential_team = [user1]
-            candidates = [u for u in participants if u != user1 and u not in used_users]
-
-            # Find best teammates based on overlap
-            while len(potential_team) < team_size and candidates:
-                best_candidate = None
-                best_score = 0
-
-                for candidate in candidates:
-                    score = sum(
-                        overlap_dict.get(team_member, {}).get(candidate, 0)
-                        for team_member in potential_team
-                    )
-
-                    if score > best_score:
-                        best_score = score
-                        best_candidate = candidate
-
-                if best_candidate and best_score > 0:
-                    potential_team.append(best_candidate)
-                    candidates.remove(best_candidate)
-                else:
-                    break
-
-            if len(potential_team) >= team_size:
-                recommendations.append(
-                    {
-                        "team_members": potential_team,
-                        "total_overlap_score": best_score,
-                        "coverage_estimate": best_score,  # Simplified
-                    },
-                )
-                used_users.update(potential_team)
-
+        recommendations = [
+            {
+                "team_members": team.member_ids,
+                "total_overlap_score": team.overlap_hours,
+                "coverage_estimate": team.coverage_hours,
+            }
+            for team in solver.solve()
+        ]
         return sorted(
             recommendations,
             key=lambda x: x["total_overlap_score"],
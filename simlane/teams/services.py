@@ -10,6 +10,7 @@ from typing import Any
 from django.contrib.auth import get_user_model
 from django.core.exceptions import ValidationError
 from django.db import transaction
+from django.db.backends.postgresql.psycopg_any import DateTimeTZRange
 from django.utils import timezone
 
 # from simlane.core.services import EmailService
@@ -17,6 +18,9 @@ from simlane.sim.models import Event
 from simlane.sim.models import SimCar
 from simlane.users.models import User
 
+from .availability_cache import refresh_users_on_commit
+from .coverage import AvailabilityGrid
+from .coverage import iter_runs
 from .models import AvailabilityWindow
 from .models import Club
 from .models import EventParticipation
@@ -26,6 +30,26 @@ from .models import Team
 User = get_user_model()
 logger = logging.getLogger(__name__)
 
+# Window lengths are whole multiples of this
+WINDOW_GRANULARITY = timedelta(minutes=15)
+
+# Longest time a bitmask may cover, whatever its resolution
+MAX_MASK_SPAN = timedelta(weeks=4)
+
+WINDOW_ROLES = ("can_drive", "can_spot", "can_strategize")
+
+# Roles and preferences of a window left out of a batch; touching windows are
+# only joined when all of these match
+WINDOW_DEFAULTS = {
+    "can_drive": True,
+    "can_spot": True,
+    "can_strategize": False,
+    "preference_level": 3,
+    "max_consecutive_stints": 1,
+    "preferred_stint_length": None,
+    "notes": "",
+}
+
 
 class EventParticipationService:
     """Service for managing event participation workflows"""
@@ -213,33 +237,220 @@ class AvailabilityService:
         windows = []
 
         for data in availability_data:
-            start_utc = (
+            window = {
+                key: value
+                for key, value in data.items()
+                if key not in ("start_time_local", "end_time_local")
+            }
+            window["start_time"] = (
                 data["start_time_local"]
                 .replace(tzinfo=user_tz)
                 .astimezone(zoneinfo.ZoneInfo("UTC"))
             )
-            end_utc = (
+            window["end_time"] = (
                 data["end_time_local"]
                 .replace(tzinfo=user_tz)
                 .astimezone(zoneinfo.ZoneInfo("UTC"))
             )
+            windows.append(window)
 
-            windows.append(
-                AvailabilityWindow(
-                    participation=participation,
-                    start_time=start_utc,
-                    end_time=end_utc,
-                    can_drive=data.get("can_drive", True),
-                    can_spot=data.get("can_spot", True),
-                    can_strategize=data.get("can_strategize", False),
-                    preference_level=data.get("preference_level", 3),
-                    max_consecutive_stints=data.get("max_consecutive_stints", 1),
-                    preferred_stint_length=data.get("preferred_stint_length"),
-                    notes=data.get("notes", ""),
-                ),
+        windows = AvailabilityService.merge_windows(windows)
+        existing = AvailabilityWindow.objects.filter(
+            participation=participation,
+        ).values_list("start_time", "end_time")
+        AvailabilityService.validate_windows(participation, windows, existing)
+
+        created = AvailabilityWindow.objects.bulk_create(
+            AvailabilityService._build_windows(participation, windows),
+        )
+        # bulk_create skips post_save, so the cache is refreshed here
+        refresh_users_on_commit(participation.event_id, [participation.user_id])
+        return created
+
+    @staticmethod
+    def replace_availability(
+        participation: EventParticipation,
+        windows: list[dict],
+    ) -> list[AvailabilityWindow]:
+        """
+        Atomically replace all windows of a participation with UTC window
+        dicts, merged and validated as one batch.
+        """
+        windows = AvailabilityService.merge_windows(windows)
+        AvailabilityService.validate_windows(participation, windows)
+
+        with transaction.atomic():
+            # Serialize concurrent replacements of the same participation
+            EventParticipation.objects.select_for_update().filter(pk=participation.pk).exists()
+            AvailabilityWindow.objects.filter(participation=participation).delete()
+            created = AvailabilityWindow.objects.bulk_create(
+                AvailabilityService._build_windows(participation, windows),
+            )
+            refresh_users_on_commit(participation.event_id, [participation.user_id])
+
+        return created
+
+    @staticmethod
+    def windows_from_mask(
+        start_time,
+        resolution: timedelta,
+        mask: int,
+        **preferences,
+    ) -> list[dict]:
+        """Window dicts for each run of set bits, bit ``i`` being the ``i``-th bucket from start_time"""
+        if resolution <= timedelta(0) or resolution % WINDOW_GRANULARITY:
+            raise ValidationError(
+                f"Resolution must be a multiple of {WINDOW_GRANULARITY.seconds // 60} minutes.",
+            )
+        if mask < 0:
+            raise ValidationError("Bitmask cannot be negative.")
+        if mask.bit_length() * resolution > MAX_MASK_SPAN:
+            raise ValidationError(f"Bitmask cannot cover more than {MAX_MASK_SPAN.days} days.")
+        return [
+            {
+                **preferences,
+                "start_time": start_time + first * resolution,
+                "end_time": start_time + last * resolution,
+            }
+            for first, last in iter_runs(mask)
+        ]
+
+    @staticmethod
+    def merge_windows(windows: list[dict]) -> list[dict]:
+        """
+        Fill in WINDOW_DEFAULTS and merge windows into disjoint ones sorted by
+        start.
+
+        Overlapping windows are split where any of them starts or ends. Each
+        piece is available for the roles of all windows covering it, at the
+        best (lowest) preference level among them, and keeps the other
+        settings of the window with that level. Touching pieces that share
+        their roles and preferences are joined. Windows that do not end after
+        they start are passed on as they are, for validate_windows to report.
+        """
+        windows = [{**WINDOW_DEFAULTS, **window} for window in windows]
+        empty = [window for window in windows if window["end_time"] <= window["start_time"]]
+        windows = sorted(
+            (window for window in windows if window["end_time"] > window["start_time"]),
+            key=lambda w: w["start_time"],
+        )
+        boundaries = sorted({w["start_time"] for w in windows} | {w["end_time"] for w in windows})
+
+        merged = []
+        active = []
+        upcoming = 0
+        for start, end in zip(boundaries, boundaries[1:]):
+            while upcoming < len(windows) and windows[upcoming]["start_time"] <= start:
+                active.append(windows[upcoming])
+                upcoming += 1
+            active = [window for window in active if window["end_time"] > start]
+            if not active:
+                continue
+            best = min(active, key=lambda w: w["preference_level"])
+            piece = {
+                **best,
+                **{role: any(window[role] for window in active) for role in WINDOW_ROLES},
+                "start_time": start,
+                "end_time": end,
+            }
+            previous = merged[-1] if merged else None
+            if (
+                previous
+                and previous["end_time"] == start
+                and all(piece[field] == previous[field] for field in WINDOW_DEFAULTS)
+            ):
+                previous["end_time"] = end
+            else:
+                merged.append(piece)
+        return sorted(merged + empty, key=lambda w: w["start_time"])
+
+    @staticmethod
+    def validate_windows(
+        participation: EventParticipation,
+        windows: list[dict],
+        existing=(),
+    ) -> None:
+        """
+        Check a batch of merged windows, and the (start, end) pairs of
+        ``existing`` windows they must not overlap, in one pass.
+
+        Applies the rules of AvailabilityWindow.clean() and the model
+        constraints, and raises one ValidationError listing every problem.
+        """
+        errors = []
+        event = participation.event
+        event_start = getattr(event, "start_time", None)
+        event_end = getattr(event, "end_time", None)
+
+        for window in windows:
+            start, end = window["start_time"], window["end_time"]
+            label = f"{start:%Y-%m-%d %H:%M} to {end:%Y-%m-%d %H:%M}"
+            duration = end - start
+            if duration < WINDOW_GRANULARITY:
+                errors.append(f"{label}: availability window must be at least 15 minutes long.")
+            elif duration % WINDOW_GRANULARITY:
+                errors.append(f"{label}: duration must be a multiple of 15 minutes.")
+            if not any(window[role] for role in WINDOW_ROLES):
+                errors.append(f"{label}: must be available for at least one role.")
+            if window["preference_level"] not in range(1, 6):
+                errors.append(f"{label}: preference level must be between 1 and 5.")
+            if event_start and start < event_start:
+                errors.append(f"{label}: cannot start before event start time ({event_start}).")
+            if event_end and end > event_end:
+                errors.append(f"{label}: cannot end after event end time ({event_end}).")
+
+        intervals = sorted(
+            [(window["start_time"], window["end_time"]) for window in windows] + list(existing),
+        )
+        latest_end = None
+        for start, end in intervals:
+            if latest_end and start < latest_end:
+                errors.append(
+                    f"{start:%Y-%m-%d %H:%M} to {end:%Y-%m-%d %H:%M}: overlaps another window. "
+                    f"Windows for the same participant cannot overlap.",
+                )
+            latest_end = max(latest_end, end) if latest_end else end
+
+        if errors:
+            raise ValidationError(errors)
+
+    @staticmethod
+    def availability_summary(windows: list[AvailabilityWindow]) -> dict[str, Any]:
+        """Hours per role and span of a participation's windows"""
+
+        def hours(role):
+            return sum(
+                window.duration_hours() for window in windows if getattr(window, role)
             )
 
-        return AvailabilityWindow.objects.bulk_create(windows)
+        return {
+            "windows": windows,
+            "window_count": len(windows),
+            "total_hours": sum(window.duration_hours() for window in windows),
+            "drive_hours": hours("can_drive"),
+            "spot_hours": hours("can_spot"),
+            "strategize_hours": hours("can_strategize"),
+            "first_start": min((window.start_time for window in windows), default=None),
+            "last_end": max((window.end_time for window in windows), default=None),
+        }
+
+    @staticmethod
+    def _build_windows(participation, windows: list[dict]) -> list[AvailabilityWindow]:
+        return [
+            AvailabilityWindow(
+                participation=participation,
+                start_time=window["start_time"],
+                end_time=window["end_time"],
+                can_drive=window["can_drive"],
+                can_spot=window["can_spot"],
+                can_strategize=window["can_strategize"],
+                preference_level=window["preference_level"],
+                max_consecutive_stints=window["max_consecutive_stints"],
+                preferred_stint_length=window["preferred_stint_length"],
+                notes=window["notes"] or "",
+            )
+            for window in windows
+        ]
 
     @staticmethod
     def get_availability_conflicts(
@@ -253,8 +464,7 @@ class AvailabilityService:
         # Find overlapping windows where users are NOT available for driving
         unavailable_windows = AvailabilityWindow.objects.filter(
             participation__event=event,
-            start_time__lt=target_end,
-            end_time__gt=target_start,
+            time_range__overlap=DateTimeTZRange(target_start, target_end),
             can_drive=False,
         ).select_related("participation__user")
 
@@ -280,63 +490,34 @@ class AvailabilityService:
         import zoneinfo
 
         display_tz = zoneinfo.ZoneInfo(timezone_display)
-        windows = (
-            AvailabilityWindow.objects.filter(
-                participation__event=event,
-            )
-            .select_related("participation__user")
-            .order_by("start_time")
-        )
 
-        # Group by hour for coverage analysis
-        coverage = {}
+        # Hourly buckets of every user's windows, loaded with one query
+        grid = AvailabilityGrid.for_event(event, timedelta(hours=1))
         total_participants = EventParticipation.objects.filter(event=event).count()
 
-        for window in windows:
-            start_hour = window.start_time.replace(minute=0, second=0, microsecond=0)
-            end_hour = window.end_time.replace(minute=0, second=0, microsecond=0)
-
-            current_hour = start_hour
-            while current_hour <= end_hour:
-                hour_key = current_hour.astimezone(display_tz).strftime(
-                    "%Y-%m-%d %H:00",
-                )
-
-                if hour_key not in coverage:
-                    coverage[hour_key] = {
-                        "drivers": 0,
-                        "spotters": 0,
-                        "strategists": 0,
-                        "total_available": 0,
-                        "users": set(),
-                    }
-
-                if window.can_drive:
-                    coverage[hour_key]["drivers"] += 1
-                if window.can_spot:
-                    coverage[hour_key]["spotters"] += 1
-                if window.can_strategize:
-                    coverage[hour_key]["strategists"] += 1
-
-                coverage[hour_key]["users"].add(window.participation.user.id)
-                current_hour += timedelta(hours=1)
-
-        # Convert sets to counts and calculate percentages
-        for hour_data in coverage.values():
-            hour_data["total_available"] = len(hour_data["users"])
-            hour_data["coverage_percentage"] = (
-                (hour_data["total_available"] / total_participants * 100)
-                if total_participants > 0
-                else 0
-            )
-            hour_data["users"] = list(
-                hour_data["users"],
-            )  # Convert set to list for JSON serialization
+        coverage = {}
+        for hour_start, counts in zip(grid.bucket_starts(), grid.counts(), strict=True):
+            if not counts["users"]:
+                continue
+            hour_key = hour_start.astimezone(display_tz).strftime("%Y-%m-%d %H:00")
+            coverage[hour_key] = {
+                "drivers": counts["drive"],
+                "spotters": counts["spot"],
+                "strategists": counts["strategize"],
+                "total_available": len(counts["users"]),
+                "coverage_percentage": (
+                    (len(counts["users"]) / total_participants * 100)
+                    if total_participants > 0
+                    else 0
+                ),
+                "users": counts["users"],
+            }
 
         return {
             "total_participants": total_participants,
             "hourly_coverage": coverage,
             "timezone": timezone_display,
+            "version": grid.version,
         }
 
 
@@ -0,0 +1,18 @@
+from datetime import datetime
+from datetime import timedelta
+from datetime import timezone as dt_timezone
+
+START = datetime(2025, 1, 7, 10, 20, tzinfo=dt_timezone.utc)
+
+
+def window_row(user_id, start_minutes, end_minutes, drive=True, spot=False, strategize=False, preference=3):
+    """Availability window values in the order the coverage grid loads them"""
+    return (
+        user_id,
+        START + timedelta(minutes=start_minutes),
+        START + timedelta(minutes=end_minutes),
+        drive,
+        spot,
+        strategize,
+        preference,
+    )
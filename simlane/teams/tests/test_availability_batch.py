@@ -0,0 +1,174 @@
+"""
+Tests for batch availability merging and validation
+"""
+
+import uuid
+from datetime import timedelta
+from types import SimpleNamespace
+
+from django.core.exceptions import ValidationError
+from django.test import SimpleTestCase
+from ninja.errors import HttpError
+
+from simlane.api.routers import events
+from simlane.core.testing import PatchingTestCase
+from simlane.teams.services import AvailabilityService
+from simlane.teams.tests.factories import START
+
+PARTICIPATION = SimpleNamespace(event=SimpleNamespace())
+
+
+def _window(start_minutes, end_minutes, **preferences):
+    return {
+        "start_time": START + timedelta(minutes=start_minutes),
+        "end_time": START + timedelta(minutes=end_minutes),
+        **preferences,
+    }
+
+
+def _spans(windows):
+    return [
+        ((window["start_time"] - START) // timedelta(minutes=1), (window["end_time"] - START) // timedelta(minutes=1))
+        for window in windows
+    ]
+
+
+class MergeWindowsTest(SimpleTestCase):
+    """Test merging of overlapping and adjacent intervals"""
+
+    def test_merges_adjacent_and_overlapping(self):
+        merged = AvailabilityService.merge_windows(
+            [_window(60, 90), _window(0, 30), _window(30, 45), _window(40, 60), _window(120, 135)],
+        )
+
+        self.assertEqual(_spans(merged), [(0, 90), (120, 135)])
+        self.assertEqual(merged[0]["preference_level"], 3)
+
+    def test_keeps_different_preferences_apart(self):
+        merged = AvailabilityService.merge_windows(
+            [_window(0, 30), _window(30, 60, preference_level=1)],
+        )
+
+        self.assertEqual(_spans(merged), [(0, 30), (30, 60)])
+
+    def test_splits_overlapping_preferences(self):
+        merged = AvailabilityService.merge_windows(
+            [_window(0, 60, preference_level=4), _window(30, 90, preference_level=1)],
+        )
+
+        self.assertEqual(_spans(merged), [(0, 30), (30, 90)])
+        self.assertEqual([window["preference_level"] for window in merged], [4, 1])
+
+    def test_combines_overlapping_roles(self):
+        merged = AvailabilityService.merge_windows(
+            [
+                _window(0, 60, can_spot=False),
+                _window(15, 45, can_drive=False, can_strategize=True, preference_level=2),
+            ],
+        )
+
+        self.assertEqual(_spans(merged), [(0, 15), (15, 45), (45, 60)])
+        self.assertEqual(
+            [(window["can_drive"], window["can_spot"], window["can_strategize"]) for window in merged],
+            [(True, False, False), (True, True, True), (True, False, False)],
+        )
+        self.assertEqual(merged[1]["preference_level"], 2)
+
+
+class ValidateWindowsTest(SimpleTestCase):
+    """Test one-pass validation of a batch"""
+
+    def _validate(self, windows, existing=()):
+        AvailabilityService.validate_windows(
+            PARTICIPATION,
+            AvailabilityService.merge_windows(windows),
+            existing,
+        )
+
+    def test_valid_batch(self):
+        self._validate([_window(0, 30), _window(30, 60, preference_level=1)])
+
+    def test_reports_every_problem(self):
+        windows = [
+            _window(0, 10),
+            _window(30, 50),
+            _window(60, 90, can_drive=False, can_spot=False),
+            _window(120, 105),
+            _window(135, 165, preference_level=7),
+        ]
+        existing = [(START + timedelta(minutes=150), START + timedelta(minutes=180))]
+
+        with self.assertRaises(ValidationError) as raised:
+            self._validate(windows, existing)
+
+        messages = raised.exception.messages
+        self.assertEqual(len(messages), 6)
+        self.assertIn("at least 15 minutes", messages[0])
+        self.assertIn("multiple of 15 minutes", messages[1])
+        self.assertIn("at least one role", messages[2])
+        self.assertIn("at least 15 minutes", messages[3])
+        self.assertIn("between 1 and 5", messages[4])
+        self.assertIn("overlaps another window", messages[5])
+
+    def test_overlap_with_existing_windows(self):
+        existing = [(START + timedelta(minutes=15), START + timedelta(minutes=45))]
+
+        with self.assertRaises(ValidationError):
+            self._validate([_window(30, 60)], existing)
+
+
+class WindowsFromMaskTest(SimpleTestCase):
+    """Test bitmask expansion"""
+
+    def test_runs_become_windows(self):
+        windows = AvailabilityService.windows_from_mask(
+            START, timedelta(minutes=30), 0b1110_0011, can_spot=True,
+        )
+
+        self.assertEqual(_spans(windows), [(0, 60), (150, 240)])
+        self.assertTrue(windows[0]["can_spot"])
+
+    def test_span_is_capped_whatever_the_resolution(self):
+        four_weeks = (1 << 28 * 24) - 1
+
+        windows = AvailabilityService.windows_from_mask(START, timedelta(hours=1), four_weeks)
+        self.assertEqual(_spans(windows), [(0, 28 * 24 * 60)])
+        with self.assertRaises(ValidationError):
+            AvailabilityService.windows_from_mask(START, timedelta(hours=2), four_weeks)
+
+    def test_resolution_must_be_whole_quarters(self):
+        with self.assertRaises(ValidationError):
+            AvailabilityService.windows_from_mask(START, timedelta(minutes=20), 0b1)
+
+    def test_negative_mask_is_rejected(self):
+        with self.assertRaises(ValidationError):
+            AvailabilityService.windows_from_mask(START, timedelta(minutes=15), int("-f", 16))
+
+
+class ReplaceAvailabilityEndpointTest(PatchingTestCase):
+    """Test bitmask errors of the availability replace endpoint"""
+
+    def setUp(self):
+        self.request = SimpleNamespace(user=object())
+        self.patch_object(events, "get_club_from_context")
+        self.patch_object(events, "check_race_planning_subscription")
+        self.patch_object(
+            events, "get_object_or_404", return_value=SimpleNamespace(user=self.request.user)
+        )
+        self.replace = self.patch_object(AvailabilityService, "replace_availability")
+
+    def _put(self, mask):
+        data = events.ReplaceAvailabilitySchema(bitmasks=[{"start_time": START, "mask": mask}])
+        with self.assertRaises(HttpError) as raised:
+            events.replace_availability_windows(self.request, uuid.uuid4(), uuid.uuid4(), data)
+        self.replace.assert_not_called()
+        return raised.exception
+
+    def test_negative_mask_is_a_bad_request(self):
+        error = self._put("-f")
+
+        self.assertEqual(error.status_code, 400)
+        self.assertIn("negative", str(error))
+
+    def test_non_hex_mask_is_a_bad_request(self):
+        self.assertEqual(self._put("xyz").status_code, 400)
@@ -0,0 +1,111 @@
+"""
+Tests for the per-event availability bitmap cache
+"""
+
+from datetime import timedelta
+
+from django.test import SimpleTestCase
+from django.test import override_settings
+from redis.exceptions import ConnectionError as RedisConnectionError
+
+from simlane.core.testing import PatchingTestCase
+from simlane.teams import availability_cache
+from simlane.teams.availability_cache import CACHE_RESOLUTION
+from simlane.teams.availability_cache import EPOCH
+from simlane.teams.availability_cache import decode_user
+from simlane.teams.availability_cache import encode_user
+from simlane.teams.availability_cache import user_masks
+from simlane.teams.coverage import AvailabilityGrid
+from simlane.teams.tests.factories import window_row
+
+WINDOWS = [
+    window_row(1, 10, 40, preference=4),
+    window_row(1, 35, 65, drive=False, spot=True, preference=2),
+    window_row(2, 0, 170, strategize=True),
+    window_row(None, 0, 30),
+]
+
+
+def _from_cache(windows, resolution, **span):
+    return AvailabilityGrid.from_user_masks(
+        user_masks(windows), EPOCH, CACHE_RESOLUTION, resolution, **span
+    )
+
+
+class UserMasksTest(SimpleTestCase):
+    """Test the cached per-user masks against grids built from windows"""
+
+    def test_encode_round_trip(self):
+        base, user = user_masks(WINDOWS)[1]
+
+        self.assertEqual(decode_user(encode_user(base, user)), (base, user))
+
+    def test_grid_matches_windows(self):
+        for resolution in (CACHE_RESOLUTION, timedelta(minutes=30), timedelta(hours=1)):
+            with self.subTest(resolution=resolution):
+                expected = AvailabilityGrid.from_windows(WINDOWS, resolution)
+                grid = _from_cache(WINDOWS, resolution)
+
+                self.assertEqual((grid.start, grid.bucket_count), (expected.start, expected.bucket_count))
+                self.assertEqual(grid.counts(), expected.counts())
+                self.assertEqual(grid.row(1), expected.row(1))
+
+    def test_explicit_span_is_clipped(self):
+        start = WINDOWS[0][1].replace(minute=30)
+        span = {"start": start, "end": start + timedelta(hours=1)}
+
+        grid = _from_cache(WINDOWS, CACHE_RESOLUTION, **span)
+
+        self.assertEqual(grid.counts(), AvailabilityGrid.from_windows(WINDOWS, CACHE_RESOLUTION, **span).counts())
+
+    def test_misaligned_buckets_are_not_served(self):
+        self.assertIsNone(_from_cache(WINDOWS, timedelta(minutes=20)))
+
+
+@override_settings(TEAM_AVAILABILITY_CACHE_TIMEOUT=60)
+class AvailabilityCacheTest(PatchingTestCase):
+    """Test reads, rebuild fallback and incremental refreshes"""
+
+    def setUp(self):
+        self.connection = self.patch_object(availability_cache, "get_redis_connection").return_value
+        self.event_windows = self.patch_object(availability_cache, "_event_windows", return_value=WINDOWS)
+
+    def test_reads_built_hash(self):
+        base, user = user_masks(WINDOWS)[2]
+        self.connection.pipeline.return_value.execute.return_value = [
+            {b"built": b"2025-01-07T00:00:00+00:00", b"user:2": encode_user(base, user)},
+            b"7",
+        ]
+
+        version, users = availability_cache.event_availability("event")
+
+        self.assertEqual((version, users), (7, {2: (base, user)}))
+        self.event_windows.assert_not_called()
+
+    def test_falls_back_to_windows_without_redis(self):
+        self.connection.pipeline.side_effect = RedisConnectionError("down")
+
+        version, users = availability_cache.event_availability("event")
+
+        self.assertIsNone(version)
+        self.assertEqual(set(users), {1, 2})
+
+    def test_refresh_replaces_changed_users_only(self):
+        self.connection.hexists.return_value = True
+        pipeline = self.connection.pipeline.return_value
+
+        availability_cache.refresh_users("event", [2, 3])
+
+        self.event_windows.assert_called_once_with("event", {2, 3})
+        self.assertEqual(list(pipeline.hset.call_args.kwargs["mapping"]), ["user:1", "user:2"])
+        pipeline.hdel.assert_called_once_with("teams:availability:event", "user:3")
+        pipeline.incr.assert_called_once_with("teams:availability:event:version")
+
+    def test_refresh_without_built_hash_only_bumps_version(self):
+        self.connection.hexists.return_value = False
+        pipeline = self.connection.pipeline.return_value
+
+        availability_cache.refresh_users("event", [1])
+
+        pipeline.hset.assert_not_called()
+        pipeline.incr.assert_called_once_with("teams:availability:event:version")
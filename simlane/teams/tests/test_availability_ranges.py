@@ -0,0 +1,244 @@
+"""
+Tests for the range-indexed availability window queries
+"""
+
+from datetime import datetime
+from datetime import timedelta
+from datetime import timezone as dt_timezone
+
+from django.db.backends.postgresql.psycopg_any import DateTimeTZRange
+from django.test import TestCase
+
+from simlane.sim.models import Event
+from simlane.sim.models import SimLayout
+from simlane.sim.models import SimTrack
+from simlane.sim.models import Simulator
+from simlane.sim.models import TrackModel
+from simlane.teams.models import AvailabilityWindow
+from simlane.teams.models import EventParticipation
+from simlane.teams.services import AvailabilityService
+from simlane.teams.utils import AvailabilityConflictDetector
+from simlane.users.tests.factories import UserFactory
+
+START = datetime(2030, 1, 7, 10, tzinfo=dt_timezone.utc)
+
+
+def _at(minutes):
+    return START + timedelta(minutes=minutes)
+
+
+class AvailabilityRangeTestCase(TestCase):
+    """Event with three participants and their availability windows"""
+
+    def setUp(self):
+        simulator = Simulator.objects.create(name="iRacing")
+        track = TrackModel.objects.create(name="Spa")
+        sim_track = SimTrack.objects.create(
+            simulator=simulator, track_model=track, sim_api_id="101", display_name="Spa"
+        )
+        layout = SimLayout.objects.create(
+            sim_track=sim_track, layout_code="101", name="Grand Prix", type="ROAD", length_km=7.0
+        )
+        self.event = Event.objects.create(simulator=simulator, sim_layout=layout, name="24h")
+        self.users = UserFactory.create_batch(3)
+        self.participations = [
+            EventParticipation.objects.create(
+                event=self.event, user=user, participation_type="team_signup"
+            )
+            for user in self.users
+        ]
+
+    def _window(self, index, start_minutes, end_minutes, drive=True, spot=False):
+        return AvailabilityWindow.objects.create(
+            participation=self.participations[index],
+            start_time=_at(start_minutes),
+            end_time=_at(end_minutes),
+            can_drive=drive,
+            can_spot=spot,
+        )
+
+
+class RangeLookupTest(AvailabilityRangeTestCase):
+    """Test && and @> against the start_time/end_time predicates they replace"""
+
+    # Probes touching, straddling, inside and matching the windows' bounds
+    PROBES = [
+        (0, 60),
+        (60, 120),
+        (120, 180),
+        (45, 60),
+        (59, 61),
+        (60, 60 + 15),
+        (90, 150),
+        (0, 240),
+        (180, 240),
+        (240, 300),
+    ]
+
+    def setUp(self):
+        super().setUp()
+        # Back to back windows meet at 60 and 120 without overlapping
+        self._window(0, 0, 60)
+        self._window(0, 60, 120)
+        self._window(1, 60, 180)
+        self._window(2, 120, 240)
+
+    def _ids(self, queryset):
+        return set(queryset.values_list("pk", flat=True))
+
+    def test_overlap_matches_interval_predicate(self):
+        windows = AvailabilityWindow.objects.all()
+
+        for start, end in self.PROBES:
+            with self.subTest(start=start, end=end):
+                self.assertEqual(
+                    self._ids(windows.filter(time_range__overlap=DateTimeTZRange(_at(start), _at(end)))),
+                    self._ids(windows.filter(start_time__lt=_at(end), end_time__gt=_at(start))),
+                )
+
+    def test_contains_matches_interval_predicate(self):
+        windows = AvailabilityWindow.objects.all()
+
+        for start, end in self.PROBES:
+            with self.subTest(start=start, end=end):
+                self.assertEqual(
+                    self._ids(windows.filter(time_range__contains=DateTimeTZRange(_at(start), _at(end)))),
+                    self._ids(windows.filter(start_time__lte=_at(start), end_time__gte=_at(end))),
+                )
+
+    def test_touching_bounds(self):
+        touching = AvailabilityWindow.objects.filter(
+            time_range__overlap=DateTimeTZRange(_at(120), _at(180)),
+        )
+
+        # The 60-120 window ends where the probe starts
+        self.assertEqual(
+            sorted((window.start_time, window.end_time) for window in touching),
+            [(_at(60), _at(180)), (_at(120), _at(240))],
+        )
+
+    def test_back_to_back_windows_are_valid(self):
+        self.assertEqual(self.participations[0].availability_windows.count(), 2)
+
+    def test_find_available_for_time_range_includes_exact_bounds(self):
+        available = AvailabilityWindow.find_available_for_time_range(self.event, _at(60), _at(180))
+
+        self.assertEqual([window.participation.user for window in available], [self.users[1]])
+
+
+class OverlappingAvailabilityTest(AvailabilityRangeTestCase):
+    """Test the intersection self join behind find_overlapping_availability"""
+
+    def setUp(self):
+        super().setUp()
+        self._window(0, 0, 240)
+        self._window(0, 300, 480)
+        self._window(1, 60, 360)
+        self._window(1, 420, 450)
+        self._window(2, 180, 300)
+        # Spotting windows never pair up
+        self._window(2, 360, 480, drive=False, spot=True)
+
+    def _pairs(self, min_overlap_hours):
+        user_ids = [user.id for user in self.users]
+
+        return {
+            (row["user1_id"], row["user2_id"]): (float(row["total_overlap_hours"]), row["overlap_count"])
+            for row in AvailabilityWindow.find_overlapping_availability(
+                user_ids, self.event, min_overlap_hours=min_overlap_hours
+            )
+        }
+
+    def test_sums_intersection_hours(self):
+        first, second, third = (user.id for user in self.users)
+
+        self.assertEqual(
+            self._pairs(0),
+            {
+                # 60-240, 300-360 and 420-450
+                (first, second): (4.5, 3),
+                # 180-240
+                (first, third): (1.0, 1),
+                # 180-300
+                (second, third): (2.0, 1),
+            },
+        )
+
+    def test_min_overlap_applies_per_intersection(self):
+        first, second, third = (user.id for user in self.users)
+
+        # Only the 3 hour 60-240 and 2 hour 180-300 intersections are long enough
+        self.assertEqual(self._pairs(2), {(first, second): (3.0, 1), (second, third): (2.0, 1)})
+        self.assertEqual(self._pairs(3.5), {})
+
+    def test_rows_are_ordered_by_total_overlap(self):
+        rows = AvailabilityWindow.find_overlapping_availability(
+            [user.id for user in self.users], self.event, min_overlap_hours=0
+        )
+
+        self.assertEqual(
+            [float(row["total_overlap_hours"]) for row in rows],
+            [4.5, 2.0, 1.0],
+        )
+        self.assertEqual((rows[0]["first_overlap_start"], rows[0]["last_overlap_end"]), (_at(60), _at(450)))
+
+
+class StintConflictTest(AvailabilityRangeTestCase):
+    """Test stint classification from the detector's single window query"""
+
+    def setUp(self):
+        super().setUp()
+        self._window(0, 0, 120)
+        self._window(0, 180, 240)
+        self._window(1, 60, 120, drive=False, spot=True)
+
+    def _stint(self, index, start_minutes, end_minutes):
+        return {"user_id": self.users[index].id, "start_time": _at(start_minutes), "end_time": _at(end_minutes)}
+
+    def test_classifies_stints(self):
+        stints = [
+            # Covered up to the window's end bound
+            self._stint(0, 60, 120),
+            # Starts in a window and runs past it
+            self._stint(0, 90, 150),
+            # Only touches the 180-240 window
+            self._stint(0, 150, 180),
+            # Spotting windows are not driving availability
+            self._stint(1, 60, 120),
+            self._stint(2, 0, 60),
+        ]
+
+        with self.assertNumQueries(1):
+            conflicts = AvailabilityConflictDetector.detect_stint_conflicts(
+                [user.id for user in self.users], stints
+            )
+
+        self.assertEqual(
+            [(conflict["type"], conflict["user_id"], conflict["stint_start"]) for conflict in conflicts],
+            [
+                ("partial_availability", self.users[0].id, _at(90)),
+                ("no_availability", self.users[0].id, _at(150)),
+                ("no_availability", self.users[1].id, _at(60)),
+                ("no_availability", self.users[2].id, _at(0)),
+            ],
+        )
+        self.assertEqual(
+            [(window["start_time"], window["end_time"]) for window in conflicts[0]["available_windows"]],
+            [(_at(0), _at(120))],
+        )
+
+    def test_no_stints_skip_the_query(self):
+        with self.assertNumQueries(0):
+            self.assertEqual(AvailabilityConflictDetector.detect_stint_conflicts([], []), [])
+
+    def test_availability_conflicts_exclude_touching_windows(self):
+        conflicts = AvailabilityService.get_availability_conflicts(self.event, _at(120), _at(180))
+
+        self.assertEqual(conflicts, [])
+        self.assertEqual(
+            [
+                conflict["user"]
+                for conflict in AvailabilityService.get_availability_conflicts(self.event, _at(90), _at(180))
+            ],
+            [self.users[1]],
+        )
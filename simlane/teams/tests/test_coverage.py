@@ -0,0 +1,87 @@
+"""
+Tests for the in-memory availability coverage grid
+"""
+
+from datetime import datetime
+from datetime import timedelta
+from datetime import timezone as dt_timezone
+
+from django.test import SimpleTestCase
+
+from simlane.teams.coverage import AvailabilityGrid
+from simlane.teams.coverage import bucket_mask
+from simlane.teams.coverage import coarsen_mask
+from simlane.teams.coverage import iter_bits
+from simlane.teams.coverage import iter_runs
+from simlane.teams.tests.factories import window_row
+
+QUARTER = timedelta(minutes=15)
+
+
+class AvailabilityGridTest(SimpleTestCase):
+    """Test bucket masks, heatmap cells and per-bucket counts"""
+
+    def test_span_rounds_to_hours(self):
+        grid = AvailabilityGrid.from_windows([window_row(1, 0, 60)], QUARTER)
+
+        self.assertEqual(grid.start, datetime(2025, 1, 7, 10, tzinfo=dt_timezone.utc))
+        # 10:00 to 12:00
+        self.assertEqual(grid.bucket_count, 8)
+
+    def test_partial_buckets_count_as_available(self):
+        grid = AvailabilityGrid.from_windows([window_row(1, 0, 30)], QUARTER)
+
+        # 10:20-10:50 touches the 10:15, 10:30 and 10:45 buckets
+        self.assertEqual(list(iter_bits(grid.users[1].available)), [1, 2, 3])
+
+    def test_cell_has_best_preference_and_roles(self):
+        grid = AvailabilityGrid.from_windows(
+            [
+                window_row(1, 10, 40, preference=4),
+                window_row(1, 35, 65, drive=False, spot=True, preference=2),
+            ],
+            QUARTER,
+        )
+
+        # 10:45 bucket is covered by both windows
+        self.assertEqual(grid.cell(1, 3), {"available": True, "preference_level": 2, "roles": ["driver", "spotter"]})
+        self.assertEqual(grid.cell(1, 2), {"available": True, "preference_level": 4, "roles": ["driver"]})
+        self.assertEqual(grid.cell(1, 7), {"available": False, "preference_level": 0, "roles": []})
+        self.assertEqual(grid.cell(2, 3)["available"], False)
+
+    def test_counts_are_distinct_users(self):
+        grid = AvailabilityGrid.from_windows(
+            [
+                window_row(1, 0, 10),
+                window_row(1, 10, 30),
+                window_row(2, 0, 30, drive=False, strategize=True),
+                window_row(None, 0, 30),
+            ],
+            timedelta(hours=1),
+        )
+
+        counts = grid.counts()
+
+        self.assertEqual(counts, [{"drive": 1, "spot": 0, "strategize": 1, "users": [1, 2]}])
+
+    def test_empty(self):
+        grid = AvailabilityGrid.from_windows([], QUARTER)
+
+        self.assertEqual((grid.bucket_count, grid.counts()), (0, []))
+
+
+class MaskHelpersTest(SimpleTestCase):
+    """Test run and coarsening helpers"""
+
+    def test_iter_runs(self):
+        self.assertEqual(list(iter_runs(0b1110_0110)), [(1, 3), (5, 8)])
+
+    def test_negative_masks_are_refused(self):
+        with self.assertRaises(AssertionError):
+            list(iter_runs(-15))
+        with self.assertRaises(AssertionError):
+            bucket_mask(-1, 2)
+
+    def test_coarsen_mask(self):
+        self.assertEqual(coarsen_mask(0b1000_0000_0110, 4), 0b101)
+        self.assertEqual(coarsen_mask(0b1011, 1), 0b1011)
@@ -0,0 +1,81 @@
+"""
+Tests for the team formation solver
+"""
+
+from django.test import SimpleTestCase
+
+from simlane.teams.coverage import bucket_mask
+from simlane.teams.formation import TeamFormationSolver
+
+# One bucket per hour
+EVENING = bucket_mask(0, 4)
+NIGHT = bucket_mask(4, 8)
+MORNING = bucket_mask(8, 12)
+
+
+def _solver(masks, experience=None, team_size=2, **options):
+    return TeamFormationSolver(
+        list(masks),
+        masks,
+        experience or {},
+        bucket_hours=1.0,
+        team_size=team_size,
+        **options,
+    )
+
+
+class TeamFormationSolverTest(SimpleTestCase):
+    """Test the overlap matrix, greedy seed and swap search"""
+
+    def test_overlap_matrix_is_popcount_of_shared_buckets(self):
+        solver = _solver({1: EVENING, 2: bucket_mask(2, 6), 3: MORNING})
+
+        self.assertEqual(solver.overlap[0], [0.0, 2.0, 0.0])
+        self.assertEqual(solver.overlap[1][0], 2.0)
+        self.assertEqual(solver.coverage_hours([0, 1]), 6.0)
+
+    def test_pairs_users_with_shared_availability(self):
+        masks = {1: EVENING, 2: NIGHT, 3: EVENING, 4: NIGHT, 5: MORNING}
+
+        teams = _solver(masks).solve(time_budget=1)
+
+        self.assertEqual(sorted(sorted(team.member_ids) for team in teams), [[1, 3], [2, 4]])
+        self.assertEqual(teams[0].overlap_hours, 4.0)
+
+    def test_max_teams(self):
+        masks = {1: EVENING, 2: EVENING, 3: NIGHT, 4: NIGHT}
+
+        self.assertEqual(len(_solver(masks).solve(max_teams=1, time_budget=1)), 1)
+
+    def test_swaps_reduce_experience_variance(self):
+        masks = dict.fromkeys([1, 2, 3, 4], EVENING)
+        experience = {1: 1, 2: 4, 3: 1, 4: 4}
+        solver = _solver(masks, experience)
+        teams, bench = solver._seed(None)
+        # Equal overlap everywhere, so the seed pairs users by index
+        self.assertEqual(sorted(sorted(team) for team in teams), [[0, 1], [2, 3]])
+
+        solver._improve(teams, bench, deadline=float("inf"))
+
+        self.assertEqual(sorted(sorted(team) for team in teams), [[0, 2], [1, 3]])
+
+    def test_bench_swap_adds_coverage(self):
+        masks = {1: EVENING, 2: EVENING, 3: EVENING | NIGHT}
+        solver = _solver(masks, overlap_weight=0.0)
+        teams, bench = [[0, 1]], {2}
+
+        solver._improve(teams, bench, deadline=float("inf"))
+
+        self.assertIn(2, teams[0])
+        self.assertEqual(solver.coverage_hours(teams[0]), 8.0)
+
+    def test_zero_budget_keeps_seed(self):
+        masks = dict.fromkeys([1, 2, 3, 4], EVENING)
+        experience = {1: 1, 2: 4, 3: 1, 4: 4}
+
+        teams = _solver(masks, experience).solve(time_budget=0)
+
+        self.assertEqual(sorted(sorted(team.member_ids) for team in teams), [[1, 2], [3, 4]])
+
+    def test_too_few_users(self):
+        self.assertEqual(_solver({1: EVENING}, team_size=3).solve(time_budget=1), [])
@@ -446,13 +446,19 @@ Utility functions for team formation, availability analysis, and chart generatio
 """
 
 import zoneinfo
-from datetime import datetime
+from collections import defaultdict
 from datetime import timedelta
 from typing import Any
 
 from django.contrib.auth import get_user_model
+from django.db.backends.postgresql.psycopg_any import DateTimeTZRange
 from django.utils import timezone
 
+from .availability_cache import CACHE_RESOLUTION
+from .coverage import AvailabilityGrid
+from .coverage import iter_runs
+from .formation import TeamFormationSolver
+
 User = get_user_model()
 
 
@@ -525,27 +531,11 @@ class AvailabilityChartGenerator:
         """Generate data for availability coverage heatmap"""
         display_tz = zoneinfo.ZoneInfo(timezone_display)
 
-        # Get all availability windows
-        windows = (
-            AvailabilityWindow.objects.filter(
-                participation__event=event,
-            )
-            .select_related("participation__user")
-            .order_by("start_time")
-        )
-
-        if not windows.exists():
-            return {"data": [], "users": [], "time_slots": []}
-
-        # Determine time range
-        earliest = windows.first().start_time
-        latest = windows.last().end_time
+        # All windows in one query, as per-user bucket bitmasks
+        grid = AvailabilityGrid.for_event(event, timedelta(hours=resolution_hours))
 
-        # Round to hour boundaries
-        start_time = earliest.replace(minute=0, second=0, microsecond=0)
-        end_time = latest.replace(minute=0, second=0, microsecond=0) + timedelta(
-            hours=1,
-        )
+        if not grid.bucket_count:
+            return {"data": [], "users": [], "time_slots": [], "version": grid.version}
 
         # Get unique users
         users = list(
@@ -558,73 +548,31 @@ class AvailabilityChartGenerator:
 
         # Generate time slots
         time_slots = []
-        current_time = start_time
-        while current_time < end_time:
-            local_time = current_time.astimezone(display_tz)
+        for slot_start in grid.bucket_starts():
+            local_time = slot_start.astimezone(display_tz)
             time_slots.append(
                 {
-                    "utc": current_time.isoformat(),
+                    "utc": slot_start.isoformat(),
                     "local": local_time.isoformat(),
                     "display": local_time.strftime("%a %m/%d %H:%M"),
                 },
             )
-            current_time += timedelta(hours=resolution_hours)
 
         # Build heatmap data
-        heatmap_data = []
-
-        for user in users:
-            user_windows = windows.filter(participation__user_id=user["id"])
-            user_row = {
+        heatmap_data = [
+            {
                 "user": user,
-                "availability": [],
+                "availability": grid.row(user["id"]),
             }
-
-            for slot in time_slots:
-                slot_start = datetime.fromisoformat(slot["utc"].replace("Z", "+00:00"))
-                slot_end = slot_start + timedelta(hours=resolution_hours)
-
-                # Check if user is available in this slot
-                available_windows = user_windows.filter(
-                    start_time__lt=slot_end,
-                    end_time__gt=slot_start,
-                )
-
-                if available_windows.exists():
-                    # Get the highest preference level (1 is best)
-                    best_preference = min(w.preference_level for w in available_windows)
-                    roles = set()
-                    for w in available_windows:
-                        if w.can_drive:
-                            roles.add("driver")
-                        if w.can_spot:
-                            roles.add("spotter")
-                        if w.can_strategize:
-                            roles.add("strategist")
-
-                    user_row["availability"].append(
-                        {
-                            "available": True,
-                            "preference_level": best_preference,
-                            "roles": list(roles),
-                        },
-                    )
-                else:
-                    user_row["availability"].append(
-                        {
-                            "available": False,
-                            "preference_level": 0,
-                            "roles": [],
-                        },
-                    )
-
-            heatmap_data.append(user_row)
+            for user in users
+        ]
 
         return {
             "data": heatmap_data,
             "users": users,
             "time_slots": time_slots,
             "timezone": timezone_display,
+            "version": grid.version,
         }
 
     @staticmethod
@@ -632,9 +580,16 @@ class AvailabilityChartGenerator:
         user_ids: list[int],
         event,
         timezone_display="UTC",
+        min_overlap_hours=2,
     ) -> dict[str, Any]:
         """Generate chart data for team member availability overlap"""
-        overlaps = AvailabilityWindow.find_overlapping_availability(user_ids, event)
+        grid = AvailabilityGrid.for_event(event, CACHE_RESOLUTION)
+        bucket_hours = grid.resolution / timedelta(hours=1)
+        drive_masks = {
+            user_id: grid.users[user_id].roles["drive"]
+            for user_id in user_ids
+            if user_id in grid.users
+        }
 
         # Build network-style data for D3.js or similar
         nodes = []
@@ -650,20 +605,30 @@ class AvailabilityChartGenerator:
                 },
             )
 
-        for overlap in overlaps:
-            links.append(
-                {
-                    "source": overlap["user1_id"],
-                    "target": overlap["user2_id"],
-                    "value": overlap["total_overlap_hours"],
-                    "overlap_windows": overlap["overlap_windows"],
-                },
-            )
+        # Stretches both members can drive, counted from min_overlap_hours
+        paired = sorted(drive_masks)
+        for i, user1 in enumerate(paired):
+            for user2 in paired[i + 1 :]:
+                runs = [
+                    (last - first) * bucket_hours
+                    for first, last in iter_runs(drive_masks[user1] & drive_masks[user2])
+                ]
+                runs = [hours for hours in runs if hours >= min_overlap_hours]
+                if runs:
+                    links.append(
+                        {
+                            "source": user1,
+                            "target": user2,
+                            "value": sum(runs),
+                            "overlap_windows": len(runs),
+                        },
+                    )
 
         return {
             "nodes": nodes,
             "links": links,
             "timezone": timezone_display,
+            "version": grid.version,
         }
 
 
@@ -677,204 +642,32 @@ class TeamFormationAlgorithms:
         max_teams: int = None,
     ) -> list[list[int]]:
         """
-        Greedy algorithm for team formation based on availability overlap.
+        Team formation based on availability overlap.
         Returns list of teams (each team is a list of user IDs).
         """
-        # Get all participants
-        participants = list(
-            EventParticipation.objects.filter(
-                event=event,
-                status="signed_up",
-                participation_type="team_signup",
-            ).values_list("user_id", flat=True),
-        )
-
-        if len(participants) < team_size:
-            return []
-
-        # Get all pairwise overlaps
-        all_overlaps = AvailabilityWindow.find_overlapping_availability(
-            participants,
-            event,
-        )
-
-        # Build adjacency matrix with overlap hours as weights
-        overlap_matrix = {}
-        for user_id in participants:
-            overlap_matrix[user_id] = {}
-
-        for overlap in all_overlaps:
-            user1, user2 = overlap["user1_id"], overlap["user2_id"]
-            hours = overlap["total_overlap_hours"]
-            overlap_matrix[user1][user2] = hours
-            overlap_matrix[user2][user1] = hours
-
-        # Greedy team formation
-        teams = []
-        available_users = set(participants)
-
-        while len(available_users) >= team_size:
-            if max_teams and len(teams) >= max_teams:
-                break
-
-            # Find the pair with highest overlap
-            best_pair = None
-            best_score = 0
-
-            for user1 in available_users:
-                for user2 in available_users:
-                    if user1 >= user2:  # Avoid duplicates
-                        continue
-                    score = overlap_matrix[user1].get(user2, 0)
-                    if score > best_score:
-                        best_score = score
-                        best_pair = (user1, user2)
-
-            if not best_pair:
-                break
-
-            # Start team with best pair
-            current_team = list(best_pair)
-            available_users.remove(best_pair[0])
-            available_users.remove(best_pair[1])
-
-            # Add more members to reach team_size
-            while len(current_team) < team_size and available_users:
-                best_addition = None
-                best_addition_score = 0
-
-                for candidate in available_users:
-                    # Calculate average overlap with current team members
-                    total_overlap = sum(
-                        overlap_matrix[candidate].get(member, 0)
-                        for member in current_team
-                    )
-                    avg_overlap = total_overlap / len(current_team)
-
-                    if avg_overlap > best_addition_score:
-                        best_addition_score = avg_overlap
-                        best_addition = candidate
-
-                if best_addition and best_addition_score > 0:
-                    current_team.append(best_addition)
-                    available_users.remove(best_addition)
-                else:
-                    break
-
-            if len(current_team) == team_size:
-                teams.append(current_team)
-
-        return teams
+        solver = TeamFormationSolver.for_event(event, team_size=team_size)
+        return [team.member_ids for team in solver.solve(max_teams=max_teams)]
 
     @staticmethod
     def balanced_team_formation(event, team_size: int = 3) -> list[dict[str, Any]]:
         """
         Create balanced teams considering both availability and skill/experience diversity.
         """
-        participants = EventParticipation.objects.filter(
-            event=event,
-            status="signed_up",
-            participation_type="team_signup",
-        ).select_related("user")
-
-        if participants.count() < team_size:
-            return []
+        teams = TeamFormationSolver.for_event(event, team_size=team_size).solve()
+        users = User.objects.in_bulk(
+            [user_id for team in teams for user_id in team.member_ids],
+        )
 
-        # Get user experience levels
-        experience_mapping = {
-            "beginner": 1,
-            "intermediate": 2,
-            "advanced": 3,
-            "professional": 4,
-        }
-        user_data = {}
-
-        for p in participants:
-            user_data[p.user_id] = {
-                "user": p.user,
-                "experience": experience_mapping.get(p.experience_level, 2),
-                "max_stint": p.max_stint_duration or 60,
-                "preferred_car": p.preferred_car,
+        return [
+            {
+                "members": [users[user_id] for user_id in team.member_ids],
+                "member_ids": team.member_ids,
+                "balance_score": team.score,
+                "average_experience": team.average_experience,
+                "total_overlap_hours": team.overlap_hours,
             }
-
-        # Get availability overlaps
-        user_ids = list(user_data.keys())
-        overlaps = AvailabilityWindow.find_overlapping_availability(user_ids, event)
-
-        # Build teams using a more sophisticated approach
-        teams = []
-        remaining_users = set(user_ids)
-
-        while len(remaining_users) >= team_size:
-            # Find the most balanced team combination
-            best_team = None
-            best_balance_score = -1
-
-            # Try different combinations (simplified for performance)
-            from itertools import combinations
-
-            for team_combo in combinations(remaining_users, team_size):
-                # Calculate balance score
-                team_list = list(team_combo)
-
-                # Experience balance
-                experiences = [user_data[uid]["experience"] for uid in team_list]
-                exp_variance = TeamFormationAlgorithms._calculate_variance(experiences)
-
-                # Availability overlap
-                team_overlaps = [
-                    o
-                    for o in overlaps
-                    if o["user1_id"] in team_list and o["user2_id"] in team_list
-                ]
-                avg_overlap = sum(
-                    o["total_overlap_hours"] for o in team_overlaps
-                ) / max(len(team_overlaps), 1)
-
-                # Combined score (lower variance = better balance, higher overlap = better)
-                balance_score = avg_overlap / max(
-                    exp_variance,
-                    0.1,
-                )  # Avoid division by zero
-
-                if balance_score > best_balance_score:
-                    best_balance_score = balance_score
-                    best_team = team_list
-
-            if best_team:
-                team_info = {
-                    "members": [user_data[uid]["user"] for uid in best_team],
-                    "member_ids": best_team,
-                    "balance_score": best_balance_score,
-                    "average_experience": sum(
-                        user_data[uid]["experience"] for uid in best_team
-                    )
-                    / len(best_team),
-                    "total_overlap_hours": sum(
-                        o["total_overlap_hours"]
-                        for o in overlaps
-                        if o["user1_id"] in best_team and o["user2_id"] in best_team
-                    ),
-                }
-                teams.append(team_info)
-
-                # Remove assigned users
-                for uid in best_team:
-                    remaining_users.remove(uid)
-            else:
-                break
-
-        return teams
-
-    @staticmethod
-    def _calculate_variance(numbers: list[float]) -> float:
-        """Calculate variance of a list of numbers"""
-        if len(numbers) < 2:
-            return 0
-
-        mean = sum(numbers) / len(numbers)
-        variance = sum((x - mean) ** 2 for x in numbers) / len(numbers)
-        return variance
+            for team in teams
+        ]
 
 
 class AvailabilityConflictDetector:
@@ -896,56 +689,63 @@ class AvailabilityConflictDetector:
             List of conflict descriptions
         """
         conflicts = []
+        if not proposed_stints:
+            return conflicts
+
+        # One && query for the drive windows of every stint's driver that
+        # touch the stints' span; each stint is then checked in memory
+        windows_by_user = defaultdict(list)
+        for window in AvailabilityWindow.objects.filter(
+            participation__user_id__in={stint["user_id"] for stint in proposed_stints},
+            time_range__overlap=DateTimeTZRange(
+                min(stint["start_time"] for stint in proposed_stints),
+                max(stint["end_time"] for stint in proposed_stints),
+            ),
+            can_drive=True,
+        ).values("participation__user_id", "start_time", "end_time", "preference_level"):
+            windows_by_user[window.pop("participation__user_id")].append(window)
 
         for stint in proposed_stints:
             user_id = stint["user_id"]
             start_time = stint["start_time"]
             end_time = stint["end_time"]
+            user_windows = windows_by_user[user_id]
 
             # Check if user is available during this time
-            available_windows = AvailabilityWindow.objects.filter(
-                participation__user_id=user_id,
-                start_time__lte=start_time,
-                end_time__gte=end_time,
-                can_drive=True,
-            )
+            if any(
+                window["start_time"] <= start_time and window["end_time"] >= end_time
+                for window in user_windows
+            ):
+                continue
 
-            if not available_windows.exists():
-                # Check partial availability
-                partial_windows = AvailabilityWindow.objects.filter(
-                    participation__user_id=user_id,
-                    start_time__lt=end_time,
-                    end_time__gt=start_time,
-                    can_drive=True,
+            # Check partial availability
+            partial_windows = [
+                window
+                for window in user_windows
+                if window["start_time"] < end_time and window["end_time"] > start_time
+            ]
+
+            if partial_windows:
+                conflicts.append(
+                    {
+                        "type": "partial_availability",
+                        "user_id": user_id,
+                        "stint_start": start_time,
+                        "stint_end": end_time,
+                        "available_windows": partial_windows,
+                        "severity": "warning",
+                    },
+                )
+            else:
+                conflicts.append(
+                    {
+                        "type": "no_availability",
+                        "user_id": user_id,
+                        "stint_start": start_time,
+                        "stint_end": end_time,
+                        "severity": "error",
+                    },
                 )
-
-                if partial_windows.exists():
-                    conflicts.append(
-                        {
-                            "type": "partial_availability",
-                            "user_id": user_id,
-                            "stint_start": start_time,
-                            "stint_end": end_time,
-                            "available_windows": list(
-                                partial_windows.values(
-                                    "start_time",
-                                    "end_time",
-                                    "preference_level",
-                                ),
-                            ),
-                            "severity": "warning",
-                        },
-                    )
-                else:
-                    conflicts.append(
-                        {
-                            "type": "no_availability",
-                            "user_id": user_id,
-                            "stint_start": start_time,
-                            "stint_end": end_time,
-                            "severity": "error",
-                        },
-                    )
 
         return conflicts
 